@@ -265,6 +265,6 @@ class Mock(object):
         else:
             return Mock()
 
-MOCK_MODULES = ['numpy', 'numpy.random', 'pp']
+MOCK_MODULES = ['numpy', 'numpy.random']
 for mod_name in MOCK_MODULES:
     sys.modules[mod_name] = Mock()
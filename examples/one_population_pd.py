@@ -79,6 +79,9 @@ def alldone(this):
 @once('generation', firstgen)
 class PrisonersDilemmaSim(OnePopDiscreteReplicatorDynamics):
 
+    # reset clears all of the per-run state, so workers may reuse instances
+    reusable = True
+
     _payoffs = [[3, 0], [4, 1]]
 
     def __init__(self, *args, **kwdargs):
@@ -79,6 +79,9 @@ def alldone(this):
 @once('generation', firstgen)
 class HawkDoveSim(NPopDiscreteReplicatorDynamics):
 
+    # reset clears all of the per-run state, so workers may reuse instances
+    reusable = True
+
     _payoffs = [[0, 4], [1, 2]]
 
     def __init__(self, *args, **kwdargs):
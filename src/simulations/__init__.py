@@ -5,12 +5,39 @@ Modules:
     :py:mod:`~simulations.base`
       Handles generic set-up tasks for EventEmitter-derived classes
 
+    :py:mod:`~simulations.catalogue`
+      Handles a SQLite catalogue of result summaries
+
+    :py:mod:`~simulations.clustering`
+      Handles clustering final populations into attractors
+
+    :py:mod:`~simulations.columns`
+      Handles columnar storage of replicator dynamics results
+
+    :py:mod:`~simulations.dispatch`
+      Handles chunked dispatch of simulation tasks to a worker pool
+
+    :py:mod:`~simulations.distributed`
+      Handles spreading a batch of simulations across machines over sockets
+
+    :py:mod:`~simulations.records`
+      Handles reading and writing aggregate stats file records
+
+    :py:mod:`~simulations.reducers`
+      Handles online summaries of simulation results
+
+    :py:mod:`~simulations.seeds`
+      Handles reproducible random streams for duplications
+
     :py:mod:`~simulations.simulation`
       Handles defining simulations
 
     :py:mod:`~simulations.simulation_runner`
       Handles running simulations
 
+    :py:mod:`~simulations.statsmerger`
+      Handles merging simulation output files
+
     :py:mod:`~simulations.statsparser`
       Handles analyzing simulation output
 
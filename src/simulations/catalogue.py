@@ -0,0 +1,359 @@
+""" A SQLite catalogue of per-duplication result summaries
+
+The catalogue database has the tables:
+
+    runs(run_id, stats_file, created)
+      one row per run (or imported stats file)
+
+    parameters(run_id, name, value)
+      the scalar options and data of each run
+
+    results(run_id, duplication, game_parameter, generation_count, converged, reason, cluster)
+      one row per result, where reason is 'stable state', 'force stop' or
+      NULL (unknown) and cluster refers to the clusters table
+
+    clusters(cluster, shape, state)
+      the final-state clusters, shared by all of the runs in the catalogue,
+      with the JSON-encoded shape and state of the first member of each
+
+with indexes on the columns that queries filter by.
+
+Classes:
+
+    :py:class:`Catalogue`
+      Adds result summaries to and queries a catalogue database
+
+"""
+
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from simulations.clustering import AttractorClustering
+from simulations.columns import _unwrap_swept
+from simulations.records import result_summary
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    stats_file TEXT,
+    created REAL
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    run_id TEXT,
+    name TEXT,
+    value,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT,
+    duplication INTEGER,
+    game_parameter,
+    generation_count INTEGER,
+    converged INTEGER,
+    reason TEXT,
+    cluster INTEGER,
+    PRIMARY KEY (run_id, duplication)
+);
+CREATE TABLE IF NOT EXISTS clusters (
+    cluster INTEGER PRIMARY KEY,
+    shape TEXT,
+    state TEXT
+);
+CREATE INDEX IF NOT EXISTS parameters_name_value ON parameters (name, value);
+CREATE INDEX IF NOT EXISTS results_cluster ON results (cluster);
+CREATE INDEX IF NOT EXISTS results_reason ON results (reason);
+CREATE INDEX IF NOT EXISTS results_generation_count ON results (generation_count);
+CREATE INDEX IF NOT EXISTS results_game_parameter ON results (game_parameter);
+"""
+
+REASONS = {1: 'stable state', 0: 'force stop', -1: None}
+
+
+class Catalogue(object):
+    """ Adds result summaries to and queries a catalogue database
+
+    Parameters:
+
+        path
+          the path of the SQLite database (created if needed)
+
+    Keyword Parameters:
+
+        effective_zero
+          The effective zero value for floating-point comparisons
+          (default 1e-10)
+
+        tolerance_scale
+          The multiple of the effective zero within which final states are
+          put in the same cluster (default 1e4)
+
+    Public Methods:
+
+        :py:meth:`~Catalogue.add_result`
+          Adds the summary of a result
+
+        :py:meth:`~Catalogue.add_run`
+          Adds a run and its parameters
+
+        :py:meth:`~Catalogue.close`
+          Commits and closes the database
+
+        :py:meth:`~Catalogue.commit`
+          Commits the pending additions
+
+        :py:meth:`~Catalogue.find`
+          Queries the result summaries
+
+    """
+
+    def __init__(self, path, *args, **kwdargs):
+        """ Opens the database, creating the tables if needed, and loads the
+            existing clusters
+
+        Parameters:
+
+            path
+              the path of the SQLite database
+
+        Keyword Parameters:
+
+            effective_zero
+              The effective zero value for floating-point comparisons
+              (default 1e-10)
+
+            tolerance_scale
+              The multiple of the effective zero within which final states
+              are put in the same cluster (default 1e4)
+
+        """
+
+        self.path = path
+        self._clustering_args = kwdargs
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+        self._clusterings = {}
+        self._cluster_ids = {}
+        for (cluster, shape, state) in self.connection.execute(
+                "SELECT cluster, shape, state FROM clusters ORDER BY cluster").fetchall():
+            shape = tuple(json.loads(shape))
+            local = self._clustering(shape).add(np.array(json.loads(state)).reshape(shape), 0)
+            # clusters that merge under a larger tolerance keep the first id
+            if local == len(self._cluster_ids[shape]):
+                self._cluster_ids[shape].append(cluster)
+
+    def _clustering(self, shape):
+        """ Returns the clustering for final states of a shape
+
+        Parameters:
+
+            shape
+              the shape of the final states
+
+        """
+
+        if shape not in self._clusterings:
+            self._clusterings[shape] = AttractorClustering(**self._clustering_args)
+            self._cluster_ids[shape] = []
+
+        return self._clusterings[shape]
+
+    def _cluster(self, state):
+        """ Returns the id of the cluster of a final state, adding a new
+            cluster if it is not near any existing one
+
+        Parameters:
+
+            state
+              the final population
+
+        """
+
+        state = np.asarray(state, dtype=np.float64)
+        clustering = self._clustering(state.shape)
+        ids = self._cluster_ids[state.shape]
+
+        local = clustering.add(state)
+        if local == len(ids):
+            cursor = self.connection.execute("INSERT INTO clusters (shape, state) VALUES (?, ?)",
+                                             (json.dumps(list(state.shape)),
+                                              json.dumps(state.ravel().tolist())))
+            ids.append(cursor.lastrowid)
+
+        return ids[local]
+
+    def add_run(self, run_id, stats_file=None, parameters=None):
+        """ Adds (or replaces) a run and its parameters
+
+        Parameters:
+
+            run_id
+              the identifier of the run
+
+            stats_file
+              the path of the stats file of the run
+
+            parameters
+              a dict of the run's parameters (values that are not numbers,
+              strings or booleans are skipped)
+
+        """
+
+        self.connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?)",
+                                (run_id, stats_file, time.time()))
+        self.connection.execute("DELETE FROM parameters WHERE run_id = ?", (run_id,))
+
+        for (name, value) in sorted((parameters or {}).items()):
+            if isinstance(value, np.number):
+                value = value.item()
+            if isinstance(value, (bool, int, long, float, basestring)):
+                self.connection.execute("INSERT INTO parameters VALUES (?, ?, ?)",
+                                        (run_id, name, value))
+
+    def add_result(self, run_id, duplication, result):
+        """ Adds (or replaces) the summary of a result
+
+        Parameters:
+
+            run_id
+              the identifier of the run
+
+            duplication
+              the (1-based) duplication number of the result
+
+            result
+              the result object (a (game_parameter, result) pair for sweeps)
+
+        """
+
+        summary = _unwrap_swept(result)
+        if summary is not result:
+            game_parameter = result[0]
+            if isinstance(game_parameter, np.number):
+                game_parameter = game_parameter.item()
+        else:
+            game_parameter = None
+
+        (generation_count, converged) = result_summary(summary)
+
+        try:
+            cluster = self._cluster(summary[2])
+        except (TypeError, IndexError, ValueError):
+            cluster = None
+
+        self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                (run_id, duplication, game_parameter,
+                                 None if generation_count < 0 else generation_count,
+                                 None if converged < 0 else converged,
+                                 REASONS[converged],
+                                 cluster))
+
+    def find(self, run_id=None, parameters=None, reason=None, final_state=None,
+                   game_parameter=None, min_generations=None, max_generations=None):
+        """ Returns the list of (run_id, duplication, game_parameter,
+            generation_count, reason, cluster) rows of the results matching
+            all of the given filters
+
+        Parameters:
+
+            run_id
+              the identifier of a run
+
+            parameters
+              a dict of parameter values that the run must have
+
+            reason
+              'stable state' or 'force stop'
+
+            final_state
+              a final population (the results must be in its cluster)
+
+            game_parameter
+              the game parameter of swept results
+
+            min_generations
+              the minimum generation count
+
+            max_generations
+              the maximum generation count
+
+        """
+
+        joins = []
+        conditions = []
+        values = []
+
+        for (k, (name, value)) in enumerate(sorted((parameters or {}).items())):
+            joins.append("JOIN parameters p{0} ON p{0}.run_id = r.run_id "
+                         "AND p{0}.name = ? AND p{0}.value = ?".format(k))
+            values.extend([name, value])
+
+        if run_id is not None:
+            conditions.append("r.run_id = ?")
+            values.append(run_id)
+
+        if reason is not None:
+            conditions.append("r.reason = ?")
+            values.append(reason)
+
+        if final_state is not None:
+            clusters = self._matching_clusters(final_state)
+            conditions.append("r.cluster IN ({0})".format(", ".join("?" * len(clusters)) or "NULL"))
+            values.extend(clusters)
+
+        if game_parameter is not None:
+            conditions.append("r.game_parameter = ?")
+            values.append(game_parameter)
+
+        if min_generations is not None:
+            conditions.append("r.generation_count >= ?")
+            values.append(min_generations)
+
+        if max_generations is not None:
+            conditions.append("r.generation_count <= ?")
+            values.append(max_generations)
+
+        query = "SELECT r.run_id, r.duplication, r.game_parameter, r.generation_count, " \
+                "r.reason, r.cluster FROM results r " + " ".join(joins)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY r.run_id, r.duplication"
+
+        return self.connection.execute(query, values).fetchall()
+
+    def _matching_clusters(self, state):
+        """ Returns the ids of the clusters whose first member is within the
+            tolerance of a state
+
+        Parameters:
+
+            state
+              the final population
+
+        """
+
+        state = np.asarray(state, dtype=np.float64)
+        if state.shape not in self._clusterings:
+            return []
+
+        ids = self._cluster_ids[state.shape]
+
+        return [ids[k] for k in self._clusterings[state.shape].matching(state)]
+
+    def commit(self):
+        """ Commits the pending additions
+
+        """
+
+        self.connection.commit()
+
+    def close(self):
+        """ Commits and closes the database
+
+        """
+
+        self.connection.commit()
+        self.connection.close()
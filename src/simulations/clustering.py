@@ -0,0 +1,290 @@
+""" Clustering of final populations into attractors
+
+States are clustered by their first member ("leader"): a state joins the
+closest existing cluster whose leader is within the tolerance in every
+coordinate, and otherwise starts a new cluster. Leaders are kept in a grid
+(spatial hash) of cells four tolerances wide, centred on the multiples of the
+cell width, so each state is only compared with the leaders of its own cell
+and of the neighbouring cells it is within a tolerance of. Typically that is
+one cell, so clustering is close to linear in the number of states.
+
+The grid has at most GRID_DIMENSIONS dimensions. States with more
+coordinates are projected onto that many weighted sums of coordinates, whose
+tolerances grow with the weights. So a lookup probes at most
+2 ** GRID_DIMENSIONS cells, however many types the game has, and the
+candidates found there are still compared in every coordinate.
+
+Classes:
+
+    :py:class:`AttractorClustering`
+      Clusters states incrementally
+
+Functions:
+
+    :py:func:`cluster_states`
+      Clusters an array of states
+
+    :py:func:`grid_projection`
+      Returns the projection of states onto the grid
+
+"""
+
+import itertools
+
+import numpy as np
+
+CELL_TOLERANCES = 4.
+
+# the most dimensions of the grid the leaders are kept in
+GRID_DIMENSIONS = 6
+
+
+class AttractorClustering(object):
+    """ Clusters states incrementally within a tolerance that is a multiple of
+        the effective zero
+
+    Keyword Parameters:
+
+        effective_zero
+          The effective zero value for floating-point comparisons
+          (default 1e-10)
+
+        tolerance_scale
+          The multiple of the effective zero within which states are
+          clustered (default 1e4)
+
+    Public Methods:
+
+        :py:meth:`~AttractorClustering.add`
+          Adds a state to its cluster
+
+        :py:meth:`~AttractorClustering.attractors`
+          Returns the clusters with their counts and basin frequencies
+
+        :py:meth:`~AttractorClustering.matching`
+          Returns the clusters whose first member is near a state
+
+    """
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the clustering
+
+        Keyword Parameters:
+
+            effective_zero
+              The effective zero value for floating-point comparisons
+              (default 1e-10)
+
+            tolerance_scale
+              The multiple of the effective zero within which states are
+              clustered (default 1e4)
+
+        """
+
+        if 'effective_zero' in kwdargs and kwdargs['effective_zero']:
+            self.effective_zero = kwdargs['effective_zero']
+        else:
+            self.effective_zero = 1e-10
+
+        if 'tolerance_scale' in kwdargs and kwdargs['tolerance_scale']:
+            self.tolerance_scale = kwdargs['tolerance_scale']
+        else:
+            self.tolerance_scale = 1e4
+
+        self.tolerance = self.effective_zero * self.tolerance_scale
+        self.cell_width = CELL_TOLERANCES * self.tolerance
+
+        self.total = 0
+        self._shape = None
+        self._projection = None
+        self._widths = None
+        self._margins = None
+        self._grid = {}
+        self._leaders = []
+        self._sums = []
+        self._counts = []
+
+    def _cells(self, state):
+        """ Returns the keys of the cells to search for the leaders near a
+            (flattened) state, its own cell first
+
+        Parameters:
+
+            state
+              the flattened state
+
+        """
+
+        position = self._projection.dot(state) / self._widths + .5
+        cell = np.floor(position)
+        offset = (position - cell) * self._widths
+
+        choices = []
+        for (low, high) in zip(offset < self._margins, offset > self._widths - self._margins):
+            choices.append((0,) + ((-1,) if low else ()) + ((1,) if high else ()))
+
+        cell = cell.astype(np.int64)
+        return [tuple((cell + np.array(step)).tolist()) for step in itertools.product(*choices)]
+
+    def _near(self, state):
+        """ Yields the (cluster, distance) pairs of the clusters whose leaders
+            are within the tolerance of a flattened state
+
+        Parameters:
+
+            state
+              the flattened state
+
+        """
+
+        for key in self._cells(state):
+            for cluster in self._grid.get(key, ()):
+                distance = np.abs(self._leaders[cluster] - state).max()
+                if distance <= self.tolerance:
+                    yield (cluster, distance)
+
+    def matching(self, state):
+        """ Returns the sorted indices of the clusters whose first member is
+            within the tolerance of a state
+
+        Parameters:
+
+            state
+              the state to look up
+
+        """
+
+        state = np.asarray(state, dtype=np.float64)
+        if state.shape != self._shape:
+            return []
+
+        return sorted(cluster for (cluster, _) in self._near(state.ravel()))
+
+    def add(self, state, count=1):
+        """ Adds a state (count times) to its cluster, returning the index of
+            the cluster
+
+        Parameters:
+
+            state
+              the final population
+
+            count
+              the number of times to add it (default 1)
+
+        """
+
+        state = np.asarray(state, dtype=np.float64)
+        if self._shape is None:
+            self._shape = state.shape
+            self._projection = grid_projection(state.size)
+            weights = np.abs(self._projection).sum(axis=1)
+            self._widths = self.cell_width * weights
+            self._margins = self.tolerance * weights
+        elif state.shape != self._shape:
+            raise ValueError("States must all have shape {0}".format(self._shape))
+
+        state = state.ravel()
+
+        best = None
+        best_distance = None
+        for (cluster, distance) in self._near(state):
+            if best is None or distance < best_distance:
+                best = cluster
+                best_distance = distance
+
+        if best is None:
+            best = len(self._leaders)
+            self._leaders.append(state)
+            self._sums.append(np.zeros(len(state), dtype=np.float64))
+            self._counts.append(0)
+            self._grid.setdefault(self._cells(state)[0], []).append(best)
+
+        self._sums[best] += state * count
+        self._counts[best] += count
+        self.total += count
+
+        return best
+
+    def attractors(self):
+        """ Returns a list of (state, count, frequency, standard_error) tuples,
+            most common first, where state is the mean of the cluster's states
+            and frequency estimates the size of its basin of attraction
+
+        """
+
+        result = []
+        for (total, count) in zip(self._sums, self._counts):
+            frequency = float(count) / self.total
+            result.append(((total / count).reshape(self._shape),
+                           count,
+                           frequency,
+                           np.sqrt(frequency * (1. - frequency) / self.total)))
+
+        return sorted(result, key=lambda attractor: -attractor[1])
+
+
+def grid_projection(size):
+    """ Returns the matrix projecting a flattened state onto the grid: the
+        identity for at most GRID_DIMENSIONS coordinates, and otherwise the
+        sums of GRID_DIMENSIONS strided groups of coordinates, the j-th
+        coordinate of a group weighted j + 1 (which keeps the pure states
+        apart)
+
+    Parameters:
+
+        size
+          the number of coordinates of the states
+
+    """
+
+    if size <= GRID_DIMENSIONS:
+        return np.eye(size)
+
+    projection = np.zeros((GRID_DIMENSIONS, size), dtype=np.float64)
+    for i in range(size):
+        projection[i % GRID_DIMENSIONS, i] = i // GRID_DIMENSIONS + 1
+
+    return projection
+
+
+def cluster_states(states, **kwdargs):
+    """ Clusters an array of states (one per row), adding each distinct state
+        once with its multiplicity, and returns the
+        :py:meth:`~AttractorClustering.attractors`
+
+    Parameters:
+
+        states
+          an array whose first axis runs over the states (rows containing NaN
+          are skipped)
+
+    Keyword Parameters:
+
+        effective_zero
+          The effective zero value for floating-point comparisons
+          (default 1e-10)
+
+        tolerance_scale
+          The multiple of the effective zero within which states are
+          clustered (default 1e4)
+
+    """
+
+    states = np.asarray(states, dtype=np.float64)
+    flat = states.reshape(len(states), -1)
+    flat = flat[~np.isnan(flat).any(axis=1)]
+
+    clustering = AttractorClustering(**kwdargs)
+    if len(flat):
+        # dedupe the rows through a void view of their bytes (adding 0. turns
+        # -0. into 0.), then visit them in lexicographic order
+        flat = np.ascontiguousarray(flat) + 0.
+        rows = flat.view(np.dtype((np.void, flat.dtype.itemsize * flat.shape[1]))).ravel()
+        (_, first, inverse) = np.unique(rows, return_index=True, return_inverse=True)
+        counts = np.bincount(inverse)
+        order = np.lexsort(flat[first].T[::-1])
+        for k in order:
+            clustering.add(flat[first[k]].reshape(states.shape[1:]), int(counts[k]))
+
+    return clustering.attractors()
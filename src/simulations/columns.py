@@ -0,0 +1,294 @@
+""" Columnar storage of replicator dynamics results
+
+Each column is a .npy file next to the stats file (see :py:func:`column_path`)
+whose row k holds the value for duplication k + 1:
+
+    generation_count
+      the int64 generation counts (-1 for rows with no result)
+
+    converged
+      int8 flags, 1 if the run reached a stable state, 0 if it was force
+      stopped and -1 if unknown
+
+    initial_pop
+      the float64 initial populations (NaN for rows with no result)
+
+    final_pop
+      the float64 final populations (NaN for rows with no result)
+
+The population columns are created when the first result arrives, since
+their shape is only known then. The result_data of each run is not stored
+in the columns.
+
+Classes:
+
+    :py:class:`ColumnWriter`
+      Writes results into memory-mapped column files
+
+Functions:
+
+    :py:func:`column_path`
+      Returns the path of a column file of a stats file
+
+    :py:func:`read_columns`
+      Reads the column files of a stats file as arrays
+
+    :py:func:`stack_results`
+      Stacks a list of results into in-memory columns
+
+"""
+
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+COLUMNS = ('generation_count', 'converged', 'initial_pop', 'final_pop')
+
+
+class ColumnWriter(object):
+    """ Writes replicator dynamics results into preallocated, memory-mapped
+        column files
+
+    Parameters:
+
+        stats_path
+          the path of the stats file the columns belong to
+
+        num_results
+          the number of rows to allocate
+
+        append
+          whether to reopen existing column files (e.g. when resuming a run)
+          instead of creating them (default False)
+
+    Public Methods:
+
+        :py:meth:`~ColumnWriter.close`
+          Flushes and closes the column files
+
+        :py:meth:`~ColumnWriter.write`
+          Writes a result into its row
+
+    """
+
+    def __init__(self, stats_path, num_results, append=False):
+        """ Creates (or reopens) the column files
+
+        Parameters:
+
+            stats_path
+              the path of the stats file the columns belong to
+
+            num_results
+              the number of rows to allocate
+
+            append
+              whether to reopen existing column files instead of creating
+              them (default False)
+
+        """
+
+        self.stats_path = stats_path
+        self.num_results = num_results
+
+        self.initial_pop = None
+        self.final_pop = None
+
+        if append and os.path.exists(column_path(stats_path, 'generation_count')):
+            for name in COLUMNS:
+                path = column_path(stats_path, name)
+                if os.path.exists(path):
+                    column = open_memmap(path, mode='r+')
+                    if len(column) != num_results:
+                        raise ValueError("Cannot reopen {0} columns of {1} rows with {2} rows".format(
+                                            stats_path, len(column), num_results))
+                    setattr(self, name, column)
+            return
+
+        self.generation_count = open_memmap(column_path(stats_path, 'generation_count'),
+                                            mode='w+', dtype=np.int64,
+                                            shape=(num_results,))
+        self.generation_count[:] = -1
+
+        self.converged = open_memmap(column_path(stats_path, 'converged'),
+                                     mode='w+', dtype=np.int8,
+                                     shape=(num_results,))
+        self.converged[:] = -1
+
+    def _create_pop_columns(self, shape):
+        """ Creates the population column files
+
+        Parameters:
+
+            shape
+              the shape of one population
+
+        """
+
+        self.initial_pop = open_memmap(column_path(self.stats_path, 'initial_pop'),
+                                       mode='w+', dtype=np.float64,
+                                       shape=(self.num_results,) + shape)
+        self.initial_pop[:] = np.nan
+
+        self.final_pop = open_memmap(column_path(self.stats_path, 'final_pop'),
+                                     mode='w+', dtype=np.float64,
+                                     shape=(self.num_results,) + shape)
+        self.final_pop[:] = np.nan
+
+    def write(self, duplication, result):
+        """ Writes a result into the row of its duplication
+
+        Parameters:
+
+            duplication
+              the (1-based) duplication number of the result
+
+            result
+              a (generation_count, initial_pop, final_pop, result_data) result
+
+        """
+
+        if not _is_replicator_result(result):
+            raise ValueError("Columnar output needs (generation_count, initial_pop, final_pop, result_data) results")
+
+        initial_pop = np.asarray(result[1], dtype=np.float64)
+        final_pop = np.asarray(result[2], dtype=np.float64)
+
+        if self.initial_pop is None:
+            self._create_pop_columns(initial_pop.shape)
+
+        row = duplication - 1
+        self.generation_count[row] = result[0]
+        self.initial_pop[row] = initial_pop
+        self.final_pop[row] = final_pop
+
+        converged = getattr(result, 'converged', None)
+        if converged is not None:
+            self.converged[row] = int(bool(converged))
+
+    def close(self):
+        """ Flushes and closes the column files
+
+        """
+
+        for name in COLUMNS:
+            column = getattr(self, name)
+            if column is not None:
+                column.flush()
+                setattr(self, name, None)
+
+
+def _is_replicator_result(result):
+    """ Checks whether a result looks like a (generation_count, initial_pop,
+        final_pop, result_data) tuple
+
+    Parameters:
+
+        result
+          the result object returned by a simulation
+
+    """
+
+    return isinstance(result, tuple) and len(result) >= 3 and \
+            isinstance(result[0], (int, long, np.integer))
+
+
+def _unwrap_swept(result):
+    """ Returns the replicator result of a swept (game_parameter, result) pair,
+        or the result itself if it is not such a pair
+
+    Parameters:
+
+        result
+          the result object returned by a simulation
+
+    """
+
+    if isinstance(result, tuple) and len(result) == 2 and _is_replicator_result(result[1]):
+        return result[1]
+
+    return result
+
+
+def column_path(stats_path, name):
+    """ Returns the path of a column file of a stats file
+
+    Parameters:
+
+        stats_path
+          the path of the stats file
+
+        name
+          the name of the column (one of :py:data:`COLUMNS`)
+
+    """
+
+    return "{0}.{1}.npy".format(stats_path, name)
+
+
+def read_columns(stats_path, mmap_mode='r'):
+    """ Reads the column files of a stats file, returning a dict of arrays by
+        column name (the population columns are missing if no result was
+        written)
+
+    Parameters:
+
+        stats_path
+          the path of the stats file
+
+        mmap_mode
+          the memory-mapping mode passed to :py:func:`numpy.load` (default
+          'r', None to read the arrays into memory)
+
+    """
+
+    columns = {}
+    for name in COLUMNS:
+        path = column_path(stats_path, name)
+        if os.path.exists(path):
+            columns[name] = np.load(path, mmap_mode=mmap_mode)
+
+    if 'generation_count' not in columns:
+        raise IOError("No columns found for {0}".format(stats_path))
+
+    return columns
+
+
+def stack_results(results):
+    """ Stacks a list of results into a dict of in-memory columns, with the
+        keys of :py:data:`COLUMNS` plus 'result_data' (a list). Swept
+        (game_parameter, result) pairs also get a 'game_parameter' column.
+        Returns an empty dict if the results are not replicator dynamics
+        results or their populations differ in shape.
+
+    Parameters:
+
+        results
+          a list of result objects returned by simulations
+
+    """
+
+    columns = {}
+
+    if results and all(isinstance(result, tuple) and len(result) == 2 and
+                       _is_replicator_result(result[1]) for result in results):
+        columns['game_parameter'] = np.array([result[0] for result in results])
+        results = [result[1] for result in results]
+
+    if not results or not all(_is_replicator_result(result) for result in results):
+        return {}
+
+    try:
+        columns['initial_pop'] = np.array([result[1] for result in results], dtype=np.float64)
+        columns['final_pop'] = np.array([result[2] for result in results], dtype=np.float64)
+    except ValueError:
+        return {}
+
+    columns['generation_count'] = np.array([result[0] for result in results], dtype=np.int64)
+    columns['converged'] = np.array([int(bool(result.converged))
+                                        if getattr(result, 'converged', None) is not None else -1
+                                        for result in results], dtype=np.int8)
+    columns['result_data'] = [result[3] if len(result) > 3 else None for result in results]
+
+    return columns
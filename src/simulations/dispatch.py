@@ -0,0 +1,501 @@
+""" Chunked dispatch of simulation tasks to a worker pool
+
+Sending tasks to the workers one at a time costs a round of pickling and
+inter-process communication per task, which dominates when simulations are
+short. :py:func:`imap_chunked` sends the tasks in chunks instead, keeping a
+few chunks per worker in flight, and yields the results back one at a time
+as each chunk completes. The chunk sizes are picked by a
+:py:class:`ChunkSizer` from the measured task durations, so that each chunk
+takes roughly a target time, and are adjusted as the run goes.
+
+Unlike :py:meth:`~multiprocessing.Pool.imap_unordered`, which reads the whole
+task iterable up front, tasks are only read as chunks are sent, and no more
+chunks are sent while the numbers of tasks in flight (sent but not complete)
+or of results pending (complete but not yet yielded) are at their limits. A
+slow consumer of the results therefore holds back the sending of tasks, and
+memory use does not grow with the number of tasks.
+
+A :py:class:`WorkerPool` is a pool whose workers are started once and kept
+(with their imported modules and anything cached at module level) until it
+is closed, so it can be shared by many batches. Its workers are processes by
+default, or threads of the calling process with the 'thread' backend, which
+pass tasks and results without pickling them and share the memory of the
+process (useful when the work releases the GIL, as the dense, batched and
+matrix step kernels of the replicator dynamics do).
+
+Classes:
+
+    :py:class:`ChunkSizer`
+      Picks the number of tasks per chunk
+
+    :py:class:`WorkerPool`
+      A long-lived pool of worker processes
+
+Functions:
+
+    :py:func:`imap_chunked`
+      Runs tasks on a pool in chunks, yielding results as they complete
+
+"""
+
+import itertools
+import multiprocessing as mp
+import multiprocessing.pool
+import Queue
+import threading
+import time
+
+# seconds to wait for a chunk at a time, so the wait can be interrupted
+POLL_INTERVAL = 1.
+
+# the kinds of workers a WorkerPool can have
+BACKENDS = ('process', 'thread')
+
+
+class ChunkSizer(object):
+    """ Picks the number of tasks to send to a worker at once from the
+        measured task durations
+
+    Keyword Parameters:
+
+        size
+          a fixed chunk size (default None, to pick it automatically)
+
+        target
+          the time in seconds that each chunk should take (default 0.1)
+
+        max_size
+          the largest chunk size to pick (default 1000)
+
+        smoothing
+          the weight of each new measurement in the running mean task
+          duration (default 0.3)
+
+        workers
+          the number of workers, used to keep enough chunks for all of them
+          near the end of a run (default 1)
+
+    Public Methods:
+
+        :py:meth:`~ChunkSizer.size`
+          Returns the size of the next chunk
+
+        :py:meth:`~ChunkSizer.update`
+          Records the duration of a completed chunk
+
+    """
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the sizer
+
+        Keyword Parameters:
+
+            size
+              a fixed chunk size (default None, to pick it automatically)
+
+            target
+              the time in seconds that each chunk should take (default 0.1)
+
+            max_size
+              the largest chunk size to pick (default 1000)
+
+            smoothing
+              the weight of each new measurement in the running mean task
+              duration (default 0.3)
+
+            workers
+              the number of workers (default 1)
+
+        """
+
+        if 'size' in kwdargs and kwdargs['size']:
+            self.fixed_size = int(kwdargs['size'])
+        else:
+            self.fixed_size = None
+
+        if 'target' in kwdargs and kwdargs['target']:
+            self.target = float(kwdargs['target'])
+        else:
+            self.target = 0.1
+
+        if 'max_size' in kwdargs and kwdargs['max_size']:
+            self.max_size = int(kwdargs['max_size'])
+        else:
+            self.max_size = 1000
+
+        if 'smoothing' in kwdargs and kwdargs['smoothing']:
+            self.smoothing = float(kwdargs['smoothing'])
+        else:
+            self.smoothing = 0.3
+
+        if 'workers' in kwdargs and kwdargs['workers']:
+            self.workers = int(kwdargs['workers'])
+        else:
+            self.workers = 1
+
+        self.task_time = None
+
+    def update(self, count, elapsed):
+        """ Records the duration of a completed chunk
+
+        Parameters:
+
+            count
+              the number of tasks in the chunk
+
+            elapsed
+              the time in seconds that the worker took to run them
+
+        """
+
+        if count <= 0:
+            return
+
+        task_time = max(float(elapsed), 0.) / count
+        if self.task_time is None:
+            self.task_time = task_time
+        else:
+            self.task_time += self.smoothing * (task_time - self.task_time)
+
+    def size(self, remaining=None):
+        """ Returns the size of the next chunk: the fixed size if there is
+            one, 1 until a chunk has been measured, and otherwise the number
+            of tasks expected to take the target time
+
+        Parameters:
+
+            remaining
+              the number of tasks left to send, if known, so that the
+              remaining tasks can still be shared among all of the workers
+
+        """
+
+        if self.fixed_size is not None:
+            return self.fixed_size
+
+        if self.task_time is None:
+            return 1
+
+        if self.task_time > 0:
+            size = int(self.target / self.task_time)
+        else:
+            size = self.max_size
+
+        if remaining is not None:
+            size = min(size, -(-remaining // self.workers))
+
+        return max(1, min(size, self.max_size))
+
+
+class WorkerPool(object):
+    """ A long-lived pool of workers, started on first use (or by
+        :py:meth:`~WorkerPool.start`) and kept until it is closed. Can be
+        used as a context manager that closes the pool on exit.
+
+    Parameters:
+
+        processes
+          the number of workers (default None, for the number of CPUs)
+
+    Keyword Parameters:
+
+        backend
+          'process' for worker processes (default) or 'thread' for worker
+          threads in this process
+
+        initializer
+          a function each worker calls when it starts
+
+        initargs
+          the arguments for the initializer
+
+    Public Methods:
+
+        :py:meth:`~WorkerPool.apply_async`
+          Runs a function in a worker
+
+        :py:meth:`~WorkerPool.close`
+          Waits for the pending work and stops the workers
+
+        :py:meth:`~WorkerPool.start`
+          Starts the workers
+
+        :py:meth:`~WorkerPool.terminate`
+          Stops the workers at once
+
+    """
+
+    def __init__(self, processes=None, *args, **kwdargs):
+        """ Sets up the pool (without starting the workers)
+
+        Parameters:
+
+            processes
+              the number of workers (default None, for the number of CPUs)
+
+        Keyword Parameters:
+
+            backend
+              'process' for worker processes (default) or 'thread' for worker
+              threads in this process
+
+            initializer
+              a function each worker calls when it starts
+
+            initargs
+              the arguments for the initializer
+
+        """
+
+        if processes is None:
+            processes = mp.cpu_count()
+
+        self.processes = processes
+
+        if 'backend' in kwdargs and kwdargs['backend']:
+            self.backend = kwdargs['backend']
+        else:
+            self.backend = 'process'
+
+        if self.backend not in BACKENDS:
+            raise ValueError("Unknown backend {0}".format(self.backend))
+
+        if 'initializer' in kwdargs and kwdargs['initializer']:
+            self.initializer = kwdargs['initializer']
+        else:
+            self.initializer = None
+
+        if 'initargs' in kwdargs and kwdargs['initargs']:
+            self.initargs = tuple(kwdargs['initargs'])
+        else:
+            self.initargs = ()
+
+        self._pool = None
+
+    @property
+    def running(self):
+        """ Whether the workers are started
+
+        """
+
+        return self._pool is not None
+
+    def _make_pool(self):
+        """ Returns a new pool of workers
+
+        """
+
+        if self.backend == 'thread':
+            return multiprocessing.pool.ThreadPool(self.processes, self.initializer, self.initargs)
+
+        return mp.Pool(self.processes, self.initializer, self.initargs)
+
+    def start(self):
+        """ Starts the workers, if they are not running already, and returns
+            the pool
+
+        """
+
+        if self._pool is None:
+            self._pool = self._make_pool()
+
+        return self
+
+    def apply_async(self, function, args=(), kwds=None, callback=None):
+        """ Runs a function in a worker (starting the workers if needed),
+            like :py:meth:`multiprocessing.Pool.apply_async`
+
+        Parameters:
+
+            function
+              the picklable function to run
+
+            args
+              the positional arguments for the function
+
+            kwds
+              the keyword arguments for the function
+
+            callback
+              a function called with the result when it is ready
+
+        """
+
+        self.start()
+
+        return self._pool.apply_async(function, args, kwds or {}, callback)
+
+    def close(self):
+        """ Waits for the pending work to finish and stops the workers (the
+            pool can be started again afterwards)
+
+        """
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def terminate(self):
+        """ Stops the workers at once, dropping the pending work
+
+        """
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+        return False
+
+
+def _run_chunk(job):
+    """ Runs a function on each task of a chunk in a worker, returning the
+        time taken and the list of results, or the exception raised
+
+    Parameters:
+
+        job
+          a (function, tasks) pair
+
+    """
+
+    (function, tasks) = job
+
+    start = time.time()
+    try:
+        results = [function(task) for task in tasks]
+    except Exception, err:
+        return (time.time() - start, None, err)
+
+    return (time.time() - start, results, None)
+
+
+def imap_chunked(pool, function, tasks, sizer=None, window=None, total=None,
+                       max_in_flight=None, max_pending=None):
+    """ Runs a function on each task on a pool in chunks, yielding the results
+        one at a time in the order that the chunks complete (like
+        :py:meth:`~multiprocessing.Pool.imap_unordered`). An exception raised
+        by the function, or by the pool while returning a chunk's results
+        (like :py:class:`multiprocessing.pool.MaybeEncodingError`), is raised
+        again here.
+
+    Parameters:
+
+        pool
+          a :py:class:`multiprocessing.Pool` (or anything with a compatible
+          apply_async method)
+
+        function
+          a picklable function of one task
+
+        tasks
+          an iterable of tasks, which is read a chunk at a time as chunks are
+          sent
+
+        sizer
+          the :py:class:`ChunkSizer` picking the chunk sizes (default a new
+          automatic one)
+
+        window
+          the number of chunks to keep in flight (default two per worker of
+          the sizer)
+
+        total
+          the number of tasks, if known, so that the chunks can be kept small
+          enough to share the last tasks among the workers
+
+        max_in_flight
+          the most tasks to have sent and not completed at once (default no
+          limit beyond the window); chunks are cut down to fit
+
+        max_pending
+          the most completed results to hold before they are yielded
+          (default no limit beyond the window); no chunks are sent while it
+          is reached
+
+    """
+
+    if sizer is None:
+        sizer = ChunkSizer()
+
+    if window is None:
+        window = 2 * sizer.workers
+
+    tasks = iter(tasks)
+    completed = Queue.Queue()
+    lock = threading.Lock()
+    # the number of tasks completed, updated from the pool's result thread
+    finished = [0]
+    # the async results of the chunks in flight by number, to catch the ones
+    # that fail without calling back (like those whose results cannot be
+    # pickled)
+    in_flight_chunks = {}
+
+    def chunk_done(outcome, number, count):
+        with lock:
+            finished[0] += count
+        completed.put((number, count, outcome))
+
+    outstanding = 0
+    numbered = 0
+    sent = 0
+    yielded = 0
+    exhausted = False
+
+    while True:
+        while not exhausted and outstanding < window:
+            with lock:
+                in_flight = sent - finished[0]
+                pending = finished[0] - yielded
+
+            size = sizer.size(None if total is None else max(total - sent, 1))
+            if max_in_flight is not None:
+                size = min(size, max_in_flight - in_flight)
+            if size <= 0 or (max_pending is not None and pending >= max_pending):
+                break
+
+            chunk = list(itertools.islice(tasks, size))
+            if not chunk:
+                exhausted = True
+                break
+
+            in_flight_chunks[numbered] = pool.apply_async(
+                _run_chunk, ((function, chunk),),
+                callback=lambda outcome, number=numbered, count=len(chunk): chunk_done(outcome, number, count))
+            numbered += 1
+            outstanding += 1
+            sent += len(chunk)
+
+        if outstanding == 0:
+            return
+
+        while True:
+            try:
+                (number, count, (elapsed, results, err)) = completed.get(True, POLL_INTERVAL)
+                break
+            except Queue.Empty:
+                for async_result in in_flight_chunks.values():
+                    if async_result is not None and async_result.ready() and \
+                            not async_result.successful():
+                        # raises the error of the chunk
+                        async_result.get()
+
+        del in_flight_chunks[number]
+        outstanding -= 1
+        if err is not None:
+            raise err
+
+        sizer.update(count, elapsed)
+        for result in results:
+            yielded += 1
+            yield result
@@ -0,0 +1,570 @@
+""" A socket protocol for spreading one batch of simulations across machines
+
+A :py:class:`Coordinator` listens on a TCP port and hands out ranges of task
+numbers to the workers that connect to it (see :py:func:`work_for`), which
+run the tasks and stream each (task number, result) pair back as soon as it
+is complete. When the connection to a worker is lost, or the worker sends
+nothing for longer than the coordinator's worker timeout, the task numbers it
+was handed and had not sent results for are handed out again.
+
+Each connection starts with a mutual challenge: both sides send a random
+nonce and answer the other's with an HMAC-SHA1 (under the shared secret) of
+their role and the nonce, so nothing is unpickled from a peer that does not
+know the secret. After that, every message is a record in the binary stats
+format (see :py:mod:`simulations.records`):
+
+    coordinator to worker
+      ('setup', setup) once, then ('range', runs) or ('done',) in answer to
+      each request, where runs is a list of (start, stop) ranges of task
+      numbers
+
+    worker to coordinator
+      ('request',) when it is ready for more tasks, and ('result', num,
+      result) for each completed task
+
+Classes:
+
+    :py:class:`Coordinator`
+      Hands out task ranges to workers and collects the results
+
+Exceptions:
+
+    :py:class:`ProtocolError`
+      Raised when a peer fails the challenge or sends an unexpected message
+
+Functions:
+
+    :py:func:`parse_address`
+      Parses a [HOST:]PORT address
+
+    :py:func:`work_for`
+      Runs the tasks handed out by a coordinator
+
+"""
+
+import collections
+import hashlib
+import hmac
+import itertools
+import os
+import Queue
+import socket
+import threading
+import time
+
+from simulations.records import StatsFileError
+from simulations.records import encode_record
+from simulations.records import frame_record
+from simulations.records import read_record
+from simulations.utils.eventemitter import EventEmitter
+
+NONCE_SIZE = 16
+DIGEST_SIZE = hashlib.sha1().digest_size
+
+# seconds to block at a time, so waits notice closing and can be interrupted
+POLL_INTERVAL = 0.5
+
+
+class ProtocolError(Exception):
+    """ Raised when a peer fails the challenge or sends an unexpected message
+
+    """
+
+    pass
+
+
+class Coordinator(EventEmitter):
+    """ Hands out ranges of task numbers to the workers that connect and
+        collects their results
+
+    Parameters:
+
+        address
+          the (host, port) to listen on (port 0 for any free port)
+
+    Keyword Parameters:
+
+        range_size
+          the most task numbers to hand out at once (default 50)
+
+        secret
+          the secret shared with the workers (required, non-empty)
+
+        worker_timeout
+          the most seconds to wait for a worker's next message (so for the
+          result of each of its tasks) before dropping it and handing its
+          task numbers out again (default 600)
+
+    Public Methods:
+
+        :py:meth:`~Coordinator.close`
+          Stops listening and tells the workers there is no more work
+
+        :py:meth:`~Coordinator.listen`
+          Starts accepting workers
+
+        :py:meth:`~Coordinator.results`
+          Hands out the tasks and yields the results
+
+    Events (emitted in the thread iterating :py:meth:`~Coordinator.results`):
+
+        worker joined(this, name)
+          emitted when a worker has passed the challenge and been set up
+
+        worker left(this, name, requeued)
+          emitted when the connection to a worker ends, with the number of
+          its task numbers that were handed out again
+
+    """
+
+    def __init__(self, address, *args, **kwdargs):
+        """ Sets up the coordinator (without listening yet)
+
+        Parameters:
+
+            address
+              the (host, port) to listen on (port 0 for any free port)
+
+        Keyword Parameters:
+
+            range_size
+              the most task numbers to hand out at once (default 50)
+
+            secret
+              the secret shared with the workers (required, non-empty)
+
+            worker_timeout
+              the most seconds to wait for a worker's next message before
+              dropping it (default 600)
+
+        """
+
+        super(Coordinator, self).__init__()
+
+        self.address = address
+
+        if 'range_size' in kwdargs and kwdargs['range_size']:
+            self.range_size = int(kwdargs['range_size'])
+        else:
+            self.range_size = 50
+
+        if 'secret' in kwdargs and kwdargs['secret']:
+            self.secret = kwdargs['secret']
+        else:
+            raise ValueError("A coordinator needs a non-empty secret")
+
+        if 'worker_timeout' in kwdargs and kwdargs['worker_timeout'] is not None:
+            self.worker_timeout = float(kwdargs['worker_timeout'])
+        else:
+            self.worker_timeout = 600.
+
+        if self.worker_timeout <= 0:
+            raise ValueError("The worker timeout must be positive")
+
+        self._socket = None
+        self._closed = False
+        self._work = threading.Condition(threading.Lock())
+        self._messages = Queue.Queue()
+        self._setup = None
+        self._pending = iter(())
+        self._requeued = collections.deque()
+        self._remaining = 0
+
+    def listen(self):
+        """ Starts listening and accepting workers in a background thread,
+            returning the (host, port) address listened on
+
+        """
+
+        if self._socket is None:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(self.address)
+            listener.listen(16)
+            listener.settimeout(POLL_INTERVAL)
+            self.address = listener.getsockname()
+            self._socket = listener
+
+            accepter = threading.Thread(target=self._accept)
+            accepter.daemon = True
+            accepter.start()
+
+        return self.address
+
+    def results(self, setup, nums, total):
+        """ Hands out task numbers to the workers and yields the (num, result)
+            pairs in the order they come back
+
+        Parameters:
+
+            setup
+              the picklable object sent to each worker before its first range
+
+            nums
+              an iterable of the task numbers, read as ranges are handed out
+
+            total
+              the number of task numbers
+
+        """
+
+        self.listen()
+
+        with self._work:
+            self._setup = setup
+            self._pending = iter(nums)
+            self._remaining = total
+            self._work.notify_all()
+
+        received = 0
+        while received < total:
+            try:
+                message = self._messages.get(True, POLL_INTERVAL)
+            except Queue.Empty:
+                continue
+
+            if message[0] == 'result':
+                received += 1
+                yield message[1:]
+            else:
+                self.emit(message[1], self, *message[2])
+
+    def close(self):
+        """ Stops listening and tells the workers that ask for more tasks
+            that there are none
+
+        """
+
+        with self._work:
+            self._closed = True
+            self._work.notify_all()
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _accept(self):
+        """ Accepts workers until the coordinator is closed, serving each in
+            its own thread
+
+        """
+
+        while not self._closed:
+            try:
+                (connection, peer) = self._socket.accept()
+            except socket.timeout:
+                continue
+            except (socket.error, AttributeError):
+                return
+
+            server = threading.Thread(target=self._serve, args=(connection, peer))
+            server.daemon = True
+            server.start()
+
+    def _allocate(self):
+        """ Returns the sorted task numbers of the next range (handed out
+            again first), waiting while others are out but none are left, or
+            None when there are no more
+
+        """
+
+        with self._work:
+            while True:
+                nums = []
+                while self._requeued and len(nums) < self.range_size:
+                    nums.append(self._requeued.popleft())
+
+                if not nums:
+                    nums = list(itertools.islice(self._pending, self.range_size))
+
+                if nums:
+                    return sorted(nums)
+
+                if self._remaining <= 0 or self._closed:
+                    return None
+
+                self._work.wait(POLL_INTERVAL)
+
+    def _serve(self, connection, peer):
+        """ Talks to one worker: sets it up, hands out ranges as it asks and
+            passes its results on, handing its outstanding task numbers out
+            again if the connection is lost or the worker sends nothing for
+            the worker timeout (a hung or partitioned worker could otherwise
+            hold its tasks until the kernel's keepalive gives up, hours later)
+
+        Parameters:
+
+            connection
+              the socket connected to the worker
+
+            peer
+              the (host, port) of the worker
+
+        """
+
+        name = "{0}:{1}".format(*peer[:2])
+        outstanding = set()
+        joined = False
+
+        connection.settimeout(self.worker_timeout)
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        rfile = connection.makefile('rb')
+        wfile = connection.makefile('wb')
+
+        try:
+            _challenge(rfile, wfile, self.secret, 'C', 'W')
+
+            with self._work:
+                while self._setup is None and not self._closed:
+                    self._work.wait(POLL_INTERVAL)
+                setup = self._setup
+
+            if setup is None:
+                return
+
+            _send(wfile, ('setup', setup))
+            joined = True
+            self._messages.put(('event', 'worker joined', (name,)))
+
+            while True:
+                message = read_record(rfile)
+
+                if message[0] == 'request':
+                    nums = self._allocate()
+                    if nums is None:
+                        _send(wfile, ('done',))
+                        return
+
+                    outstanding.update(nums)
+                    _send(wfile, ('range', _runs(nums)))
+
+                elif message[0] == 'result':
+                    with self._work:
+                        if message[1] not in outstanding:
+                            raise ProtocolError("Result for task {0} was not expected".format(message[1]))
+
+                        outstanding.discard(message[1])
+                        self._messages.put(message)
+                        self._remaining -= 1
+                        if self._remaining <= 0:
+                            self._work.notify_all()
+
+                else:
+                    raise ProtocolError("Unexpected message {0!r}".format(message[0]))
+
+        except (EOFError, IndexError, TypeError, socket.error, StatsFileError, ProtocolError):
+            pass
+
+        finally:
+            for fileobj in (rfile, wfile, connection):
+                try:
+                    fileobj.close()
+                except socket.error:
+                    pass
+
+            if outstanding:
+                with self._work:
+                    self._requeued.extend(sorted(outstanding))
+                    self._work.notify_all()
+
+            if joined:
+                self._messages.put(('event', 'worker left', (name, len(outstanding))))
+
+
+def work_for(address, run, *args, **kwdargs):
+    """ Connects to a coordinator and runs the tasks it hands out until it has
+        no more, returning the number of results sent
+
+    Parameters:
+
+        address
+          the (host, port) of the coordinator
+
+        run
+          a function of (setup, nums) that returns an iterable of the
+          (num, result) pairs of a list of task numbers
+
+    Keyword Parameters:
+
+        secret
+          the secret shared with the coordinator (required, non-empty)
+
+        timeout
+          the number of seconds to keep trying to connect while the
+          coordinator is not up yet (default 30)
+
+    """
+
+    if 'secret' in kwdargs and kwdargs['secret']:
+        secret = kwdargs['secret']
+    else:
+        raise ValueError("A worker needs a non-empty secret")
+
+    if 'timeout' in kwdargs and kwdargs['timeout'] is not None:
+        timeout = kwdargs['timeout']
+    else:
+        timeout = 30.
+
+    deadline = time.time() + timeout
+    while True:
+        try:
+            connection = socket.create_connection(address)
+            break
+        except socket.error:
+            if time.time() >= deadline:
+                raise
+            time.sleep(POLL_INTERVAL)
+
+    connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    rfile = connection.makefile('rb')
+    wfile = connection.makefile('wb')
+
+    try:
+        _challenge(rfile, wfile, secret, 'W', 'C')
+
+        message = read_record(rfile)
+        if message[0] != 'setup':
+            raise ProtocolError("Expected the setup, not {0!r}".format(message[0]))
+        setup = message[1]
+
+        count = 0
+        while True:
+            _send(wfile, ('request',))
+            message = read_record(rfile)
+
+            if message[0] == 'done':
+                return count
+            elif message[0] != 'range':
+                raise ProtocolError("Unexpected message {0!r}".format(message[0]))
+
+            for (num, result) in run(setup, _expand(message[1])):
+                _send(wfile, ('result', num, result))
+                count += 1
+    finally:
+        for fileobj in (rfile, wfile, connection):
+            try:
+                fileobj.close()
+            except socket.error:
+                pass
+
+
+def parse_address(address, default_host='127.0.0.1'):
+    """ Parses a 'HOST:PORT' or 'PORT' address into a (host, port) pair,
+        raising ValueError if it is malformed
+
+    Parameters:
+
+        address
+          the address string
+
+        default_host
+          the host if the address has none (default '127.0.0.1')
+
+    """
+
+    (host, _, port) = address.rpartition(':')
+
+    try:
+        port = int(port)
+    except ValueError:
+        raise ValueError("Bad port in address {0}".format(address))
+
+    if not 0 <= port < 65536:
+        raise ValueError("Bad port in address {0}".format(address))
+
+    return (host or default_host, port)
+
+
+def _send(wfile, message):
+    """ Sends a message as a record
+
+    Parameters:
+
+        wfile
+          the file object writing to the socket
+
+        message
+          the picklable message
+
+    """
+
+    wfile.write(frame_record(*encode_record(message)))
+    wfile.flush()
+
+
+def _digest(secret, role, nonce):
+    """ Returns the answer to a challenge nonce for a role
+
+    """
+
+    return hmac.new(secret, role + nonce, hashlib.sha1).digest()
+
+
+def _read_exactly(rfile, size):
+    """ Reads exactly size bytes, raising EOFError if the connection ends
+        first
+
+    """
+
+    data = rfile.read(size)
+    if len(data) < size:
+        raise EOFError()
+
+    return data
+
+
+def _challenge(rfile, wfile, secret, role, peer_role):
+    """ Runs the mutual challenge, raising ProtocolError if the peer does not
+        know the secret
+
+    Parameters:
+
+        rfile
+          the file object reading from the socket
+
+        wfile
+          the file object writing to the socket
+
+        secret
+          the shared secret
+
+        role
+          this side's role ('C' for the coordinator, 'W' for a worker)
+
+        peer_role
+          the peer's role
+
+    """
+
+    nonce = os.urandom(NONCE_SIZE)
+    wfile.write(nonce)
+    wfile.flush()
+
+    wfile.write(_digest(secret, role, _read_exactly(rfile, NONCE_SIZE)))
+    wfile.flush()
+
+    if not hmac.compare_digest(_read_exactly(rfile, DIGEST_SIZE), _digest(secret, peer_role, nonce)):
+        raise ProtocolError("The peer failed the challenge")
+
+
+def _runs(nums):
+    """ Compresses sorted task numbers into a list of (start, stop) ranges
+
+    """
+
+    runs = []
+    for num in nums:
+        if runs and runs[-1][1] == num:
+            runs[-1][1] = num + 1
+        else:
+            runs.append([num, num + 1])
+
+    return [tuple(run) for run in runs]
+
+
+def _expand(runs):
+    """ Expands a list of (start, stop) ranges into the task numbers
+
+    """
+
+    return [num for (start, stop) in runs for num in xrange(start, stop)]
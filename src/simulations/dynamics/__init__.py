@@ -16,4 +16,7 @@ Modules:
     :py:mod:`~simulations.dynamics.onepop_discrete_replicator`
       Implements 1-population discrete time replicator dynamics
 
+    :py:mod:`~simulations.dynamics.structured_replicator`
+      Implements replicator and imitation dynamics on graphs and lattices
+
 """
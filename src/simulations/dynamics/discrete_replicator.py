@@ -5,8 +5,14 @@ Classes:
     :py:class:`DiscreteReplicatorDynamics`
       implements generic discrete time replicator dynamics
 
+    :py:class:`ReplicatorResult`
+      the result tuple of a run, which also records how the run stopped
+
 Functions:
 
+    :py:func:`sparse_payoffs`
+      Extracts the nonzero entries of a payoffs cache
+
     :py:func:`initial_set_handler`
       Default handler for 'initial set' events
 
@@ -23,16 +29,35 @@ from simulations.simulation import Simulation
 
 def _create_caches(this, *args):
     """ Handler to wrap around :py:meth:`DiscreteReplicatorDynamics._create_classes`
+        (the caches kept by :py:meth:`DiscreteReplicatorDynamics.reset` are
+        not created again)
 
     """
 
-    this._create_caches()
-    this._num_profiles = this._profiles_cache.shape[0]
-    this._sample_profile = this._profiles_cache[0]
-    this._profile_size = this._profiles_cache.shape[1]
+    if this._keep_caches:
+        return
+
+    before = dict(vars(this))
+
+    if this.game_parameters is not None:
+        _create_batch_caches(this)
+    else:
+        this._create_caches()
+
     this._background_rate = np.float64(this.background_rate)
     this._effective_zero = np.float64(this.effective_zero)
 
+    if this._profiles_cache is not None:
+        this._num_profiles = this._profiles_cache.shape[0]
+        this._sample_profile = this._profiles_cache[0]
+        this._profile_size = this._profiles_cache.shape[1]
+
+    if this.sparse_payoffs and this._payoffs_cache is not None and this._batch_payoffs is None:
+        (this._profiles_cache,
+         this._sparse_entries,
+         this._sparse_values) = sparse_payoffs(this._profiles_cache, this._payoffs_cache)
+        this._payoffs_cache = None
+
     if this._one_or_many == DiscreteReplicatorDynamics.TYPE_ONE:
         this._num_types = np.arange(len(this.types))
         this._num_types_2 = np.arange(len(this.types) + 1)
@@ -42,6 +67,55 @@ def _create_caches(this, *args):
         this._num_types_2 = np.zeros([len(this.types) + 1, max(len(type) for type in this.types)], dtype=np.int)
         this._num_pops = np.arange(len(this.types))
 
+    # remember what was cached, so other instances can share it
+    this._cache_attributes = [name for (name, value) in vars(this).items()
+                                if name not in ('result_data', '_cache_attributes') and
+                                    (name not in before or before[name] is not value)]
+
+
+class ReplicatorResult(tuple):
+    """ The (generation_count, initial_pop, final_pop, result_data) tuple
+        returned by a run, with a :py:attr:`converged` attribute that is true
+        if the run reached a stable state and false if it was force stopped
+
+    """
+
+    def __new__(cls, values, converged=True):
+        """ Creates the result tuple
+
+        Parameters:
+
+            values
+              the (generation_count, initial_pop, final_pop, result_data) values
+
+            converged
+              whether the run reached a stable state (default True)
+
+        """
+
+        result = super(ReplicatorResult, cls).__new__(cls, values)
+        result.converged = converged
+
+        return result
+
+
+def _create_batch_caches(this):
+    """ Creates the caches once for each of the batched game parameters,
+        stacking the payoffs into a (games, profiles, slots) array
+
+    """
+
+    payoffs = []
+    for parameter in this.game_parameters:
+        this.game_parameter = parameter
+        this._create_caches()
+        if this._payoffs_cache is None:
+            raise ValueError("Batched games require a dense payoffs cache")
+        payoffs.append(this._payoffs_cache)
+
+    this.game_parameter = None
+    this._batch_payoffs = np.array(payoffs, dtype=np.float64)
+
 
 class DiscreteReplicatorDynamics(Simulation):
     """ Implements an abstract discrete-time replicator dynamics
@@ -60,6 +134,28 @@ class DiscreteReplicatorDynamics(Simulation):
           The natural rate of reproduction (parameter in the dynamics,
           default 0.)
 
+        game_parameters
+          A list of game parameters sharing one profile structure. If given
+          (here or as data['game_parameters']), the games are run together
+          with the batched step kernels, :py:attr:`game_parameter` is set to
+          each one in turn while the caches are created, and
+          :py:meth:`~DiscreteReplicatorDynamics.run` returns a list of
+          (game_parameter, result) pairs. Cannot be combined with
+          sparse_payoffs.
+
+        sparse_payoffs
+          If true, only the nonzero payoffs are kept after the caches are
+          created, and generations are stepped by iterating over those
+          entries alone (default False)
+
+    Public Methods:
+
+        :py:meth:`~DiscreteReplicatorDynamics.reset`
+          Prepares the simulation for another duplication, keeping the caches
+
+        :py:meth:`~DiscreteReplicatorDynamics.share_caches`
+          Uses the caches of another instance instead of creating them
+
     Methods to Implement:
 
         :py:meth:`~simulations.base.Base._add_listeners`
@@ -118,6 +214,16 @@ class DiscreteReplicatorDynamics(Simulation):
               The natural rate of reproduction (parameter in the dynamics,
               default 0.)
 
+            game_parameters
+              A list of game parameters sharing one profile structure, to be
+              run together with the batched step kernels (also read from
+              data['game_parameters']; cannot be combined with sparse_payoffs)
+
+            sparse_payoffs
+              If true, only the nonzero payoffs are kept after the caches are
+              created, and generations are stepped by iterating over those
+              entries alone (default False)
+
         """
 
         super(DiscreteReplicatorDynamics, self).__init__(*args, **kwdargs)
@@ -140,6 +246,23 @@ class DiscreteReplicatorDynamics(Simulation):
         else:
             self.background_rate = 0.
 
+        if 'sparse_payoffs' in kwdargs and kwdargs['sparse_payoffs']:
+            self.sparse_payoffs = True
+        else:
+            self.sparse_payoffs = False
+
+        if 'game_parameters' in kwdargs and kwdargs['game_parameters'] is not None:
+            self.game_parameters = list(kwdargs['game_parameters'])
+        elif isinstance(self.data, dict) and self.data.get('game_parameters') is not None:
+            self.game_parameters = list(self.data['game_parameters'])
+        else:
+            self.game_parameters = None
+
+        if self.game_parameters is not None and self.sparse_payoffs:
+            raise ValueError("Batched games cannot use sparse payoffs")
+
+        self.game_parameter = None
+
         self._profiles_cache = None
         self._payoffs_cache = None
         self._one_or_many = None
@@ -152,9 +275,69 @@ class DiscreteReplicatorDynamics(Simulation):
         self._interaction_arity = None
         self._num_pops = None
         self._sample_profile = None
+        self._sparse_entries = None
+        self._sparse_values = None
+        self._batch_payoffs = None
+        self._keep_caches = False
+        self._cache_attributes = None
 
         self.on('initial set', _create_caches)
 
+    def reset(self, iteration, outfile, streams=None):
+        """ Prepares the simulation for another duplication, clearing the
+            per-run state (the forced stop flag, result data and current game
+            parameter) but keeping the payoff caches, which are not created
+            again when the next initial population is set. Subclasses whose
+            other per-run state is cleared too can set
+            :py:attr:`~simulations.simulation.Simulation.reusable`.
+
+        Parameters:
+
+            iteration
+              The iteration number of the next duplication
+
+            outfile
+              The name of a file to which to dump output (or None, indicating
+              stdout)
+
+            streams
+              The :py:class:`~simulations.seeds.RandomStreams` of the next
+              task's duplications (default None)
+
+        """
+
+        self.force_stop = False
+        self.result_data = None
+        self.game_parameter = None
+        self._keep_caches = self._background_rate is not None
+
+        super(DiscreteReplicatorDynamics, self).reset(iteration, outfile, streams)
+
+    def share_caches(self, other):
+        """ Uses the caches created by another instance of the same class,
+            constructed with the same arguments, instead of creating its own.
+            The caches are only read while stepping, so instances running in
+            different threads can share one copy. Returns whether the other
+            instance had caches to share.
+
+        Parameters:
+
+            other
+              the instance whose caches to use
+
+        """
+
+        if other._cache_attributes is None:
+            return False
+
+        for name in other._cache_attributes:
+            setattr(self, name, getattr(other, name))
+
+        self._cache_attributes = other._cache_attributes
+        self._keep_caches = True
+
+        return True
+
     def _add_default_listeners(self):
         """ Sets up default event listeners
 
@@ -210,9 +393,27 @@ class DiscreteReplicatorDynamics(Simulation):
         # x_i(t+1) = (a + u(e^i, x(t)))*x_i(t) / (a + u(x(t), x(t)))
         # a is background (lifetime) birthrate
 
-        if self._profiles_cache is None or self._payoffs_cache is None:
+        if self._background_rate is None:
             _create_caches(self)
 
+        if self._sparse_values is not None:
+            if self._one_or_many == self.TYPE_ONE:
+                return fastfuncs.one_dimensional_sparse_step(pop,
+                                                             self._profiles_cache,
+                                                             self._sparse_entries,
+                                                             self._sparse_values,
+                                                             self._interaction_arity,
+                                                             self._background_rate,
+                                                             self._effective_zero)
+
+            if self._one_or_many == self.TYPE_MANY:
+                return fastfuncs.n_dimensional_sparse_step(pop,
+                                                           self._profiles_cache,
+                                                           self._sparse_entries,
+                                                           self._sparse_values,
+                                                           self._background_rate,
+                                                           self._effective_zero)
+
         if self._one_or_many == self.TYPE_ONE:
             return fastfuncs.one_dimensional_step(pop,
                                                   self._profiles_cache,
@@ -239,6 +440,116 @@ class DiscreteReplicatorDynamics(Simulation):
                                                 self._num_profiles,
                                                 self._profile_size)
 
+    def _step_generation_batch(self, pops, payoffs):
+        """ Step the populations of several games to the next generation in
+            one kernel call
+
+        Parameters:
+
+            pops
+              The stacked populations (or lists of populations) of the games
+
+            payoffs
+              The stacked (games, profiles, slots) payoffs of the games
+
+        """
+
+        if self._one_or_many == self.TYPE_ONE:
+            return fastfuncs.one_dimensional_batch_step(pops,
+                                                        self._profiles_cache,
+                                                        payoffs,
+                                                        self._interaction_arity,
+                                                        self._background_rate,
+                                                        self._effective_zero)
+
+        if self._one_or_many == self.TYPE_MANY:
+            return fastfuncs.n_dimensional_batch_step(pops,
+                                                      self._profiles_cache,
+                                                      payoffs,
+                                                      self._background_rate,
+                                                      self._effective_zero)
+
+    def _run_batch(self, initial_pop=None):
+        """ Run every game in :py:attr:`game_parameters` at once. Games that
+            reach a stable state are frozen (and their 'stable state' events
+            emitted, with :py:attr:`game_parameter` set) while the rest keep
+            stepping.
+
+        Parameters:
+
+            initial_pop
+              (optional) stacked initial populations. Randomizes if not provided.
+
+        """
+
+        num_games = len(self.game_parameters)
+
+        if initial_pop is None:
+            # each game starts from the stream of its own duplication
+            populations = []
+            for k in xrange(num_games):
+                self.random = self.random_state(k)
+                populations.append(self._random_population())
+            initial_pop = np.array(populations)
+
+        self.emit('initial set', self, initial_pop)
+
+        this_generation = initial_pop.copy()
+        last_generation = this_generation.copy()
+        generation_counts = np.zeros(num_games, dtype=np.int)
+        active = np.arange(num_games)
+        payoffs = self._batch_payoffs
+        generation_count = 0
+
+        while len(active) and not self.force_stop:
+            generation_count += 1
+            last_generation = this_generation.copy()
+            tmp = self._step_generation_batch(this_generation[active], payoffs)
+            this_generation[active] = tmp[:, 1:]
+
+            self.emit('generation',
+                        self,
+                        generation_count,
+                        this_generation,
+                        last_generation)
+
+            done = tmp.reshape(len(active), -1)[:, 0] == 1
+            if done.any():
+                for game in active[done]:
+                    generation_counts[game] = generation_count
+                    self.game_parameter = self.game_parameters[game]
+                    self.emit('stable state',
+                                self,
+                                generation_count,
+                                this_generation[game],
+                                last_generation[game],
+                                initial_pop[game])
+
+                active = active[~done]
+                payoffs = self._batch_payoffs[active]
+
+        converged = np.ones(num_games, dtype=np.bool)
+        converged[active] = False
+
+        for game in active:
+            generation_counts[game] = generation_count
+            self.game_parameter = self.game_parameters[game]
+            self.emit('force stop',
+                        self,
+                        generation_count,
+                        this_generation[game],
+                        last_generation[game],
+                        initial_pop[game])
+
+        self.game_parameter = None
+
+        return [(parameter, ReplicatorResult((int(generation_counts[game]),
+                                              initial_pop[game],
+                                              this_generation[game],
+                                              self.result_data),
+                                             bool(converged[game])))
+                    for game, parameter in enumerate(self.game_parameters)]
+
     def _run(self, initial_pop=None):
         """ Actually run the simulation
 
@@ -249,6 +560,9 @@ class DiscreteReplicatorDynamics(Simulation):
 
         """
 
+        if self.game_parameters is not None:
+            return self._run_batch(initial_pop)
+
         if initial_pop is None:
             initial_pop = self._random_population()
 
@@ -292,10 +606,40 @@ class DiscreteReplicatorDynamics(Simulation):
                         last_generation,
                         initial_pop)
 
-        return (generation_count,
-                initial_pop,
-                this_generation,
-                self.result_data)
+        return ReplicatorResult((generation_count,
+                                 initial_pop,
+                                 this_generation,
+                                 self.result_data),
+                                not self.force_stop)
+
+
+def sparse_payoffs(profiles_cache, payoffs_cache):
+    """ Extracts the nonzero entries of a payoffs cache, returning a tuple
+        (profiles, entries, values) where profiles holds only the profiles
+        with some nonzero payoff, and each row (profile row, slot) of entries
+        has the payoff of the corresponding element of values
+
+    Parameters:
+
+        profiles_cache
+          the num_profiles x profile_size array of strategy profiles
+
+        payoffs_cache
+          the num_profiles x profile_size array of profile payoffs
+
+    """
+
+    keep = (payoffs_cache != 0.).any(axis=1)
+    profiles = profiles_cache[keep].copy()
+    (rows, slots) = np.nonzero(payoffs_cache[keep])
+
+    entries = np.empty((len(rows), 2), dtype=np.int)
+    entries[:, 0] = rows
+    entries[:, 1] = slots
+
+    return (profiles,
+            entries,
+            np.ascontiguousarray(payoffs_cache[keep][rows, slots], dtype=np.float64))
 
 
 def stable_state_handler(this, genct, thisgen, lastgen, firstgen):
@@ -14,7 +14,6 @@ Functions:
 """
 
 import numpy as np
-import numpy.random as rand
 import simulations.dynamics.replicator_fastfuncs as fastfuncs
 
 from simulations.dynamics.discrete_replicator import DiscreteReplicatorDynamics
@@ -98,9 +97,7 @@ class NPopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
             appropriate dimensionalities
 
         """
-        rand.seed()
-
-        samples = [rand.dirichlet([1] * len(self.types[i]))
+        samples = [self.random.dirichlet([1] * len(self.types[i]))
                         for i in xrange(len(self.types))]
 
         type_cts = [len(i) for i in self.types]
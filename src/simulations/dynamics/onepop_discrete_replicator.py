@@ -7,16 +7,22 @@ Classes:
 
 Functions:
 
+    :py:func:`low_rank_factors`
+      Computes a truncated singular value decomposition of a payoff matrix
+
+    :py:func:`payoff_matrix`
+      Collapses a two-player payoffs cache into a types x types matrix
+
     :py:func:`stable_state_handler`
       Default handler for 'stable state' and 'force stop' events
 
 """
 
 import numpy as np
-import numpy.random as rand
 import simulations.dynamics.replicator_fastfuncs as fastfuncs
 
 from simulations.dynamics.discrete_replicator import DiscreteReplicatorDynamics
+from simulations.dynamics.discrete_replicator import _create_caches
 
 
 class OnePopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
@@ -31,6 +37,23 @@ class OnePopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
         interaction_arity
           The number of players in a given interaction (default 2)
 
+        pairwise_payoffs
+          A types x types matrix whose (i, j) entry is the payoff to type i
+          against type j. If given, the payoff of an interaction is taken to
+          be the sum of the pairwise payoffs against the other players, and
+          the strategy profiles are never enumerated.
+
+        payoff_rank
+          If given, replace the payoffs with a truncated SVD of at most this
+          rank, which must be at least 1 (requires an interaction arity of 2 or pairwise_payoffs, and
+          no batched game_parameters)
+
+        payoff_tolerance
+          If given, replace the payoffs with the smallest-rank truncated SVD
+          whose relative approximation error is at most this value (0 for an
+          exact factorization; requires an interaction arity of 2 or
+          pairwise_payoffs, and no batched game_parameters)
+
         types
           A list of names for the possible types (used to calculate
           dimensionality, defaults to the return value of :py:meth:`~OnePopDiscreteReplicatorDynamics._default_types`)
@@ -72,6 +95,23 @@ class OnePopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
             interaction_arity
               The number of players in a given interaction (default 2)
 
+            pairwise_payoffs
+              A types x types matrix whose (i, j) entry is the payoff to type
+              i against type j. If given, the payoff of an interaction is
+              taken to be the sum of the pairwise payoffs against the other
+              players, and the strategy profiles are never enumerated.
+
+            payoff_rank
+              If given, replace the payoffs with a truncated SVD of at most
+              this rank, which must be at least 1 (requires an interaction
+              arity of 2 or pairwise_payoffs, and no batched game_parameters)
+
+            payoff_tolerance
+              If given, replace the payoffs with the smallest-rank truncated
+              SVD whose relative approximation error is at most this value
+              (0 for an exact factorization; requires an interaction arity of
+              2 or pairwise_payoffs, and no batched game_parameters)
+
             types
               A list of names for the possible types (used to calculate
               dimensionality, defaults to the return value of
@@ -90,7 +130,78 @@ class OnePopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
         else:
             self.interaction_arity = 2
 
+        if 'pairwise_payoffs' in kwdargs and kwdargs['pairwise_payoffs'] is not None:
+            self.pairwise_payoffs = np.array(kwdargs['pairwise_payoffs'], dtype=np.float64)
+        else:
+            self.pairwise_payoffs = None
+
+        if 'payoff_rank' in kwdargs and kwdargs['payoff_rank'] is not None:
+            self.payoff_rank = int(kwdargs['payoff_rank'])
+            if self.payoff_rank < 1:
+                raise ValueError("The payoff rank must be at least 1")
+        else:
+            self.payoff_rank = None
+
+        if 'payoff_tolerance' in kwdargs and kwdargs['payoff_tolerance'] is not None:
+            self.payoff_tolerance = float(kwdargs['payoff_tolerance'])
+            if self.payoff_tolerance < 0:
+                raise ValueError("The payoff tolerance must be non-negative")
+        else:
+            self.payoff_tolerance = None
+
+        if self.game_parameters is not None and \
+                (self.payoff_rank is not None or self.payoff_tolerance is not None):
+            raise ValueError("Batched games cannot use low-rank payoffs")
+
+        self.payoff_approximation_error = None
+
         self._one_or_many = self.TYPE_ONE
+        self._payoff_left = None
+        self._payoff_right = None
+
+    def reset(self, iteration, outfile, streams=None):
+        """ Prepares the simulation for another duplication, keeping the
+            caches (and recording the kept low-rank payoffs in the new
+            :py:attr:`result_data`)
+
+        Parameters:
+
+            iteration
+              The iteration number of the next duplication
+
+            outfile
+              The name of a file to which to dump output (or None, indicating
+              stdout)
+
+            streams
+              The :py:class:`~simulations.seeds.RandomStreams` of the next
+              task's duplications (default None)
+
+        """
+
+        super(OnePopDiscreteReplicatorDynamics, self).reset(iteration, outfile, streams)
+
+        if self._keep_caches and self._payoff_right is not None:
+            self._record_low_rank()
+
+    def share_caches(self, other):
+        """ Uses the caches created by another instance instead of creating
+            its own (and records shared low-rank payoffs in
+            :py:attr:`result_data`)
+
+        Parameters:
+
+            other
+              the instance whose caches to use
+
+        """
+
+        shared = super(OnePopDiscreteReplicatorDynamics, self).share_caches(other)
+
+        if shared and self._payoff_right is not None:
+            self._record_low_rank()
+
+        return shared
 
     def _add_default_listeners(self):
         """ Sets up default event listeners
@@ -120,9 +231,7 @@ class OnePopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
 
         """
 
-        rand.seed()
-
-        return rand.dirichlet([1] * len(self.types))
+        return self.random.dirichlet([1] * len(self.types))
 
     def _null_population(self):
         """ Generates a population guaranteed to compare falsely with a random
@@ -145,10 +254,159 @@ class OnePopDiscreteReplicatorDynamics(DiscreteReplicatorDynamics):
         return [1, 1]
 
     def _create_caches(self):
+        if self.pairwise_payoffs is not None:
+            self._create_pairwise_cache()
+            return
+
         self._profiles_cache = fastfuncs.generate_profiles(np.repeat(np.int(len(self.types)), self.interaction_arity))
         self._payoffs_cache = np.array([np.array(self._profile_payoffs(c), dtype=np.float64)
                                                     for c in self._profiles_cache])
 
+        if self.payoff_rank is not None or self.payoff_tolerance is not None:
+            self._create_low_rank_cache()
+
+    def _create_pairwise_cache(self):
+        """ Sets up the payoffs for a game whose payoff is the sum of pairwise
+            interactions with each of the other (interaction_arity - 1)
+            players. The expected payoffs are then exactly
+            (interaction_arity - 1) * pairwise_payoffs . pop, so no profiles
+            are enumerated.
+
+        """
+
+        if self.pairwise_payoffs.shape != (len(self.types), len(self.types)):
+            raise ValueError("Pairwise payoffs must be a types x types matrix")
+
+        if self.payoff_rank is not None or self.payoff_tolerance is not None:
+            self._create_low_rank_cache()
+        else:
+            self._payoff_left = self.pairwise_payoffs * (self.interaction_arity - 1)
+            self._payoff_right = None
+
+    def _create_low_rank_cache(self):
+        """ Factors the payoffs into a truncated SVD so that each generation
+            costs O(types * rank) instead of O(types ** 2). The relative
+            approximation error is stored in
+            :py:attr:`payoff_approximation_error` and in
+            :py:attr:`result_data` (if that is None or a dictionary).
+
+        """
+
+        if self.pairwise_payoffs is not None:
+            matrix = self.pairwise_payoffs * (self.interaction_arity - 1)
+        elif self.interaction_arity == 2:
+            matrix = payoff_matrix(self._payoffs_cache, len(self.types))
+        else:
+            raise ValueError("Low-rank payoffs require an interaction arity of 2 or pairwise payoffs")
+
+        (self._payoff_left,
+         self._payoff_right,
+         self.payoff_approximation_error) = low_rank_factors(matrix,
+                                                             self.payoff_rank,
+                                                             self.payoff_tolerance)
+
+        self._record_low_rank()
+
+    def _record_low_rank(self):
+        """ Stores the rank and approximation error of the low-rank payoffs in
+            :py:attr:`result_data` (if that is None or a dictionary)
+
+        """
+
+        if self.result_data is None:
+            self.result_data = {}
+
+        if isinstance(self.result_data, dict):
+            self.result_data['payoff_rank'] = self._payoff_right.shape[0]
+            self.result_data['payoff_approximation_error'] = self.payoff_approximation_error
+
+    def _step_generation(self, pop):
+        """ Step the population to the next generation, using the pairwise
+            or low-rank payoff matrices if they were requested
+
+        Parameters:
+
+            pop
+              The population to send to the next generation
+
+        """
+
+        if self._background_rate is None:
+            _create_caches(self)
+
+        if self._payoff_left is not None:
+            return fastfuncs.matrix_step(pop,
+                                         self._payoff_left,
+                                         self._payoff_right,
+                                         self._background_rate,
+                                         self._effective_zero)
+
+        return super(OnePopDiscreteReplicatorDynamics, self)._step_generation(pop)
+
+
+def payoff_matrix(payoffs_cache, num_types):
+    """ Collapses the payoffs cache of a two-player game into a matrix whose
+        (i, j) entry is the average payoff to type i against type j over both
+        player positions (so that the expected payoffs are matrix . pop)
+
+    Parameters:
+
+        payoffs_cache
+          the (num_types ** 2) x 2 array of profile payoffs
+
+        num_types
+          the number of types in the population
+
+    """
+
+    first = payoffs_cache[:, 0].reshape(num_types, num_types)
+    second = payoffs_cache[:, 1].reshape(num_types, num_types)
+
+    return (first + second.T) / 2.
+
+
+def low_rank_factors(matrix, rank=None, tolerance=None):
+    """ Computes a truncated SVD of a payoff matrix, returning a tuple
+        (left, right, error) such that left . right approximates the matrix
+        and error is the relative (Frobenius norm) approximation error
+
+    Parameters:
+
+        matrix
+          the square payoff matrix to factor
+
+        rank
+          the maximum rank of the factorization (default: full rank)
+
+        tolerance
+          if given, use the smallest rank whose relative error is at most this
+          value (subject to the rank limit)
+
+    """
+
+    (left, values, right) = np.linalg.svd(matrix)
+
+    # tail_errors[r] is the relative error of keeping the first r values
+    tail = np.sqrt(np.cumsum((values ** 2)[::-1]))[::-1]
+    norm = tail[0] if len(tail) else 0.
+    if norm > 0.:
+        tail_errors = np.append(tail / norm, 0.)
+    else:
+        tail_errors = np.zeros(len(values) + 1)
+
+    max_rank = len(values)
+    if rank is not None:
+        max_rank = max(1, min(rank, max_rank))
+
+    use_rank = max_rank
+    if tolerance is not None:
+        use_rank = int(np.argmax(tail_errors <= tolerance))
+        use_rank = max(1, min(use_rank, max_rank))
+
+    return (left[:, :use_rank] * values[:use_rank],
+            right[:use_rank].copy(),
+            float(tail_errors[use_rank]))
+
 
 def stable_state_handler(this, genct, thisgen, lastgen, firstgen):
     """ Print out a report when a stable state is reached.
@@ -1,4 +1,4 @@
-/* Generated by Cython 0.15.1 on Fri Mar 15 15:06:51 2013 */
+/* Generated by Cython 0.15.1 on Mon Oct 19 08:46:37 2026 */
 
 #define PY_SSIZE_T_CLEAN
 #include "Python.h"
@@ -758,6 +758,8 @@ static CYTHON_INLINE PyObject *__Pyx_GetItemInt_Fast(PyObject *o, Py_ssize_t i)
     }
     return r;
 }
+#define __Pyx_BufPtrStrided2d(type, buf, i0, s0, i1, s1) (type)((char*)buf + i0 * s0 + i1 * s1)
+#define __Pyx_BufPtrStrided3d(type, buf, i0, s0, i1, s1, i2, s2) (type)((char*)buf + i0 * s0 + i1 * s1 + i2 * s2)
 
 static CYTHON_INLINE void __Pyx_RaiseNeedMoreValuesError(Py_ssize_t index);
 
@@ -774,13 +776,21 @@ static void __Pyx_ReleaseBuffer(Py_buffer *view);
 #define __Pyx_ReleaseBuffer PyBuffer_Release
 #endif
 
-Py_ssize_t __Pyx_zeros[] = {0, 0};
-Py_ssize_t __Pyx_minusones[] = {-1, -1};
+Py_ssize_t __Pyx_zeros[] = {0, 0, 0};
+Py_ssize_t __Pyx_minusones[] = {-1, -1, -1};
 
 static PyObject *__Pyx_Import(PyObject *name, PyObject *from_list, long level); /*proto*/
 
 static CYTHON_INLINE PyObject *__Pyx_PyInt_to_py_npy_long(npy_long);
 
+#ifndef __PYX_FORCE_INIT_THREADS
+  #if PY_VERSION_HEX < 0x02040200
+    #define __PYX_FORCE_INIT_THREADS 1
+  #else
+    #define __PYX_FORCE_INIT_THREADS 0
+  #endif
+#endif
+
 #if CYTHON_CCOMPLEX
   #ifdef __cplusplus
     #define __Pyx_CREAL(z) ((z).real())
@@ -964,6 +974,14 @@ static int __pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_pop_equals(P
 static int __pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_pop_equals(PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t); /*proto*/
 static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_int_t, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_int_t, __pyx_t_5numpy_int_t, int __pyx_skip_dispatch); /*proto*/
 static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, PyArrayObject *, __pyx_t_5numpy_int_t, __pyx_t_5numpy_int_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_matrix_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_sparse_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_int_t, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_sparse_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_neighbour_payoffs(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_structured_replicator_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_structured_imitation_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_batch_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_int_t, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_batch_step(PyArrayObject *, PyArrayObject *, PyArrayObject *, __pyx_t_5numpy_float64_t, __pyx_t_5numpy_float64_t, int __pyx_skip_dispatch); /*proto*/
 static __Pyx_TypeInfo __Pyx_TypeInfo_nn___pyx_t_5numpy_int_t = { "int_t", NULL, sizeof(__pyx_t_5numpy_int_t), 'I' };
 static __Pyx_TypeInfo __Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t = { "float64_t", NULL, sizeof(__pyx_t_5numpy_float64_t), 'R' };
 #define __Pyx_MODULE_NAME "simulations.dynamics.replicator_fastfuncs"
@@ -972,22 +990,25 @@ int __pyx_module_is_main_simulations__dynamics__replicator_fastfuncs = 0;
 /* Implementation of 'simulations.dynamics.replicator_fastfuncs' */
 static PyObject *__pyx_builtin_xrange;
 static PyObject *__pyx_builtin_ValueError;
+static PyObject *__pyx_builtin_ZeroDivisionError;
 static PyObject *__pyx_builtin_range;
 static PyObject *__pyx_builtin_RuntimeError;
 static char __pyx_k_6[] = "Can only handle 1 or 2 dimensions";
-static char __pyx_k_8[] = "ndarray is not C contiguous";
-static char __pyx_k_10[] = "ndarray is not Fortran contiguous";
-static char __pyx_k_12[] = "Non-native byte order not supported";
-static char __pyx_k_14[] = "unknown dtype code in numpy.pxd (%d)";
-static char __pyx_k_15[] = "Format string allocated too short, see comment in numpy.pxd";
-static char __pyx_k_18[] = "Format string allocated too short.";
-static char __pyx_k_20[] = "simulations.dynamics.replicator_fastfuncs";
+static char __pyx_k_8[] = "float division";
+static char __pyx_k_14[] = "ndarray is not C contiguous";
+static char __pyx_k_16[] = "ndarray is not Fortran contiguous";
+static char __pyx_k_18[] = "Non-native byte order not supported";
+static char __pyx_k_20[] = "unknown dtype code in numpy.pxd (%d)";
+static char __pyx_k_21[] = "Format string allocated too short, see comment in numpy.pxd";
+static char __pyx_k_24[] = "Format string allocated too short.";
+static char __pyx_k_26[] = "simulations.dynamics.replicator_fastfuncs";
 static char __pyx_k__B[] = "B";
 static char __pyx_k__H[] = "H";
 static char __pyx_k__I[] = "I";
 static char __pyx_k__L[] = "L";
 static char __pyx_k__O[] = "O";
 static char __pyx_k__Q[] = "Q";
+static char __pyx_k__T[] = "T";
 static char __pyx_k__b[] = "b";
 static char __pyx_k__d[] = "d";
 static char __pyx_k__f[] = "f";
@@ -1000,21 +1021,30 @@ static char __pyx_k__Zd[] = "Zd";
 static char __pyx_k__Zf[] = "Zf";
 static char __pyx_k__Zg[] = "Zg";
 static char __pyx_k__np[] = "np";
+static char __pyx_k__dot[] = "dot";
 static char __pyx_k__int[] = "int";
 static char __pyx_k__out[] = "out";
 static char __pyx_k__pop[] = "pop";
+static char __pyx_k__left[] = "left";
+static char __pyx_k__pops[] = "pops";
 static char __pyx_k__prod[] = "prod";
 static char __pyx_k__size[] = "size";
 static char __pyx_k__arity[] = "arity";
 static char __pyx_k__dtype[] = "dtype";
 static char __pyx_k__numpy[] = "numpy";
 static char __pyx_k__range[] = "range";
+static char __pyx_k__right[] = "right";
 static char __pyx_k__types[] = "types";
 static char __pyx_k__zeros[] = "zeros";
 static char __pyx_k__arange[] = "arange";
+static char __pyx_k__indptr[] = "indptr";
 static char __pyx_k__newpop[] = "newpop";
 static char __pyx_k__repeat[] = "repeat";
+static char __pyx_k__values[] = "values";
 static char __pyx_k__xrange[] = "xrange";
+static char __pyx_k__entries[] = "entries";
+static char __pyx_k__float64[] = "float64";
+static char __pyx_k__indices[] = "indices";
 static char __pyx_k__prevpop[] = "prevpop";
 static char __pyx_k____main__[] = "__main__";
 static char __pyx_k____test__[] = "__test__";
@@ -1026,38 +1056,51 @@ static char __pyx_k__types_array[] = "types_array";
 static char __pyx_k__RuntimeError[] = "RuntimeError";
 static char __pyx_k__num_profiles[] = "num_profiles";
 static char __pyx_k__profile_size[] = "profile_size";
+static char __pyx_k__payoff_matrix[] = "payoff_matrix";
 static char __pyx_k__types_array_2[] = "types_array_2";
 static char __pyx_k__effective_zero[] = "effective_zero";
 static char __pyx_k__sample_profile[] = "sample_profile";
 static char __pyx_k__background_rate[] = "background_rate";
 static char __pyx_k__profile_payoffs[] = "profile_payoffs";
+static char __pyx_k__ZeroDivisionError[] = "ZeroDivisionError";
 static char __pyx_k__generate_profiles[] = "generate_profiles";
-static PyObject *__pyx_kp_u_10;
-static PyObject *__pyx_kp_u_12;
 static PyObject *__pyx_kp_u_14;
-static PyObject *__pyx_kp_u_15;
+static PyObject *__pyx_kp_u_16;
 static PyObject *__pyx_kp_u_18;
-static PyObject *__pyx_n_s_20;
+static PyObject *__pyx_kp_u_20;
+static PyObject *__pyx_kp_u_21;
+static PyObject *__pyx_kp_u_24;
+static PyObject *__pyx_n_s_26;
 static PyObject *__pyx_kp_s_6;
-static PyObject *__pyx_kp_u_8;
+static PyObject *__pyx_kp_s_8;
 static PyObject *__pyx_n_s__RuntimeError;
+static PyObject *__pyx_n_s__T;
 static PyObject *__pyx_n_s__ValueError;
+static PyObject *__pyx_n_s__ZeroDivisionError;
 static PyObject *__pyx_n_s____main__;
 static PyObject *__pyx_n_s____test__;
 static PyObject *__pyx_n_s__arange;
 static PyObject *__pyx_n_s__arity;
 static PyObject *__pyx_n_s__background_rate;
+static PyObject *__pyx_n_s__dot;
 static PyObject *__pyx_n_s__dtype;
 static PyObject *__pyx_n_s__effective_zero;
+static PyObject *__pyx_n_s__entries;
+static PyObject *__pyx_n_s__float64;
 static PyObject *__pyx_n_s__generate_profiles;
+static PyObject *__pyx_n_s__indices;
+static PyObject *__pyx_n_s__indptr;
 static PyObject *__pyx_n_s__int;
+static PyObject *__pyx_n_s__left;
 static PyObject *__pyx_n_s__newpop;
 static PyObject *__pyx_n_s__np;
 static PyObject *__pyx_n_s__num_profiles;
 static PyObject *__pyx_n_s__numpy;
 static PyObject *__pyx_n_s__out;
+static PyObject *__pyx_n_s__payoff_matrix;
 static PyObject *__pyx_n_s__pop;
 static PyObject *__pyx_n_s__pop_equals;
+static PyObject *__pyx_n_s__pops;
 static PyObject *__pyx_n_s__prevpop;
 static PyObject *__pyx_n_s__prod;
 static PyObject *__pyx_n_s__profile_payoffs;
@@ -1065,12 +1108,14 @@ static PyObject *__pyx_n_s__profile_size;
 static PyObject *__pyx_n_s__profiles;
 static PyObject *__pyx_n_s__range;
 static PyObject *__pyx_n_s__repeat;
+static PyObject *__pyx_n_s__right;
 static PyObject *__pyx_n_s__sample_profile;
 static PyObject *__pyx_n_s__size;
 static PyObject *__pyx_n_s__type_counts;
 static PyObject *__pyx_n_s__types;
 static PyObject *__pyx_n_s__types_array;
 static PyObject *__pyx_n_s__types_array_2;
+static PyObject *__pyx_n_s__values;
 static PyObject *__pyx_n_s__xrange;
 static PyObject *__pyx_n_s__zeros;
 static PyObject *__pyx_int_0;
@@ -1083,11 +1128,16 @@ static PyObject *__pyx_k_slice_5;
 static PyObject *__pyx_k_tuple_2;
 static PyObject *__pyx_k_tuple_7;
 static PyObject *__pyx_k_tuple_9;
+static PyObject *__pyx_k_tuple_10;
 static PyObject *__pyx_k_tuple_11;
+static PyObject *__pyx_k_tuple_12;
 static PyObject *__pyx_k_tuple_13;
-static PyObject *__pyx_k_tuple_16;
+static PyObject *__pyx_k_tuple_15;
 static PyObject *__pyx_k_tuple_17;
 static PyObject *__pyx_k_tuple_19;
+static PyObject *__pyx_k_tuple_22;
+static PyObject *__pyx_k_tuple_23;
+static PyObject *__pyx_k_tuple_25;
 
 /* "simulations/dynamics/replicator_fastfuncs.pyx":9
  * np.import_array()
@@ -2014,9 +2064,9 @@ static int __pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_pop_equals
   return __pyx_r;
 }
 
-/* "simulations/dynamics/replicator_fastfuncs.pyx":69
- * 
+/* "simulations/dynamics/replicator_fastfuncs.pyx":70
  * 
+ * @cython.cdivision(True)
  * cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_step(np.ndarray[np.float64_t, ndim=1] pop,             # <<<<<<<<<<<<<<
  *                                                             np.ndarray[np.int_t, ndim=2] profiles,
  *                                                             np.ndarray[np.int_t, ndim=1] sample_profile,
@@ -2027,36 +2077,35 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   int __pyx_v_i;
   int __pyx_v_j;
   int __pyx_v_strategy;
+  int __pyx_v_degenerate;
   int __pyx_v_types;
   int __pyx_v_izero;
   int __pyx_v_ione;
   __pyx_t_5numpy_float64_t __pyx_v_profile_prob;
   __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
   __pyx_t_5numpy_float64_t __pyx_v_prob;
-  __pyx_t_5numpy_float64_t __pyx_v_contrib;
-  __pyx_t_5numpy_float64_t __pyx_v_contrib2;
   __pyx_t_5numpy_float64_t __pyx_v_tmp;
   __pyx_t_5numpy_float64_t __pyx_v_arityf;
   __pyx_t_5numpy_float64_t __pyx_v_zero;
-  PyArrayObject *__pyx_v_expected_contribution = 0;
-  PyArrayObject *__pyx_v_profile_probs = 0;
   npy_intp *__pyx_v_dims;
   npy_intp *__pyx_v_new_dims;
   npy_intp *__pyx_v_profile_dims;
   PyArrayObject *__pyx_v_newpop2 = 0;
   PyArrayObject *__pyx_v_payoffs = 0;
   PyArrayObject *__pyx_v_newpop = 0;
+  PyArrayObject *__pyx_v_profile_probs = 0;
+  PyArrayObject *__pyx_v_expected_contribution = 0;
   Py_buffer __pyx_bstruct_profile_payoffs;
   Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
   Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
   Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
   Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
-  Py_buffer __pyx_bstruct_pop;
-  Py_ssize_t __pyx_bstride_0_pop = 0;
-  Py_ssize_t __pyx_bshape_0_pop = 0;
   Py_buffer __pyx_bstruct_sample_profile;
   Py_ssize_t __pyx_bstride_0_sample_profile = 0;
   Py_ssize_t __pyx_bshape_0_sample_profile = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
   Py_buffer __pyx_bstruct_profile_probs;
   Py_ssize_t __pyx_bstride_0_profile_probs = 0;
   Py_ssize_t __pyx_bshape_0_profile_probs = 0;
@@ -2089,31 +2138,44 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   PyArrayObject *__pyx_t_2 = NULL;
   PyArrayObject *__pyx_t_3 = NULL;
   PyArrayObject *__pyx_t_4 = NULL;
-  __pyx_t_5numpy_int_t __pyx_t_5;
+  PyArrayObject *__pyx_t_5 = NULL;
   PyArrayObject *__pyx_t_6 = NULL;
-  int __pyx_t_7;
-  PyObject *__pyx_t_8 = NULL;
-  PyObject *__pyx_t_9 = NULL;
-  PyObject *__pyx_t_10 = NULL;
+  __pyx_t_5numpy_int_t __pyx_t_7;
+  __pyx_t_5numpy_int_t __pyx_t_8;
+  int __pyx_t_9;
+  int __pyx_t_10;
   __pyx_t_5numpy_int_t __pyx_t_11;
   int __pyx_t_12;
-  __pyx_t_5numpy_float64_t __pyx_t_13;
+  int __pyx_t_13;
   int __pyx_t_14;
   int __pyx_t_15;
   int __pyx_t_16;
   int __pyx_t_17;
-  __pyx_t_5numpy_float64_t __pyx_t_18;
+  int __pyx_t_18;
   int __pyx_t_19;
-  long __pyx_t_20;
+  int __pyx_t_20;
+  int __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  int __pyx_t_26;
+  int __pyx_t_27;
+  int __pyx_t_28;
+  int __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  long __pyx_t_32;
+  long __pyx_t_33;
   int __pyx_lineno = 0;
   const char *__pyx_filename = NULL;
   int __pyx_clineno = 0;
   __Pyx_RefNannySetupContext("one_dimensional_step");
-  __pyx_bstruct_expected_contribution.buf = NULL;
-  __pyx_bstruct_profile_probs.buf = NULL;
   __pyx_bstruct_newpop2.buf = NULL;
   __pyx_bstruct_payoffs.buf = NULL;
   __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_profile_probs.buf = NULL;
+  __pyx_bstruct_expected_contribution.buf = NULL;
   __pyx_bstruct_pop.buf = NULL;
   __pyx_bstruct_profiles.buf = NULL;
   __pyx_bstruct_sample_profile.buf = NULL;
@@ -2122,106 +2184,115 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   __pyx_bstruct_types_array_2.buf = NULL;
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0];
   __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
   __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_sample_profile = __pyx_bstruct_sample_profile.strides[0];
   __pyx_bshape_0_sample_profile = __pyx_bstruct_sample_profile.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1];
   __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_types_array = __pyx_bstruct_types_array.strides[0];
   __pyx_bshape_0_types_array = __pyx_bstruct_types_array.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_types_array_2 = __pyx_bstruct_types_array_2.strides[0];
   __pyx_bshape_0_types_array_2 = __pyx_bstruct_types_array_2.shape[0];
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":82
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":83
  * 
  *     cdef int i, j, strategy
+ *     cdef int degenerate = 0             # <<<<<<<<<<<<<<
+ *     cdef int types = types_array.shape[0]
+ *     cdef int izero = <int>0
+ */
+  __pyx_v_degenerate = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":84
+ *     cdef int i, j, strategy
+ *     cdef int degenerate = 0
  *     cdef int types = types_array.shape[0]             # <<<<<<<<<<<<<<
  *     cdef int izero = <int>0
  *     cdef int ione = <int>1
  */
   __pyx_v_types = (__pyx_v_types_array->dimensions[0]);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":83
- *     cdef int i, j, strategy
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":85
+ *     cdef int degenerate = 0
  *     cdef int types = types_array.shape[0]
  *     cdef int izero = <int>0             # <<<<<<<<<<<<<<
  *     cdef int ione = <int>1
- *     cdef np.float64_t profile_prob, avg_payoff, prob, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t profile_prob, avg_payoff, prob, tmp = 0.
  */
   __pyx_v_izero = ((int)0);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":84
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":86
  *     cdef int types = types_array.shape[0]
  *     cdef int izero = <int>0
  *     cdef int ione = <int>1             # <<<<<<<<<<<<<<
- *     cdef np.float64_t profile_prob, avg_payoff, prob, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t profile_prob, avg_payoff, prob, tmp = 0.
  *     cdef np.float64_t arityf = <np.float64_t>arity
  */
   __pyx_v_ione = ((int)1);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":85
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":87
  *     cdef int izero = <int>0
  *     cdef int ione = <int>1
- *     cdef np.float64_t profile_prob, avg_payoff, prob, contrib, contrib2, tmp = 0.             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t profile_prob, avg_payoff, prob, tmp = 0.             # <<<<<<<<<<<<<<
  *     cdef np.float64_t arityf = <np.float64_t>arity
  *     cdef np.float64_t zero = 0.
  */
   __pyx_v_tmp = 0.;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":86
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":88
  *     cdef int ione = <int>1
- *     cdef np.float64_t profile_prob, avg_payoff, prob, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t profile_prob, avg_payoff, prob, tmp = 0.
  *     cdef np.float64_t arityf = <np.float64_t>arity             # <<<<<<<<<<<<<<
  *     cdef np.float64_t zero = 0.
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+ *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
  */
   __pyx_v_arityf = ((__pyx_t_5numpy_float64_t)__pyx_v_arity);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":87
- *     cdef np.float64_t profile_prob, avg_payoff, prob, contrib, contrib2, tmp = 0.
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":89
+ *     cdef np.float64_t profile_prob, avg_payoff, prob, tmp = 0.
  *     cdef np.float64_t arityf = <np.float64_t>arity
  *     cdef np.float64_t zero = 0.             # <<<<<<<<<<<<<<
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
+ *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  */
   __pyx_v_zero = 0.;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":89
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":90
+ *     cdef np.float64_t arityf = <np.float64_t>arity
  *     cdef np.float64_t zero = 0.
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)             # <<<<<<<<<<<<<<
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
  */
   __pyx_v_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_types_array));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":90
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":91
+ *     cdef np.float64_t zero = 0.
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)             # <<<<<<<<<<<<<<
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
@@ -2229,7 +2300,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
  */
   __pyx_v_new_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_types_array_2));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":91
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":92
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)             # <<<<<<<<<<<<<<
@@ -2238,22 +2309,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
  */
   __pyx_v_profile_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_sample_profile));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":92
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":93
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
  *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.PyArray_ZEROS(ione, new_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 92; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 93; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 92; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 93; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_2 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
     if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop2, (PyObject*)__pyx_t_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
       __pyx_v_newpop2 = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop2.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 92; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 93; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_newpop2 = __pyx_bstruct_newpop2.strides[0];
       __pyx_bshape_0_newpop2 = __pyx_bstruct_newpop2.shape[0];
     }
@@ -2262,22 +2333,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   __pyx_v_newpop2 = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":93
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":94
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
  *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.PyArray_ZEROS(ione, new_dims, np.NPY_FLOAT64, izero)
- * 
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 93; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 93; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_3 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
     if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_3, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
       __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 93; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0];
       __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0];
     }
@@ -2286,22 +2357,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":94
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":95
  *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.PyArray_ZEROS(ione, new_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
- * 
- *     #go over each possible profile of strategies
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_new_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_new_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 95; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 95; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_4 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
     if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_4, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
       __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 95; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0];
       __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0];
     }
@@ -2310,442 +2381,403 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   __pyx_v_newpop = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":97
- * 
- *     #go over each possible profile of strategies
- *     for i from 0 <= i < num_profiles:             # <<<<<<<<<<<<<<
- *         profile_prob = 1.
- *         #profile_probs = np.empty(profile_size, dtype=np.float64)
- */
-  __pyx_t_5 = __pyx_v_num_profiles;
-  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_5; __pyx_v_i++) {
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":98
- *     #go over each possible profile of strategies
- *     for i from 0 <= i < num_profiles:
- *         profile_prob = 1.             # <<<<<<<<<<<<<<
- *         #profile_probs = np.empty(profile_size, dtype=np.float64)
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
- */
-    __pyx_v_profile_prob = 1.;
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":100
- *         profile_prob = 1.
- *         #profile_probs = np.empty(profile_size, dtype=np.float64)
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)             # <<<<<<<<<<<<<<
- *         expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":96
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.PyArray_ZEROS(ione, new_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  * 
  */
-    __pyx_t_1 = PyArray_EMPTY(1, __pyx_v_profile_dims, NPY_FLOAT64, 0); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_1);
-    if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __pyx_t_6 = ((PyArrayObject *)__pyx_t_1);
-    {
-      __Pyx_BufFmt_StackElem __pyx_stack[1];
-      __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
-      __pyx_t_7 = __Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_probs, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack);
-      if (unlikely(__pyx_t_7 < 0)) {
-        PyErr_Fetch(&__pyx_t_8, &__pyx_t_9, &__pyx_t_10);
-        if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_probs, (PyObject*)__pyx_v_profile_probs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
-          Py_XDECREF(__pyx_t_8); Py_XDECREF(__pyx_t_9); Py_XDECREF(__pyx_t_10);
-          __Pyx_RaiseBufferFallbackError();
-        } else {
-          PyErr_Restore(__pyx_t_8, __pyx_t_9, __pyx_t_10);
-        }
-      }
-      __pyx_bstride_0_profile_probs = __pyx_bstruct_profile_probs.strides[0];
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_profile_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 96; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 96; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_5 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_probs, (PyObject*)__pyx_t_5, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_profile_probs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_profile_probs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 96; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_profile_probs = __pyx_bstruct_profile_probs.strides[0];
       __pyx_bshape_0_profile_probs = __pyx_bstruct_profile_probs.shape[0];
-      if (unlikely(__pyx_t_7 < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
-    __pyx_t_6 = 0;
-    __Pyx_XDECREF(((PyObject *)__pyx_v_profile_probs));
-    __pyx_v_profile_probs = ((PyArrayObject *)__pyx_t_1);
-    __pyx_t_1 = 0;
+  }
+  __pyx_t_5 = 0;
+  __pyx_v_profile_probs = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":101
- *         #profile_probs = np.empty(profile_size, dtype=np.float64)
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
- *         expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)             # <<<<<<<<<<<<<<
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":97
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.PyArray_ZEROS(ione, new_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  * 
- *         #calculate the probability of that profile being drawn
+ *     #the loops only touch typed buffers, so other threads can run meanwhile
  */
-    __pyx_t_1 = PyArray_ZEROS(1, __pyx_v_profile_dims, NPY_FLOAT64, 0); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 101; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_1);
-    if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 101; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __pyx_t_6 = ((PyArrayObject *)__pyx_t_1);
-    {
-      __Pyx_BufFmt_StackElem __pyx_stack[1];
-      __Pyx_SafeReleaseBuffer(&__pyx_bstruct_expected_contribution);
-      __pyx_t_7 = __Pyx_GetBufferAndValidate(&__pyx_bstruct_expected_contribution, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack);
-      if (unlikely(__pyx_t_7 < 0)) {
-        PyErr_Fetch(&__pyx_t_10, &__pyx_t_9, &__pyx_t_8);
-        if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_expected_contribution, (PyObject*)__pyx_v_expected_contribution, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
-          Py_XDECREF(__pyx_t_10); Py_XDECREF(__pyx_t_9); Py_XDECREF(__pyx_t_8);
-          __Pyx_RaiseBufferFallbackError();
-        } else {
-          PyErr_Restore(__pyx_t_10, __pyx_t_9, __pyx_t_8);
-        }
-      }
-      __pyx_bstride_0_expected_contribution = __pyx_bstruct_expected_contribution.strides[0];
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_profile_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 97; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 97; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_expected_contribution, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_expected_contribution = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_expected_contribution.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 97; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_expected_contribution = __pyx_bstruct_expected_contribution.strides[0];
       __pyx_bshape_0_expected_contribution = __pyx_bstruct_expected_contribution.shape[0];
-      if (unlikely(__pyx_t_7 < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 101; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    }
-    __pyx_t_6 = 0;
-    __Pyx_XDECREF(((PyObject *)__pyx_v_expected_contribution));
-    __pyx_v_expected_contribution = ((PyArrayObject *)__pyx_t_1);
-    __pyx_t_1 = 0;
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":105
- *         #calculate the probability of that profile being drawn
- *         #profile_prob = profile_probs.prod()
- *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             prob = (<np.float64_t*>np.PyArray_GETPTR1(pop, strategy))[0]
- */
-    __pyx_t_11 = __pyx_v_profile_size;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_11; __pyx_v_j++) {
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":106
- *         #profile_prob = profile_probs.prod()
- *         for j from 0 <= j < profile_size:
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]             # <<<<<<<<<<<<<<
- *             prob = (<np.float64_t*>np.PyArray_GETPTR1(pop, strategy))[0]
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- */
-      __pyx_v_strategy = (((int *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_profiles), __pyx_v_i, __pyx_v_j))[0]);
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":107
- *         for j from 0 <= j < profile_size:
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             prob = (<np.float64_t*>np.PyArray_GETPTR1(pop, strategy))[0]             # <<<<<<<<<<<<<<
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- *             profile_probs[j] = prob
- */
-      __pyx_v_prob = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_pop), __pyx_v_strategy))[0]);
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":109
- *             prob = (<np.float64_t*>np.PyArray_GETPTR1(pop, strategy))[0]
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- *             profile_probs[j] = prob             # <<<<<<<<<<<<<<
- *             profile_prob = profile_prob * prob
- * 
- */
-      __pyx_t_7 = __pyx_v_j;
-      if (__pyx_t_7 < 0) __pyx_t_7 += __pyx_bshape_0_profile_probs;
-      *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_probs.buf, __pyx_t_7, __pyx_bstride_0_profile_probs) = __pyx_v_prob;
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":110
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- *             profile_probs[j] = prob
- *             profile_prob = profile_prob * prob             # <<<<<<<<<<<<<<
- * 
- *         #calculate the expected contribution for each of the profile slots
- */
-      __pyx_v_profile_prob = (__pyx_v_profile_prob * __pyx_v_prob);
     }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_expected_contribution = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":113
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":100
  * 
- *         #calculate the expected contribution for each of the profile slots
- *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
- *             if profile_prob > zero:
- *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- */
-    __pyx_t_11 = __pyx_v_profile_size;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_11; __pyx_v_j++) {
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":114
- *         #calculate the expected contribution for each of the profile slots
- *         for j from 0 <= j < profile_size:
- *             if profile_prob > zero:             # <<<<<<<<<<<<<<
- *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
+ *     #the loops only touch typed buffers, so other threads can run meanwhile
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         #go over each possible profile of strategies
+ *         for i from 0 <= i < num_profiles:
  */
-      __pyx_t_12 = (__pyx_v_profile_prob > __pyx_v_zero);
-      if (__pyx_t_12) {
+  {
+      #ifdef WITH_THREAD
+      PyThreadState *_save = NULL;
+      #endif
+      Py_UNBLOCK_THREADS
+      /*try:*/ {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":102
+ *     with nogil:
+ *         #go over each possible profile of strategies
+ *         for i from 0 <= i < num_profiles:             # <<<<<<<<<<<<<<
+ *             #calculate the probability of that profile being drawn
+ *             #profile_prob = profile_probs.prod()
+ */
+        __pyx_t_7 = __pyx_v_num_profiles;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_7; __pyx_v_i++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":105
+ *             #calculate the probability of that profile being drawn
+ *             #profile_prob = profile_probs.prod()
+ *             profile_prob = 1.             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < profile_size:
+ *                 prob = pop[profiles[i, j]]
+ */
+          __pyx_v_profile_prob = 1.;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":106
+ *             #profile_prob = profile_probs.prod()
+ *             profile_prob = 1.
+ *             for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                 prob = pop[profiles[i, j]]
+ *                 profile_probs[j] = prob
+ */
+          __pyx_t_8 = __pyx_v_profile_size;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_8; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":107
+ *             profile_prob = 1.
+ *             for j from 0 <= j < profile_size:
+ *                 prob = pop[profiles[i, j]]             # <<<<<<<<<<<<<<
+ *                 profile_probs[j] = prob
+ *                 profile_prob = profile_prob * prob
+ */
+            __pyx_t_9 = __pyx_v_i;
+            __pyx_t_10 = __pyx_v_j;
+            if (__pyx_t_9 < 0) __pyx_t_9 += __pyx_bshape_0_profiles;
+            if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_1_profiles;
+            __pyx_t_11 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_9, __pyx_bstride_0_profiles, __pyx_t_10, __pyx_bstride_1_profiles));
+            if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_0_pop;
+            __pyx_v_prob = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_11, __pyx_bstride_0_pop));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":108
+ *             for j from 0 <= j < profile_size:
+ *                 prob = pop[profiles[i, j]]
+ *                 profile_probs[j] = prob             # <<<<<<<<<<<<<<
+ *                 profile_prob = profile_prob * prob
+ * 
+ */
+            __pyx_t_12 = __pyx_v_j;
+            if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_0_profile_probs;
+            *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_probs.buf, __pyx_t_12, __pyx_bstride_0_profile_probs) = __pyx_v_prob;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":109
+ *                 prob = pop[profiles[i, j]]
+ *                 profile_probs[j] = prob
+ *                 profile_prob = profile_prob * prob             # <<<<<<<<<<<<<<
+ * 
+ *             #calculate the expected contribution for each of the profile slots
+ */
+            __pyx_v_profile_prob = (__pyx_v_profile_prob * __pyx_v_prob);
+          }
 
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":116
- *             if profile_prob > zero:
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":113
+ *             #calculate the expected contribution for each of the profile slots
  *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]             # <<<<<<<<<<<<<<
- *                 prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]
- *                 contrib = contrib * profile_prob / prob
+ *             for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                 if profile_prob > zero:
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
  */
-        __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_profile_payoffs), __pyx_v_i, __pyx_v_j))[0]);
+          __pyx_t_8 = __pyx_v_profile_size;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_8; __pyx_v_j++) {
 
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":117
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":114
  *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
- *                 prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]             # <<<<<<<<<<<<<<
- *                 contrib = contrib * profile_prob / prob
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
- */
-        __pyx_v_prob = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_profile_probs), __pyx_v_j))[0]);
-
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":118
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
- *                 prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]
- *                 contrib = contrib * profile_prob / prob             # <<<<<<<<<<<<<<
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
- *                 expected_contribution[j] = contrib
- */
-        __pyx_t_13 = (__pyx_v_contrib * __pyx_v_profile_prob);
-        if (unlikely(__pyx_v_prob == 0)) {
-          PyErr_Format(PyExc_ZeroDivisionError, "float division");
-          {__pyx_filename = __pyx_f[0]; __pyx_lineno = 118; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-        }
-        __pyx_v_contrib = (__pyx_t_13 / __pyx_v_prob);
-
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":120
- *                 contrib = contrib * profile_prob / prob
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
- *                 expected_contribution[j] = contrib             # <<<<<<<<<<<<<<
- *             else:
- *                 #expected_contribution = profile_payoffs[i] * zero
+ *             for j from 0 <= j < profile_size:
+ *                 if profile_prob > zero:             # <<<<<<<<<<<<<<
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
+ *                 else:
  */
-        __pyx_t_14 = __pyx_v_j;
-        if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_expected_contribution;
-        *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_14, __pyx_bstride_0_expected_contribution) = __pyx_v_contrib;
-        goto __pyx_L9;
-      }
-      /*else*/ {
+            __pyx_t_13 = (__pyx_v_profile_prob > __pyx_v_zero);
+            if (__pyx_t_13) {
 
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":124
- *                 #expected_contribution = profile_payoffs[i] * zero
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), zero)
- *                 expected_contribution[j] = zero             # <<<<<<<<<<<<<<
- * 
- *         #add the expected contributions to the right type's payoff.
- */
-        __pyx_t_15 = __pyx_v_j;
-        if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_0_expected_contribution;
-        *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_15, __pyx_bstride_0_expected_contribution) = __pyx_v_zero;
-      }
-      __pyx_L9:;
-    }
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":115
+ *             for j from 0 <= j < profile_size:
+ *                 if profile_prob > zero:
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]             # <<<<<<<<<<<<<<
+ *                 else:
+ *                     expected_contribution[j] = zero
+ */
+              __pyx_t_14 = __pyx_v_i;
+              __pyx_t_15 = __pyx_v_j;
+              if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_profile_payoffs;
+              if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_1_profile_payoffs;
+              __pyx_t_16 = __pyx_v_j;
+              if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_profile_probs;
+              __pyx_t_17 = __pyx_v_j;
+              if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_0_expected_contribution;
+              *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_17, __pyx_bstride_0_expected_contribution) = (((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_payoffs.buf, __pyx_t_14, __pyx_bstride_0_profile_payoffs, __pyx_t_15, __pyx_bstride_1_profile_payoffs)) * __pyx_v_profile_prob) / (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_probs.buf, __pyx_t_16, __pyx_bstride_0_profile_probs)));
+              goto __pyx_L12;
+            }
+            /*else*/ {
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":127
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":117
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
+ *                 else:
+ *                     expected_contribution[j] = zero             # <<<<<<<<<<<<<<
  * 
- *         #add the expected contributions to the right type's payoff.
- *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
- *             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
+ *             #add the expected contributions to the right type's payoff.
  */
-    __pyx_t_11 = __pyx_v_profile_size;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_11; __pyx_v_j++) {
+              __pyx_t_18 = __pyx_v_j;
+              if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_expected_contribution;
+              *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_18, __pyx_bstride_0_expected_contribution) = __pyx_v_zero;
+            }
+            __pyx_L12:;
+          }
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":129
- *         for j from 0 <= j < profile_size:
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":121
+ *             #add the expected contributions to the right type's payoff.
  *             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]             # <<<<<<<<<<<<<<
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, strategy))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
+ *             for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                 strategy = profiles[i, j]
+ *                 payoffs[strategy] = payoffs[strategy] + expected_contribution[j]
  */
-      __pyx_v_strategy = (((int *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_profiles), __pyx_v_i, __pyx_v_j))[0]);
+          __pyx_t_8 = __pyx_v_profile_size;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_8; __pyx_v_j++) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":130
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":122
  *             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, strategy))[0]             # <<<<<<<<<<<<<<
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
- *             #np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, strategy), contrib + contrib2)
- */
-      __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_strategy))[0]);
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":131
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, strategy))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]             # <<<<<<<<<<<<<<
- *             #np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, strategy), contrib + contrib2)
- *             payoffs[strategy] = contrib + contrib2
- */
-      __pyx_v_contrib2 = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_expected_contribution), __pyx_v_j))[0]);
+ *             for j from 0 <= j < profile_size:
+ *                 strategy = profiles[i, j]             # <<<<<<<<<<<<<<
+ *                 payoffs[strategy] = payoffs[strategy] + expected_contribution[j]
+ * 
+ */
+            __pyx_t_19 = __pyx_v_i;
+            __pyx_t_20 = __pyx_v_j;
+            if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_profiles;
+            if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_1_profiles;
+            __pyx_v_strategy = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_19, __pyx_bstride_0_profiles, __pyx_t_20, __pyx_bstride_1_profiles));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":123
+ *             for j from 0 <= j < profile_size:
+ *                 strategy = profiles[i, j]
+ *                 payoffs[strategy] = payoffs[strategy] + expected_contribution[j]             # <<<<<<<<<<<<<<
+ * 
+ *         #payoffs = payoffs / <float>arity
+ */
+            __pyx_t_21 = __pyx_v_strategy;
+            if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_0_payoffs;
+            __pyx_t_22 = __pyx_v_j;
+            if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_0_expected_contribution;
+            __pyx_t_23 = __pyx_v_strategy;
+            if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_0_payoffs;
+            *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_23, __pyx_bstride_0_payoffs) = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_21, __pyx_bstride_0_payoffs)) + (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_22, __pyx_bstride_0_expected_contribution)));
+          }
+        }
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":133
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
- *             #np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, strategy), contrib + contrib2)
- *             payoffs[strategy] = contrib + contrib2             # <<<<<<<<<<<<<<
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":126
+ * 
+ *         #payoffs = payoffs / <float>arity
+ *         for i from 0 <= i < types:             # <<<<<<<<<<<<<<
+ *             payoffs[i] = payoffs[i] / arityf
  * 
- *     #payoffs = payoffs / <float>arity
  */
-      __pyx_t_16 = __pyx_v_strategy;
-      if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_payoffs;
-      *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_16, __pyx_bstride_0_payoffs) = (__pyx_v_contrib + __pyx_v_contrib2);
-    }
-  }
+        __pyx_t_24 = __pyx_v_types;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_24; __pyx_v_i++) {
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":136
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":127
+ *         #payoffs = payoffs / <float>arity
+ *         for i from 0 <= i < types:
+ *             payoffs[i] = payoffs[i] / arityf             # <<<<<<<<<<<<<<
  * 
- *     #payoffs = payoffs / <float>arity
- *     for i from 0 <= i < types:             # <<<<<<<<<<<<<<
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         contrib = contrib / arityf
+ *         #avg_payoff = np.dot(pop, payoffs)
  */
-  __pyx_t_17 = __pyx_v_types;
-  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_17; __pyx_v_i++) {
+          __pyx_t_25 = __pyx_v_i;
+          if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_payoffs;
+          __pyx_t_26 = __pyx_v_i;
+          if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_0_payoffs;
+          *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_26, __pyx_bstride_0_payoffs) = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_25, __pyx_bstride_0_payoffs)) / __pyx_v_arityf);
+        }
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":137
- *     #payoffs = payoffs / <float>arity
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]             # <<<<<<<<<<<<<<
- *         contrib = contrib / arityf
- *         np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, i), contrib)
- */
-    __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_i))[0]);
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":130
+ * 
+ *         #avg_payoff = np.dot(pop, payoffs)
+ *         avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *         for i from 0 <= i < types:
+ *             avg_payoff = <np.float64_t>(avg_payoff + (pop[i] * payoffs[i]))
+ */
+        __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":131
+ *         #avg_payoff = np.dot(pop, payoffs)
+ *         avg_payoff = <np.float64_t>0
+ *         for i from 0 <= i < types:             # <<<<<<<<<<<<<<
+ *             avg_payoff = <np.float64_t>(avg_payoff + (pop[i] * payoffs[i]))
+ *         if background_rate + avg_payoff == zero:
+ */
+        __pyx_t_24 = __pyx_v_types;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_24; __pyx_v_i++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":132
+ *         avg_payoff = <np.float64_t>0
+ *         for i from 0 <= i < types:
+ *             avg_payoff = <np.float64_t>(avg_payoff + (pop[i] * payoffs[i]))             # <<<<<<<<<<<<<<
+ *         if background_rate + avg_payoff == zero:
+ *             degenerate = 1
+ */
+          __pyx_t_27 = __pyx_v_i;
+          if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_0_pop;
+          __pyx_t_28 = __pyx_v_i;
+          if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_0_payoffs;
+          __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)(__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_27, __pyx_bstride_0_pop)) * (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_28, __pyx_bstride_0_payoffs)))));
+        }
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":138
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         contrib = contrib / arityf             # <<<<<<<<<<<<<<
- *         np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, i), contrib)
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":133
+ *         for i from 0 <= i < types:
+ *             avg_payoff = <np.float64_t>(avg_payoff + (pop[i] * payoffs[i]))
+ *         if background_rate + avg_payoff == zero:             # <<<<<<<<<<<<<<
+ *             degenerate = 1
  * 
  */
-    if (unlikely(__pyx_v_arityf == 0)) {
-      PyErr_Format(PyExc_ZeroDivisionError, "float division");
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 138; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    }
-    __pyx_v_contrib = (__pyx_v_contrib / __pyx_v_arityf);
+        __pyx_t_13 = ((__pyx_v_background_rate + __pyx_v_avg_payoff) == __pyx_v_zero);
+        if (__pyx_t_13) {
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":139
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         contrib = contrib / arityf
- *         np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, i), contrib)             # <<<<<<<<<<<<<<
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":134
+ *             avg_payoff = <np.float64_t>(avg_payoff + (pop[i] * payoffs[i]))
+ *         if background_rate + avg_payoff == zero:
+ *             degenerate = 1             # <<<<<<<<<<<<<<
  * 
- *     #avg_payoff = np.dot(pop, payoffs)
+ *         #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
  */
-    __pyx_t_1 = PyFloat_FromDouble(__pyx_v_contrib); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 139; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_1);
-    PyArray_SETITEM(((PyArrayObject *)__pyx_v_payoffs), PyArray_GETPTR1(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_i), __pyx_t_1);
-    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
-  }
+          __pyx_v_degenerate = 1;
+          goto __pyx_L19;
+        }
+        __pyx_L19:;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":142
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":137
  * 
- *     #avg_payoff = np.dot(pop, payoffs)
- *     avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
+ *         #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
+ *         for i from 0 <= i < types:             # <<<<<<<<<<<<<<
+ *             tmp = pop[i] * (background_rate + payoffs[i]) / (background_rate + avg_payoff)
+ *             newpop2[i] = tmp
  */
-  __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+        __pyx_t_24 = __pyx_v_types;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_24; __pyx_v_i++) {
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":143
- *     #avg_payoff = np.dot(pop, payoffs)
- *     avg_payoff = <np.float64_t>0
- *     for i from 0 <= i < types:             # <<<<<<<<<<<<<<
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":138
+ *         #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
+ *         for i from 0 <= i < types:
+ *             tmp = pop[i] * (background_rate + payoffs[i]) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *             newpop2[i] = tmp
+ *             newpop[i + 1] = tmp
  */
-  __pyx_t_17 = __pyx_v_types;
-  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_17; __pyx_v_i++) {
+          __pyx_t_29 = __pyx_v_i;
+          if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_0_pop;
+          __pyx_t_30 = __pyx_v_i;
+          if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_0_payoffs;
+          __pyx_v_tmp = (((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_29, __pyx_bstride_0_pop)) * (__pyx_v_background_rate + (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_30, __pyx_bstride_0_payoffs)))) / (__pyx_v_background_rate + __pyx_v_avg_payoff));
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":144
- *     avg_payoff = <np.float64_t>0
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]             # <<<<<<<<<<<<<<
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         avg_payoff = <np.float64_t>(avg_payoff + (contrib * contrib2))
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":139
+ *         for i from 0 <= i < types:
+ *             tmp = pop[i] * (background_rate + payoffs[i]) / (background_rate + avg_payoff)
+ *             newpop2[i] = tmp             # <<<<<<<<<<<<<<
+ *             newpop[i + 1] = tmp
+ * 
  */
-    __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_pop), __pyx_v_i))[0]);
+          __pyx_t_31 = __pyx_v_i;
+          if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_0_newpop2;
+          *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop2.buf, __pyx_t_31, __pyx_bstride_0_newpop2) = __pyx_v_tmp;
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":145
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]             # <<<<<<<<<<<<<<
- *         avg_payoff = <np.float64_t>(avg_payoff + (contrib * contrib2))
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":140
+ *             tmp = pop[i] * (background_rate + payoffs[i]) / (background_rate + avg_payoff)
+ *             newpop2[i] = tmp
+ *             newpop[i + 1] = tmp             # <<<<<<<<<<<<<<
  * 
+ *     if degenerate:
  */
-    __pyx_v_contrib2 = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_i))[0]);
+          __pyx_t_32 = (__pyx_v_i + 1);
+          if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_0_newpop;
+          *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_32, __pyx_bstride_0_newpop) = __pyx_v_tmp;
+        }
+      }
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":146
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         avg_payoff = <np.float64_t>(avg_payoff + (contrib * contrib2))             # <<<<<<<<<<<<<<
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":100
  * 
- *     #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
+ *     #the loops only touch typed buffers, so other threads can run meanwhile
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         #go over each possible profile of strategies
+ *         for i from 0 <= i < num_profiles:
  */
-    __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)(__pyx_v_avg_payoff + (__pyx_v_contrib * __pyx_v_contrib2)));
+      /*finally:*/ {
+        Py_BLOCK_THREADS
+      }
   }
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":149
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":142
+ *             newpop[i + 1] = tmp
  * 
- *     #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
- *     for i from 0 <= i < types:             # <<<<<<<<<<<<<<
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- */
-  __pyx_t_17 = __pyx_v_types;
-  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_17; __pyx_v_i++) {
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":150
- *     #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]             # <<<<<<<<<<<<<<
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
- */
-    __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_pop), __pyx_v_i))[0]);
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":151
- *     for i from 0 <= i < types:
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]             # <<<<<<<<<<<<<<
- *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
- *         #np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR1(newpop2, i), tmp)
- */
-    __pyx_v_contrib2 = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_i))[0]);
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":152
- *         contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
- *         contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
- *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
- *         #np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR1(newpop2, i), tmp)
- *         #np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, <int>(i + 1)), tmp)
- */
-    __pyx_t_13 = (__pyx_v_contrib * (__pyx_v_background_rate + __pyx_v_contrib2));
-    __pyx_t_18 = (__pyx_v_background_rate + __pyx_v_avg_payoff);
-    if (unlikely(__pyx_t_18 == 0)) {
-      PyErr_Format(PyExc_ZeroDivisionError, "float division");
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    }
-    __pyx_v_tmp = (__pyx_t_13 / __pyx_t_18);
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":155
- *         #np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR1(newpop2, i), tmp)
- *         #np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, <int>(i + 1)), tmp)
- *         newpop2[i] = tmp             # <<<<<<<<<<<<<<
- *         newpop[i + 1] = tmp
+ *     if degenerate:             # <<<<<<<<<<<<<<
+ *         raise ZeroDivisionError("float division")
  * 
  */
-    __pyx_t_19 = __pyx_v_i;
-    if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_newpop2;
-    *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop2.buf, __pyx_t_19, __pyx_bstride_0_newpop2) = __pyx_v_tmp;
+  if (__pyx_v_degenerate) {
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":156
- *         #np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, <int>(i + 1)), tmp)
- *         newpop2[i] = tmp
- *         newpop[i + 1] = tmp             # <<<<<<<<<<<<<<
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":143
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
  * 
  *     #newpop = np.insert(newpop, 0, one_pop_equals(newpop, pop, effective_zero))
  */
-    __pyx_t_20 = (__pyx_v_i + 1);
-    if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_newpop;
-    *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_20, __pyx_bstride_0_newpop) = __pyx_v_tmp;
+    __pyx_t_1 = PyObject_Call(__pyx_builtin_ZeroDivisionError, ((PyObject *)__pyx_k_tuple_9), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 143; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_Raise(__pyx_t_1, 0, 0, 0);
+    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+    {__pyx_filename = __pyx_f[0]; __pyx_lineno = 143; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    goto __pyx_L22;
   }
+  __pyx_L22:;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":159
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":146
  * 
  *     #newpop = np.insert(newpop, 0, one_pop_equals(newpop, pop, effective_zero))
- *     np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, 0), <np.float64_t>one_pop_equals(newpop2, pop, effective_zero))             # <<<<<<<<<<<<<<
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)             # <<<<<<<<<<<<<<
  * 
  *     return newpop
  */
-  __pyx_t_1 = PyFloat_FromDouble(((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero))); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 159; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_1);
-  PyArray_SETITEM(((PyArrayObject *)__pyx_v_newpop), PyArray_GETPTR1(((PyArrayObject *)__pyx_v_newpop), 0), __pyx_t_1);
-  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_33 = 0;
+  if (__pyx_t_33 < 0) __pyx_t_33 += __pyx_bshape_0_newpop;
+  *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_33, __pyx_bstride_0_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":161
- *     np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, 0), <np.float64_t>one_pop_equals(newpop2, pop, effective_zero))
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":148
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
  * 
  *     return newpop             # <<<<<<<<<<<<<<
  * 
@@ -2763,8 +2795,8 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
     __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
@@ -2779,8 +2811,8 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   goto __pyx_L2;
   __pyx_L0:;
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
@@ -2790,19 +2822,19 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
   __pyx_L2:;
-  __Pyx_XDECREF((PyObject *)__pyx_v_expected_contribution);
-  __Pyx_XDECREF((PyObject *)__pyx_v_profile_probs);
   __Pyx_XDECREF((PyObject *)__pyx_v_newpop2);
   __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
   __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XDECREF((PyObject *)__pyx_v_profile_probs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_expected_contribution);
   __Pyx_XGIVEREF((PyObject *)__pyx_r);
   __Pyx_RefNannyFinishContext();
   return __pyx_r;
 }
 
-/* "simulations/dynamics/replicator_fastfuncs.pyx":69
- * 
+/* "simulations/dynamics/replicator_fastfuncs.pyx":70
  * 
+ * @cython.cdivision(True)
  * cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_step(np.ndarray[np.float64_t, ndim=1] pop,             # <<<<<<<<<<<<<<
  *                                                             np.ndarray[np.int_t, ndim=2] profiles,
  *                                                             np.ndarray[np.int_t, ndim=1] sample_profile,
@@ -2881,65 +2913,65 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_2one_di
         values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profiles);
         if (likely(values[1])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  2:
         values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__sample_profile);
         if (likely(values[2])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  3:
         values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_payoffs);
         if (likely(values[3])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  4:
         values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__types_array);
         if (likely(values[4])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  5:
         values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__types_array_2);
         if (likely(values[5])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  6:
         values[6] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__arity);
         if (likely(values[6])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 6); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 6); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  7:
         values[7] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
         if (likely(values[7])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 7); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 7); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  8:
         values[8] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
         if (likely(values[8])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 8); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 8); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  9:
         values[9] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__num_profiles);
         if (likely(values[9])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 9); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 9); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 10:
         values[10] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_size);
         if (likely(values[10])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 10); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, 10); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
       }
       if (unlikely(kw_args > 0)) {
-        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "one_dimensional_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "one_dimensional_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
       }
     } else if (PyTuple_GET_SIZE(__pyx_args) != 11) {
       goto __pyx_L5_argtuple_error;
@@ -2962,15 +2994,15 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_2one_di
     __pyx_v_profile_payoffs = ((PyArrayObject *)values[3]);
     __pyx_v_types_array = ((PyArrayObject *)values[4]);
     __pyx_v_types_array_2 = ((PyArrayObject *)values[5]);
-    __pyx_v_arity = __Pyx_PyInt_from_py_npy_long(values[6]); if (unlikely((__pyx_v_arity == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 75; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[7]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 76; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[8]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 77; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_num_profiles = __Pyx_PyInt_from_py_npy_long(values[9]); if (unlikely((__pyx_v_num_profiles == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 78; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_profile_size = __Pyx_PyInt_from_py_npy_long(values[10]); if (unlikely((__pyx_v_profile_size == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 79; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_arity = __Pyx_PyInt_from_py_npy_long(values[6]); if (unlikely((__pyx_v_arity == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 76; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[7]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 77; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[8]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 78; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_num_profiles = __Pyx_PyInt_from_py_npy_long(values[9]); if (unlikely((__pyx_v_num_profiles == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 79; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_profile_size = __Pyx_PyInt_from_py_npy_long(values[10]); if (unlikely((__pyx_v_profile_size == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 80; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
   }
   goto __pyx_L4_argument_unpacking_done;
   __pyx_L5_argtuple_error:;
-  __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __Pyx_RaiseArgtupleInvalid("one_dimensional_step", 1, 11, 11, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
   __pyx_L3_error:;
   __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
   __Pyx_RefNannyFinishContext();
@@ -2982,50 +3014,50 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_2one_di
   __pyx_bstruct_profile_payoffs.buf = NULL;
   __pyx_bstruct_types_array.buf = NULL;
   __pyx_bstruct_types_array_2.buf = NULL;
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_sample_profile), __pyx_ptype_5numpy_ndarray, 1, "sample_profile", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 71; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profile_payoffs), __pyx_ptype_5numpy_ndarray, 1, "profile_payoffs", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 72; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array), __pyx_ptype_5numpy_ndarray, 1, "types_array", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 73; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array_2), __pyx_ptype_5numpy_ndarray, 1, "types_array_2", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 74; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 71; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_sample_profile), __pyx_ptype_5numpy_ndarray, 1, "sample_profile", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 72; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profile_payoffs), __pyx_ptype_5numpy_ndarray, 1, "profile_payoffs", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 73; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array), __pyx_ptype_5numpy_ndarray, 1, "types_array", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 74; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array_2), __pyx_ptype_5numpy_ndarray, 1, "types_array_2", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 75; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0];
   __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
   __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_sample_profile = __pyx_bstruct_sample_profile.strides[0];
   __pyx_bshape_0_sample_profile = __pyx_bstruct_sample_profile.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1];
   __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_types_array = __pyx_bstruct_types_array.strides[0];
   __pyx_bshape_0_types_array = __pyx_bstruct_types_array.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_types_array_2 = __pyx_bstruct_types_array_2.strides[0];
   __pyx_bshape_0_types_array_2 = __pyx_bstruct_types_array_2.shape[0];
   __Pyx_XDECREF(__pyx_r);
-  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_step(__pyx_v_pop, __pyx_v_profiles, __pyx_v_sample_profile, __pyx_v_profile_payoffs, __pyx_v_types_array, __pyx_v_types_array_2, __pyx_v_arity, __pyx_v_background_rate, __pyx_v_effective_zero, __pyx_v_num_profiles, __pyx_v_profile_size, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 69; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_step(__pyx_v_pop, __pyx_v_profiles, __pyx_v_sample_profile, __pyx_v_profile_payoffs, __pyx_v_types_array, __pyx_v_types_array_2, __pyx_v_arity, __pyx_v_background_rate, __pyx_v_effective_zero, __pyx_v_num_profiles, __pyx_v_profile_size, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __pyx_r = __pyx_t_1;
   __pyx_t_1 = 0;
@@ -3060,9 +3092,9 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_2one_di
   return __pyx_r;
 }
 
-/* "simulations/dynamics/replicator_fastfuncs.pyx":164
- * 
+/* "simulations/dynamics/replicator_fastfuncs.pyx":152
  * 
+ * @cython.cdivision(True)
  * cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
  *                                                           np.ndarray[np.int_t, ndim=2] profiles,
  *                                                           np.ndarray[np.int_t, ndim=1] sample_profile,
@@ -3073,6 +3105,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   int __pyx_v_i;
   int __pyx_v_j;
   int __pyx_v_strategy;
+  int __pyx_v_degenerate;
   int __pyx_v_izero;
   int __pyx_v_ione;
   int __pyx_v_itwo;
@@ -3081,11 +3114,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   __pyx_t_5numpy_float64_t __pyx_v_zero;
   __pyx_t_5numpy_float64_t __pyx_v_profile_prob;
   __pyx_t_5numpy_float64_t __pyx_v_prob;
-  __pyx_t_5numpy_float64_t __pyx_v_contrib;
-  __pyx_t_5numpy_float64_t __pyx_v_contrib2;
   __pyx_t_5numpy_float64_t __pyx_v_tmp;
-  PyArrayObject *__pyx_v_expected_contribution = 0;
-  PyArrayObject *__pyx_v_profile_probs = 0;
   npy_intp *__pyx_v_dims;
   npy_intp *__pyx_v_new_dims;
   npy_intp *__pyx_v_profile_dims;
@@ -3094,19 +3123,21 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   PyArrayObject *__pyx_v_payoffs = 0;
   PyArrayObject *__pyx_v_newpop = 0;
   PyArrayObject *__pyx_v_avg_payoffs = 0;
+  PyArrayObject *__pyx_v_profile_probs = 0;
+  PyArrayObject *__pyx_v_expected_contribution = 0;
   Py_buffer __pyx_bstruct_profile_payoffs;
   Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
   Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
   Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
   Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
+  Py_buffer __pyx_bstruct_sample_profile;
+  Py_ssize_t __pyx_bstride_0_sample_profile = 0;
+  Py_ssize_t __pyx_bshape_0_sample_profile = 0;
   Py_buffer __pyx_bstruct_pop;
   Py_ssize_t __pyx_bstride_0_pop = 0;
   Py_ssize_t __pyx_bstride_1_pop = 0;
   Py_ssize_t __pyx_bshape_0_pop = 0;
   Py_ssize_t __pyx_bshape_1_pop = 0;
-  Py_buffer __pyx_bstruct_sample_profile;
-  Py_ssize_t __pyx_bstride_0_sample_profile = 0;
-  Py_ssize_t __pyx_bshape_0_sample_profile = 0;
   Py_buffer __pyx_bstruct_profile_probs;
   Py_ssize_t __pyx_bstride_0_profile_probs = 0;
   Py_ssize_t __pyx_bshape_0_profile_probs = 0;
@@ -3156,15 +3187,15 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   PyArrayObject *__pyx_t_3 = NULL;
   PyArrayObject *__pyx_t_4 = NULL;
   PyArrayObject *__pyx_t_5 = NULL;
-  __pyx_t_5numpy_int_t __pyx_t_6;
+  PyArrayObject *__pyx_t_6 = NULL;
   PyArrayObject *__pyx_t_7 = NULL;
-  int __pyx_t_8;
-  PyObject *__pyx_t_9 = NULL;
-  PyObject *__pyx_t_10 = NULL;
-  PyObject *__pyx_t_11 = NULL;
-  __pyx_t_5numpy_int_t __pyx_t_12;
-  int __pyx_t_13;
-  __pyx_t_5numpy_float64_t __pyx_t_14;
+  __pyx_t_5numpy_int_t __pyx_t_8;
+  __pyx_t_5numpy_int_t __pyx_t_9;
+  int __pyx_t_10;
+  int __pyx_t_11;
+  int __pyx_t_12;
+  __pyx_t_5numpy_int_t __pyx_t_13;
+  int __pyx_t_14;
   int __pyx_t_15;
   int __pyx_t_16;
   int __pyx_t_17;
@@ -3172,17 +3203,41 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   int __pyx_t_19;
   int __pyx_t_20;
   int __pyx_t_21;
-  __pyx_t_5numpy_float64_t __pyx_t_22;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  int __pyx_t_26;
+  int __pyx_t_27;
+  int __pyx_t_28;
+  int __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  int __pyx_t_32;
+  int __pyx_t_33;
+  int __pyx_t_34;
+  int __pyx_t_35;
+  int __pyx_t_36;
+  int __pyx_t_37;
+  int __pyx_t_38;
+  int __pyx_t_39;
+  int __pyx_t_40;
+  int __pyx_t_41;
+  int __pyx_t_42;
+  int __pyx_t_43;
+  long __pyx_t_44;
+  int __pyx_t_45;
+  long __pyx_t_46;
   int __pyx_lineno = 0;
   const char *__pyx_filename = NULL;
   int __pyx_clineno = 0;
   __Pyx_RefNannySetupContext("n_dimensional_step");
-  __pyx_bstruct_expected_contribution.buf = NULL;
-  __pyx_bstruct_profile_probs.buf = NULL;
   __pyx_bstruct_newpop2.buf = NULL;
   __pyx_bstruct_payoffs.buf = NULL;
   __pyx_bstruct_newpop.buf = NULL;
   __pyx_bstruct_avg_payoffs.buf = NULL;
+  __pyx_bstruct_profile_probs.buf = NULL;
+  __pyx_bstruct_expected_contribution.buf = NULL;
   __pyx_bstruct_pop.buf = NULL;
   __pyx_bstruct_profiles.buf = NULL;
   __pyx_bstruct_sample_profile.buf = NULL;
@@ -3192,58 +3247,67 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   __pyx_bstruct_type_counts.buf = NULL;
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
   __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
   __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_sample_profile = __pyx_bstruct_sample_profile.strides[0];
   __pyx_bshape_0_sample_profile = __pyx_bstruct_sample_profile.shape[0];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1];
   __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_types_array = __pyx_bstruct_types_array.strides[0]; __pyx_bstride_1_types_array = __pyx_bstruct_types_array.strides[1];
   __pyx_bshape_0_types_array = __pyx_bstruct_types_array.shape[0]; __pyx_bshape_1_types_array = __pyx_bstruct_types_array.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_types_array_2 = __pyx_bstruct_types_array_2.strides[0]; __pyx_bstride_1_types_array_2 = __pyx_bstruct_types_array_2.strides[1];
   __pyx_bshape_0_types_array_2 = __pyx_bstruct_types_array_2.shape[0]; __pyx_bshape_1_types_array_2 = __pyx_bstruct_types_array_2.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_type_counts, (PyObject*)__pyx_v_type_counts, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_type_counts, (PyObject*)__pyx_v_type_counts, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_type_counts = __pyx_bstruct_type_counts.strides[0];
   __pyx_bshape_0_type_counts = __pyx_bstruct_type_counts.shape[0];
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":177
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":165
  * 
  *     cdef int i, j, strategy
+ *     cdef int degenerate = 0             # <<<<<<<<<<<<<<
+ *     cdef int izero = <int>0
+ *     cdef int ione = <int>1
+ */
+  __pyx_v_degenerate = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":166
+ *     cdef int i, j, strategy
+ *     cdef int degenerate = 0
  *     cdef int izero = <int>0             # <<<<<<<<<<<<<<
  *     cdef int ione = <int>1
  *     cdef int itwo = <int>2
  */
   __pyx_v_izero = ((int)0);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":178
- *     cdef int i, j, strategy
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":167
+ *     cdef int degenerate = 0
  *     cdef int izero = <int>0
  *     cdef int ione = <int>1             # <<<<<<<<<<<<<<
  *     cdef int itwo = <int>2
@@ -3251,7 +3315,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
  */
   __pyx_v_ione = ((int)1);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":179
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":168
  *     cdef int izero = <int>0
  *     cdef int ione = <int>1
  *     cdef int itwo = <int>2             # <<<<<<<<<<<<<<
@@ -3260,7 +3324,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
  */
   __pyx_v_itwo = ((int)2);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":180
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":169
  *     cdef int ione = <int>1
  *     cdef int itwo = <int>2
  *     cdef int num_pops = types_array.shape[0]             # <<<<<<<<<<<<<<
@@ -3269,44 +3333,44 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
  */
   __pyx_v_num_pops = (__pyx_v_types_array->dimensions[0]);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":181
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":170
  *     cdef int itwo = <int>2
  *     cdef int num_pops = types_array.shape[0]
  *     cdef int types = types_array.shape[1]             # <<<<<<<<<<<<<<
  *     cdef np.float64_t zero = 0.
- *     cdef np.float64_t profile_prob, prob, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t profile_prob, prob, tmp = 0.
  */
   __pyx_v_types = (__pyx_v_types_array->dimensions[1]);
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":182
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":171
  *     cdef int num_pops = types_array.shape[0]
  *     cdef int types = types_array.shape[1]
  *     cdef np.float64_t zero = 0.             # <<<<<<<<<<<<<<
- *     cdef np.float64_t profile_prob, prob, contrib, contrib2, tmp = 0.
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+ *     cdef np.float64_t profile_prob, prob, tmp = 0.
+ *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
  */
   __pyx_v_zero = 0.;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":183
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":172
  *     cdef int types = types_array.shape[1]
  *     cdef np.float64_t zero = 0.
- *     cdef np.float64_t profile_prob, prob, contrib, contrib2, tmp = 0.             # <<<<<<<<<<<<<<
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+ *     cdef np.float64_t profile_prob, prob, tmp = 0.             # <<<<<<<<<<<<<<
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
+ *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  */
   __pyx_v_tmp = 0.;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":185
- *     cdef np.float64_t profile_prob, prob, contrib, contrib2, tmp = 0.
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":173
+ *     cdef np.float64_t zero = 0.
+ *     cdef np.float64_t profile_prob, prob, tmp = 0.
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)             # <<<<<<<<<<<<<<
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
  */
   __pyx_v_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_types_array));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":186
- *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":174
+ *     cdef np.float64_t profile_prob, prob, tmp = 0.
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)             # <<<<<<<<<<<<<<
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
@@ -3314,7 +3378,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
  */
   __pyx_v_new_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_types_array_2));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":187
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":175
  *     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)             # <<<<<<<<<<<<<<
@@ -3323,7 +3387,7 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
  */
   __pyx_v_profile_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_sample_profile));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":188
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":176
  *     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
  *     cdef np.npy_intp* by_pop_dims = np.PyArray_DIMS(type_counts)             # <<<<<<<<<<<<<<
@@ -3332,22 +3396,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
  */
   __pyx_v_by_pop_dims = PyArray_DIMS(((PyArrayObject *)__pyx_v_type_counts));
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":189
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":177
  *     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
  *     cdef np.npy_intp* by_pop_dims = np.PyArray_DIMS(type_counts)
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.PyArray_ZEROS(itwo, new_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_itwo, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 189; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_itwo, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 177; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 189; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 177; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_2 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop2, (PyObject*)__pyx_t_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop2, (PyObject*)__pyx_t_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
       __pyx_v_newpop2 = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop2.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 189; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 177; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_newpop2 = __pyx_bstruct_newpop2.strides[0]; __pyx_bstride_1_newpop2 = __pyx_bstruct_newpop2.strides[1];
       __pyx_bshape_0_newpop2 = __pyx_bstruct_newpop2.shape[0]; __pyx_bshape_1_newpop2 = __pyx_bstruct_newpop2.shape[1];
     }
@@ -3356,22 +3420,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   __pyx_v_newpop2 = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":190
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":178
  *     cdef np.npy_intp* by_pop_dims = np.PyArray_DIMS(type_counts)
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.PyArray_ZEROS(itwo, new_dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=1] avg_payoffs = np.PyArray_ZEROS(ione, by_pop_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_itwo, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 190; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_itwo, __pyx_v_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 178; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 190; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 178; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_3 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_3, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_3, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
       __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 190; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 178; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0]; __pyx_bstride_1_payoffs = __pyx_bstruct_payoffs.strides[1];
       __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0]; __pyx_bshape_1_payoffs = __pyx_bstruct_payoffs.shape[1];
     }
@@ -3380,22 +3444,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":191
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":179
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.PyArray_ZEROS(itwo, new_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  *     cdef np.ndarray[np.float64_t, ndim=1] avg_payoffs = np.PyArray_ZEROS(ione, by_pop_dims, np.NPY_FLOAT64, izero)
- * 
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_itwo, __pyx_v_new_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_itwo, __pyx_v_new_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 179; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 179; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_4 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_4, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_4, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
       __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 179; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0]; __pyx_bstride_1_newpop = __pyx_bstruct_newpop.strides[1];
       __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0]; __pyx_bshape_1_newpop = __pyx_bstruct_newpop.shape[1];
     }
@@ -3404,22 +3468,22 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   __pyx_v_newpop = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":192
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":180
  *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.PyArray_ZEROS(itwo, new_dims, np.NPY_FLOAT64, izero)
  *     cdef np.ndarray[np.float64_t, ndim=1] avg_payoffs = np.PyArray_ZEROS(ione, by_pop_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
- * 
- *     #go over each possible profile of strategies
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  */
-  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_by_pop_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 192; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_by_pop_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 180; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
-  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 192; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 180; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_t_5 = ((PyArrayObject *)__pyx_t_1);
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
     if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_avg_payoffs, (PyObject*)__pyx_t_5, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
       __pyx_v_avg_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_avg_payoffs.buf = NULL;
-      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 192; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 180; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     } else {__pyx_bstride_0_avg_payoffs = __pyx_bstruct_avg_payoffs.strides[0];
       __pyx_bshape_0_avg_payoffs = __pyx_bstruct_avg_payoffs.shape[0];
     }
@@ -3428,431 +3492,6582 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   __pyx_v_avg_payoffs = ((PyArrayObject *)__pyx_t_1);
   __pyx_t_1 = 0;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":195
- * 
- *     #go over each possible profile of strategies
- *     for i from 0 <= i < num_profiles:             # <<<<<<<<<<<<<<
- *         profile_prob = 1.
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
- */
-  __pyx_t_6 = __pyx_v_num_profiles;
-  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_6; __pyx_v_i++) {
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":196
- *     #go over each possible profile of strategies
- *     for i from 0 <= i < num_profiles:
- *         profile_prob = 1.             # <<<<<<<<<<<<<<
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
- *         expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)
- */
-    __pyx_v_profile_prob = 1.;
-
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":197
- *     for i from 0 <= i < num_profiles:
- *         profile_prob = 1.
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)             # <<<<<<<<<<<<<<
- *         expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":181
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.PyArray_ZEROS(itwo, new_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] avg_payoffs = np.PyArray_ZEROS(ione, by_pop_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  * 
  */
-    __pyx_t_1 = PyArray_EMPTY(1, __pyx_v_profile_dims, NPY_FLOAT64, 0); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 197; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_1);
-    if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 197; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __pyx_t_7 = ((PyArrayObject *)__pyx_t_1);
-    {
-      __Pyx_BufFmt_StackElem __pyx_stack[1];
-      __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
-      __pyx_t_8 = __Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_probs, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack);
-      if (unlikely(__pyx_t_8 < 0)) {
-        PyErr_Fetch(&__pyx_t_9, &__pyx_t_10, &__pyx_t_11);
-        if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_probs, (PyObject*)__pyx_v_profile_probs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
-          Py_XDECREF(__pyx_t_9); Py_XDECREF(__pyx_t_10); Py_XDECREF(__pyx_t_11);
-          __Pyx_RaiseBufferFallbackError();
-        } else {
-          PyErr_Restore(__pyx_t_9, __pyx_t_10, __pyx_t_11);
-        }
-      }
-      __pyx_bstride_0_profile_probs = __pyx_bstruct_profile_probs.strides[0];
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_profile_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 181; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 181; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_probs, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_profile_probs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_profile_probs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 181; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_profile_probs = __pyx_bstruct_profile_probs.strides[0];
       __pyx_bshape_0_profile_probs = __pyx_bstruct_profile_probs.shape[0];
-      if (unlikely(__pyx_t_8 < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 197; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
-    __pyx_t_7 = 0;
-    __Pyx_XDECREF(((PyObject *)__pyx_v_profile_probs));
-    __pyx_v_profile_probs = ((PyArrayObject *)__pyx_t_1);
-    __pyx_t_1 = 0;
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_profile_probs = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":198
- *         profile_prob = 1.
- *         profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
- *         expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)             # <<<<<<<<<<<<<<
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":182
+ *     cdef np.ndarray[np.float64_t, ndim=1] avg_payoffs = np.PyArray_ZEROS(ione, by_pop_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)             # <<<<<<<<<<<<<<
  * 
- *         #calculate the probability of that profile being drawn
+ *     with nogil:
  */
-    __pyx_t_1 = PyArray_ZEROS(1, __pyx_v_profile_dims, NPY_FLOAT64, 0); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_1);
-    if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __pyx_t_7 = ((PyArrayObject *)__pyx_t_1);
-    {
-      __Pyx_BufFmt_StackElem __pyx_stack[1];
-      __Pyx_SafeReleaseBuffer(&__pyx_bstruct_expected_contribution);
-      __pyx_t_8 = __Pyx_GetBufferAndValidate(&__pyx_bstruct_expected_contribution, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack);
-      if (unlikely(__pyx_t_8 < 0)) {
-        PyErr_Fetch(&__pyx_t_11, &__pyx_t_10, &__pyx_t_9);
-        if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_expected_contribution, (PyObject*)__pyx_v_expected_contribution, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
-          Py_XDECREF(__pyx_t_11); Py_XDECREF(__pyx_t_10); Py_XDECREF(__pyx_t_9);
-          __Pyx_RaiseBufferFallbackError();
-        } else {
-          PyErr_Restore(__pyx_t_11, __pyx_t_10, __pyx_t_9);
-        }
-      }
-      __pyx_bstride_0_expected_contribution = __pyx_bstruct_expected_contribution.strides[0];
+  __pyx_t_1 = PyArray_ZEROS(__pyx_v_ione, __pyx_v_profile_dims, NPY_FLOAT64, __pyx_v_izero); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 182; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 182; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_expected_contribution, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_expected_contribution = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_expected_contribution.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 182; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_expected_contribution = __pyx_bstruct_expected_contribution.strides[0];
       __pyx_bshape_0_expected_contribution = __pyx_bstruct_expected_contribution.shape[0];
-      if (unlikely(__pyx_t_8 < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
-    __pyx_t_7 = 0;
-    __Pyx_XDECREF(((PyObject *)__pyx_v_expected_contribution));
-    __pyx_v_expected_contribution = ((PyArrayObject *)__pyx_t_1);
-    __pyx_t_1 = 0;
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_expected_contribution = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":201
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":184
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  * 
- *         #calculate the probability of that profile being drawn
- *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
- *             #profile_probs[j] = pop[j][profile[j]]
- *             #profile_prob = profile_prob * pop[j][profile[j]]
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         #go over each possible profile of strategies
+ *         for i from 0 <= i < num_profiles:
  */
-    __pyx_t_12 = __pyx_v_profile_size;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_12; __pyx_v_j++) {
+  {
+      #ifdef WITH_THREAD
+      PyThreadState *_save = NULL;
+      #endif
+      Py_UNBLOCK_THREADS
+      /*try:*/ {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":186
+ *     with nogil:
+ *         #go over each possible profile of strategies
+ *         for i from 0 <= i < num_profiles:             # <<<<<<<<<<<<<<
+ *             #calculate the probability of that profile being drawn
+ *             #profile_prob = profile_probs.prod()
+ */
+        __pyx_t_8 = __pyx_v_num_profiles;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_8; __pyx_v_i++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":189
+ *             #calculate the probability of that profile being drawn
+ *             #profile_prob = profile_probs.prod()
+ *             profile_prob = 1.             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < profile_size:
+ *                 prob = pop[j, profiles[i, j]]
+ */
+          __pyx_v_profile_prob = 1.;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":190
+ *             #profile_prob = profile_probs.prod()
+ *             profile_prob = 1.
+ *             for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                 prob = pop[j, profiles[i, j]]
+ *                 profile_probs[j] = prob
+ */
+          __pyx_t_9 = __pyx_v_profile_size;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":191
+ *             profile_prob = 1.
+ *             for j from 0 <= j < profile_size:
+ *                 prob = pop[j, profiles[i, j]]             # <<<<<<<<<<<<<<
+ *                 profile_probs[j] = prob
+ *                 profile_prob = profile_prob * prob
+ */
+            __pyx_t_10 = __pyx_v_i;
+            __pyx_t_11 = __pyx_v_j;
+            if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_0_profiles;
+            if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_1_profiles;
+            __pyx_t_12 = __pyx_v_j;
+            __pyx_t_13 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_10, __pyx_bstride_0_profiles, __pyx_t_11, __pyx_bstride_1_profiles));
+            if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_0_pop;
+            if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_1_pop;
+            __pyx_v_prob = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_12, __pyx_bstride_0_pop, __pyx_t_13, __pyx_bstride_1_pop));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":192
+ *             for j from 0 <= j < profile_size:
+ *                 prob = pop[j, profiles[i, j]]
+ *                 profile_probs[j] = prob             # <<<<<<<<<<<<<<
+ *                 profile_prob = profile_prob * prob
+ * 
+ */
+            __pyx_t_14 = __pyx_v_j;
+            if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_profile_probs;
+            *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_probs.buf, __pyx_t_14, __pyx_bstride_0_profile_probs) = __pyx_v_prob;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":193
+ *                 prob = pop[j, profiles[i, j]]
+ *                 profile_probs[j] = prob
+ *                 profile_prob = profile_prob * prob             # <<<<<<<<<<<<<<
+ * 
+ *             #calculate the expected contribution for each of the profile slots
+ */
+            __pyx_v_profile_prob = (__pyx_v_profile_prob * __pyx_v_prob);
+          }
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":204
- *             #profile_probs[j] = pop[j][profile[j]]
- *             #profile_prob = profile_prob * pop[j][profile[j]]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]             # <<<<<<<<<<<<<<
- *             prob = (<np.float64_t*>np.PyArray_GETPTR2(pop, j, strategy))[0]
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":197
+ *             #calculate the expected contribution for each of the profile slots
+ *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
+ *             for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                 if profile_prob > zero:
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
  */
-      __pyx_v_strategy = (((int *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_profiles), __pyx_v_i, __pyx_v_j))[0]);
+          __pyx_t_9 = __pyx_v_profile_size;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":205
- *             #profile_prob = profile_prob * pop[j][profile[j]]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             prob = (<np.float64_t*>np.PyArray_GETPTR2(pop, j, strategy))[0]             # <<<<<<<<<<<<<<
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- *             profile_probs[j] = prob
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":198
+ *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
+ *             for j from 0 <= j < profile_size:
+ *                 if profile_prob > zero:             # <<<<<<<<<<<<<<
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
+ *                 else:
  */
-      __pyx_v_prob = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_pop), __pyx_v_j, __pyx_v_strategy))[0]);
+            __pyx_t_15 = (__pyx_v_profile_prob > __pyx_v_zero);
+            if (__pyx_t_15) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":207
- *             prob = (<np.float64_t*>np.PyArray_GETPTR2(pop, j, strategy))[0]
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- *             profile_probs[j] = prob             # <<<<<<<<<<<<<<
- *             profile_prob = profile_prob * prob
- *         #profile_prob = profile_probs.prod()
- */
-      __pyx_t_8 = __pyx_v_j;
-      if (__pyx_t_8 < 0) __pyx_t_8 += __pyx_bshape_0_profile_probs;
-      *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_probs.buf, __pyx_t_8, __pyx_bstride_0_profile_probs) = __pyx_v_prob;
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":199
+ *             for j from 0 <= j < profile_size:
+ *                 if profile_prob > zero:
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]             # <<<<<<<<<<<<<<
+ *                 else:
+ *                     expected_contribution[j] = zero
+ */
+              __pyx_t_16 = __pyx_v_i;
+              __pyx_t_17 = __pyx_v_j;
+              if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_profile_payoffs;
+              if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_1_profile_payoffs;
+              __pyx_t_18 = __pyx_v_j;
+              if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_profile_probs;
+              __pyx_t_19 = __pyx_v_j;
+              if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_expected_contribution;
+              *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_19, __pyx_bstride_0_expected_contribution) = (((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_payoffs.buf, __pyx_t_16, __pyx_bstride_0_profile_payoffs, __pyx_t_17, __pyx_bstride_1_profile_payoffs)) * __pyx_v_profile_prob) / (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_probs.buf, __pyx_t_18, __pyx_bstride_0_profile_probs)));
+              goto __pyx_L12;
+            }
+            /*else*/ {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":208
- *             #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
- *             profile_probs[j] = prob
- *             profile_prob = profile_prob * prob             # <<<<<<<<<<<<<<
- *         #profile_prob = profile_probs.prod()
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":201
+ *                     expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
+ *                 else:
+ *                     expected_contribution[j] = zero             # <<<<<<<<<<<<<<
  * 
+ *             #add the expected contributions to the right type's payoff.
  */
-      __pyx_v_profile_prob = (__pyx_v_profile_prob * __pyx_v_prob);
-    }
+              __pyx_t_20 = __pyx_v_j;
+              if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_expected_contribution;
+              *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_20, __pyx_bstride_0_expected_contribution) = __pyx_v_zero;
+            }
+            __pyx_L12:;
+          }
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":217
- *         #    expected_contribution = profile_payoffs[i] * zero
- *         #calculate the expected contribution for each of the profile slots
- *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
- *             if profile_prob > zero:
- *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- */
-    __pyx_t_12 = __pyx_v_profile_size;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_12; __pyx_v_j++) {
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":205
+ *             #add the expected contributions to the right type's payoff.
+ *             #payoffs[j][profile[j]] = payoffs[j][profile[j]] + expected_contribution[j]
+ *             for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                 strategy = profiles[i, j]
+ *                 payoffs[j, strategy] = payoffs[j, strategy] + expected_contribution[j]
+ */
+          __pyx_t_9 = __pyx_v_profile_size;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":206
+ *             #payoffs[j][profile[j]] = payoffs[j][profile[j]] + expected_contribution[j]
+ *             for j from 0 <= j < profile_size:
+ *                 strategy = profiles[i, j]             # <<<<<<<<<<<<<<
+ *                 payoffs[j, strategy] = payoffs[j, strategy] + expected_contribution[j]
+ * 
+ */
+            __pyx_t_21 = __pyx_v_i;
+            __pyx_t_22 = __pyx_v_j;
+            if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_0_profiles;
+            if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_1_profiles;
+            __pyx_v_strategy = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_21, __pyx_bstride_0_profiles, __pyx_t_22, __pyx_bstride_1_profiles));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":207
+ *             for j from 0 <= j < profile_size:
+ *                 strategy = profiles[i, j]
+ *                 payoffs[j, strategy] = payoffs[j, strategy] + expected_contribution[j]             # <<<<<<<<<<<<<<
+ * 
+ *         for i from 0 <= i < num_pops:
+ */
+            __pyx_t_23 = __pyx_v_j;
+            __pyx_t_24 = __pyx_v_strategy;
+            if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_1_payoffs;
+            __pyx_t_25 = __pyx_v_j;
+            if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_expected_contribution;
+            __pyx_t_26 = __pyx_v_j;
+            __pyx_t_27 = __pyx_v_strategy;
+            if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_1_payoffs;
+            *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_26, __pyx_bstride_0_payoffs, __pyx_t_27, __pyx_bstride_1_payoffs) = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_23, __pyx_bstride_0_payoffs, __pyx_t_24, __pyx_bstride_1_payoffs)) + (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_25, __pyx_bstride_0_expected_contribution)));
+          }
+        }
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":218
- *         #calculate the expected contribution for each of the profile slots
- *         for j from 0 <= j < profile_size:
- *             if profile_prob > zero:             # <<<<<<<<<<<<<<
- *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
- */
-      __pyx_t_13 = (__pyx_v_profile_prob > __pyx_v_zero);
-      if (__pyx_t_13) {
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":209
+ *                 payoffs[j, strategy] = payoffs[j, strategy] + expected_contribution[j]
+ * 
+ *         for i from 0 <= i < num_pops:             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < types:
+ *                 avg_payoffs[i] = avg_payoffs[i] + (pop[i, j] * payoffs[i, j])
+ */
+        __pyx_t_28 = __pyx_v_num_pops;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_28; __pyx_v_i++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":210
+ * 
+ *         for i from 0 <= i < num_pops:
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 avg_payoffs[i] = avg_payoffs[i] + (pop[i, j] * payoffs[i, j])
+ *             if background_rate + avg_payoffs[i] == zero:
+ */
+          __pyx_t_29 = __pyx_v_types;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_29; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":211
+ *         for i from 0 <= i < num_pops:
+ *             for j from 0 <= j < types:
+ *                 avg_payoffs[i] = avg_payoffs[i] + (pop[i, j] * payoffs[i, j])             # <<<<<<<<<<<<<<
+ *             if background_rate + avg_payoffs[i] == zero:
+ *                 degenerate = 1
+ */
+            __pyx_t_30 = __pyx_v_i;
+            if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_0_avg_payoffs;
+            __pyx_t_31 = __pyx_v_i;
+            __pyx_t_32 = __pyx_v_j;
+            if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_0_pop;
+            if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_1_pop;
+            __pyx_t_33 = __pyx_v_i;
+            __pyx_t_34 = __pyx_v_j;
+            if (__pyx_t_33 < 0) __pyx_t_33 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_34 < 0) __pyx_t_34 += __pyx_bshape_1_payoffs;
+            __pyx_t_35 = __pyx_v_i;
+            if (__pyx_t_35 < 0) __pyx_t_35 += __pyx_bshape_0_avg_payoffs;
+            *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_35, __pyx_bstride_0_avg_payoffs) = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_30, __pyx_bstride_0_avg_payoffs)) + ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_31, __pyx_bstride_0_pop, __pyx_t_32, __pyx_bstride_1_pop)) * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_33, __pyx_bstride_0_payoffs, __pyx_t_34, __pyx_bstride_1_payoffs))));
+          }
 
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":220
- *             if profile_prob > zero:
- *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]             # <<<<<<<<<<<<<<
- *                 prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]
- *                 contrib = contrib * profile_prob / prob
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":212
+ *             for j from 0 <= j < types:
+ *                 avg_payoffs[i] = avg_payoffs[i] + (pop[i, j] * payoffs[i, j])
+ *             if background_rate + avg_payoffs[i] == zero:             # <<<<<<<<<<<<<<
+ *                 degenerate = 1
+ * 
  */
-        __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_profile_payoffs), __pyx_v_i, __pyx_v_j))[0]);
-
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":221
- *             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
- *                 prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]             # <<<<<<<<<<<<<<
- *                 contrib = contrib * profile_prob / prob
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
- */
-        __pyx_v_prob = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_profile_probs), __pyx_v_j))[0]);
-
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":222
- *                 contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
- *                 prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]
- *                 contrib = contrib * profile_prob / prob             # <<<<<<<<<<<<<<
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
- *                 expected_contribution[j] = contrib
- */
-        __pyx_t_14 = (__pyx_v_contrib * __pyx_v_profile_prob);
-        if (unlikely(__pyx_v_prob == 0)) {
-          PyErr_Format(PyExc_ZeroDivisionError, "float division");
-          {__pyx_filename = __pyx_f[0]; __pyx_lineno = 222; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-        }
-        __pyx_v_contrib = (__pyx_t_14 / __pyx_v_prob);
+          __pyx_t_29 = __pyx_v_i;
+          if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_0_avg_payoffs;
+          __pyx_t_15 = ((__pyx_v_background_rate + (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_29, __pyx_bstride_0_avg_payoffs))) == __pyx_v_zero);
+          if (__pyx_t_15) {
 
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":224
- *                 contrib = contrib * profile_prob / prob
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
- *                 expected_contribution[j] = contrib             # <<<<<<<<<<<<<<
- *             else:
- *                 #expected_contribution = profile_payoffs[i] * zero
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":213
+ *                 avg_payoffs[i] = avg_payoffs[i] + (pop[i, j] * payoffs[i, j])
+ *             if background_rate + avg_payoffs[i] == zero:
+ *                 degenerate = 1             # <<<<<<<<<<<<<<
+ * 
+ *             for j from 0 <= j < types:
  */
-        __pyx_t_15 = __pyx_v_j;
-        if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_0_expected_contribution;
-        *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_15, __pyx_bstride_0_expected_contribution) = __pyx_v_contrib;
-        goto __pyx_L9;
+            __pyx_v_degenerate = 1;
+            goto __pyx_L19;
+          }
+          __pyx_L19:;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":215
+ *                 degenerate = 1
+ * 
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 tmp = (pop[i, j] * (background_rate + payoffs[i, j]) / (background_rate + avg_payoffs[i]))
+ *                 newpop2[i, j] = tmp
+ */
+          __pyx_t_36 = __pyx_v_types;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_36; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":216
+ * 
+ *             for j from 0 <= j < types:
+ *                 tmp = (pop[i, j] * (background_rate + payoffs[i, j]) / (background_rate + avg_payoffs[i]))             # <<<<<<<<<<<<<<
+ *                 newpop2[i, j] = tmp
+ *                 newpop[i + 1, j] = tmp
+ */
+            __pyx_t_37 = __pyx_v_i;
+            __pyx_t_38 = __pyx_v_j;
+            if (__pyx_t_37 < 0) __pyx_t_37 += __pyx_bshape_0_pop;
+            if (__pyx_t_38 < 0) __pyx_t_38 += __pyx_bshape_1_pop;
+            __pyx_t_39 = __pyx_v_i;
+            __pyx_t_40 = __pyx_v_j;
+            if (__pyx_t_39 < 0) __pyx_t_39 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_40 < 0) __pyx_t_40 += __pyx_bshape_1_payoffs;
+            __pyx_t_41 = __pyx_v_i;
+            if (__pyx_t_41 < 0) __pyx_t_41 += __pyx_bshape_0_avg_payoffs;
+            __pyx_v_tmp = (((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_37, __pyx_bstride_0_pop, __pyx_t_38, __pyx_bstride_1_pop)) * (__pyx_v_background_rate + (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_39, __pyx_bstride_0_payoffs, __pyx_t_40, __pyx_bstride_1_payoffs)))) / (__pyx_v_background_rate + (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_41, __pyx_bstride_0_avg_payoffs))));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":217
+ *             for j from 0 <= j < types:
+ *                 tmp = (pop[i, j] * (background_rate + payoffs[i, j]) / (background_rate + avg_payoffs[i]))
+ *                 newpop2[i, j] = tmp             # <<<<<<<<<<<<<<
+ *                 newpop[i + 1, j] = tmp
+ * 
+ */
+            __pyx_t_42 = __pyx_v_i;
+            __pyx_t_43 = __pyx_v_j;
+            if (__pyx_t_42 < 0) __pyx_t_42 += __pyx_bshape_0_newpop2;
+            if (__pyx_t_43 < 0) __pyx_t_43 += __pyx_bshape_1_newpop2;
+            *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop2.buf, __pyx_t_42, __pyx_bstride_0_newpop2, __pyx_t_43, __pyx_bstride_1_newpop2) = __pyx_v_tmp;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":218
+ *                 tmp = (pop[i, j] * (background_rate + payoffs[i, j]) / (background_rate + avg_payoffs[i]))
+ *                 newpop2[i, j] = tmp
+ *                 newpop[i + 1, j] = tmp             # <<<<<<<<<<<<<<
+ * 
+ *     if degenerate:
+ */
+            __pyx_t_44 = (__pyx_v_i + 1);
+            __pyx_t_45 = __pyx_v_j;
+            if (__pyx_t_44 < 0) __pyx_t_44 += __pyx_bshape_0_newpop;
+            if (__pyx_t_45 < 0) __pyx_t_45 += __pyx_bshape_1_newpop;
+            *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_44, __pyx_bstride_0_newpop, __pyx_t_45, __pyx_bstride_1_newpop) = __pyx_v_tmp;
+          }
+        }
       }
-      /*else*/ {
 
-        /* "simulations/dynamics/replicator_fastfuncs.pyx":228
- *                 #expected_contribution = profile_payoffs[i] * zero
- *                 #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), zero)
- *                 expected_contribution[j] = zero             # <<<<<<<<<<<<<<
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":184
+ *     cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
  * 
- *         #add the expected contributions to the right type's payoff.
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         #go over each possible profile of strategies
+ *         for i from 0 <= i < num_profiles:
  */
-        __pyx_t_16 = __pyx_v_j;
-        if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_expected_contribution;
-        *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_expected_contribution.buf, __pyx_t_16, __pyx_bstride_0_expected_contribution) = __pyx_v_zero;
+      /*finally:*/ {
+        Py_BLOCK_THREADS
       }
-      __pyx_L9:;
-    }
+  }
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":233
- *         #for j from 0 <= j < profile_size:
- *         #    payoffs[j][profile[j]] = payoffs[j][profile[j]] + expected_contribution[j]
- *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
- *             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":220
+ *                 newpop[i + 1, j] = tmp
+ * 
+ *     if degenerate:             # <<<<<<<<<<<<<<
+ *         raise ZeroDivisionError("float division")
+ * 
  */
-    __pyx_t_12 = __pyx_v_profile_size;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_12; __pyx_v_j++) {
+  if (__pyx_v_degenerate) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":235
- *         for j from 0 <= j < profile_size:
- *             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]             # <<<<<<<<<<<<<<
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, j, strategy))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":221
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
  */
-      __pyx_v_strategy = (((int *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_profiles), __pyx_v_i, __pyx_v_j))[0]);
+    __pyx_t_1 = PyObject_Call(__pyx_builtin_ZeroDivisionError, ((PyObject *)__pyx_k_tuple_10), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 221; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_Raise(__pyx_t_1, 0, 0, 0);
+    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+    {__pyx_filename = __pyx_f[0]; __pyx_lineno = 221; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    goto __pyx_L22;
+  }
+  __pyx_L22:;
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":236
- *             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, j, strategy))[0]             # <<<<<<<<<<<<<<
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
- *             np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR2(payoffs, j, strategy), contrib + contrib2)
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":223
+ *         raise ZeroDivisionError("float division")
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)             # <<<<<<<<<<<<<<
+ *     for j from 0 <= j < types:
+ *         newpop[0, j] = tmp
  */
-      __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_j, __pyx_v_strategy))[0]);
+  __pyx_v_tmp = ((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero));
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":237
- *             strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, j, strategy))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]             # <<<<<<<<<<<<<<
- *             np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR2(payoffs, j, strategy), contrib + contrib2)
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":224
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *         newpop[0, j] = tmp
  * 
  */
-      __pyx_v_contrib2 = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR1(((PyArrayObject *)__pyx_v_expected_contribution), __pyx_v_j))[0]);
+  __pyx_t_28 = __pyx_v_types;
+  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_28; __pyx_v_j++) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":238
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, j, strategy))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
- *             np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR2(payoffs, j, strategy), contrib + contrib2)             # <<<<<<<<<<<<<<
- * 
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":225
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ *     for j from 0 <= j < types:
+ *         newpop[0, j] = tmp             # <<<<<<<<<<<<<<
  * 
+ *     return newpop
  */
-      __pyx_t_1 = PyFloat_FromDouble((__pyx_v_contrib + __pyx_v_contrib2)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 238; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_1);
-      PyArray_SETITEM(((PyArrayObject *)__pyx_v_payoffs), PyArray_GETPTR2(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_j, __pyx_v_strategy), __pyx_t_1);
-      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
-    }
+    __pyx_t_46 = 0;
+    __pyx_t_36 = __pyx_v_j;
+    if (__pyx_t_46 < 0) __pyx_t_46 += __pyx_bshape_0_newpop;
+    if (__pyx_t_36 < 0) __pyx_t_36 += __pyx_bshape_1_newpop;
+    *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_46, __pyx_bstride_0_newpop, __pyx_t_36, __pyx_bstride_1_newpop) = __pyx_v_tmp;
   }
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":241
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":227
+ *         newpop[0, j] = tmp
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
  * 
  * 
- *     for i from 0 <= i < num_pops:             # <<<<<<<<<<<<<<
- *         for j from 0 <= j < types:
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
  */
-  __pyx_t_17 = __pyx_v_num_pops;
-  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_17; __pyx_v_i++) {
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_expected_contribution);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_avg_payoffs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_expected_contribution);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_avg_payoffs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop2);
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XDECREF((PyObject *)__pyx_v_avg_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_profile_probs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_expected_contribution);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":242
+/* "simulations/dynamics/replicator_fastfuncs.pyx":152
  * 
- *     for i from 0 <= i < num_pops:
- *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                           np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                           np.ndarray[np.int_t, ndim=1] sample_profile,
  */
-    __pyx_t_18 = __pyx_v_types;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_18; __pyx_v_j++) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":243
- *     for i from 0 <= i < num_pops:
- *         for j from 0 <= j < types:
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]             # <<<<<<<<<<<<<<
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
- *             avg_payoffs[i] = avg_payoffs[i] + (contrib * contrib2)
- */
-      __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_pop), __pyx_v_i, __pyx_v_j))[0]);
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dimensional_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dimensional_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pop = 0;
+  PyArrayObject *__pyx_v_profiles = 0;
+  PyArrayObject *__pyx_v_sample_profile = 0;
+  PyArrayObject *__pyx_v_profile_payoffs = 0;
+  PyArrayObject *__pyx_v_types_array = 0;
+  PyArrayObject *__pyx_v_types_array_2 = 0;
+  __pyx_t_5numpy_float64_t __pyx_v_background_rate;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  PyArrayObject *__pyx_v_type_counts = 0;
+  __pyx_t_5numpy_int_t __pyx_v_num_profiles;
+  __pyx_t_5numpy_int_t __pyx_v_profile_size;
+  Py_buffer __pyx_bstruct_profile_payoffs;
+  Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
+  Py_buffer __pyx_bstruct_types_array_2;
+  Py_ssize_t __pyx_bstride_0_types_array_2 = 0;
+  Py_ssize_t __pyx_bstride_1_types_array_2 = 0;
+  Py_ssize_t __pyx_bshape_0_types_array_2 = 0;
+  Py_ssize_t __pyx_bshape_1_types_array_2 = 0;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_types_array;
+  Py_ssize_t __pyx_bstride_0_types_array = 0;
+  Py_ssize_t __pyx_bstride_1_types_array = 0;
+  Py_ssize_t __pyx_bshape_0_types_array = 0;
+  Py_ssize_t __pyx_bshape_1_types_array = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_sample_profile;
+  Py_ssize_t __pyx_bstride_0_sample_profile = 0;
+  Py_ssize_t __pyx_bshape_0_sample_profile = 0;
+  Py_buffer __pyx_bstruct_type_counts;
+  Py_ssize_t __pyx_bstride_0_type_counts = 0;
+  Py_ssize_t __pyx_bshape_0_type_counts = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__profiles,&__pyx_n_s__sample_profile,&__pyx_n_s__profile_payoffs,&__pyx_n_s__types_array,&__pyx_n_s__types_array_2,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,&__pyx_n_s__type_counts,&__pyx_n_s__num_profiles,&__pyx_n_s__profile_size,0};
+  __Pyx_RefNannySetupContext("n_dimensional_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[11] = {0,0,0,0,0,0,0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case 11: values[10] = PyTuple_GET_ITEM(__pyx_args, 10);
+        case 10: values[9] = PyTuple_GET_ITEM(__pyx_args, 9);
+        case  9: values[8] = PyTuple_GET_ITEM(__pyx_args, 8);
+        case  8: values[7] = PyTuple_GET_ITEM(__pyx_args, 7);
+        case  7: values[6] = PyTuple_GET_ITEM(__pyx_args, 6);
+        case  6: values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profiles);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__sample_profile);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_payoffs);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__types_array);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  5:
+        values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__types_array_2);
+        if (likely(values[5])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  6:
+        values[6] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
+        if (likely(values[6])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 6); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  7:
+        values[7] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[7])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 7); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  8:
+        values[8] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__type_counts);
+        if (likely(values[8])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 8); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  9:
+        values[9] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__num_profiles);
+        if (likely(values[9])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 9); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case 10:
+        values[10] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_size);
+        if (likely(values[10])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 10); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "n_dimensional_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 11) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+      values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+      values[6] = PyTuple_GET_ITEM(__pyx_args, 6);
+      values[7] = PyTuple_GET_ITEM(__pyx_args, 7);
+      values[8] = PyTuple_GET_ITEM(__pyx_args, 8);
+      values[9] = PyTuple_GET_ITEM(__pyx_args, 9);
+      values[10] = PyTuple_GET_ITEM(__pyx_args, 10);
+    }
+    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_profiles = ((PyArrayObject *)values[1]);
+    __pyx_v_sample_profile = ((PyArrayObject *)values[2]);
+    __pyx_v_profile_payoffs = ((PyArrayObject *)values[3]);
+    __pyx_v_types_array = ((PyArrayObject *)values[4]);
+    __pyx_v_types_array_2 = ((PyArrayObject *)values[5]);
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[6]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 158; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[7]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 159; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_type_counts = ((PyArrayObject *)values[8]);
+    __pyx_v_num_profiles = __Pyx_PyInt_from_py_npy_long(values[9]); if (unlikely((__pyx_v_num_profiles == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 161; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_profile_size = __Pyx_PyInt_from_py_npy_long(values[10]); if (unlikely((__pyx_v_profile_size == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 162; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_sample_profile.buf = NULL;
+  __pyx_bstruct_profile_payoffs.buf = NULL;
+  __pyx_bstruct_types_array.buf = NULL;
+  __pyx_bstruct_types_array_2.buf = NULL;
+  __pyx_bstruct_type_counts.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 153; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_sample_profile), __pyx_ptype_5numpy_ndarray, 1, "sample_profile", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 154; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profile_payoffs), __pyx_ptype_5numpy_ndarray, 1, "profile_payoffs", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 155; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array), __pyx_ptype_5numpy_ndarray, 1, "types_array", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 156; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array_2), __pyx_ptype_5numpy_ndarray, 1, "types_array_2", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 157; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_type_counts), __pyx_ptype_5numpy_ndarray, 1, "type_counts", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 160; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_sample_profile = __pyx_bstruct_sample_profile.strides[0];
+  __pyx_bshape_0_sample_profile = __pyx_bstruct_sample_profile.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1];
+  __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_types_array = __pyx_bstruct_types_array.strides[0]; __pyx_bstride_1_types_array = __pyx_bstruct_types_array.strides[1];
+  __pyx_bshape_0_types_array = __pyx_bstruct_types_array.shape[0]; __pyx_bshape_1_types_array = __pyx_bstruct_types_array.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_types_array_2 = __pyx_bstruct_types_array_2.strides[0]; __pyx_bstride_1_types_array_2 = __pyx_bstruct_types_array_2.strides[1];
+  __pyx_bshape_0_types_array_2 = __pyx_bstruct_types_array_2.shape[0]; __pyx_bshape_1_types_array_2 = __pyx_bstruct_types_array_2.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_type_counts, (PyObject*)__pyx_v_type_counts, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_type_counts = __pyx_bstruct_type_counts.strides[0];
+  __pyx_bshape_0_type_counts = __pyx_bstruct_type_counts.shape[0];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_step(__pyx_v_pop, __pyx_v_profiles, __pyx_v_sample_profile, __pyx_v_profile_payoffs, __pyx_v_types_array, __pyx_v_types_array_2, __pyx_v_background_rate, __pyx_v_effective_zero, __pyx_v_type_counts, __pyx_v_num_profiles, __pyx_v_profile_size, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 152; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":232
+ * 
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=1] matrix_step(np.ndarray[np.float64_t, ndim=1] pop,             # <<<<<<<<<<<<<<
+ *                                                    np.ndarray[np.float64_t, ndim=2] left,
+ *                                                    np.ndarray[np.float64_t, ndim=2] right,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_4matrix_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_matrix_step(PyArrayObject *__pyx_v_pop, PyArrayObject *__pyx_v_left, PyArrayObject *__pyx_v_right, __pyx_t_5numpy_float64_t __pyx_v_background_rate, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_i;
+  int __pyx_v_degenerate;
+  int __pyx_v_types;
+  __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
+  __pyx_t_5numpy_float64_t __pyx_v_contrib;
+  __pyx_t_5numpy_float64_t __pyx_v_contrib2;
+  __pyx_t_5numpy_float64_t __pyx_v_tmp;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_newpop2 = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_right;
+  Py_ssize_t __pyx_bstride_0_right = 0;
+  Py_ssize_t __pyx_bstride_1_right = 0;
+  Py_ssize_t __pyx_bshape_0_right = 0;
+  Py_ssize_t __pyx_bshape_1_right = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_buffer __pyx_bstruct_newpop2;
+  Py_ssize_t __pyx_bstride_0_newpop2 = 0;
+  Py_ssize_t __pyx_bshape_0_newpop2 = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  Py_buffer __pyx_bstruct_left;
+  Py_ssize_t __pyx_bstride_0_left = 0;
+  Py_ssize_t __pyx_bstride_1_left = 0;
+  Py_ssize_t __pyx_bshape_0_left = 0;
+  Py_ssize_t __pyx_bshape_1_left = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  PyArrayObject *__pyx_t_7 = NULL;
+  int __pyx_t_8;
+  PyArrayObject *__pyx_t_9 = NULL;
+  int __pyx_t_10;
+  PyObject *__pyx_t_11 = NULL;
+  PyObject *__pyx_t_12 = NULL;
+  PyObject *__pyx_t_13 = NULL;
+  int __pyx_t_14;
+  int __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  int __pyx_t_18;
+  long __pyx_t_19;
+  long __pyx_t_20;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("matrix_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_newpop2.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_left.buf = NULL;
+  __pyx_bstruct_right.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_left, (PyObject*)__pyx_v_left, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_left = __pyx_bstruct_left.strides[0]; __pyx_bstride_1_left = __pyx_bstruct_left.strides[1];
+  __pyx_bshape_0_left = __pyx_bstruct_left.shape[0]; __pyx_bshape_1_left = __pyx_bstruct_left.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_right, (PyObject*)__pyx_v_right, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_right = __pyx_bstruct_right.strides[0]; __pyx_bstride_1_right = __pyx_bstruct_right.strides[1];
+  __pyx_bshape_0_right = __pyx_bstruct_right.shape[0]; __pyx_bshape_1_right = __pyx_bstruct_right.shape[1];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":239
+ * 
+ *     cdef int i
+ *     cdef int degenerate = 0             # <<<<<<<<<<<<<<
+ *     cdef int types = pop.shape[0]
+ *     cdef np.float64_t avg_payoff, contrib, contrib2, tmp = 0.
+ */
+  __pyx_v_degenerate = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":240
+ *     cdef int i
+ *     cdef int degenerate = 0
+ *     cdef int types = pop.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs
+ */
+  __pyx_v_types = (__pyx_v_pop->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":241
+ *     cdef int degenerate = 0
+ *     cdef int types = pop.shape[0]
+ *     cdef np.float64_t avg_payoff, contrib, contrib2, tmp = 0.             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+ */
+  __pyx_v_tmp = 0.;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":243
+ *     cdef np.float64_t avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)
+ * 
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  __pyx_t_1 = 0;
+  __pyx_t_1 = PyDict_New(); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_1));
+  __pyx_t_4 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_4, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  if (PyDict_SetItem(__pyx_t_1, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_1)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_1)); __pyx_t_1 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop2, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop2 = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop2.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 243; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop2 = __pyx_bstruct_newpop2.strides[0];
+      __pyx_bshape_0_newpop2 = __pyx_bstruct_newpop2.shape[0];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_newpop2 = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":244
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     #payoffs = left . pop, or left . (right . pop) in O(types * rank)
+ */
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__zeros); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyInt_FromLong((__pyx_v_types + 1)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_5);
+  __Pyx_GIVEREF(__pyx_t_5);
+  __pyx_t_5 = 0;
+  __pyx_t_5 = PyDict_New(); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_5));
+  __pyx_t_2 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __pyx_t_4 = PyObject_GetAttr(__pyx_t_2, __pyx_n_s__float64); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  if (PyDict_SetItem(__pyx_t_5, ((PyObject *)__pyx_n_s__dtype), __pyx_t_4) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __pyx_t_4 = PyEval_CallObjectWithKeywords(__pyx_t_1, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_5)); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_5)); __pyx_t_5 = 0;
+  if (!(likely(((__pyx_t_4) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_4, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_4);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 244; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0];
+    }
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_4);
+  __pyx_t_4 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":247
+ * 
+ *     #payoffs = left . pop, or left . (right . pop) in O(types * rank)
+ *     if right is None:             # <<<<<<<<<<<<<<
+ *         payoffs = np.dot(left, pop)
+ *     else:
+ */
+  __pyx_t_8 = (((PyObject *)__pyx_v_right) == Py_None);
+  if (__pyx_t_8) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":248
+ *     #payoffs = left . pop, or left . (right . pop) in O(types * rank)
+ *     if right is None:
+ *         payoffs = np.dot(left, pop)             # <<<<<<<<<<<<<<
+ *     else:
+ *         payoffs = np.dot(left, np.dot(right, pop))
+ */
+    __pyx_t_4 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 248; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_4);
+    __pyx_t_5 = PyObject_GetAttr(__pyx_t_4, __pyx_n_s__dot); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 248; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_5);
+    __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+    __pyx_t_4 = PyTuple_New(2); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 248; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+    __Pyx_INCREF(((PyObject *)__pyx_v_left));
+    PyTuple_SET_ITEM(__pyx_t_4, 0, ((PyObject *)__pyx_v_left));
+    __Pyx_GIVEREF(((PyObject *)__pyx_v_left));
+    __Pyx_INCREF(((PyObject *)__pyx_v_pop));
+    PyTuple_SET_ITEM(__pyx_t_4, 1, ((PyObject *)__pyx_v_pop));
+    __Pyx_GIVEREF(((PyObject *)__pyx_v_pop));
+    __pyx_t_3 = PyObject_Call(__pyx_t_5, ((PyObject *)__pyx_t_4), NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 248; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_3);
+    __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+    __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+    if (!(likely(((__pyx_t_3) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_3, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 248; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_9 = ((PyArrayObject *)__pyx_t_3);
+    {
+      __Pyx_BufFmt_StackElem __pyx_stack[1];
+      __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+      __pyx_t_10 = __Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_9, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack);
+      if (unlikely(__pyx_t_10 < 0)) {
+        PyErr_Fetch(&__pyx_t_11, &__pyx_t_12, &__pyx_t_13);
+        if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_v_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {
+          Py_XDECREF(__pyx_t_11); Py_XDECREF(__pyx_t_12); Py_XDECREF(__pyx_t_13);
+          __Pyx_RaiseBufferFallbackError();
+        } else {
+          PyErr_Restore(__pyx_t_11, __pyx_t_12, __pyx_t_13);
+        }
+      }
+      __pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0];
+      if (unlikely(__pyx_t_10 < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 248; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    }
+    __pyx_t_9 = 0;
+    __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_3);
+    __pyx_t_3 = 0;
+    goto __pyx_L3;
+  }
+  /*else*/ {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":250
+ *         payoffs = np.dot(left, pop)
+ *     else:
+ *         payoffs = np.dot(left, np.dot(right, pop))             # <<<<<<<<<<<<<<
+ * 
+ *     with nogil:
+ */
+    __pyx_t_3 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_3);
+    __pyx_t_4 = PyObject_GetAttr(__pyx_t_3, __pyx_n_s__dot); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_4);
+    __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
+    __pyx_t_3 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_3);
+    __pyx_t_5 = PyObject_GetAttr(__pyx_t_3, __pyx_n_s__dot); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_5);
+    __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
+    __pyx_t_3 = PyTuple_New(2); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+    __Pyx_INCREF(((PyObject *)__pyx_v_right));
+    PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_v_right));
+    __Pyx_GIVEREF(((PyObject *)__pyx_v_right));
+    __Pyx_INCREF(((PyObject *)__pyx_v_pop));
+    PyTuple_SET_ITEM(__pyx_t_3, 1, ((PyObject *)__pyx_v_pop));
+    __Pyx_GIVEREF(((PyObject *)__pyx_v_pop));
+    __pyx_t_1 = PyObject_Call(__pyx_t_5, ((PyObject *)__pyx_t_3), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+    __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+    __pyx_t_3 = PyTuple_New(2); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+    __Pyx_INCREF(((PyObject *)__pyx_v_left));
+    PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_v_left));
+    __Pyx_GIVEREF(((PyObject *)__pyx_v_left));
+    PyTuple_SET_ITEM(__pyx_t_3, 1, __pyx_t_1);
+    __Pyx_GIVEREF(__pyx_t_1);
+    __pyx_t_1 = 0;
+    __pyx_t_1 = PyObject_Call(__pyx_t_4, ((PyObject *)__pyx_t_3), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+    __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+    if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_9 = ((PyArrayObject *)__pyx_t_1);
+    {
+      __Pyx_BufFmt_StackElem __pyx_stack[1];
+      __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+      __pyx_t_10 = __Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_9, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack);
+      if (unlikely(__pyx_t_10 < 0)) {
+        PyErr_Fetch(&__pyx_t_13, &__pyx_t_12, &__pyx_t_11);
+        if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_v_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {
+          Py_XDECREF(__pyx_t_13); Py_XDECREF(__pyx_t_12); Py_XDECREF(__pyx_t_11);
+          __Pyx_RaiseBufferFallbackError();
+        } else {
+          PyErr_Restore(__pyx_t_13, __pyx_t_12, __pyx_t_11);
+        }
+      }
+      __pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0];
+      if (unlikely(__pyx_t_10 < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    }
+    __pyx_t_9 = 0;
+    __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_1);
+    __pyx_t_1 = 0;
+  }
+  __pyx_L3:;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":252
+ *         payoffs = np.dot(left, np.dot(right, pop))
+ * 
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         avg_payoff = <np.float64_t>0
+ *         for i from 0 <= i < types:
+ */
+  {
+      #ifdef WITH_THREAD
+      PyThreadState *_save = NULL;
+      #endif
+      Py_UNBLOCK_THREADS
+      /*try:*/ {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":253
+ * 
+ *     with nogil:
+ *         avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *         for i from 0 <= i < types:
+ *             avg_payoff = avg_payoff + pop[i] * payoffs[i]
+ */
+        __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":254
+ *     with nogil:
+ *         avg_payoff = <np.float64_t>0
+ *         for i from 0 <= i < types:             # <<<<<<<<<<<<<<
+ *             avg_payoff = avg_payoff + pop[i] * payoffs[i]
+ *         if background_rate + avg_payoff == 0.:
+ */
+        __pyx_t_10 = __pyx_v_types;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_10; __pyx_v_i++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":255
+ *         avg_payoff = <np.float64_t>0
+ *         for i from 0 <= i < types:
+ *             avg_payoff = avg_payoff + pop[i] * payoffs[i]             # <<<<<<<<<<<<<<
+ *         if background_rate + avg_payoff == 0.:
+ *             degenerate = 1
+ */
+          __pyx_t_14 = __pyx_v_i;
+          if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_pop;
+          __pyx_t_15 = __pyx_v_i;
+          if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_0_payoffs;
+          __pyx_v_avg_payoff = (__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_14, __pyx_bstride_0_pop)) * (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_15, __pyx_bstride_0_payoffs))));
+        }
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":256
+ *         for i from 0 <= i < types:
+ *             avg_payoff = avg_payoff + pop[i] * payoffs[i]
+ *         if background_rate + avg_payoff == 0.:             # <<<<<<<<<<<<<<
+ *             degenerate = 1
+ * 
+ */
+        __pyx_t_8 = ((__pyx_v_background_rate + __pyx_v_avg_payoff) == 0.);
+        if (__pyx_t_8) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":257
+ *             avg_payoff = avg_payoff + pop[i] * payoffs[i]
+ *         if background_rate + avg_payoff == 0.:
+ *             degenerate = 1             # <<<<<<<<<<<<<<
+ * 
+ *         for i from 0 <= i < types:
+ */
+          __pyx_v_degenerate = 1;
+          goto __pyx_L9;
+        }
+        __pyx_L9:;
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":259
+ *             degenerate = 1
+ * 
+ *         for i from 0 <= i < types:             # <<<<<<<<<<<<<<
+ *             contrib = pop[i]
+ *             contrib2 = payoffs[i]
+ */
+        __pyx_t_10 = __pyx_v_types;
+        for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_10; __pyx_v_i++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":260
+ * 
+ *         for i from 0 <= i < types:
+ *             contrib = pop[i]             # <<<<<<<<<<<<<<
+ *             contrib2 = payoffs[i]
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ */
+          __pyx_t_16 = __pyx_v_i;
+          if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_pop;
+          __pyx_v_contrib = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_16, __pyx_bstride_0_pop));
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":261
+ *         for i from 0 <= i < types:
+ *             contrib = pop[i]
+ *             contrib2 = payoffs[i]             # <<<<<<<<<<<<<<
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *             newpop2[i] = tmp
+ */
+          __pyx_t_17 = __pyx_v_i;
+          if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_0_payoffs;
+          __pyx_v_contrib2 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_17, __pyx_bstride_0_payoffs));
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":262
+ *             contrib = pop[i]
+ *             contrib2 = payoffs[i]
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *             newpop2[i] = tmp
+ *             newpop[i + 1] = tmp
+ */
+          __pyx_v_tmp = ((__pyx_v_contrib * (__pyx_v_background_rate + __pyx_v_contrib2)) / (__pyx_v_background_rate + __pyx_v_avg_payoff));
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":263
+ *             contrib2 = payoffs[i]
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *             newpop2[i] = tmp             # <<<<<<<<<<<<<<
+ *             newpop[i + 1] = tmp
+ * 
+ */
+          __pyx_t_18 = __pyx_v_i;
+          if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_newpop2;
+          *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop2.buf, __pyx_t_18, __pyx_bstride_0_newpop2) = __pyx_v_tmp;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":264
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *             newpop2[i] = tmp
+ *             newpop[i + 1] = tmp             # <<<<<<<<<<<<<<
+ * 
+ *     if degenerate:
+ */
+          __pyx_t_19 = (__pyx_v_i + 1);
+          if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_newpop;
+          *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_19, __pyx_bstride_0_newpop) = __pyx_v_tmp;
+        }
+      }
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":252
+ *         payoffs = np.dot(left, np.dot(right, pop))
+ * 
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         avg_payoff = <np.float64_t>0
+ *         for i from 0 <= i < types:
+ */
+      /*finally:*/ {
+        Py_BLOCK_THREADS
+      }
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":266
+ *             newpop[i + 1] = tmp
+ * 
+ *     if degenerate:             # <<<<<<<<<<<<<<
+ *         raise ZeroDivisionError("float division")
+ * 
+ */
+  if (__pyx_v_degenerate) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":267
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+ */
+    __pyx_t_1 = PyObject_Call(__pyx_builtin_ZeroDivisionError, ((PyObject *)__pyx_k_tuple_11), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 267; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_Raise(__pyx_t_1, 0, 0, 0);
+    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+    {__pyx_filename = __pyx_f[0]; __pyx_lineno = 267; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    goto __pyx_L12;
+  }
+  __pyx_L12:;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":269
+ *         raise ZeroDivisionError("float division")
+ * 
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+  __pyx_t_20 = 0;
+  if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_newpop;
+  *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_20, __pyx_bstride_0_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":271
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_right);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_left);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.matrix_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_right);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_left);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop2);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":232
+ * 
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=1] matrix_step(np.ndarray[np.float64_t, ndim=1] pop,             # <<<<<<<<<<<<<<
+ *                                                    np.ndarray[np.float64_t, ndim=2] left,
+ *                                                    np.ndarray[np.float64_t, ndim=2] right,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_4matrix_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_4matrix_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pop = 0;
+  PyArrayObject *__pyx_v_left = 0;
+  PyArrayObject *__pyx_v_right = 0;
+  __pyx_t_5numpy_float64_t __pyx_v_background_rate;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  Py_buffer __pyx_bstruct_right;
+  Py_ssize_t __pyx_bstride_0_right = 0;
+  Py_ssize_t __pyx_bstride_1_right = 0;
+  Py_ssize_t __pyx_bshape_0_right = 0;
+  Py_ssize_t __pyx_bshape_1_right = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_buffer __pyx_bstruct_left;
+  Py_ssize_t __pyx_bstride_0_left = 0;
+  Py_ssize_t __pyx_bstride_1_left = 0;
+  Py_ssize_t __pyx_bshape_0_left = 0;
+  Py_ssize_t __pyx_bshape_1_left = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__left,&__pyx_n_s__right,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("matrix_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[5] = {0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__left);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("matrix_step", 1, 5, 5, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__right);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("matrix_step", 1, 5, 5, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("matrix_step", 1, 5, 5, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("matrix_step", 1, 5, 5, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "matrix_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 5) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+    }
+    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_left = ((PyArrayObject *)values[1]);
+    __pyx_v_right = ((PyArrayObject *)values[2]);
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[3]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 235; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[4]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 236; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("matrix_step", 1, 5, 5, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.matrix_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_left.buf = NULL;
+  __pyx_bstruct_right.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_left), __pyx_ptype_5numpy_ndarray, 1, "left", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 233; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_right), __pyx_ptype_5numpy_ndarray, 1, "right", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 234; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_left, (PyObject*)__pyx_v_left, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_left = __pyx_bstruct_left.strides[0]; __pyx_bstride_1_left = __pyx_bstruct_left.strides[1];
+  __pyx_bshape_0_left = __pyx_bstruct_left.shape[0]; __pyx_bshape_1_left = __pyx_bstruct_left.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_right, (PyObject*)__pyx_v_right, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_right = __pyx_bstruct_right.strides[0]; __pyx_bstride_1_right = __pyx_bstruct_right.strides[1];
+  __pyx_bshape_0_right = __pyx_bstruct_right.shape[0]; __pyx_bshape_1_right = __pyx_bstruct_right.shape[1];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_matrix_step(__pyx_v_pop, __pyx_v_left, __pyx_v_right, __pyx_v_background_rate, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 232; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_right);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_left);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.matrix_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_right);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_left);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":274
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_sparse_step(np.ndarray[np.float64_t, ndim=1] pop,             # <<<<<<<<<<<<<<
+ *                                                                    np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                    np.ndarray[np.int_t, ndim=2] entries,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_5one_dimensional_sparse_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_sparse_step(PyArrayObject *__pyx_v_pop, PyArrayObject *__pyx_v_profiles, PyArrayObject *__pyx_v_entries, PyArrayObject *__pyx_v_values, __pyx_t_5numpy_int_t __pyx_v_arity, __pyx_t_5numpy_float64_t __pyx_v_background_rate, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_e;
+  int __pyx_v_j;
+  int __pyx_v_row;
+  int __pyx_v_slot;
+  int __pyx_v_types;
+  int __pyx_v_num_entries;
+  int __pyx_v_profile_size;
+  __pyx_t_5numpy_float64_t __pyx_v_prob;
+  __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
+  __pyx_t_5numpy_float64_t __pyx_v_contrib;
+  __pyx_t_5numpy_float64_t __pyx_v_contrib2;
+  __pyx_t_5numpy_float64_t __pyx_v_tmp;
+  __pyx_t_5numpy_float64_t __pyx_v_arityf;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_newpop2 = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_buffer __pyx_bstruct_newpop2;
+  Py_ssize_t __pyx_bstride_0_newpop2 = 0;
+  Py_ssize_t __pyx_bshape_0_newpop2 = 0;
+  Py_buffer __pyx_bstruct_entries;
+  Py_ssize_t __pyx_bstride_0_entries = 0;
+  Py_ssize_t __pyx_bstride_1_entries = 0;
+  Py_ssize_t __pyx_bshape_0_entries = 0;
+  Py_ssize_t __pyx_bshape_1_entries = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_values;
+  Py_ssize_t __pyx_bstride_0_values = 0;
+  Py_ssize_t __pyx_bshape_0_values = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  PyArrayObject *__pyx_t_7 = NULL;
+  PyArrayObject *__pyx_t_8 = NULL;
+  int __pyx_t_9;
+  int __pyx_t_10;
+  long __pyx_t_11;
+  int __pyx_t_12;
+  long __pyx_t_13;
+  int __pyx_t_14;
+  int __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  __pyx_t_5numpy_int_t __pyx_t_18;
+  int __pyx_t_19;
+  __pyx_t_5numpy_int_t __pyx_t_20;
+  int __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  __pyx_t_5numpy_int_t __pyx_t_24;
+  int __pyx_t_25;
+  __pyx_t_5numpy_float64_t __pyx_t_26;
+  int __pyx_t_27;
+  int __pyx_t_28;
+  int __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  __pyx_t_5numpy_float64_t __pyx_t_32;
+  int __pyx_t_33;
+  long __pyx_t_34;
+  long __pyx_t_35;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("one_dimensional_sparse_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_newpop2.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_entries.buf = NULL;
+  __pyx_bstruct_values.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_entries, (PyObject*)__pyx_v_entries, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_entries = __pyx_bstruct_entries.strides[0]; __pyx_bstride_1_entries = __pyx_bstruct_entries.strides[1];
+  __pyx_bshape_0_entries = __pyx_bstruct_entries.shape[0]; __pyx_bshape_1_entries = __pyx_bstruct_entries.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_values, (PyObject*)__pyx_v_values, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_values = __pyx_bstruct_values.strides[0];
+  __pyx_bshape_0_values = __pyx_bstruct_values.shape[0];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":283
+ * 
+ *     cdef int e, j, row, slot
+ *     cdef int types = pop.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int num_entries = values.shape[0]
+ *     cdef int profile_size = profiles.shape[1]
+ */
+  __pyx_v_types = (__pyx_v_pop->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":284
+ *     cdef int e, j, row, slot
+ *     cdef int types = pop.shape[0]
+ *     cdef int num_entries = values.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ */
+  __pyx_v_num_entries = (__pyx_v_values->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":285
+ *     cdef int types = pop.shape[0]
+ *     cdef int num_entries = values.shape[0]
+ *     cdef int profile_size = profiles.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ */
+  __pyx_v_profile_size = (__pyx_v_profiles->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":286
+ *     cdef int num_entries = values.shape[0]
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.zeros(types, dtype=np.float64)
+ */
+  __pyx_v_tmp = 0.;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":287
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t arityf = <np.float64_t>arity             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.zeros(types, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+ */
+  __pyx_v_arityf = ((__pyx_t_5numpy_float64_t)__pyx_v_arity);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":288
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.zeros(types, dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  __pyx_t_1 = 0;
+  __pyx_t_1 = PyDict_New(); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_1));
+  __pyx_t_4 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_4, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  if (PyDict_SetItem(__pyx_t_1, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_1)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_1)); __pyx_t_1 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 288; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":289
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.zeros(types, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)
+ * 
+ */
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__zeros); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_5);
+  __Pyx_GIVEREF(__pyx_t_5);
+  __pyx_t_5 = 0;
+  __pyx_t_5 = PyDict_New(); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_5));
+  __pyx_t_2 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __pyx_t_4 = PyObject_GetAttr(__pyx_t_2, __pyx_n_s__float64); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  if (PyDict_SetItem(__pyx_t_5, ((PyObject *)__pyx_n_s__dtype), __pyx_t_4) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __pyx_t_4 = PyEval_CallObjectWithKeywords(__pyx_t_1, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_5)); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_5)); __pyx_t_5 = 0;
+  if (!(likely(((__pyx_t_4) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_4, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_4);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop2, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop2 = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop2.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 289; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop2 = __pyx_bstruct_newpop2.strides[0];
+      __pyx_bshape_0_newpop2 = __pyx_bstruct_newpop2.shape[0];
+    }
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_newpop2 = ((PyArrayObject *)__pyx_t_4);
+  __pyx_t_4 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":290
+ *     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.zeros(types, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     #only visit the nonzero (profile, slot, value) entries
+ */
+  __pyx_t_4 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_4, __pyx_n_s__zeros); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __pyx_t_4 = PyInt_FromLong((__pyx_v_types + 1)); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_4);
+  __Pyx_GIVEREF(__pyx_t_4);
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyDict_New(); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__float64); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  if (PyDict_SetItem(__pyx_t_4, ((PyObject *)__pyx_n_s__dtype), __pyx_t_2) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __pyx_t_2 = PyEval_CallObjectWithKeywords(__pyx_t_5, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_4)); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  if (!(likely(((__pyx_t_2) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_2, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_8 = ((PyArrayObject *)__pyx_t_2);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_8, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 290; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0];
+    }
+  }
+  __pyx_t_8 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_2);
+  __pyx_t_2 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":293
+ * 
+ *     #only visit the nonzero (profile, slot, value) entries
+ *     for e from 0 <= e < num_entries:             # <<<<<<<<<<<<<<
+ *         row = entries[e, 0]
+ *         slot = entries[e, 1]
+ */
+  __pyx_t_9 = __pyx_v_num_entries;
+  for (__pyx_v_e = 0; __pyx_v_e < __pyx_t_9; __pyx_v_e++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":294
+ *     #only visit the nonzero (profile, slot, value) entries
+ *     for e from 0 <= e < num_entries:
+ *         row = entries[e, 0]             # <<<<<<<<<<<<<<
+ *         slot = entries[e, 1]
+ * 
+ */
+    __pyx_t_10 = __pyx_v_e;
+    __pyx_t_11 = 0;
+    if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_0_entries;
+    if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_1_entries;
+    __pyx_v_row = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_entries.buf, __pyx_t_10, __pyx_bstride_0_entries, __pyx_t_11, __pyx_bstride_1_entries));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":295
+ *     for e from 0 <= e < num_entries:
+ *         row = entries[e, 0]
+ *         slot = entries[e, 1]             # <<<<<<<<<<<<<<
+ * 
+ *         #probability of the other slots of the profile being drawn
+ */
+    __pyx_t_12 = __pyx_v_e;
+    __pyx_t_13 = 1;
+    if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_0_entries;
+    if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_1_entries;
+    __pyx_v_slot = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_entries.buf, __pyx_t_12, __pyx_bstride_0_entries, __pyx_t_13, __pyx_bstride_1_entries));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":298
+ * 
+ *         #probability of the other slots of the profile being drawn
+ *         prob = 1.             # <<<<<<<<<<<<<<
+ *         for j from 0 <= j < profile_size:
+ *             if j != slot:
+ */
+    __pyx_v_prob = 1.;
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":299
+ *         #probability of the other slots of the profile being drawn
+ *         prob = 1.
+ *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *             if j != slot:
+ *                 prob = prob * pop[profiles[row, j]]
+ */
+    __pyx_t_14 = __pyx_v_profile_size;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_14; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":300
+ *         prob = 1.
+ *         for j from 0 <= j < profile_size:
+ *             if j != slot:             # <<<<<<<<<<<<<<
+ *                 prob = prob * pop[profiles[row, j]]
+ * 
+ */
+      __pyx_t_15 = (__pyx_v_j != __pyx_v_slot);
+      if (__pyx_t_15) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":301
+ *         for j from 0 <= j < profile_size:
+ *             if j != slot:
+ *                 prob = prob * pop[profiles[row, j]]             # <<<<<<<<<<<<<<
+ * 
+ *         payoffs[profiles[row, slot]] = payoffs[profiles[row, slot]] + values[e] * prob
+ */
+        __pyx_t_16 = __pyx_v_row;
+        __pyx_t_17 = __pyx_v_j;
+        if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_profiles;
+        if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_1_profiles;
+        __pyx_t_18 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_16, __pyx_bstride_0_profiles, __pyx_t_17, __pyx_bstride_1_profiles));
+        if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_pop;
+        __pyx_v_prob = (__pyx_v_prob * (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_18, __pyx_bstride_0_pop)));
+        goto __pyx_L7;
+      }
+      __pyx_L7:;
+    }
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":303
+ *                 prob = prob * pop[profiles[row, j]]
+ * 
+ *         payoffs[profiles[row, slot]] = payoffs[profiles[row, slot]] + values[e] * prob             # <<<<<<<<<<<<<<
+ * 
+ *     avg_payoff = <np.float64_t>0
+ */
+    __pyx_t_14 = __pyx_v_row;
+    __pyx_t_19 = __pyx_v_slot;
+    if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_profiles;
+    if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_1_profiles;
+    __pyx_t_20 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_14, __pyx_bstride_0_profiles, __pyx_t_19, __pyx_bstride_1_profiles));
+    if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_payoffs;
+    __pyx_t_21 = __pyx_v_e;
+    if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_0_values;
+    __pyx_t_22 = __pyx_v_row;
+    __pyx_t_23 = __pyx_v_slot;
+    if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_0_profiles;
+    if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_1_profiles;
+    __pyx_t_24 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_22, __pyx_bstride_0_profiles, __pyx_t_23, __pyx_bstride_1_profiles));
+    if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_0_payoffs;
+    *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_24, __pyx_bstride_0_payoffs) = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_20, __pyx_bstride_0_payoffs)) + ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_values.buf, __pyx_t_21, __pyx_bstride_0_values)) * __pyx_v_prob));
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":305
+ *         payoffs[profiles[row, slot]] = payoffs[profiles[row, slot]] + values[e] * prob
+ * 
+ *     avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *     for j from 0 <= j < types:
+ *         payoffs[j] = payoffs[j] / arityf
+ */
+  __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":306
+ * 
+ *     avg_payoff = <np.float64_t>0
+ *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *         payoffs[j] = payoffs[j] / arityf
+ *         avg_payoff = avg_payoff + pop[j] * payoffs[j]
+ */
+  __pyx_t_9 = __pyx_v_types;
+  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":307
+ *     avg_payoff = <np.float64_t>0
+ *     for j from 0 <= j < types:
+ *         payoffs[j] = payoffs[j] / arityf             # <<<<<<<<<<<<<<
+ *         avg_payoff = avg_payoff + pop[j] * payoffs[j]
+ * 
+ */
+    __pyx_t_25 = __pyx_v_j;
+    if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_payoffs;
+    __pyx_t_26 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_25, __pyx_bstride_0_payoffs));
+    if (unlikely(__pyx_v_arityf == 0)) {
+      PyErr_Format(PyExc_ZeroDivisionError, "float division");
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 307; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    }
+    __pyx_t_27 = __pyx_v_j;
+    if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_0_payoffs;
+    *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_27, __pyx_bstride_0_payoffs) = (__pyx_t_26 / __pyx_v_arityf);
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":308
+ *     for j from 0 <= j < types:
+ *         payoffs[j] = payoffs[j] / arityf
+ *         avg_payoff = avg_payoff + pop[j] * payoffs[j]             # <<<<<<<<<<<<<<
+ * 
+ *     for j from 0 <= j < types:
+ */
+    __pyx_t_28 = __pyx_v_j;
+    if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_0_pop;
+    __pyx_t_29 = __pyx_v_j;
+    if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_0_payoffs;
+    __pyx_v_avg_payoff = (__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_28, __pyx_bstride_0_pop)) * (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_29, __pyx_bstride_0_payoffs))));
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":310
+ *         avg_payoff = avg_payoff + pop[j] * payoffs[j]
+ * 
+ *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *         contrib = pop[j]
+ *         contrib2 = payoffs[j]
+ */
+  __pyx_t_9 = __pyx_v_types;
+  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":311
+ * 
+ *     for j from 0 <= j < types:
+ *         contrib = pop[j]             # <<<<<<<<<<<<<<
+ *         contrib2 = payoffs[j]
+ *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ */
+    __pyx_t_30 = __pyx_v_j;
+    if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_0_pop;
+    __pyx_v_contrib = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_30, __pyx_bstride_0_pop));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":312
+ *     for j from 0 <= j < types:
+ *         contrib = pop[j]
+ *         contrib2 = payoffs[j]             # <<<<<<<<<<<<<<
+ *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *         newpop2[j] = tmp
+ */
+    __pyx_t_31 = __pyx_v_j;
+    if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_0_payoffs;
+    __pyx_v_contrib2 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_31, __pyx_bstride_0_payoffs));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":313
+ *         contrib = pop[j]
+ *         contrib2 = payoffs[j]
+ *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *         newpop2[j] = tmp
+ *         newpop[j + 1] = tmp
+ */
+    __pyx_t_26 = (__pyx_v_contrib * (__pyx_v_background_rate + __pyx_v_contrib2));
+    __pyx_t_32 = (__pyx_v_background_rate + __pyx_v_avg_payoff);
+    if (unlikely(__pyx_t_32 == 0)) {
+      PyErr_Format(PyExc_ZeroDivisionError, "float division");
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 313; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    }
+    __pyx_v_tmp = (__pyx_t_26 / __pyx_t_32);
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":314
+ *         contrib2 = payoffs[j]
+ *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *         newpop2[j] = tmp             # <<<<<<<<<<<<<<
+ *         newpop[j + 1] = tmp
+ * 
+ */
+    __pyx_t_33 = __pyx_v_j;
+    if (__pyx_t_33 < 0) __pyx_t_33 += __pyx_bshape_0_newpop2;
+    *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop2.buf, __pyx_t_33, __pyx_bstride_0_newpop2) = __pyx_v_tmp;
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":315
+ *         tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *         newpop2[j] = tmp
+ *         newpop[j + 1] = tmp             # <<<<<<<<<<<<<<
+ * 
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+ */
+    __pyx_t_34 = (__pyx_v_j + 1);
+    if (__pyx_t_34 < 0) __pyx_t_34 += __pyx_bshape_0_newpop;
+    *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_34, __pyx_bstride_0_newpop) = __pyx_v_tmp;
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":317
+ *         newpop[j + 1] = tmp
+ * 
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+  __pyx_t_35 = 0;
+  if (__pyx_t_35 < 0) __pyx_t_35 += __pyx_bshape_0_newpop;
+  *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_35, __pyx_bstride_0_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":319
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_sparse_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop2);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":274
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_sparse_step(np.ndarray[np.float64_t, ndim=1] pop,             # <<<<<<<<<<<<<<
+ *                                                                    np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                    np.ndarray[np.int_t, ndim=2] entries,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_5one_dimensional_sparse_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_5one_dimensional_sparse_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pop = 0;
+  PyArrayObject *__pyx_v_profiles = 0;
+  PyArrayObject *__pyx_v_entries = 0;
+  PyArrayObject *__pyx_v_values = 0;
+  __pyx_t_5numpy_int_t __pyx_v_arity;
+  __pyx_t_5numpy_float64_t __pyx_v_background_rate;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_values;
+  Py_ssize_t __pyx_bstride_0_values = 0;
+  Py_ssize_t __pyx_bshape_0_values = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_buffer __pyx_bstruct_entries;
+  Py_ssize_t __pyx_bstride_0_entries = 0;
+  Py_ssize_t __pyx_bstride_1_entries = 0;
+  Py_ssize_t __pyx_bshape_0_entries = 0;
+  Py_ssize_t __pyx_bshape_1_entries = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__profiles,&__pyx_n_s__entries,&__pyx_n_s__values,&__pyx_n_s__arity,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("one_dimensional_sparse_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[7] = {0,0,0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  7: values[6] = PyTuple_GET_ITEM(__pyx_args, 6);
+        case  6: values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profiles);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__entries);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__values);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__arity);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  5:
+        values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
+        if (likely(values[5])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  6:
+        values[6] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[6])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, 6); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "one_dimensional_sparse_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 7) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+      values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+      values[6] = PyTuple_GET_ITEM(__pyx_args, 6);
+    }
+    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_profiles = ((PyArrayObject *)values[1]);
+    __pyx_v_entries = ((PyArrayObject *)values[2]);
+    __pyx_v_values = ((PyArrayObject *)values[3]);
+    __pyx_v_arity = __Pyx_PyInt_from_py_npy_long(values[4]); if (unlikely((__pyx_v_arity == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 278; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[5]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 279; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[6]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 280; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("one_dimensional_sparse_step", 1, 7, 7, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_sparse_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_entries.buf = NULL;
+  __pyx_bstruct_values.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 275; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_entries), __pyx_ptype_5numpy_ndarray, 1, "entries", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 276; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_values), __pyx_ptype_5numpy_ndarray, 1, "values", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 277; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_entries, (PyObject*)__pyx_v_entries, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_entries = __pyx_bstruct_entries.strides[0]; __pyx_bstride_1_entries = __pyx_bstruct_entries.strides[1];
+  __pyx_bshape_0_entries = __pyx_bstruct_entries.shape[0]; __pyx_bshape_1_entries = __pyx_bstruct_entries.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_values, (PyObject*)__pyx_v_values, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_values = __pyx_bstruct_values.strides[0];
+  __pyx_bshape_0_values = __pyx_bstruct_values.shape[0];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_sparse_step(__pyx_v_pop, __pyx_v_profiles, __pyx_v_entries, __pyx_v_values, __pyx_v_arity, __pyx_v_background_rate, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 274; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_sparse_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":322
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_sparse_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                                  np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                  np.ndarray[np.int_t, ndim=2] entries,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_6n_dimensional_sparse_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_sparse_step(PyArrayObject *__pyx_v_pop, PyArrayObject *__pyx_v_profiles, PyArrayObject *__pyx_v_entries, PyArrayObject *__pyx_v_values, __pyx_t_5numpy_float64_t __pyx_v_background_rate, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_e;
+  int __pyx_v_i;
+  int __pyx_v_j;
+  int __pyx_v_row;
+  int __pyx_v_slot;
+  int __pyx_v_num_pops;
+  int __pyx_v_types;
+  int __pyx_v_num_entries;
+  int __pyx_v_profile_size;
+  __pyx_t_5numpy_float64_t __pyx_v_prob;
+  __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
+  __pyx_t_5numpy_float64_t __pyx_v_contrib;
+  __pyx_t_5numpy_float64_t __pyx_v_contrib2;
+  __pyx_t_5numpy_float64_t __pyx_v_tmp;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_newpop2 = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_newpop2;
+  Py_ssize_t __pyx_bstride_0_newpop2 = 0;
+  Py_ssize_t __pyx_bstride_1_newpop2 = 0;
+  Py_ssize_t __pyx_bshape_0_newpop2 = 0;
+  Py_ssize_t __pyx_bshape_1_newpop2 = 0;
+  Py_buffer __pyx_bstruct_entries;
+  Py_ssize_t __pyx_bstride_0_entries = 0;
+  Py_ssize_t __pyx_bstride_1_entries = 0;
+  Py_ssize_t __pyx_bshape_0_entries = 0;
+  Py_ssize_t __pyx_bshape_1_entries = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bstride_1_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_1_newpop = 0;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_values;
+  Py_ssize_t __pyx_bstride_0_values = 0;
+  Py_ssize_t __pyx_bshape_0_values = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_payoffs = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  PyArrayObject *__pyx_t_7 = NULL;
+  PyArrayObject *__pyx_t_8 = NULL;
+  int __pyx_t_9;
+  int __pyx_t_10;
+  long __pyx_t_11;
+  int __pyx_t_12;
+  long __pyx_t_13;
+  int __pyx_t_14;
+  int __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  int __pyx_t_18;
+  __pyx_t_5numpy_int_t __pyx_t_19;
+  int __pyx_t_20;
+  int __pyx_t_21;
+  __pyx_t_5numpy_int_t __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  int __pyx_t_26;
+  __pyx_t_5numpy_int_t __pyx_t_27;
+  int __pyx_t_28;
+  int __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  int __pyx_t_32;
+  int __pyx_t_33;
+  int __pyx_t_34;
+  int __pyx_t_35;
+  int __pyx_t_36;
+  __pyx_t_5numpy_float64_t __pyx_t_37;
+  __pyx_t_5numpy_float64_t __pyx_t_38;
+  int __pyx_t_39;
+  int __pyx_t_40;
+  long __pyx_t_41;
+  int __pyx_t_42;
+  long __pyx_t_43;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("n_dimensional_sparse_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_newpop2.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_entries.buf = NULL;
+  __pyx_bstruct_values.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_entries, (PyObject*)__pyx_v_entries, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_entries = __pyx_bstruct_entries.strides[0]; __pyx_bstride_1_entries = __pyx_bstruct_entries.strides[1];
+  __pyx_bshape_0_entries = __pyx_bstruct_entries.shape[0]; __pyx_bshape_1_entries = __pyx_bstruct_entries.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_values, (PyObject*)__pyx_v_values, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_values = __pyx_bstruct_values.strides[0];
+  __pyx_bshape_0_values = __pyx_bstruct_values.shape[0];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":330
+ * 
+ *     cdef int e, i, j, row, slot
+ *     cdef int num_pops = pop.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int types = pop.shape[1]
+ *     cdef int num_entries = values.shape[0]
+ */
+  __pyx_v_num_pops = (__pyx_v_pop->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":331
+ *     cdef int e, i, j, row, slot
+ *     cdef int num_pops = pop.shape[0]
+ *     cdef int types = pop.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef int num_entries = values.shape[0]
+ *     cdef int profile_size = profiles.shape[1]
+ */
+  __pyx_v_types = (__pyx_v_pop->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":332
+ *     cdef int num_pops = pop.shape[0]
+ *     cdef int types = pop.shape[1]
+ *     cdef int num_entries = values.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ */
+  __pyx_v_num_entries = (__pyx_v_values->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":333
+ *     cdef int types = pop.shape[1]
+ *     cdef int num_entries = values.shape[0]
+ *     cdef int profile_size = profiles.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_pops, types), dtype=np.float64)
+ */
+  __pyx_v_profile_size = (__pyx_v_profiles->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":334
+ *     cdef int num_entries = values.shape[0]
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.zeros((num_pops, types), dtype=np.float64)
+ */
+  __pyx_v_tmp = 0.;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":335
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_pops, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.zeros((num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_pops + 1, types), dtype=np.float64)
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_num_pops); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = PyTuple_New(2); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  PyTuple_SET_ITEM(__pyx_t_4, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_4, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_1 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_4));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_4));
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyDict_New(); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  if (PyDict_SetItem(__pyx_t_4, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_4)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 335; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0]; __pyx_bstride_1_payoffs = __pyx_bstruct_payoffs.strides[1];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0]; __pyx_bshape_1_payoffs = __pyx_bstruct_payoffs.shape[1];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":336
+ *     cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.zeros((num_pops, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_pops + 1, types), dtype=np.float64)
+ * 
+ */
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_4 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__zeros); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyInt_FromLong(__pyx_v_num_pops); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_2 = PyTuple_New(2); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  PyTuple_SET_ITEM(__pyx_t_2, 0, __pyx_t_5);
+  __Pyx_GIVEREF(__pyx_t_5);
+  PyTuple_SET_ITEM(__pyx_t_2, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_5 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_2));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_2));
+  __pyx_t_2 = 0;
+  __pyx_t_2 = PyDict_New(); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__float64); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  if (PyDict_SetItem(__pyx_t_2, ((PyObject *)__pyx_n_s__dtype), __pyx_t_1) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyEval_CallObjectWithKeywords(__pyx_t_4, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_2)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_2)); __pyx_t_2 = 0;
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop2, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop2 = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop2.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 336; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop2 = __pyx_bstruct_newpop2.strides[0]; __pyx_bstride_1_newpop2 = __pyx_bstruct_newpop2.strides[1];
+      __pyx_bshape_0_newpop2 = __pyx_bstruct_newpop2.shape[0]; __pyx_bshape_1_newpop2 = __pyx_bstruct_newpop2.shape[1];
+    }
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_newpop2 = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":337
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.zeros((num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_pops + 1, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     #only visit the nonzero (profile, slot, value) entries
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong((__pyx_v_num_pops + 1)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = PyTuple_New(2); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  PyTuple_SET_ITEM(__pyx_t_4, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_4, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_1 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_4));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_4));
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyDict_New(); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  if (PyDict_SetItem(__pyx_t_4, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_4)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_8 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_8, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 337; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0]; __pyx_bstride_1_newpop = __pyx_bstruct_newpop.strides[1];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0]; __pyx_bshape_1_newpop = __pyx_bstruct_newpop.shape[1];
+    }
+  }
+  __pyx_t_8 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":340
+ * 
+ *     #only visit the nonzero (profile, slot, value) entries
+ *     for e from 0 <= e < num_entries:             # <<<<<<<<<<<<<<
+ *         row = entries[e, 0]
+ *         slot = entries[e, 1]
+ */
+  __pyx_t_9 = __pyx_v_num_entries;
+  for (__pyx_v_e = 0; __pyx_v_e < __pyx_t_9; __pyx_v_e++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":341
+ *     #only visit the nonzero (profile, slot, value) entries
+ *     for e from 0 <= e < num_entries:
+ *         row = entries[e, 0]             # <<<<<<<<<<<<<<
+ *         slot = entries[e, 1]
+ * 
+ */
+    __pyx_t_10 = __pyx_v_e;
+    __pyx_t_11 = 0;
+    if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_0_entries;
+    if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_1_entries;
+    __pyx_v_row = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_entries.buf, __pyx_t_10, __pyx_bstride_0_entries, __pyx_t_11, __pyx_bstride_1_entries));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":342
+ *     for e from 0 <= e < num_entries:
+ *         row = entries[e, 0]
+ *         slot = entries[e, 1]             # <<<<<<<<<<<<<<
+ * 
+ *         #probability of the other populations' strategies in the profile
+ */
+    __pyx_t_12 = __pyx_v_e;
+    __pyx_t_13 = 1;
+    if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_0_entries;
+    if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_1_entries;
+    __pyx_v_slot = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_entries.buf, __pyx_t_12, __pyx_bstride_0_entries, __pyx_t_13, __pyx_bstride_1_entries));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":345
+ * 
+ *         #probability of the other populations' strategies in the profile
+ *         prob = 1.             # <<<<<<<<<<<<<<
+ *         for j from 0 <= j < profile_size:
+ *             if j != slot:
+ */
+    __pyx_v_prob = 1.;
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":346
+ *         #probability of the other populations' strategies in the profile
+ *         prob = 1.
+ *         for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *             if j != slot:
+ *                 prob = prob * pop[j, profiles[row, j]]
+ */
+    __pyx_t_14 = __pyx_v_profile_size;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_14; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":347
+ *         prob = 1.
+ *         for j from 0 <= j < profile_size:
+ *             if j != slot:             # <<<<<<<<<<<<<<
+ *                 prob = prob * pop[j, profiles[row, j]]
+ * 
+ */
+      __pyx_t_15 = (__pyx_v_j != __pyx_v_slot);
+      if (__pyx_t_15) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":348
+ *         for j from 0 <= j < profile_size:
+ *             if j != slot:
+ *                 prob = prob * pop[j, profiles[row, j]]             # <<<<<<<<<<<<<<
+ * 
+ *         payoffs[slot, profiles[row, slot]] = payoffs[slot, profiles[row, slot]] + values[e] * prob
+ */
+        __pyx_t_16 = __pyx_v_row;
+        __pyx_t_17 = __pyx_v_j;
+        if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_profiles;
+        if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_1_profiles;
+        __pyx_t_18 = __pyx_v_j;
+        __pyx_t_19 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_16, __pyx_bstride_0_profiles, __pyx_t_17, __pyx_bstride_1_profiles));
+        if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_pop;
+        if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_1_pop;
+        __pyx_v_prob = (__pyx_v_prob * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_18, __pyx_bstride_0_pop, __pyx_t_19, __pyx_bstride_1_pop)));
+        goto __pyx_L7;
+      }
+      __pyx_L7:;
+    }
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":350
+ *                 prob = prob * pop[j, profiles[row, j]]
+ * 
+ *         payoffs[slot, profiles[row, slot]] = payoffs[slot, profiles[row, slot]] + values[e] * prob             # <<<<<<<<<<<<<<
+ * 
+ *     for i from 0 <= i < num_pops:
+ */
+    __pyx_t_14 = __pyx_v_row;
+    __pyx_t_20 = __pyx_v_slot;
+    if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_profiles;
+    if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_1_profiles;
+    __pyx_t_21 = __pyx_v_slot;
+    __pyx_t_22 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_14, __pyx_bstride_0_profiles, __pyx_t_20, __pyx_bstride_1_profiles));
+    if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_0_payoffs;
+    if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_1_payoffs;
+    __pyx_t_23 = __pyx_v_e;
+    if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_0_values;
+    __pyx_t_24 = __pyx_v_row;
+    __pyx_t_25 = __pyx_v_slot;
+    if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_0_profiles;
+    if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_1_profiles;
+    __pyx_t_26 = __pyx_v_slot;
+    __pyx_t_27 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_24, __pyx_bstride_0_profiles, __pyx_t_25, __pyx_bstride_1_profiles));
+    if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_0_payoffs;
+    if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_1_payoffs;
+    *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_26, __pyx_bstride_0_payoffs, __pyx_t_27, __pyx_bstride_1_payoffs) = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_21, __pyx_bstride_0_payoffs, __pyx_t_22, __pyx_bstride_1_payoffs)) + ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_values.buf, __pyx_t_23, __pyx_bstride_0_values)) * __pyx_v_prob));
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":352
+ *         payoffs[slot, profiles[row, slot]] = payoffs[slot, profiles[row, slot]] + values[e] * prob
+ * 
+ *     for i from 0 <= i < num_pops:             # <<<<<<<<<<<<<<
+ *         avg_payoff = <np.float64_t>0
+ *         for j from 0 <= j < types:
+ */
+  __pyx_t_9 = __pyx_v_num_pops;
+  for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_9; __pyx_v_i++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":353
+ * 
+ *     for i from 0 <= i < num_pops:
+ *         avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *         for j from 0 <= j < types:
+ *             avg_payoff = avg_payoff + pop[i, j] * payoffs[i, j]
+ */
+    __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":354
+ *     for i from 0 <= i < num_pops:
+ *         avg_payoff = <np.float64_t>0
+ *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *             avg_payoff = avg_payoff + pop[i, j] * payoffs[i, j]
+ * 
+ */
+    __pyx_t_28 = __pyx_v_types;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_28; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":355
+ *         avg_payoff = <np.float64_t>0
+ *         for j from 0 <= j < types:
+ *             avg_payoff = avg_payoff + pop[i, j] * payoffs[i, j]             # <<<<<<<<<<<<<<
+ * 
+ *         for j from 0 <= j < types:
+ */
+      __pyx_t_29 = __pyx_v_i;
+      __pyx_t_30 = __pyx_v_j;
+      if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_0_pop;
+      if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_1_pop;
+      __pyx_t_31 = __pyx_v_i;
+      __pyx_t_32 = __pyx_v_j;
+      if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_0_payoffs;
+      if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_1_payoffs;
+      __pyx_v_avg_payoff = (__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_29, __pyx_bstride_0_pop, __pyx_t_30, __pyx_bstride_1_pop)) * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_31, __pyx_bstride_0_payoffs, __pyx_t_32, __pyx_bstride_1_payoffs))));
+    }
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":357
+ *             avg_payoff = avg_payoff + pop[i, j] * payoffs[i, j]
+ * 
+ *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *             contrib = pop[i, j]
+ *             contrib2 = payoffs[i, j]
+ */
+    __pyx_t_28 = __pyx_v_types;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_28; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":358
+ * 
+ *         for j from 0 <= j < types:
+ *             contrib = pop[i, j]             # <<<<<<<<<<<<<<
+ *             contrib2 = payoffs[i, j]
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ */
+      __pyx_t_33 = __pyx_v_i;
+      __pyx_t_34 = __pyx_v_j;
+      if (__pyx_t_33 < 0) __pyx_t_33 += __pyx_bshape_0_pop;
+      if (__pyx_t_34 < 0) __pyx_t_34 += __pyx_bshape_1_pop;
+      __pyx_v_contrib = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_33, __pyx_bstride_0_pop, __pyx_t_34, __pyx_bstride_1_pop));
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":359
+ *         for j from 0 <= j < types:
+ *             contrib = pop[i, j]
+ *             contrib2 = payoffs[i, j]             # <<<<<<<<<<<<<<
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *             newpop2[i, j] = tmp
+ */
+      __pyx_t_35 = __pyx_v_i;
+      __pyx_t_36 = __pyx_v_j;
+      if (__pyx_t_35 < 0) __pyx_t_35 += __pyx_bshape_0_payoffs;
+      if (__pyx_t_36 < 0) __pyx_t_36 += __pyx_bshape_1_payoffs;
+      __pyx_v_contrib2 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_35, __pyx_bstride_0_payoffs, __pyx_t_36, __pyx_bstride_1_payoffs));
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":360
+ *             contrib = pop[i, j]
+ *             contrib2 = payoffs[i, j]
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *             newpop2[i, j] = tmp
+ *             newpop[i + 1, j] = tmp
+ */
+      __pyx_t_37 = (__pyx_v_contrib * (__pyx_v_background_rate + __pyx_v_contrib2));
+      __pyx_t_38 = (__pyx_v_background_rate + __pyx_v_avg_payoff);
+      if (unlikely(__pyx_t_38 == 0)) {
+        PyErr_Format(PyExc_ZeroDivisionError, "float division");
+        {__pyx_filename = __pyx_f[0]; __pyx_lineno = 360; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      }
+      __pyx_v_tmp = (__pyx_t_37 / __pyx_t_38);
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":361
+ *             contrib2 = payoffs[i, j]
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *             newpop2[i, j] = tmp             # <<<<<<<<<<<<<<
+ *             newpop[i + 1, j] = tmp
+ * 
+ */
+      __pyx_t_39 = __pyx_v_i;
+      __pyx_t_40 = __pyx_v_j;
+      if (__pyx_t_39 < 0) __pyx_t_39 += __pyx_bshape_0_newpop2;
+      if (__pyx_t_40 < 0) __pyx_t_40 += __pyx_bshape_1_newpop2;
+      *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop2.buf, __pyx_t_39, __pyx_bstride_0_newpop2, __pyx_t_40, __pyx_bstride_1_newpop2) = __pyx_v_tmp;
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":362
+ *             tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+ *             newpop2[i, j] = tmp
+ *             newpop[i + 1, j] = tmp             # <<<<<<<<<<<<<<
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ */
+      __pyx_t_41 = (__pyx_v_i + 1);
+      __pyx_t_42 = __pyx_v_j;
+      if (__pyx_t_41 < 0) __pyx_t_41 += __pyx_bshape_0_newpop;
+      if (__pyx_t_42 < 0) __pyx_t_42 += __pyx_bshape_1_newpop;
+      *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_41, __pyx_bstride_0_newpop, __pyx_t_42, __pyx_bstride_1_newpop) = __pyx_v_tmp;
+    }
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":364
+ *             newpop[i + 1, j] = tmp
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)             # <<<<<<<<<<<<<<
+ *     for j from 0 <= j < types:
+ *         newpop[0, j] = tmp
+ */
+  __pyx_v_tmp = ((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":365
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *         newpop[0, j] = tmp
+ * 
+ */
+  __pyx_t_9 = __pyx_v_types;
+  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":366
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ *     for j from 0 <= j < types:
+ *         newpop[0, j] = tmp             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+    __pyx_t_43 = 0;
+    __pyx_t_28 = __pyx_v_j;
+    if (__pyx_t_43 < 0) __pyx_t_43 += __pyx_bshape_0_newpop;
+    if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_1_newpop;
+    *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_43, __pyx_bstride_0_newpop, __pyx_t_28, __pyx_bstride_1_newpop) = __pyx_v_tmp;
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":368
+ *         newpop[0, j] = tmp
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_sparse_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop2);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":322
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_sparse_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                                  np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                  np.ndarray[np.int_t, ndim=2] entries,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_6n_dimensional_sparse_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_6n_dimensional_sparse_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pop = 0;
+  PyArrayObject *__pyx_v_profiles = 0;
+  PyArrayObject *__pyx_v_entries = 0;
+  PyArrayObject *__pyx_v_values = 0;
+  __pyx_t_5numpy_float64_t __pyx_v_background_rate;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_values;
+  Py_ssize_t __pyx_bstride_0_values = 0;
+  Py_ssize_t __pyx_bshape_0_values = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_entries;
+  Py_ssize_t __pyx_bstride_0_entries = 0;
+  Py_ssize_t __pyx_bstride_1_entries = 0;
+  Py_ssize_t __pyx_bshape_0_entries = 0;
+  Py_ssize_t __pyx_bshape_1_entries = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__profiles,&__pyx_n_s__entries,&__pyx_n_s__values,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("n_dimensional_sparse_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[6] = {0,0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  6: values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profiles);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_sparse_step", 1, 6, 6, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__entries);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_sparse_step", 1, 6, 6, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__values);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_sparse_step", 1, 6, 6, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_sparse_step", 1, 6, 6, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  5:
+        values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[5])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_sparse_step", 1, 6, 6, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "n_dimensional_sparse_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 6) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+      values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+    }
+    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_profiles = ((PyArrayObject *)values[1]);
+    __pyx_v_entries = ((PyArrayObject *)values[2]);
+    __pyx_v_values = ((PyArrayObject *)values[3]);
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[4]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 326; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[5]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 327; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("n_dimensional_sparse_step", 1, 6, 6, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_sparse_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_entries.buf = NULL;
+  __pyx_bstruct_values.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_entries), __pyx_ptype_5numpy_ndarray, 1, "entries", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 324; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_values), __pyx_ptype_5numpy_ndarray, 1, "values", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 325; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_entries, (PyObject*)__pyx_v_entries, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_entries = __pyx_bstruct_entries.strides[0]; __pyx_bstride_1_entries = __pyx_bstruct_entries.strides[1];
+  __pyx_bshape_0_entries = __pyx_bstruct_entries.shape[0]; __pyx_bshape_1_entries = __pyx_bstruct_entries.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_values, (PyObject*)__pyx_v_values, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_values = __pyx_bstruct_values.strides[0];
+  __pyx_bshape_0_values = __pyx_bstruct_values.shape[0];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_sparse_step(__pyx_v_pop, __pyx_v_profiles, __pyx_v_entries, __pyx_v_values, __pyx_v_background_rate, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 322; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_sparse_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_values);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_entries);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":371
+ * 
+ * 
+ * cdef np.ndarray neighbour_payoffs(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                   np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+ *                                   np.ndarray[np.int_t, ndim=1] indptr,
+ */
+
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_neighbour_payoffs(PyArrayObject *__pyx_v_pop, PyArrayObject *__pyx_v_payoff_matrix, PyArrayObject *__pyx_v_indptr, PyArrayObject *__pyx_v_indices) {
+  int __pyx_v_v;
+  int __pyx_v_k;
+  int __pyx_v_j;
+  int __pyx_v_nodes;
+  int __pyx_v_types;
+  __pyx_t_5numpy_float64_t __pyx_v_degree;
+  PyArrayObject *__pyx_v_neighbourhood = 0;
+  Py_buffer __pyx_bstruct_payoff_matrix;
+  Py_ssize_t __pyx_bstride_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bstride_1_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_1_payoff_matrix = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_indptr;
+  Py_ssize_t __pyx_bstride_0_indptr = 0;
+  Py_ssize_t __pyx_bshape_0_indptr = 0;
+  Py_buffer __pyx_bstruct_neighbourhood;
+  Py_ssize_t __pyx_bstride_0_neighbourhood = 0;
+  Py_ssize_t __pyx_bstride_1_neighbourhood = 0;
+  Py_ssize_t __pyx_bshape_0_neighbourhood = 0;
+  Py_ssize_t __pyx_bshape_1_neighbourhood = 0;
+  Py_buffer __pyx_bstruct_indices;
+  Py_ssize_t __pyx_bstride_0_indices = 0;
+  Py_ssize_t __pyx_bshape_0_indices = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  int __pyx_t_7;
+  int __pyx_t_8;
+  long __pyx_t_9;
+  __pyx_t_5numpy_int_t __pyx_t_10;
+  int __pyx_t_11;
+  int __pyx_t_12;
+  int __pyx_t_13;
+  int __pyx_t_14;
+  __pyx_t_5numpy_int_t __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  int __pyx_t_18;
+  long __pyx_t_19;
+  int __pyx_t_20;
+  int __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  __pyx_t_5numpy_float64_t __pyx_t_24;
+  int __pyx_t_25;
+  int __pyx_t_26;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("neighbour_payoffs");
+  __pyx_bstruct_neighbourhood.buf = NULL;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_payoff_matrix.buf = NULL;
+  __pyx_bstruct_indptr.buf = NULL;
+  __pyx_bstruct_indices.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 371; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoff_matrix, (PyObject*)__pyx_v_payoff_matrix, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 371; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[0]; __pyx_bstride_1_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[1];
+  __pyx_bshape_0_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[0]; __pyx_bshape_1_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indptr, (PyObject*)__pyx_v_indptr, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 371; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indptr = __pyx_bstruct_indptr.strides[0];
+  __pyx_bshape_0_indptr = __pyx_bstruct_indptr.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indices, (PyObject*)__pyx_v_indices, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 371; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indices = __pyx_bstruct_indices.strides[0];
+  __pyx_bshape_0_indices = __pyx_bstruct_indices.shape[0];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":377
+ * 
+ *     cdef int v, k, j
+ *     cdef int nodes = pop.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int types = pop.shape[1]
+ *     cdef np.float64_t degree
+ */
+  __pyx_v_nodes = (__pyx_v_pop->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":378
+ *     cdef int v, k, j
+ *     cdef int nodes = pop.shape[0]
+ *     cdef int types = pop.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t degree
+ *     cdef np.ndarray[np.float64_t, ndim=2] neighbourhood = np.zeros((nodes, types), dtype=np.float64)
+ */
+  __pyx_v_types = (__pyx_v_pop->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":380
+ *     cdef int types = pop.shape[1]
+ *     cdef np.float64_t degree
+ *     cdef np.ndarray[np.float64_t, ndim=2] neighbourhood = np.zeros((nodes, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     #mean state of each node's neighbours
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_nodes); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = PyTuple_New(2); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  PyTuple_SET_ITEM(__pyx_t_4, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_4, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_1 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_4));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_4));
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyDict_New(); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  if (PyDict_SetItem(__pyx_t_4, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_4)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_neighbourhood, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_neighbourhood = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_neighbourhood.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 380; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_neighbourhood = __pyx_bstruct_neighbourhood.strides[0]; __pyx_bstride_1_neighbourhood = __pyx_bstruct_neighbourhood.strides[1];
+      __pyx_bshape_0_neighbourhood = __pyx_bstruct_neighbourhood.shape[0]; __pyx_bshape_1_neighbourhood = __pyx_bstruct_neighbourhood.shape[1];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_neighbourhood = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":383
+ * 
+ *     #mean state of each node's neighbours
+ *     for v from 0 <= v < nodes:             # <<<<<<<<<<<<<<
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ *             for j from 0 <= j < types:
+ */
+  __pyx_t_7 = __pyx_v_nodes;
+  for (__pyx_v_v = 0; __pyx_v_v < __pyx_t_7; __pyx_v_v++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":384
+ *     #mean state of each node's neighbours
+ *     for v from 0 <= v < nodes:
+ *         for k from indptr[v] <= k < indptr[v + 1]:             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < types:
+ *                 neighbourhood[v, j] = neighbourhood[v, j] + pop[indices[k], j]
+ */
+    __pyx_t_8 = __pyx_v_v;
+    if (__pyx_t_8 < 0) __pyx_t_8 += __pyx_bshape_0_indptr;
+    __pyx_t_9 = (__pyx_v_v + 1);
+    if (__pyx_t_9 < 0) __pyx_t_9 += __pyx_bshape_0_indptr;
+    __pyx_t_10 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_9, __pyx_bstride_0_indptr));
+    for (__pyx_v_k = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_8, __pyx_bstride_0_indptr)); __pyx_v_k < __pyx_t_10; __pyx_v_k++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":385
+ *     for v from 0 <= v < nodes:
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 neighbourhood[v, j] = neighbourhood[v, j] + pop[indices[k], j]
+ * 
+ */
+      __pyx_t_11 = __pyx_v_types;
+      for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_11; __pyx_v_j++) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":386
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ *             for j from 0 <= j < types:
+ *                 neighbourhood[v, j] = neighbourhood[v, j] + pop[indices[k], j]             # <<<<<<<<<<<<<<
+ * 
+ *         degree = <np.float64_t>(indptr[v + 1] - indptr[v])
+ */
+        __pyx_t_12 = __pyx_v_v;
+        __pyx_t_13 = __pyx_v_j;
+        if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_0_neighbourhood;
+        if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_1_neighbourhood;
+        __pyx_t_14 = __pyx_v_k;
+        if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_0_indices;
+        __pyx_t_15 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indices.buf, __pyx_t_14, __pyx_bstride_0_indices));
+        __pyx_t_16 = __pyx_v_j;
+        if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_0_pop;
+        if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_1_pop;
+        __pyx_t_17 = __pyx_v_v;
+        __pyx_t_18 = __pyx_v_j;
+        if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_0_neighbourhood;
+        if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_1_neighbourhood;
+        *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_neighbourhood.buf, __pyx_t_17, __pyx_bstride_0_neighbourhood, __pyx_t_18, __pyx_bstride_1_neighbourhood) = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_neighbourhood.buf, __pyx_t_12, __pyx_bstride_0_neighbourhood, __pyx_t_13, __pyx_bstride_1_neighbourhood)) + (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_15, __pyx_bstride_0_pop, __pyx_t_16, __pyx_bstride_1_pop)));
+      }
+    }
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":388
+ *                 neighbourhood[v, j] = neighbourhood[v, j] + pop[indices[k], j]
+ * 
+ *         degree = <np.float64_t>(indptr[v + 1] - indptr[v])             # <<<<<<<<<<<<<<
+ *         if degree > 0.:
+ *             for j from 0 <= j < types:
+ */
+    __pyx_t_19 = (__pyx_v_v + 1);
+    if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_indptr;
+    __pyx_t_11 = __pyx_v_v;
+    if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_0_indptr;
+    __pyx_v_degree = ((__pyx_t_5numpy_float64_t)((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_19, __pyx_bstride_0_indptr)) - (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_11, __pyx_bstride_0_indptr))));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":389
+ * 
+ *         degree = <np.float64_t>(indptr[v + 1] - indptr[v])
+ *         if degree > 0.:             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < types:
+ *                 neighbourhood[v, j] = neighbourhood[v, j] / degree
+ */
+    __pyx_t_20 = (__pyx_v_degree > 0.);
+    if (__pyx_t_20) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":390
+ *         degree = <np.float64_t>(indptr[v + 1] - indptr[v])
+ *         if degree > 0.:
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 neighbourhood[v, j] = neighbourhood[v, j] / degree
+ * 
+ */
+      __pyx_t_21 = __pyx_v_types;
+      for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_21; __pyx_v_j++) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":391
+ *         if degree > 0.:
+ *             for j from 0 <= j < types:
+ *                 neighbourhood[v, j] = neighbourhood[v, j] / degree             # <<<<<<<<<<<<<<
+ * 
+ *     #payoffs[v, i] = sum_j payoff_matrix[i, j] * neighbourhood[v, j]
+ */
+        __pyx_t_22 = __pyx_v_v;
+        __pyx_t_23 = __pyx_v_j;
+        if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_0_neighbourhood;
+        if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_1_neighbourhood;
+        __pyx_t_24 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_neighbourhood.buf, __pyx_t_22, __pyx_bstride_0_neighbourhood, __pyx_t_23, __pyx_bstride_1_neighbourhood));
+        if (unlikely(__pyx_v_degree == 0)) {
+          PyErr_Format(PyExc_ZeroDivisionError, "float division");
+          {__pyx_filename = __pyx_f[0]; __pyx_lineno = 391; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        }
+        __pyx_t_25 = __pyx_v_v;
+        __pyx_t_26 = __pyx_v_j;
+        if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_neighbourhood;
+        if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_1_neighbourhood;
+        *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_neighbourhood.buf, __pyx_t_25, __pyx_bstride_0_neighbourhood, __pyx_t_26, __pyx_bstride_1_neighbourhood) = (__pyx_t_24 / __pyx_v_degree);
+      }
+      goto __pyx_L9;
+    }
+    __pyx_L9:;
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":394
+ * 
+ *     #payoffs[v, i] = sum_j payoff_matrix[i, j] * neighbourhood[v, j]
+ *     return np.dot(neighbourhood, payoff_matrix.T)             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 394; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_4 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__dot); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 394; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyObject_GetAttr(((PyObject *)__pyx_v_payoff_matrix), __pyx_n_s__T); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 394; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_3 = PyTuple_New(2); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 394; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  __Pyx_INCREF(((PyObject *)__pyx_v_neighbourhood));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_v_neighbourhood));
+  __Pyx_GIVEREF(((PyObject *)__pyx_v_neighbourhood));
+  PyTuple_SET_ITEM(__pyx_t_3, 1, __pyx_t_5);
+  __Pyx_GIVEREF(__pyx_t_5);
+  __pyx_t_5 = 0;
+  __pyx_t_5 = PyObject_Call(__pyx_t_4, ((PyObject *)__pyx_t_3), NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 394; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 394; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_r = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_neighbourhood);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.neighbour_payoffs", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_neighbourhood);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_neighbourhood);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":397
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=2] structured_replicator_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                                   np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+ *                                                                   np.ndarray[np.int_t, ndim=1] indptr,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_7structured_replicator_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_structured_replicator_step(PyArrayObject *__pyx_v_pop, PyArrayObject *__pyx_v_payoff_matrix, PyArrayObject *__pyx_v_indptr, PyArrayObject *__pyx_v_indices, __pyx_t_5numpy_float64_t __pyx_v_background_rate, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_v;
+  int __pyx_v_j;
+  int __pyx_v_same;
+  int __pyx_v_nodes;
+  int __pyx_v_types;
+  __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
+  __pyx_t_5numpy_float64_t __pyx_v_diff;
+  __pyx_t_5numpy_float64_t __pyx_v_tmp;
+  __pyx_t_5numpy_float64_t __pyx_v_neg_effective_zero;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bstride_1_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_1_newpop = 0;
+  Py_buffer __pyx_bstruct_payoff_matrix;
+  Py_ssize_t __pyx_bstride_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bstride_1_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_1_payoff_matrix = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_indptr;
+  Py_ssize_t __pyx_bstride_0_indptr = 0;
+  Py_ssize_t __pyx_bshape_0_indptr = 0;
+  Py_buffer __pyx_bstruct_indices;
+  Py_ssize_t __pyx_bstride_0_indices = 0;
+  Py_ssize_t __pyx_bshape_0_indices = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_payoffs = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  int __pyx_t_7;
+  int __pyx_t_8;
+  int __pyx_t_9;
+  int __pyx_t_10;
+  int __pyx_t_11;
+  int __pyx_t_12;
+  long __pyx_t_13;
+  int __pyx_t_14;
+  int __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  int __pyx_t_18;
+  int __pyx_t_19;
+  long __pyx_t_20;
+  int __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  __pyx_t_5numpy_float64_t __pyx_t_26;
+  __pyx_t_5numpy_float64_t __pyx_t_27;
+  long __pyx_t_28;
+  int __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  long __pyx_t_32;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("structured_replicator_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_payoff_matrix.buf = NULL;
+  __pyx_bstruct_indptr.buf = NULL;
+  __pyx_bstruct_indices.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoff_matrix, (PyObject*)__pyx_v_payoff_matrix, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[0]; __pyx_bstride_1_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[1];
+  __pyx_bshape_0_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[0]; __pyx_bshape_1_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indptr, (PyObject*)__pyx_v_indptr, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indptr = __pyx_bstruct_indptr.strides[0];
+  __pyx_bshape_0_indptr = __pyx_bstruct_indptr.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indices, (PyObject*)__pyx_v_indices, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indices = __pyx_bstruct_indices.strides[0];
+  __pyx_bshape_0_indices = __pyx_bstruct_indices.shape[0];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":405
+ * 
+ *     cdef int v, j
+ *     cdef int same = 1             # <<<<<<<<<<<<<<
+ *     cdef int nodes = pop.shape[0]
+ *     cdef int types = pop.shape[1]
+ */
+  __pyx_v_same = 1;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":406
+ *     cdef int v, j
+ *     cdef int same = 1
+ *     cdef int nodes = pop.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int types = pop.shape[1]
+ *     cdef np.float64_t avg_payoff, diff, tmp
+ */
+  __pyx_v_nodes = (__pyx_v_pop->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":407
+ *     cdef int same = 1
+ *     cdef int nodes = pop.shape[0]
+ *     cdef int types = pop.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t avg_payoff, diff, tmp
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ */
+  __pyx_v_types = (__pyx_v_pop->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":409
+ *     cdef int types = pop.shape[1]
+ *     cdef np.float64_t avg_payoff, diff, tmp
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+ */
+  __pyx_v_neg_effective_zero = (-1.0 * __pyx_v_effective_zero);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":410
+ *     cdef np.float64_t avg_payoff, diff, tmp
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+ * 
+ */
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_neighbour_payoffs(((PyArrayObject *)__pyx_v_pop), ((PyArrayObject *)__pyx_v_payoff_matrix), ((PyArrayObject *)__pyx_v_indptr), ((PyArrayObject *)__pyx_v_indices))); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 410; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)((PyArrayObject *)__pyx_t_1), &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 410; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0]; __pyx_bstride_1_payoffs = __pyx_bstruct_payoffs.strides[1];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0]; __pyx_bshape_1_payoffs = __pyx_bstruct_payoffs.shape[1];
+    }
+  }
+  __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":411
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     for v from 0 <= v < nodes:
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong((__pyx_v_nodes + 1)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = PyTuple_New(2); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  PyTuple_SET_ITEM(__pyx_t_4, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_4, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_1 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_4));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_4));
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyDict_New(); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  if (PyDict_SetItem(__pyx_t_4, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_4)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 411; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0]; __pyx_bstride_1_newpop = __pyx_bstruct_newpop.strides[1];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0]; __pyx_bshape_1_newpop = __pyx_bstruct_newpop.shape[1];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":413
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+ * 
+ *     for v from 0 <= v < nodes:             # <<<<<<<<<<<<<<
+ *         avg_payoff = <np.float64_t>0
+ *         for j from 0 <= j < types:
+ */
+  __pyx_t_7 = __pyx_v_nodes;
+  for (__pyx_v_v = 0; __pyx_v_v < __pyx_t_7; __pyx_v_v++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":414
+ * 
+ *     for v from 0 <= v < nodes:
+ *         avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *         for j from 0 <= j < types:
+ *             avg_payoff = avg_payoff + pop[v, j] * payoffs[v, j]
+ */
+    __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":415
+ *     for v from 0 <= v < nodes:
+ *         avg_payoff = <np.float64_t>0
+ *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *             avg_payoff = avg_payoff + pop[v, j] * payoffs[v, j]
+ * 
+ */
+    __pyx_t_8 = __pyx_v_types;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_8; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":416
+ *         avg_payoff = <np.float64_t>0
+ *         for j from 0 <= j < types:
+ *             avg_payoff = avg_payoff + pop[v, j] * payoffs[v, j]             # <<<<<<<<<<<<<<
+ * 
+ *         #isolated nodes (and nodes with no net fitness) keep their state
+ */
+      __pyx_t_9 = __pyx_v_v;
+      __pyx_t_10 = __pyx_v_j;
+      if (__pyx_t_9 < 0) __pyx_t_9 += __pyx_bshape_0_pop;
+      if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_1_pop;
+      __pyx_t_11 = __pyx_v_v;
+      __pyx_t_12 = __pyx_v_j;
+      if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_0_payoffs;
+      if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_1_payoffs;
+      __pyx_v_avg_payoff = (__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_9, __pyx_bstride_0_pop, __pyx_t_10, __pyx_bstride_1_pop)) * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_11, __pyx_bstride_0_payoffs, __pyx_t_12, __pyx_bstride_1_payoffs))));
+    }
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":419
+ * 
+ *         #isolated nodes (and nodes with no net fitness) keep their state
+ *         if indptr[v + 1] == indptr[v] or background_rate + avg_payoff == 0.:             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < types:
+ *                 newpop[v + 1, j] = pop[v, j]
+ */
+    __pyx_t_13 = (__pyx_v_v + 1);
+    if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_0_indptr;
+    __pyx_t_8 = __pyx_v_v;
+    if (__pyx_t_8 < 0) __pyx_t_8 += __pyx_bshape_0_indptr;
+    __pyx_t_14 = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_13, __pyx_bstride_0_indptr)) == (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_8, __pyx_bstride_0_indptr)));
+    if (!__pyx_t_14) {
+      __pyx_t_15 = ((__pyx_v_background_rate + __pyx_v_avg_payoff) == 0.);
+      __pyx_t_16 = __pyx_t_15;
+    } else {
+      __pyx_t_16 = __pyx_t_14;
+    }
+    if (__pyx_t_16) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":420
+ *         #isolated nodes (and nodes with no net fitness) keep their state
+ *         if indptr[v + 1] == indptr[v] or background_rate + avg_payoff == 0.:
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 newpop[v + 1, j] = pop[v, j]
+ *             continue
+ */
+      __pyx_t_17 = __pyx_v_types;
+      for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_17; __pyx_v_j++) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":421
+ *         if indptr[v + 1] == indptr[v] or background_rate + avg_payoff == 0.:
+ *             for j from 0 <= j < types:
+ *                 newpop[v + 1, j] = pop[v, j]             # <<<<<<<<<<<<<<
+ *             continue
+ * 
+ */
+        __pyx_t_18 = __pyx_v_v;
+        __pyx_t_19 = __pyx_v_j;
+        if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_pop;
+        if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_1_pop;
+        __pyx_t_20 = (__pyx_v_v + 1);
+        __pyx_t_21 = __pyx_v_j;
+        if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_newpop;
+        if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_1_newpop;
+        *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_20, __pyx_bstride_0_newpop, __pyx_t_21, __pyx_bstride_1_newpop) = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_18, __pyx_bstride_0_pop, __pyx_t_19, __pyx_bstride_1_pop));
+      }
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":422
+ *             for j from 0 <= j < types:
+ *                 newpop[v + 1, j] = pop[v, j]
+ *             continue             # <<<<<<<<<<<<<<
+ * 
+ *         for j from 0 <= j < types:
+ */
+      goto __pyx_L3_continue;
+      goto __pyx_L7;
+    }
+    __pyx_L7:;
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":424
+ *             continue
+ * 
+ *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *             tmp = pop[v, j] * (background_rate + payoffs[v, j]) / (background_rate + avg_payoff)
+ *             newpop[v + 1, j] = tmp
+ */
+    __pyx_t_17 = __pyx_v_types;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_17; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":425
+ * 
+ *         for j from 0 <= j < types:
+ *             tmp = pop[v, j] * (background_rate + payoffs[v, j]) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *             newpop[v + 1, j] = tmp
+ *             diff = tmp - pop[v, j]
+ */
+      __pyx_t_22 = __pyx_v_v;
+      __pyx_t_23 = __pyx_v_j;
+      if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_0_pop;
+      if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_1_pop;
+      __pyx_t_24 = __pyx_v_v;
+      __pyx_t_25 = __pyx_v_j;
+      if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_0_payoffs;
+      if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_1_payoffs;
+      __pyx_t_26 = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_22, __pyx_bstride_0_pop, __pyx_t_23, __pyx_bstride_1_pop)) * (__pyx_v_background_rate + (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_24, __pyx_bstride_0_payoffs, __pyx_t_25, __pyx_bstride_1_payoffs))));
+      __pyx_t_27 = (__pyx_v_background_rate + __pyx_v_avg_payoff);
+      if (unlikely(__pyx_t_27 == 0)) {
+        PyErr_Format(PyExc_ZeroDivisionError, "float division");
+        {__pyx_filename = __pyx_f[0]; __pyx_lineno = 425; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      }
+      __pyx_v_tmp = (__pyx_t_26 / __pyx_t_27);
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":426
+ *         for j from 0 <= j < types:
+ *             tmp = pop[v, j] * (background_rate + payoffs[v, j]) / (background_rate + avg_payoff)
+ *             newpop[v + 1, j] = tmp             # <<<<<<<<<<<<<<
+ *             diff = tmp - pop[v, j]
+ *             if diff < neg_effective_zero or diff > effective_zero:
+ */
+      __pyx_t_28 = (__pyx_v_v + 1);
+      __pyx_t_29 = __pyx_v_j;
+      if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_0_newpop;
+      if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_1_newpop;
+      *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_28, __pyx_bstride_0_newpop, __pyx_t_29, __pyx_bstride_1_newpop) = __pyx_v_tmp;
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":427
+ *             tmp = pop[v, j] * (background_rate + payoffs[v, j]) / (background_rate + avg_payoff)
+ *             newpop[v + 1, j] = tmp
+ *             diff = tmp - pop[v, j]             # <<<<<<<<<<<<<<
+ *             if diff < neg_effective_zero or diff > effective_zero:
+ *                 same = 0
+ */
+      __pyx_t_30 = __pyx_v_v;
+      __pyx_t_31 = __pyx_v_j;
+      if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_0_pop;
+      if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_1_pop;
+      __pyx_v_diff = (__pyx_v_tmp - (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_30, __pyx_bstride_0_pop, __pyx_t_31, __pyx_bstride_1_pop)));
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":428
+ *             newpop[v + 1, j] = tmp
+ *             diff = tmp - pop[v, j]
+ *             if diff < neg_effective_zero or diff > effective_zero:             # <<<<<<<<<<<<<<
+ *                 same = 0
+ * 
+ */
+      __pyx_t_16 = (__pyx_v_diff < __pyx_v_neg_effective_zero);
+      if (!__pyx_t_16) {
+        __pyx_t_14 = (__pyx_v_diff > __pyx_v_effective_zero);
+        __pyx_t_15 = __pyx_t_14;
+      } else {
+        __pyx_t_15 = __pyx_t_16;
+      }
+      if (__pyx_t_15) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":429
+ *             diff = tmp - pop[v, j]
+ *             if diff < neg_effective_zero or diff > effective_zero:
+ *                 same = 0             # <<<<<<<<<<<<<<
+ * 
+ *     for j from 0 <= j < types:
+ */
+        __pyx_v_same = 0;
+        goto __pyx_L12;
+      }
+      __pyx_L12:;
+    }
+    __pyx_L3_continue:;
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":431
+ *                 same = 0
+ * 
+ *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *         newpop[0, j] = <np.float64_t>same
+ * 
+ */
+  __pyx_t_7 = __pyx_v_types;
+  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_7; __pyx_v_j++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":432
+ * 
+ *     for j from 0 <= j < types:
+ *         newpop[0, j] = <np.float64_t>same             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+    __pyx_t_32 = 0;
+    __pyx_t_17 = __pyx_v_j;
+    if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_0_newpop;
+    if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_1_newpop;
+    *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_32, __pyx_bstride_0_newpop, __pyx_t_17, __pyx_bstride_1_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_v_same);
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":434
+ *         newpop[0, j] = <np.float64_t>same
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.structured_replicator_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":397
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=2] structured_replicator_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                                   np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+ *                                                                   np.ndarray[np.int_t, ndim=1] indptr,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_7structured_replicator_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_7structured_replicator_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pop = 0;
+  PyArrayObject *__pyx_v_payoff_matrix = 0;
+  PyArrayObject *__pyx_v_indptr = 0;
+  PyArrayObject *__pyx_v_indices = 0;
+  __pyx_t_5numpy_float64_t __pyx_v_background_rate;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  Py_buffer __pyx_bstruct_payoff_matrix;
+  Py_ssize_t __pyx_bstride_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bstride_1_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_1_payoff_matrix = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_indptr;
+  Py_ssize_t __pyx_bstride_0_indptr = 0;
+  Py_ssize_t __pyx_bshape_0_indptr = 0;
+  Py_buffer __pyx_bstruct_indices;
+  Py_ssize_t __pyx_bstride_0_indices = 0;
+  Py_ssize_t __pyx_bshape_0_indices = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__payoff_matrix,&__pyx_n_s__indptr,&__pyx_n_s__indices,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("structured_replicator_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[6] = {0,0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  6: values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__payoff_matrix);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_replicator_step", 1, 6, 6, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__indptr);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_replicator_step", 1, 6, 6, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__indices);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_replicator_step", 1, 6, 6, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_replicator_step", 1, 6, 6, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  5:
+        values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[5])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_replicator_step", 1, 6, 6, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "structured_replicator_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 6) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+      values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+    }
+    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_payoff_matrix = ((PyArrayObject *)values[1]);
+    __pyx_v_indptr = ((PyArrayObject *)values[2]);
+    __pyx_v_indices = ((PyArrayObject *)values[3]);
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[4]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 401; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[5]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 402; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("structured_replicator_step", 1, 6, 6, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.structured_replicator_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_payoff_matrix.buf = NULL;
+  __pyx_bstruct_indptr.buf = NULL;
+  __pyx_bstruct_indices.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_payoff_matrix), __pyx_ptype_5numpy_ndarray, 1, "payoff_matrix", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 398; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_indptr), __pyx_ptype_5numpy_ndarray, 1, "indptr", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 399; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_indices), __pyx_ptype_5numpy_ndarray, 1, "indices", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 400; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoff_matrix, (PyObject*)__pyx_v_payoff_matrix, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[0]; __pyx_bstride_1_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[1];
+  __pyx_bshape_0_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[0]; __pyx_bshape_1_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indptr, (PyObject*)__pyx_v_indptr, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indptr = __pyx_bstruct_indptr.strides[0];
+  __pyx_bshape_0_indptr = __pyx_bstruct_indptr.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indices, (PyObject*)__pyx_v_indices, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indices = __pyx_bstruct_indices.strides[0];
+  __pyx_bshape_0_indices = __pyx_bstruct_indices.shape[0];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_structured_replicator_step(__pyx_v_pop, __pyx_v_payoff_matrix, __pyx_v_indptr, __pyx_v_indices, __pyx_v_background_rate, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 397; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.structured_replicator_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":437
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=2] structured_imitation_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                                  np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+ *                                                                  np.ndarray[np.int_t, ndim=1] indptr,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_8structured_imitation_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_structured_imitation_step(PyArrayObject *__pyx_v_pop, PyArrayObject *__pyx_v_payoff_matrix, PyArrayObject *__pyx_v_indptr, PyArrayObject *__pyx_v_indices, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_v;
+  int __pyx_v_k;
+  int __pyx_v_j;
+  int __pyx_v_best;
+  int __pyx_v_same;
+  int __pyx_v_nodes;
+  int __pyx_v_types;
+  __pyx_t_5numpy_float64_t __pyx_v_best_fitness;
+  __pyx_t_5numpy_float64_t __pyx_v_diff;
+  __pyx_t_5numpy_float64_t __pyx_v_neg_effective_zero;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_fitness = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bstride_1_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_1_newpop = 0;
+  Py_buffer __pyx_bstruct_payoff_matrix;
+  Py_ssize_t __pyx_bstride_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bstride_1_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_1_payoff_matrix = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  Py_buffer __pyx_bstruct_fitness;
+  Py_ssize_t __pyx_bstride_0_fitness = 0;
+  Py_ssize_t __pyx_bshape_0_fitness = 0;
+  Py_buffer __pyx_bstruct_indptr;
+  Py_ssize_t __pyx_bstride_0_indptr = 0;
+  Py_ssize_t __pyx_bshape_0_indptr = 0;
+  Py_buffer __pyx_bstruct_indices;
+  Py_ssize_t __pyx_bstride_0_indices = 0;
+  Py_ssize_t __pyx_bshape_0_indices = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_payoffs = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  PyArrayObject *__pyx_t_7 = NULL;
+  int __pyx_t_8;
+  int __pyx_t_9;
+  int __pyx_t_10;
+  int __pyx_t_11;
+  int __pyx_t_12;
+  int __pyx_t_13;
+  int __pyx_t_14;
+  int __pyx_t_15;
+  int __pyx_t_16;
+  long __pyx_t_17;
+  __pyx_t_5numpy_int_t __pyx_t_18;
+  int __pyx_t_19;
+  __pyx_t_5numpy_int_t __pyx_t_20;
+  int __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  int __pyx_t_26;
+  long __pyx_t_27;
+  int __pyx_t_28;
+  int __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  int __pyx_t_32;
+  int __pyx_t_33;
+  int __pyx_t_34;
+  long __pyx_t_35;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("structured_imitation_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_fitness.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_payoff_matrix.buf = NULL;
+  __pyx_bstruct_indptr.buf = NULL;
+  __pyx_bstruct_indices.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoff_matrix, (PyObject*)__pyx_v_payoff_matrix, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[0]; __pyx_bstride_1_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[1];
+  __pyx_bshape_0_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[0]; __pyx_bshape_1_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indptr, (PyObject*)__pyx_v_indptr, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indptr = __pyx_bstruct_indptr.strides[0];
+  __pyx_bshape_0_indptr = __pyx_bstruct_indptr.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indices, (PyObject*)__pyx_v_indices, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indices = __pyx_bstruct_indices.strides[0];
+  __pyx_bshape_0_indices = __pyx_bstruct_indices.shape[0];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":444
+ * 
+ *     cdef int v, k, j, best
+ *     cdef int same = 1             # <<<<<<<<<<<<<<
+ *     cdef int nodes = pop.shape[0]
+ *     cdef int types = pop.shape[1]
+ */
+  __pyx_v_same = 1;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":445
+ *     cdef int v, k, j, best
+ *     cdef int same = 1
+ *     cdef int nodes = pop.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int types = pop.shape[1]
+ *     cdef np.float64_t best_fitness, diff
+ */
+  __pyx_v_nodes = (__pyx_v_pop->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":446
+ *     cdef int same = 1
+ *     cdef int nodes = pop.shape[0]
+ *     cdef int types = pop.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t best_fitness, diff
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ */
+  __pyx_v_types = (__pyx_v_pop->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":448
+ *     cdef int types = pop.shape[1]
+ *     cdef np.float64_t best_fitness, diff
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+ *     cdef np.ndarray[np.float64_t, ndim=1] fitness = np.zeros(nodes, dtype=np.float64)
+ */
+  __pyx_v_neg_effective_zero = (-1.0 * __pyx_v_effective_zero);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":449
+ *     cdef np.float64_t best_fitness, diff
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=1] fitness = np.zeros(nodes, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+ */
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_neighbour_payoffs(((PyArrayObject *)__pyx_v_pop), ((PyArrayObject *)__pyx_v_payoff_matrix), ((PyArrayObject *)__pyx_v_indptr), ((PyArrayObject *)__pyx_v_indices))); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 449; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)((PyArrayObject *)__pyx_t_1), &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 449; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0]; __pyx_bstride_1_payoffs = __pyx_bstruct_payoffs.strides[1];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0]; __pyx_bshape_1_payoffs = __pyx_bstruct_payoffs.shape[1];
+    }
+  }
+  __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":450
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+ *     cdef np.ndarray[np.float64_t, ndim=1] fitness = np.zeros(nodes, dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+ * 
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_nodes); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  __pyx_t_1 = 0;
+  __pyx_t_1 = PyDict_New(); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_1));
+  __pyx_t_4 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_4, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  if (PyDict_SetItem(__pyx_t_1, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_1)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_1)); __pyx_t_1 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_fitness, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 1, 0, __pyx_stack) == -1)) {
+      __pyx_v_fitness = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_fitness.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 450; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_fitness = __pyx_bstruct_fitness.strides[0];
+      __pyx_bshape_0_fitness = __pyx_bstruct_fitness.shape[0];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_fitness = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":451
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+ *     cdef np.ndarray[np.float64_t, ndim=1] fitness = np.zeros(nodes, dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     for v from 0 <= v < nodes:
+ */
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__zeros); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyInt_FromLong((__pyx_v_nodes + 1)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_2 = PyTuple_New(2); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  PyTuple_SET_ITEM(__pyx_t_2, 0, __pyx_t_5);
+  __Pyx_GIVEREF(__pyx_t_5);
+  PyTuple_SET_ITEM(__pyx_t_2, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_5 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_2));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_2));
+  __pyx_t_2 = 0;
+  __pyx_t_2 = PyDict_New(); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_4 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__float64); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  if (PyDict_SetItem(__pyx_t_2, ((PyObject *)__pyx_n_s__dtype), __pyx_t_4) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __pyx_t_4 = PyEval_CallObjectWithKeywords(__pyx_t_1, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_2)); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_2)); __pyx_t_2 = 0;
+  if (!(likely(((__pyx_t_4) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_4, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_4);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 451; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0]; __pyx_bstride_1_newpop = __pyx_bstruct_newpop.strides[1];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0]; __pyx_bshape_1_newpop = __pyx_bstruct_newpop.shape[1];
+    }
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_4);
+  __pyx_t_4 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":453
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+ * 
+ *     for v from 0 <= v < nodes:             # <<<<<<<<<<<<<<
+ *         for j from 0 <= j < types:
+ *             fitness[v] = fitness[v] + pop[v, j] * payoffs[v, j]
+ */
+  __pyx_t_8 = __pyx_v_nodes;
+  for (__pyx_v_v = 0; __pyx_v_v < __pyx_t_8; __pyx_v_v++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":454
+ * 
+ *     for v from 0 <= v < nodes:
+ *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *             fitness[v] = fitness[v] + pop[v, j] * payoffs[v, j]
+ * 
+ */
+    __pyx_t_9 = __pyx_v_types;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":455
+ *     for v from 0 <= v < nodes:
+ *         for j from 0 <= j < types:
+ *             fitness[v] = fitness[v] + pop[v, j] * payoffs[v, j]             # <<<<<<<<<<<<<<
+ * 
+ *     #each node copies its fittest neighbour, if that one does strictly better
+ */
+      __pyx_t_10 = __pyx_v_v;
+      if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_0_fitness;
+      __pyx_t_11 = __pyx_v_v;
+      __pyx_t_12 = __pyx_v_j;
+      if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_0_pop;
+      if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_1_pop;
+      __pyx_t_13 = __pyx_v_v;
+      __pyx_t_14 = __pyx_v_j;
+      if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_0_payoffs;
+      if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_1_payoffs;
+      __pyx_t_15 = __pyx_v_v;
+      if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_0_fitness;
+      *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_fitness.buf, __pyx_t_15, __pyx_bstride_0_fitness) = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_fitness.buf, __pyx_t_10, __pyx_bstride_0_fitness)) + ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_11, __pyx_bstride_0_pop, __pyx_t_12, __pyx_bstride_1_pop)) * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_13, __pyx_bstride_0_payoffs, __pyx_t_14, __pyx_bstride_1_payoffs))));
+    }
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":458
+ * 
+ *     #each node copies its fittest neighbour, if that one does strictly better
+ *     for v from 0 <= v < nodes:             # <<<<<<<<<<<<<<
+ *         best = v
+ *         best_fitness = fitness[v]
+ */
+  __pyx_t_8 = __pyx_v_nodes;
+  for (__pyx_v_v = 0; __pyx_v_v < __pyx_t_8; __pyx_v_v++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":459
+ *     #each node copies its fittest neighbour, if that one does strictly better
+ *     for v from 0 <= v < nodes:
+ *         best = v             # <<<<<<<<<<<<<<
+ *         best_fitness = fitness[v]
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ */
+    __pyx_v_best = __pyx_v_v;
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":460
+ *     for v from 0 <= v < nodes:
+ *         best = v
+ *         best_fitness = fitness[v]             # <<<<<<<<<<<<<<
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ *             if fitness[indices[k]] - best_fitness > effective_zero:
+ */
+    __pyx_t_9 = __pyx_v_v;
+    if (__pyx_t_9 < 0) __pyx_t_9 += __pyx_bshape_0_fitness;
+    __pyx_v_best_fitness = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_fitness.buf, __pyx_t_9, __pyx_bstride_0_fitness));
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":461
+ *         best = v
+ *         best_fitness = fitness[v]
+ *         for k from indptr[v] <= k < indptr[v + 1]:             # <<<<<<<<<<<<<<
+ *             if fitness[indices[k]] - best_fitness > effective_zero:
+ *                 best = indices[k]
+ */
+    __pyx_t_16 = __pyx_v_v;
+    if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_indptr;
+    __pyx_t_17 = (__pyx_v_v + 1);
+    if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_0_indptr;
+    __pyx_t_18 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_17, __pyx_bstride_0_indptr));
+    for (__pyx_v_k = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indptr.buf, __pyx_t_16, __pyx_bstride_0_indptr)); __pyx_v_k < __pyx_t_18; __pyx_v_k++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":462
+ *         best_fitness = fitness[v]
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ *             if fitness[indices[k]] - best_fitness > effective_zero:             # <<<<<<<<<<<<<<
+ *                 best = indices[k]
+ *                 best_fitness = fitness[best]
+ */
+      __pyx_t_19 = __pyx_v_k;
+      if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_indices;
+      __pyx_t_20 = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indices.buf, __pyx_t_19, __pyx_bstride_0_indices));
+      if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_fitness;
+      __pyx_t_21 = (((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_fitness.buf, __pyx_t_20, __pyx_bstride_0_fitness)) - __pyx_v_best_fitness) > __pyx_v_effective_zero);
+      if (__pyx_t_21) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":463
+ *         for k from indptr[v] <= k < indptr[v + 1]:
+ *             if fitness[indices[k]] - best_fitness > effective_zero:
+ *                 best = indices[k]             # <<<<<<<<<<<<<<
+ *                 best_fitness = fitness[best]
+ * 
+ */
+        __pyx_t_22 = __pyx_v_k;
+        if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_0_indices;
+        __pyx_v_best = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_int_t *, __pyx_bstruct_indices.buf, __pyx_t_22, __pyx_bstride_0_indices));
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":464
+ *             if fitness[indices[k]] - best_fitness > effective_zero:
+ *                 best = indices[k]
+ *                 best_fitness = fitness[best]             # <<<<<<<<<<<<<<
+ * 
+ *         for j from 0 <= j < types:
+ */
+        __pyx_t_23 = __pyx_v_best;
+        if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_0_fitness;
+        __pyx_v_best_fitness = (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_fitness.buf, __pyx_t_23, __pyx_bstride_0_fitness));
+        goto __pyx_L11;
+      }
+      __pyx_L11:;
+    }
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":466
+ *                 best_fitness = fitness[best]
+ * 
+ *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *             newpop[v + 1, j] = pop[best, j]
+ *             diff = pop[best, j] - pop[v, j]
+ */
+    __pyx_t_24 = __pyx_v_types;
+    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_24; __pyx_v_j++) {
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":467
+ * 
+ *         for j from 0 <= j < types:
+ *             newpop[v + 1, j] = pop[best, j]             # <<<<<<<<<<<<<<
+ *             diff = pop[best, j] - pop[v, j]
+ *             if diff < neg_effective_zero or diff > effective_zero:
+ */
+      __pyx_t_25 = __pyx_v_best;
+      __pyx_t_26 = __pyx_v_j;
+      if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_pop;
+      if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_1_pop;
+      __pyx_t_27 = (__pyx_v_v + 1);
+      __pyx_t_28 = __pyx_v_j;
+      if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_0_newpop;
+      if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_1_newpop;
+      *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_27, __pyx_bstride_0_newpop, __pyx_t_28, __pyx_bstride_1_newpop) = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_25, __pyx_bstride_0_pop, __pyx_t_26, __pyx_bstride_1_pop));
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":468
+ *         for j from 0 <= j < types:
+ *             newpop[v + 1, j] = pop[best, j]
+ *             diff = pop[best, j] - pop[v, j]             # <<<<<<<<<<<<<<
+ *             if diff < neg_effective_zero or diff > effective_zero:
+ *                 same = 0
+ */
+      __pyx_t_29 = __pyx_v_best;
+      __pyx_t_30 = __pyx_v_j;
+      if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_0_pop;
+      if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_1_pop;
+      __pyx_t_31 = __pyx_v_v;
+      __pyx_t_32 = __pyx_v_j;
+      if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_0_pop;
+      if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_1_pop;
+      __pyx_v_diff = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_29, __pyx_bstride_0_pop, __pyx_t_30, __pyx_bstride_1_pop)) - (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pop.buf, __pyx_t_31, __pyx_bstride_0_pop, __pyx_t_32, __pyx_bstride_1_pop)));
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":469
+ *             newpop[v + 1, j] = pop[best, j]
+ *             diff = pop[best, j] - pop[v, j]
+ *             if diff < neg_effective_zero or diff > effective_zero:             # <<<<<<<<<<<<<<
+ *                 same = 0
+ * 
+ */
+      __pyx_t_21 = (__pyx_v_diff < __pyx_v_neg_effective_zero);
+      if (!__pyx_t_21) {
+        __pyx_t_33 = (__pyx_v_diff > __pyx_v_effective_zero);
+        __pyx_t_34 = __pyx_t_33;
+      } else {
+        __pyx_t_34 = __pyx_t_21;
+      }
+      if (__pyx_t_34) {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":470
+ *             diff = pop[best, j] - pop[v, j]
+ *             if diff < neg_effective_zero or diff > effective_zero:
+ *                 same = 0             # <<<<<<<<<<<<<<
+ * 
+ *     for j from 0 <= j < types:
+ */
+        __pyx_v_same = 0;
+        goto __pyx_L14;
+      }
+      __pyx_L14:;
+    }
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":472
+ *                 same = 0
+ * 
+ *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *         newpop[0, j] = <np.float64_t>same
+ * 
+ */
+  __pyx_t_8 = __pyx_v_types;
+  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_8; __pyx_v_j++) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":473
+ * 
+ *     for j from 0 <= j < types:
+ *         newpop[0, j] = <np.float64_t>same             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+    __pyx_t_35 = 0;
+    __pyx_t_24 = __pyx_v_j;
+    if (__pyx_t_35 < 0) __pyx_t_35 += __pyx_bshape_0_newpop;
+    if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_1_newpop;
+    *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_35, __pyx_bstride_0_newpop, __pyx_t_24, __pyx_bstride_1_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_v_same);
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":475
+ *         newpop[0, j] = <np.float64_t>same
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_fitness);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.structured_imitation_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_fitness);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_fitness);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":437
+ * 
+ * 
+ * cpdef np.ndarray[np.float64_t, ndim=2] structured_imitation_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
+ *                                                                  np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+ *                                                                  np.ndarray[np.int_t, ndim=1] indptr,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_8structured_imitation_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_8structured_imitation_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pop = 0;
+  PyArrayObject *__pyx_v_payoff_matrix = 0;
+  PyArrayObject *__pyx_v_indptr = 0;
+  PyArrayObject *__pyx_v_indices = 0;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  Py_buffer __pyx_bstruct_indices;
+  Py_ssize_t __pyx_bstride_0_indices = 0;
+  Py_ssize_t __pyx_bshape_0_indices = 0;
+  Py_buffer __pyx_bstruct_indptr;
+  Py_ssize_t __pyx_bstride_0_indptr = 0;
+  Py_ssize_t __pyx_bshape_0_indptr = 0;
+  Py_buffer __pyx_bstruct_payoff_matrix;
+  Py_ssize_t __pyx_bstride_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bstride_1_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_0_payoff_matrix = 0;
+  Py_ssize_t __pyx_bshape_1_payoff_matrix = 0;
+  Py_buffer __pyx_bstruct_pop;
+  Py_ssize_t __pyx_bstride_0_pop = 0;
+  Py_ssize_t __pyx_bstride_1_pop = 0;
+  Py_ssize_t __pyx_bshape_0_pop = 0;
+  Py_ssize_t __pyx_bshape_1_pop = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__payoff_matrix,&__pyx_n_s__indptr,&__pyx_n_s__indices,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("structured_imitation_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[5] = {0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__payoff_matrix);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_imitation_step", 1, 5, 5, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__indptr);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_imitation_step", 1, 5, 5, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__indices);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_imitation_step", 1, 5, 5, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("structured_imitation_step", 1, 5, 5, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "structured_imitation_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 5) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+    }
+    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_payoff_matrix = ((PyArrayObject *)values[1]);
+    __pyx_v_indptr = ((PyArrayObject *)values[2]);
+    __pyx_v_indices = ((PyArrayObject *)values[3]);
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[4]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 441; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("structured_imitation_step", 1, 5, 5, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.structured_imitation_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_payoff_matrix.buf = NULL;
+  __pyx_bstruct_indptr.buf = NULL;
+  __pyx_bstruct_indices.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_payoff_matrix), __pyx_ptype_5numpy_ndarray, 1, "payoff_matrix", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 438; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_indptr), __pyx_ptype_5numpy_ndarray, 1, "indptr", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 439; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_indices), __pyx_ptype_5numpy_ndarray, 1, "indices", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 440; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
+  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoff_matrix, (PyObject*)__pyx_v_payoff_matrix, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[0]; __pyx_bstride_1_payoff_matrix = __pyx_bstruct_payoff_matrix.strides[1];
+  __pyx_bshape_0_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[0]; __pyx_bshape_1_payoff_matrix = __pyx_bstruct_payoff_matrix.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indptr, (PyObject*)__pyx_v_indptr, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indptr = __pyx_bstruct_indptr.strides[0];
+  __pyx_bshape_0_indptr = __pyx_bstruct_indptr.shape[0];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_indices, (PyObject*)__pyx_v_indices, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_indices = __pyx_bstruct_indices.strides[0];
+  __pyx_bshape_0_indices = __pyx_bstruct_indices.shape[0];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_structured_imitation_step(__pyx_v_pop, __pyx_v_payoff_matrix, __pyx_v_indptr, __pyx_v_indices, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 437; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.structured_imitation_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indices);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_indptr);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoff_matrix);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":479
+ * 
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=2] one_dimensional_batch_step(np.ndarray[np.float64_t, ndim=2] pops,             # <<<<<<<<<<<<<<
+ *                                                                   np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                   np.ndarray[np.float64_t, ndim=3] profile_payoffs,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_9one_dimensional_batch_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_batch_step(PyArrayObject *__pyx_v_pops, PyArrayObject *__pyx_v_profiles, PyArrayObject *__pyx_v_profile_payoffs, __pyx_t_5numpy_int_t __pyx_v_arity, __pyx_t_5numpy_float64_t __pyx_v_background_rate, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_g;
+  int __pyx_v_i;
+  int __pyx_v_j;
+  int __pyx_v_same;
+  int __pyx_v_degenerate;
+  int __pyx_v_num_games;
+  int __pyx_v_types;
+  int __pyx_v_num_profiles;
+  int __pyx_v_profile_size;
+  __pyx_t_5numpy_float64_t __pyx_v_profile_prob;
+  __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
+  __pyx_t_5numpy_float64_t __pyx_v_diff;
+  __pyx_t_5numpy_float64_t __pyx_v_tmp;
+  __pyx_t_5numpy_float64_t __pyx_v_arityf;
+  __pyx_t_5numpy_float64_t __pyx_v_neg_effective_zero;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_profile_payoffs;
+  Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_2_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_2_profile_payoffs = 0;
+  Py_buffer __pyx_bstruct_pops;
+  Py_ssize_t __pyx_bstride_0_pops = 0;
+  Py_ssize_t __pyx_bstride_1_pops = 0;
+  Py_ssize_t __pyx_bshape_0_pops = 0;
+  Py_ssize_t __pyx_bshape_1_pops = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bstride_1_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_1_newpop = 0;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_payoffs = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  PyArrayObject *__pyx_t_7 = NULL;
+  int __pyx_t_8;
+  int __pyx_t_9;
+  int __pyx_t_10;
+  int __pyx_t_11;
+  int __pyx_t_12;
+  int __pyx_t_13;
+  __pyx_t_5numpy_int_t __pyx_t_14;
+  int __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  int __pyx_t_18;
+  __pyx_t_5numpy_int_t __pyx_t_19;
+  int __pyx_t_20;
+  int __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  __pyx_t_5numpy_int_t __pyx_t_26;
+  int __pyx_t_27;
+  int __pyx_t_28;
+  int __pyx_t_29;
+  __pyx_t_5numpy_int_t __pyx_t_30;
+  int __pyx_t_31;
+  int __pyx_t_32;
+  int __pyx_t_33;
+  int __pyx_t_34;
+  int __pyx_t_35;
+  int __pyx_t_36;
+  int __pyx_t_37;
+  int __pyx_t_38;
+  int __pyx_t_39;
+  int __pyx_t_40;
+  int __pyx_t_41;
+  int __pyx_t_42;
+  long __pyx_t_43;
+  int __pyx_t_44;
+  int __pyx_t_45;
+  int __pyx_t_46;
+  int __pyx_t_47;
+  long __pyx_t_48;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("one_dimensional_batch_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pops.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_profile_payoffs.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pops, (PyObject*)__pyx_v_pops, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pops = __pyx_bstruct_pops.strides[0]; __pyx_bstride_1_pops = __pyx_bstruct_pops.strides[1];
+  __pyx_bshape_0_pops = __pyx_bstruct_pops.shape[0]; __pyx_bshape_1_pops = __pyx_bstruct_pops.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 3, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1]; __pyx_bstride_2_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[2];
+  __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1]; __pyx_bshape_2_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[2];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":487
+ * 
+ *     cdef int g, i, j, same
+ *     cdef int degenerate = 0             # <<<<<<<<<<<<<<
+ *     cdef int num_games = pops.shape[0]
+ *     cdef int types = pops.shape[1]
+ */
+  __pyx_v_degenerate = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":488
+ *     cdef int g, i, j, same
+ *     cdef int degenerate = 0
+ *     cdef int num_games = pops.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int types = pops.shape[1]
+ *     cdef int num_profiles = profiles.shape[0]
+ */
+  __pyx_v_num_games = (__pyx_v_pops->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":489
+ *     cdef int degenerate = 0
+ *     cdef int num_games = pops.shape[0]
+ *     cdef int types = pops.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef int num_profiles = profiles.shape[0]
+ *     cdef int profile_size = profiles.shape[1]
+ */
+  __pyx_v_types = (__pyx_v_pops->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":490
+ *     cdef int num_games = pops.shape[0]
+ *     cdef int types = pops.shape[1]
+ *     cdef int num_profiles = profiles.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ */
+  __pyx_v_num_profiles = (__pyx_v_profiles->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":491
+ *     cdef int types = pops.shape[1]
+ *     cdef int num_profiles = profiles.shape[0]
+ *     cdef int profile_size = profiles.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ */
+  __pyx_v_profile_size = (__pyx_v_profiles->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":493
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ *     cdef np.float64_t arityf = <np.float64_t>arity             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_games, types), dtype=np.float64)
+ */
+  __pyx_v_arityf = ((__pyx_t_5numpy_float64_t)__pyx_v_arity);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":494
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_games, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_games, types + 1), dtype=np.float64)
+ */
+  __pyx_v_neg_effective_zero = (-1.0 * __pyx_v_effective_zero);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":495
+ *     cdef np.float64_t arityf = <np.float64_t>arity
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_games, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_games, types + 1), dtype=np.float64)
+ * 
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_num_games); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = PyTuple_New(2); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  PyTuple_SET_ITEM(__pyx_t_4, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_4, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_1 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_4));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_4));
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyDict_New(); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__float64); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  if (PyDict_SetItem(__pyx_t_4, ((PyObject *)__pyx_n_s__dtype), __pyx_t_5) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_4)); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  if (!(likely(((__pyx_t_5) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_5, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_5);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 495; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0]; __pyx_bstride_1_payoffs = __pyx_bstruct_payoffs.strides[1];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0]; __pyx_bshape_1_payoffs = __pyx_bstruct_payoffs.shape[1];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_5);
+  __pyx_t_5 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":496
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_games, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_games, types + 1), dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     with nogil:
+ */
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_4 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__zeros); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __pyx_t_5 = PyInt_FromLong(__pyx_v_num_games); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_3 = PyInt_FromLong((__pyx_v_types + 1)); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_2 = PyTuple_New(2); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  PyTuple_SET_ITEM(__pyx_t_2, 0, __pyx_t_5);
+  __Pyx_GIVEREF(__pyx_t_5);
+  PyTuple_SET_ITEM(__pyx_t_2, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  __pyx_t_5 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, ((PyObject *)__pyx_t_2));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_2));
+  __pyx_t_2 = 0;
+  __pyx_t_2 = PyDict_New(); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  __pyx_t_5 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_5, __pyx_n_s__float64); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  if (PyDict_SetItem(__pyx_t_2, ((PyObject *)__pyx_n_s__dtype), __pyx_t_1) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyEval_CallObjectWithKeywords(__pyx_t_4, ((PyObject *)__pyx_t_3), ((PyObject *)__pyx_t_2)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_2)); __pyx_t_2 = 0;
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 2, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 496; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0]; __pyx_bstride_1_newpop = __pyx_bstruct_newpop.strides[1];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0]; __pyx_bshape_1_newpop = __pyx_bstruct_newpop.shape[1];
+    }
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":498
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_games, types + 1), dtype=np.float64)
+ * 
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         for g from 0 <= g < num_games:
+ *             #go over each possible profile of strategies for this game
+ */
+  {
+      #ifdef WITH_THREAD
+      PyThreadState *_save = NULL;
+      #endif
+      Py_UNBLOCK_THREADS
+      /*try:*/ {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":499
+ * 
+ *     with nogil:
+ *         for g from 0 <= g < num_games:             # <<<<<<<<<<<<<<
+ *             #go over each possible profile of strategies for this game
+ *             for i from 0 <= i < num_profiles:
+ */
+        __pyx_t_8 = __pyx_v_num_games;
+        for (__pyx_v_g = 0; __pyx_v_g < __pyx_t_8; __pyx_v_g++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":501
+ *         for g from 0 <= g < num_games:
+ *             #go over each possible profile of strategies for this game
+ *             for i from 0 <= i < num_profiles:             # <<<<<<<<<<<<<<
+ *                 profile_prob = 1.
+ *                 for j from 0 <= j < profile_size:
+ */
+          __pyx_t_9 = __pyx_v_num_profiles;
+          for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_9; __pyx_v_i++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":502
+ *             #go over each possible profile of strategies for this game
+ *             for i from 0 <= i < num_profiles:
+ *                 profile_prob = 1.             # <<<<<<<<<<<<<<
+ *                 for j from 0 <= j < profile_size:
+ *                     profile_prob = profile_prob * pops[g, profiles[i, j]]
+ */
+            __pyx_v_profile_prob = 1.;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":503
+ *             for i from 0 <= i < num_profiles:
+ *                 profile_prob = 1.
+ *                 for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                     profile_prob = profile_prob * pops[g, profiles[i, j]]
+ * 
+ */
+            __pyx_t_10 = __pyx_v_profile_size;
+            for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_10; __pyx_v_j++) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":504
+ *                 profile_prob = 1.
+ *                 for j from 0 <= j < profile_size:
+ *                     profile_prob = profile_prob * pops[g, profiles[i, j]]             # <<<<<<<<<<<<<<
+ * 
+ *                 if profile_prob > 0.:
+ */
+              __pyx_t_11 = __pyx_v_i;
+              __pyx_t_12 = __pyx_v_j;
+              if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_0_profiles;
+              if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_1_profiles;
+              __pyx_t_13 = __pyx_v_g;
+              __pyx_t_14 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_11, __pyx_bstride_0_profiles, __pyx_t_12, __pyx_bstride_1_profiles));
+              if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_0_pops;
+              if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_1_pops;
+              __pyx_v_profile_prob = (__pyx_v_profile_prob * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_13, __pyx_bstride_0_pops, __pyx_t_14, __pyx_bstride_1_pops)));
+            }
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":506
+ *                     profile_prob = profile_prob * pops[g, profiles[i, j]]
+ * 
+ *                 if profile_prob > 0.:             # <<<<<<<<<<<<<<
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, profiles[i, j]] = payoffs[g, profiles[i, j]] + \
+ */
+            __pyx_t_15 = (__pyx_v_profile_prob > 0.);
+            if (__pyx_t_15) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":507
+ * 
+ *                 if profile_prob > 0.:
+ *                     for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                         payoffs[g, profiles[i, j]] = payoffs[g, profiles[i, j]] + \
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, profiles[i, j]]
+ */
+              __pyx_t_10 = __pyx_v_profile_size;
+              for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_10; __pyx_v_j++) {
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":508
+ *                 if profile_prob > 0.:
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, profiles[i, j]] = payoffs[g, profiles[i, j]] + \             # <<<<<<<<<<<<<<
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, profiles[i, j]]
+ * 
+ */
+                __pyx_t_16 = __pyx_v_i;
+                __pyx_t_17 = __pyx_v_j;
+                if (__pyx_t_16 < 0) __pyx_t_16 += __pyx_bshape_0_profiles;
+                if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_1_profiles;
+                __pyx_t_18 = __pyx_v_g;
+                __pyx_t_19 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_16, __pyx_bstride_0_profiles, __pyx_t_17, __pyx_bstride_1_profiles));
+                if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_0_payoffs;
+                if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_1_payoffs;
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":509
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, profiles[i, j]] = payoffs[g, profiles[i, j]] + \
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, profiles[i, j]]             # <<<<<<<<<<<<<<
+ * 
+ *             avg_payoff = <np.float64_t>0
+ */
+                __pyx_t_20 = __pyx_v_g;
+                __pyx_t_21 = __pyx_v_i;
+                __pyx_t_22 = __pyx_v_j;
+                if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_profile_payoffs;
+                if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_1_profile_payoffs;
+                if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_2_profile_payoffs;
+                __pyx_t_23 = __pyx_v_i;
+                __pyx_t_24 = __pyx_v_j;
+                if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_0_profiles;
+                if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_1_profiles;
+                __pyx_t_25 = __pyx_v_g;
+                __pyx_t_26 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_23, __pyx_bstride_0_profiles, __pyx_t_24, __pyx_bstride_1_profiles));
+                if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_pops;
+                if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_1_pops;
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":508
+ *                 if profile_prob > 0.:
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, profiles[i, j]] = payoffs[g, profiles[i, j]] + \             # <<<<<<<<<<<<<<
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, profiles[i, j]]
+ * 
+ */
+                __pyx_t_27 = __pyx_v_i;
+                __pyx_t_28 = __pyx_v_j;
+                if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_0_profiles;
+                if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_1_profiles;
+                __pyx_t_29 = __pyx_v_g;
+                __pyx_t_30 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_27, __pyx_bstride_0_profiles, __pyx_t_28, __pyx_bstride_1_profiles));
+                if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_0_payoffs;
+                if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_1_payoffs;
+                *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_29, __pyx_bstride_0_payoffs, __pyx_t_30, __pyx_bstride_1_payoffs) = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_18, __pyx_bstride_0_payoffs, __pyx_t_19, __pyx_bstride_1_payoffs)) + (((*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_payoffs.buf, __pyx_t_20, __pyx_bstride_0_profile_payoffs, __pyx_t_21, __pyx_bstride_1_profile_payoffs, __pyx_t_22, __pyx_bstride_2_profile_payoffs)) * __pyx_v_profile_prob) / (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_25, __pyx_bstride_0_pops, __pyx_t_26, __pyx_bstride_1_pops))));
+              }
+              goto __pyx_L12;
+            }
+            __pyx_L12:;
+          }
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":511
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, profiles[i, j]]
+ * 
+ *             avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < types:
+ *                 payoffs[g, j] = payoffs[g, j] / arityf
+ */
+          __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":512
+ * 
+ *             avg_payoff = <np.float64_t>0
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 payoffs[g, j] = payoffs[g, j] / arityf
+ *                 avg_payoff = avg_payoff + pops[g, j] * payoffs[g, j]
+ */
+          __pyx_t_9 = __pyx_v_types;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":513
+ *             avg_payoff = <np.float64_t>0
+ *             for j from 0 <= j < types:
+ *                 payoffs[g, j] = payoffs[g, j] / arityf             # <<<<<<<<<<<<<<
+ *                 avg_payoff = avg_payoff + pops[g, j] * payoffs[g, j]
+ *             if background_rate + avg_payoff == 0.:
+ */
+            __pyx_t_10 = __pyx_v_g;
+            __pyx_t_31 = __pyx_v_j;
+            if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_1_payoffs;
+            __pyx_t_32 = __pyx_v_g;
+            __pyx_t_33 = __pyx_v_j;
+            if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_33 < 0) __pyx_t_33 += __pyx_bshape_1_payoffs;
+            *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_32, __pyx_bstride_0_payoffs, __pyx_t_33, __pyx_bstride_1_payoffs) = ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_10, __pyx_bstride_0_payoffs, __pyx_t_31, __pyx_bstride_1_payoffs)) / __pyx_v_arityf);
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":514
+ *             for j from 0 <= j < types:
+ *                 payoffs[g, j] = payoffs[g, j] / arityf
+ *                 avg_payoff = avg_payoff + pops[g, j] * payoffs[g, j]             # <<<<<<<<<<<<<<
+ *             if background_rate + avg_payoff == 0.:
+ *                 degenerate = 1
+ */
+            __pyx_t_34 = __pyx_v_g;
+            __pyx_t_35 = __pyx_v_j;
+            if (__pyx_t_34 < 0) __pyx_t_34 += __pyx_bshape_0_pops;
+            if (__pyx_t_35 < 0) __pyx_t_35 += __pyx_bshape_1_pops;
+            __pyx_t_36 = __pyx_v_g;
+            __pyx_t_37 = __pyx_v_j;
+            if (__pyx_t_36 < 0) __pyx_t_36 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_37 < 0) __pyx_t_37 += __pyx_bshape_1_payoffs;
+            __pyx_v_avg_payoff = (__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_34, __pyx_bstride_0_pops, __pyx_t_35, __pyx_bstride_1_pops)) * (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_36, __pyx_bstride_0_payoffs, __pyx_t_37, __pyx_bstride_1_payoffs))));
+          }
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":515
+ *                 payoffs[g, j] = payoffs[g, j] / arityf
+ *                 avg_payoff = avg_payoff + pops[g, j] * payoffs[g, j]
+ *             if background_rate + avg_payoff == 0.:             # <<<<<<<<<<<<<<
+ *                 degenerate = 1
+ * 
+ */
+          __pyx_t_15 = ((__pyx_v_background_rate + __pyx_v_avg_payoff) == 0.);
+          if (__pyx_t_15) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":516
+ *                 avg_payoff = avg_payoff + pops[g, j] * payoffs[g, j]
+ *             if background_rate + avg_payoff == 0.:
+ *                 degenerate = 1             # <<<<<<<<<<<<<<
+ * 
+ *             same = 1
+ */
+            __pyx_v_degenerate = 1;
+            goto __pyx_L17;
+          }
+          __pyx_L17:;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":518
+ *                 degenerate = 1
+ * 
+ *             same = 1             # <<<<<<<<<<<<<<
+ *             for j from 0 <= j < types:
+ *                 tmp = pops[g, j] * (background_rate + payoffs[g, j]) / (background_rate + avg_payoff)
+ */
+          __pyx_v_same = 1;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":519
+ * 
+ *             same = 1
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 tmp = pops[g, j] * (background_rate + payoffs[g, j]) / (background_rate + avg_payoff)
+ *                 newpop[g, j + 1] = tmp
+ */
+          __pyx_t_9 = __pyx_v_types;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":520
+ *             same = 1
+ *             for j from 0 <= j < types:
+ *                 tmp = pops[g, j] * (background_rate + payoffs[g, j]) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *                 newpop[g, j + 1] = tmp
+ *                 diff = tmp - pops[g, j]
+ */
+            __pyx_t_38 = __pyx_v_g;
+            __pyx_t_39 = __pyx_v_j;
+            if (__pyx_t_38 < 0) __pyx_t_38 += __pyx_bshape_0_pops;
+            if (__pyx_t_39 < 0) __pyx_t_39 += __pyx_bshape_1_pops;
+            __pyx_t_40 = __pyx_v_g;
+            __pyx_t_41 = __pyx_v_j;
+            if (__pyx_t_40 < 0) __pyx_t_40 += __pyx_bshape_0_payoffs;
+            if (__pyx_t_41 < 0) __pyx_t_41 += __pyx_bshape_1_payoffs;
+            __pyx_v_tmp = (((*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_38, __pyx_bstride_0_pops, __pyx_t_39, __pyx_bstride_1_pops)) * (__pyx_v_background_rate + (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_40, __pyx_bstride_0_payoffs, __pyx_t_41, __pyx_bstride_1_payoffs)))) / (__pyx_v_background_rate + __pyx_v_avg_payoff));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":521
+ *             for j from 0 <= j < types:
+ *                 tmp = pops[g, j] * (background_rate + payoffs[g, j]) / (background_rate + avg_payoff)
+ *                 newpop[g, j + 1] = tmp             # <<<<<<<<<<<<<<
+ *                 diff = tmp - pops[g, j]
+ *                 if diff < neg_effective_zero or diff > effective_zero:
+ */
+            __pyx_t_42 = __pyx_v_g;
+            __pyx_t_43 = (__pyx_v_j + 1);
+            if (__pyx_t_42 < 0) __pyx_t_42 += __pyx_bshape_0_newpop;
+            if (__pyx_t_43 < 0) __pyx_t_43 += __pyx_bshape_1_newpop;
+            *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_42, __pyx_bstride_0_newpop, __pyx_t_43, __pyx_bstride_1_newpop) = __pyx_v_tmp;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":522
+ *                 tmp = pops[g, j] * (background_rate + payoffs[g, j]) / (background_rate + avg_payoff)
+ *                 newpop[g, j + 1] = tmp
+ *                 diff = tmp - pops[g, j]             # <<<<<<<<<<<<<<
+ *                 if diff < neg_effective_zero or diff > effective_zero:
+ *                     same = 0
+ */
+            __pyx_t_44 = __pyx_v_g;
+            __pyx_t_45 = __pyx_v_j;
+            if (__pyx_t_44 < 0) __pyx_t_44 += __pyx_bshape_0_pops;
+            if (__pyx_t_45 < 0) __pyx_t_45 += __pyx_bshape_1_pops;
+            __pyx_v_diff = (__pyx_v_tmp - (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_44, __pyx_bstride_0_pops, __pyx_t_45, __pyx_bstride_1_pops)));
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":523
+ *                 newpop[g, j + 1] = tmp
+ *                 diff = tmp - pops[g, j]
+ *                 if diff < neg_effective_zero or diff > effective_zero:             # <<<<<<<<<<<<<<
+ *                     same = 0
+ * 
+ */
+            __pyx_t_15 = (__pyx_v_diff < __pyx_v_neg_effective_zero);
+            if (!__pyx_t_15) {
+              __pyx_t_46 = (__pyx_v_diff > __pyx_v_effective_zero);
+              __pyx_t_47 = __pyx_t_46;
+            } else {
+              __pyx_t_47 = __pyx_t_15;
+            }
+            if (__pyx_t_47) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":524
+ *                 diff = tmp - pops[g, j]
+ *                 if diff < neg_effective_zero or diff > effective_zero:
+ *                     same = 0             # <<<<<<<<<<<<<<
+ * 
+ *             newpop[g, 0] = <np.float64_t>same
+ */
+              __pyx_v_same = 0;
+              goto __pyx_L20;
+            }
+            __pyx_L20:;
+          }
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":526
+ *                     same = 0
+ * 
+ *             newpop[g, 0] = <np.float64_t>same             # <<<<<<<<<<<<<<
+ * 
+ *     if degenerate:
+ */
+          __pyx_t_9 = __pyx_v_g;
+          __pyx_t_48 = 0;
+          if (__pyx_t_9 < 0) __pyx_t_9 += __pyx_bshape_0_newpop;
+          if (__pyx_t_48 < 0) __pyx_t_48 += __pyx_bshape_1_newpop;
+          *__Pyx_BufPtrStrided2d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_9, __pyx_bstride_0_newpop, __pyx_t_48, __pyx_bstride_1_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_v_same);
+        }
+      }
+
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":498
+ *     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_games, types + 1), dtype=np.float64)
+ * 
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         for g from 0 <= g < num_games:
+ *             #go over each possible profile of strategies for this game
+ */
+      /*finally:*/ {
+        Py_BLOCK_THREADS
+      }
+  }
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":528
+ *             newpop[g, 0] = <np.float64_t>same
+ * 
+ *     if degenerate:             # <<<<<<<<<<<<<<
+ *         raise ZeroDivisionError("float division")
+ * 
+ */
+  if (__pyx_v_degenerate) {
+
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":529
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+    __pyx_t_1 = PyObject_Call(__pyx_builtin_ZeroDivisionError, ((PyObject *)__pyx_k_tuple_12), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 529; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_Raise(__pyx_t_1, 0, 0, 0);
+    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+    {__pyx_filename = __pyx_f[0]; __pyx_lineno = 529; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    goto __pyx_L21;
+  }
+  __pyx_L21:;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":531
+ *         raise ZeroDivisionError("float division")
+ * 
+ *     return newpop             # <<<<<<<<<<<<<<
+ * 
+ * 
+ */
+  __Pyx_XDECREF(((PyObject *)__pyx_r));
+  __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
+  __pyx_r = ((PyArrayObject *)__pyx_v_newpop);
+  goto __pyx_L0;
+
+  __pyx_r = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_batch_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
+  __pyx_L2:;
+  __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
+  __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
+  __Pyx_XGIVEREF((PyObject *)__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":479
+ * 
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=2] one_dimensional_batch_step(np.ndarray[np.float64_t, ndim=2] pops,             # <<<<<<<<<<<<<<
+ *                                                                   np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                   np.ndarray[np.float64_t, ndim=3] profile_payoffs,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_9one_dimensional_batch_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_9one_dimensional_batch_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pops = 0;
+  PyArrayObject *__pyx_v_profiles = 0;
+  PyArrayObject *__pyx_v_profile_payoffs = 0;
+  __pyx_t_5numpy_int_t __pyx_v_arity;
+  __pyx_t_5numpy_float64_t __pyx_v_background_rate;
+  __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
+  Py_buffer __pyx_bstruct_profile_payoffs;
+  Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_2_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_2_profile_payoffs = 0;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_pops;
+  Py_ssize_t __pyx_bstride_0_pops = 0;
+  Py_ssize_t __pyx_bstride_1_pops = 0;
+  Py_ssize_t __pyx_bshape_0_pops = 0;
+  Py_ssize_t __pyx_bshape_1_pops = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pops,&__pyx_n_s__profiles,&__pyx_n_s__profile_payoffs,&__pyx_n_s__arity,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("one_dimensional_batch_step");
+  __pyx_self = __pyx_self;
+  {
+    PyObject* values[6] = {0,0,0,0,0,0};
+    if (unlikely(__pyx_kwds)) {
+      Py_ssize_t kw_args;
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  6: values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+        case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+        case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+        case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+        case  2: values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+        case  1: values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      kw_args = PyDict_Size(__pyx_kwds);
+      switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case  0:
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pops);
+        if (likely(values[0])) kw_args--;
+        else goto __pyx_L5_argtuple_error;
+        case  1:
+        values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profiles);
+        if (likely(values[1])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_batch_step", 1, 6, 6, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  2:
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_payoffs);
+        if (likely(values[2])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_batch_step", 1, 6, 6, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  3:
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__arity);
+        if (likely(values[3])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_batch_step", 1, 6, 6, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  4:
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
+        if (likely(values[4])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_batch_step", 1, 6, 6, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+        case  5:
+        values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
+        if (likely(values[5])) kw_args--;
+        else {
+          __Pyx_RaiseArgtupleInvalid("one_dimensional_batch_step", 1, 6, 6, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        }
+      }
+      if (unlikely(kw_args > 0)) {
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "one_dimensional_batch_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+      }
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 6) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
+      values[1] = PyTuple_GET_ITEM(__pyx_args, 1);
+      values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
+      values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
+      values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
+      values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
+    }
+    __pyx_v_pops = ((PyArrayObject *)values[0]);
+    __pyx_v_profiles = ((PyArrayObject *)values[1]);
+    __pyx_v_profile_payoffs = ((PyArrayObject *)values[2]);
+    __pyx_v_arity = __Pyx_PyInt_from_py_npy_long(values[3]); if (unlikely((__pyx_v_arity == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 482; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[4]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 483; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[5]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 484; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  }
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("one_dimensional_batch_step", 1, 6, 6, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __pyx_L3_error:;
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_batch_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_bstruct_pops.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_profile_payoffs.buf = NULL;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pops), __pyx_ptype_5numpy_ndarray, 1, "pops", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 480; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profile_payoffs), __pyx_ptype_5numpy_ndarray, 1, "profile_payoffs", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 481; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pops, (PyObject*)__pyx_v_pops, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pops = __pyx_bstruct_pops.strides[0]; __pyx_bstride_1_pops = __pyx_bstruct_pops.strides[1];
+  __pyx_bshape_0_pops = __pyx_bstruct_pops.shape[0]; __pyx_bshape_1_pops = __pyx_bstruct_pops.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 3, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1]; __pyx_bstride_2_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[2];
+  __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1]; __pyx_bshape_2_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[2];
+  __Pyx_XDECREF(__pyx_r);
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_one_dimensional_batch_step(__pyx_v_pops, __pyx_v_profiles, __pyx_v_profile_payoffs, __pyx_v_arity, __pyx_v_background_rate, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 479; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_r = __pyx_t_1;
+  __pyx_t_1 = 0;
+  goto __pyx_L0;
+
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
+    __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
+  __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.one_dimensional_batch_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  goto __pyx_L2;
+  __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
+  __pyx_L2:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "simulations/dynamics/replicator_fastfuncs.pyx":535
+ * 
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=3] n_dimensional_batch_step(np.ndarray[np.float64_t, ndim=3] pops,             # <<<<<<<<<<<<<<
+ *                                                                 np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                 np.ndarray[np.float64_t, ndim=3] profile_payoffs,
+ */
+
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_10n_dimensional_batch_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_batch_step(PyArrayObject *__pyx_v_pops, PyArrayObject *__pyx_v_profiles, PyArrayObject *__pyx_v_profile_payoffs, __pyx_t_5numpy_float64_t __pyx_v_background_rate, __pyx_t_5numpy_float64_t __pyx_v_effective_zero, int __pyx_skip_dispatch) {
+  int __pyx_v_g;
+  int __pyx_v_i;
+  int __pyx_v_j;
+  int __pyx_v_k;
+  int __pyx_v_same;
+  int __pyx_v_degenerate;
+  int __pyx_v_num_games;
+  int __pyx_v_num_pops;
+  int __pyx_v_types;
+  int __pyx_v_num_profiles;
+  int __pyx_v_profile_size;
+  __pyx_t_5numpy_float64_t __pyx_v_profile_prob;
+  __pyx_t_5numpy_float64_t __pyx_v_avg_payoff;
+  __pyx_t_5numpy_float64_t __pyx_v_diff;
+  __pyx_t_5numpy_float64_t __pyx_v_tmp;
+  __pyx_t_5numpy_float64_t __pyx_v_neg_effective_zero;
+  PyArrayObject *__pyx_v_payoffs = 0;
+  PyArrayObject *__pyx_v_newpop = 0;
+  Py_buffer __pyx_bstruct_profile_payoffs;
+  Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_2_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bshape_2_profile_payoffs = 0;
+  Py_buffer __pyx_bstruct_pops;
+  Py_ssize_t __pyx_bstride_0_pops = 0;
+  Py_ssize_t __pyx_bstride_1_pops = 0;
+  Py_ssize_t __pyx_bstride_2_pops = 0;
+  Py_ssize_t __pyx_bshape_0_pops = 0;
+  Py_ssize_t __pyx_bshape_1_pops = 0;
+  Py_ssize_t __pyx_bshape_2_pops = 0;
+  Py_buffer __pyx_bstruct_newpop;
+  Py_ssize_t __pyx_bstride_0_newpop = 0;
+  Py_ssize_t __pyx_bstride_1_newpop = 0;
+  Py_ssize_t __pyx_bstride_2_newpop = 0;
+  Py_ssize_t __pyx_bshape_0_newpop = 0;
+  Py_ssize_t __pyx_bshape_1_newpop = 0;
+  Py_ssize_t __pyx_bshape_2_newpop = 0;
+  Py_buffer __pyx_bstruct_profiles;
+  Py_ssize_t __pyx_bstride_0_profiles = 0;
+  Py_ssize_t __pyx_bstride_1_profiles = 0;
+  Py_ssize_t __pyx_bshape_0_profiles = 0;
+  Py_ssize_t __pyx_bshape_1_profiles = 0;
+  Py_buffer __pyx_bstruct_payoffs;
+  Py_ssize_t __pyx_bstride_0_payoffs = 0;
+  Py_ssize_t __pyx_bstride_1_payoffs = 0;
+  Py_ssize_t __pyx_bstride_2_payoffs = 0;
+  Py_ssize_t __pyx_bshape_0_payoffs = 0;
+  Py_ssize_t __pyx_bshape_1_payoffs = 0;
+  Py_ssize_t __pyx_bshape_2_payoffs = 0;
+  PyArrayObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyArrayObject *__pyx_t_6 = NULL;
+  PyArrayObject *__pyx_t_7 = NULL;
+  int __pyx_t_8;
+  int __pyx_t_9;
+  int __pyx_t_10;
+  int __pyx_t_11;
+  int __pyx_t_12;
+  int __pyx_t_13;
+  int __pyx_t_14;
+  __pyx_t_5numpy_int_t __pyx_t_15;
+  int __pyx_t_16;
+  int __pyx_t_17;
+  int __pyx_t_18;
+  int __pyx_t_19;
+  int __pyx_t_20;
+  __pyx_t_5numpy_int_t __pyx_t_21;
+  int __pyx_t_22;
+  int __pyx_t_23;
+  int __pyx_t_24;
+  int __pyx_t_25;
+  int __pyx_t_26;
+  int __pyx_t_27;
+  int __pyx_t_28;
+  __pyx_t_5numpy_int_t __pyx_t_29;
+  int __pyx_t_30;
+  int __pyx_t_31;
+  int __pyx_t_32;
+  int __pyx_t_33;
+  __pyx_t_5numpy_int_t __pyx_t_34;
+  int __pyx_t_35;
+  int __pyx_t_36;
+  int __pyx_t_37;
+  int __pyx_t_38;
+  int __pyx_t_39;
+  int __pyx_t_40;
+  int __pyx_t_41;
+  int __pyx_t_42;
+  int __pyx_t_43;
+  int __pyx_t_44;
+  int __pyx_t_45;
+  int __pyx_t_46;
+  int __pyx_t_47;
+  long __pyx_t_48;
+  int __pyx_t_49;
+  int __pyx_t_50;
+  int __pyx_t_51;
+  int __pyx_t_52;
+  int __pyx_t_53;
+  int __pyx_t_54;
+  long __pyx_t_55;
+  int __pyx_t_56;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("n_dimensional_batch_step");
+  __pyx_bstruct_payoffs.buf = NULL;
+  __pyx_bstruct_newpop.buf = NULL;
+  __pyx_bstruct_pops.buf = NULL;
+  __pyx_bstruct_profiles.buf = NULL;
+  __pyx_bstruct_profile_payoffs.buf = NULL;
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pops, (PyObject*)__pyx_v_pops, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 3, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_pops = __pyx_bstruct_pops.strides[0]; __pyx_bstride_1_pops = __pyx_bstruct_pops.strides[1]; __pyx_bstride_2_pops = __pyx_bstruct_pops.strides[2];
+  __pyx_bshape_0_pops = __pyx_bstruct_pops.shape[0]; __pyx_bshape_1_pops = __pyx_bstruct_pops.shape[1]; __pyx_bshape_2_pops = __pyx_bstruct_pops.shape[2];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
+  __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 3, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  }
+  __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1]; __pyx_bstride_2_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[2];
+  __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1]; __pyx_bshape_2_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[2];
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":542
+ * 
+ *     cdef int g, i, j, k, same
+ *     cdef int degenerate = 0             # <<<<<<<<<<<<<<
+ *     cdef int num_games = pops.shape[0]
+ *     cdef int num_pops = pops.shape[1]
+ */
+  __pyx_v_degenerate = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":543
+ *     cdef int g, i, j, k, same
+ *     cdef int degenerate = 0
+ *     cdef int num_games = pops.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int num_pops = pops.shape[1]
+ *     cdef int types = pops.shape[2]
+ */
+  __pyx_v_num_games = (__pyx_v_pops->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":544
+ *     cdef int degenerate = 0
+ *     cdef int num_games = pops.shape[0]
+ *     cdef int num_pops = pops.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef int types = pops.shape[2]
+ *     cdef int num_profiles = profiles.shape[0]
+ */
+  __pyx_v_num_pops = (__pyx_v_pops->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":545
+ *     cdef int num_games = pops.shape[0]
+ *     cdef int num_pops = pops.shape[1]
+ *     cdef int types = pops.shape[2]             # <<<<<<<<<<<<<<
+ *     cdef int num_profiles = profiles.shape[0]
+ *     cdef int profile_size = profiles.shape[1]
+ */
+  __pyx_v_types = (__pyx_v_pops->dimensions[2]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":546
+ *     cdef int num_pops = pops.shape[1]
+ *     cdef int types = pops.shape[2]
+ *     cdef int num_profiles = profiles.shape[0]             # <<<<<<<<<<<<<<
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ */
+  __pyx_v_num_profiles = (__pyx_v_profiles->dimensions[0]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":547
+ *     cdef int types = pops.shape[2]
+ *     cdef int num_profiles = profiles.shape[0]
+ *     cdef int profile_size = profiles.shape[1]             # <<<<<<<<<<<<<<
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ */
+  __pyx_v_profile_size = (__pyx_v_profiles->dimensions[1]);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":549
+ *     cdef int profile_size = profiles.shape[1]
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=3] payoffs = np.zeros((num_games, num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=3] newpop = np.zeros((num_games, num_pops + 1, types), dtype=np.float64)
+ */
+  __pyx_v_neg_effective_zero = (-1.0 * __pyx_v_effective_zero);
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":550
+ *     cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=3] payoffs = np.zeros((num_games, num_pops, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ *     cdef np.ndarray[np.float64_t, ndim=3] newpop = np.zeros((num_games, num_pops + 1, types), dtype=np.float64)
+ * 
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_num_games); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_3 = PyInt_FromLong(__pyx_v_num_pops); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_5 = PyTuple_New(3); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_5));
+  PyTuple_SET_ITEM(__pyx_t_5, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_5, 1, __pyx_t_3);
+  __Pyx_GIVEREF(__pyx_t_3);
+  PyTuple_SET_ITEM(__pyx_t_5, 2, __pyx_t_4);
+  __Pyx_GIVEREF(__pyx_t_4);
+  __pyx_t_1 = 0;
+  __pyx_t_3 = 0;
+  __pyx_t_4 = 0;
+  __pyx_t_4 = PyTuple_New(1); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_4));
+  PyTuple_SET_ITEM(__pyx_t_4, 0, ((PyObject *)__pyx_t_5));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_5));
+  __pyx_t_5 = 0;
+  __pyx_t_5 = PyDict_New(); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_5));
+  __pyx_t_3 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_3, __pyx_n_s__float64); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
+  if (PyDict_SetItem(__pyx_t_5, ((PyObject *)__pyx_n_s__dtype), __pyx_t_1) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyEval_CallObjectWithKeywords(__pyx_t_2, ((PyObject *)__pyx_t_4), ((PyObject *)__pyx_t_5)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_4)); __pyx_t_4 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_5)); __pyx_t_5 = 0;
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_6 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_payoffs, (PyObject*)__pyx_t_6, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 3, 0, __pyx_stack) == -1)) {
+      __pyx_v_payoffs = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_payoffs.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 550; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_payoffs = __pyx_bstruct_payoffs.strides[0]; __pyx_bstride_1_payoffs = __pyx_bstruct_payoffs.strides[1]; __pyx_bstride_2_payoffs = __pyx_bstruct_payoffs.strides[2];
+      __pyx_bshape_0_payoffs = __pyx_bstruct_payoffs.shape[0]; __pyx_bshape_1_payoffs = __pyx_bstruct_payoffs.shape[1]; __pyx_bshape_2_payoffs = __pyx_bstruct_payoffs.shape[2];
+    }
+  }
+  __pyx_t_6 = 0;
+  __pyx_v_payoffs = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":551
+ *     cdef np.float64_t neg_effective_zero = -1 * effective_zero
+ *     cdef np.ndarray[np.float64_t, ndim=3] payoffs = np.zeros((num_games, num_pops, types), dtype=np.float64)
+ *     cdef np.ndarray[np.float64_t, ndim=3] newpop = np.zeros((num_games, num_pops + 1, types), dtype=np.float64)             # <<<<<<<<<<<<<<
+ * 
+ *     with nogil:
+ */
+  __pyx_t_1 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_5 = PyObject_GetAttr(__pyx_t_1, __pyx_n_s__zeros); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_5);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyInt_FromLong(__pyx_v_num_games); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_4 = PyInt_FromLong((__pyx_v_num_pops + 1)); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_2 = PyInt_FromLong(__pyx_v_types); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_2);
+  __pyx_t_3 = PyTuple_New(3); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_1);
+  __Pyx_GIVEREF(__pyx_t_1);
+  PyTuple_SET_ITEM(__pyx_t_3, 1, __pyx_t_4);
+  __Pyx_GIVEREF(__pyx_t_4);
+  PyTuple_SET_ITEM(__pyx_t_3, 2, __pyx_t_2);
+  __Pyx_GIVEREF(__pyx_t_2);
+  __pyx_t_1 = 0;
+  __pyx_t_4 = 0;
+  __pyx_t_2 = 0;
+  __pyx_t_2 = PyTuple_New(1); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_2));
+  PyTuple_SET_ITEM(__pyx_t_2, 0, ((PyObject *)__pyx_t_3));
+  __Pyx_GIVEREF(((PyObject *)__pyx_t_3));
+  __pyx_t_3 = 0;
+  __pyx_t_3 = PyDict_New(); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_t_3));
+  __pyx_t_4 = __Pyx_GetName(__pyx_m, __pyx_n_s__np); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_1 = PyObject_GetAttr(__pyx_t_4, __pyx_n_s__float64); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  if (PyDict_SetItem(__pyx_t_3, ((PyObject *)__pyx_n_s__dtype), __pyx_t_1) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_t_1 = PyEval_CallObjectWithKeywords(__pyx_t_5, ((PyObject *)__pyx_t_2), ((PyObject *)__pyx_t_3)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_1);
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_2)); __pyx_t_2 = 0;
+  __Pyx_DECREF(((PyObject *)__pyx_t_3)); __pyx_t_3 = 0;
+  if (!(likely(((__pyx_t_1) == Py_None) || likely(__Pyx_TypeTest(__pyx_t_1, __pyx_ptype_5numpy_ndarray))))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_7 = ((PyArrayObject *)__pyx_t_1);
+  {
+    __Pyx_BufFmt_StackElem __pyx_stack[1];
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_newpop, (PyObject*)__pyx_t_7, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES| PyBUF_WRITABLE, 3, 0, __pyx_stack) == -1)) {
+      __pyx_v_newpop = ((PyArrayObject *)Py_None); __Pyx_INCREF(Py_None); __pyx_bstruct_newpop.buf = NULL;
+      {__pyx_filename = __pyx_f[0]; __pyx_lineno = 551; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    } else {__pyx_bstride_0_newpop = __pyx_bstruct_newpop.strides[0]; __pyx_bstride_1_newpop = __pyx_bstruct_newpop.strides[1]; __pyx_bstride_2_newpop = __pyx_bstruct_newpop.strides[2];
+      __pyx_bshape_0_newpop = __pyx_bstruct_newpop.shape[0]; __pyx_bshape_1_newpop = __pyx_bstruct_newpop.shape[1]; __pyx_bshape_2_newpop = __pyx_bstruct_newpop.shape[2];
+    }
+  }
+  __pyx_t_7 = 0;
+  __pyx_v_newpop = ((PyArrayObject *)__pyx_t_1);
+  __pyx_t_1 = 0;
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":244
- *         for j from 0 <= j < types:
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]             # <<<<<<<<<<<<<<
- *             avg_payoffs[i] = avg_payoffs[i] + (contrib * contrib2)
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":553
+ *     cdef np.ndarray[np.float64_t, ndim=3] newpop = np.zeros((num_games, num_pops + 1, types), dtype=np.float64)
  * 
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         for g from 0 <= g < num_games:
+ *             #go over each possible profile of strategies for this game
  */
-      __pyx_v_contrib2 = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_i, __pyx_v_j))[0]);
+  {
+      #ifdef WITH_THREAD
+      PyThreadState *_save = NULL;
+      #endif
+      Py_UNBLOCK_THREADS
+      /*try:*/ {
+
+        /* "simulations/dynamics/replicator_fastfuncs.pyx":554
+ * 
+ *     with nogil:
+ *         for g from 0 <= g < num_games:             # <<<<<<<<<<<<<<
+ *             #go over each possible profile of strategies for this game
+ *             for i from 0 <= i < num_profiles:
+ */
+        __pyx_t_8 = __pyx_v_num_games;
+        for (__pyx_v_g = 0; __pyx_v_g < __pyx_t_8; __pyx_v_g++) {
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":556
+ *         for g from 0 <= g < num_games:
+ *             #go over each possible profile of strategies for this game
+ *             for i from 0 <= i < num_profiles:             # <<<<<<<<<<<<<<
+ *                 profile_prob = 1.
+ *                 for j from 0 <= j < profile_size:
+ */
+          __pyx_t_9 = __pyx_v_num_profiles;
+          for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_9; __pyx_v_i++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":557
+ *             #go over each possible profile of strategies for this game
+ *             for i from 0 <= i < num_profiles:
+ *                 profile_prob = 1.             # <<<<<<<<<<<<<<
+ *                 for j from 0 <= j < profile_size:
+ *                     profile_prob = profile_prob * pops[g, j, profiles[i, j]]
+ */
+            __pyx_v_profile_prob = 1.;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":558
+ *             for i from 0 <= i < num_profiles:
+ *                 profile_prob = 1.
+ *                 for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                     profile_prob = profile_prob * pops[g, j, profiles[i, j]]
+ * 
+ */
+            __pyx_t_10 = __pyx_v_profile_size;
+            for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_10; __pyx_v_j++) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":559
+ *                 profile_prob = 1.
+ *                 for j from 0 <= j < profile_size:
+ *                     profile_prob = profile_prob * pops[g, j, profiles[i, j]]             # <<<<<<<<<<<<<<
+ * 
+ *                 if profile_prob > 0.:
+ */
+              __pyx_t_11 = __pyx_v_i;
+              __pyx_t_12 = __pyx_v_j;
+              if (__pyx_t_11 < 0) __pyx_t_11 += __pyx_bshape_0_profiles;
+              if (__pyx_t_12 < 0) __pyx_t_12 += __pyx_bshape_1_profiles;
+              __pyx_t_13 = __pyx_v_g;
+              __pyx_t_14 = __pyx_v_j;
+              __pyx_t_15 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_11, __pyx_bstride_0_profiles, __pyx_t_12, __pyx_bstride_1_profiles));
+              if (__pyx_t_13 < 0) __pyx_t_13 += __pyx_bshape_0_pops;
+              if (__pyx_t_14 < 0) __pyx_t_14 += __pyx_bshape_1_pops;
+              if (__pyx_t_15 < 0) __pyx_t_15 += __pyx_bshape_2_pops;
+              __pyx_v_profile_prob = (__pyx_v_profile_prob * (*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_13, __pyx_bstride_0_pops, __pyx_t_14, __pyx_bstride_1_pops, __pyx_t_15, __pyx_bstride_2_pops)));
+            }
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":245
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
- *             avg_payoffs[i] = avg_payoffs[i] + (contrib * contrib2)             # <<<<<<<<<<<<<<
- * 
- *         for j from 0 <= j < types:
- */
-      __pyx_t_19 = __pyx_v_i;
-      if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_avg_payoffs;
-      __pyx_t_20 = __pyx_v_i;
-      if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_0_avg_payoffs;
-      *__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_20, __pyx_bstride_0_avg_payoffs) = ((*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_19, __pyx_bstride_0_avg_payoffs)) + (__pyx_v_contrib * __pyx_v_contrib2));
-    }
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":561
+ *                     profile_prob = profile_prob * pops[g, j, profiles[i, j]]
+ * 
+ *                 if profile_prob > 0.:             # <<<<<<<<<<<<<<
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, j, profiles[i, j]] = payoffs[g, j, profiles[i, j]] + \
+ */
+            __pyx_t_16 = (__pyx_v_profile_prob > 0.);
+            if (__pyx_t_16) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":562
+ * 
+ *                 if profile_prob > 0.:
+ *                     for j from 0 <= j < profile_size:             # <<<<<<<<<<<<<<
+ *                         payoffs[g, j, profiles[i, j]] = payoffs[g, j, profiles[i, j]] + \
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, j, profiles[i, j]]
+ */
+              __pyx_t_10 = __pyx_v_profile_size;
+              for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_10; __pyx_v_j++) {
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":563
+ *                 if profile_prob > 0.:
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, j, profiles[i, j]] = payoffs[g, j, profiles[i, j]] + \             # <<<<<<<<<<<<<<
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, j, profiles[i, j]]
+ * 
+ */
+                __pyx_t_17 = __pyx_v_i;
+                __pyx_t_18 = __pyx_v_j;
+                if (__pyx_t_17 < 0) __pyx_t_17 += __pyx_bshape_0_profiles;
+                if (__pyx_t_18 < 0) __pyx_t_18 += __pyx_bshape_1_profiles;
+                __pyx_t_19 = __pyx_v_g;
+                __pyx_t_20 = __pyx_v_j;
+                __pyx_t_21 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_17, __pyx_bstride_0_profiles, __pyx_t_18, __pyx_bstride_1_profiles));
+                if (__pyx_t_19 < 0) __pyx_t_19 += __pyx_bshape_0_payoffs;
+                if (__pyx_t_20 < 0) __pyx_t_20 += __pyx_bshape_1_payoffs;
+                if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_2_payoffs;
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":564
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, j, profiles[i, j]] = payoffs[g, j, profiles[i, j]] + \
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, j, profiles[i, j]]             # <<<<<<<<<<<<<<
+ * 
+ *             same = 1
+ */
+                __pyx_t_22 = __pyx_v_g;
+                __pyx_t_23 = __pyx_v_i;
+                __pyx_t_24 = __pyx_v_j;
+                if (__pyx_t_22 < 0) __pyx_t_22 += __pyx_bshape_0_profile_payoffs;
+                if (__pyx_t_23 < 0) __pyx_t_23 += __pyx_bshape_1_profile_payoffs;
+                if (__pyx_t_24 < 0) __pyx_t_24 += __pyx_bshape_2_profile_payoffs;
+                __pyx_t_25 = __pyx_v_i;
+                __pyx_t_26 = __pyx_v_j;
+                if (__pyx_t_25 < 0) __pyx_t_25 += __pyx_bshape_0_profiles;
+                if (__pyx_t_26 < 0) __pyx_t_26 += __pyx_bshape_1_profiles;
+                __pyx_t_27 = __pyx_v_g;
+                __pyx_t_28 = __pyx_v_j;
+                __pyx_t_29 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_25, __pyx_bstride_0_profiles, __pyx_t_26, __pyx_bstride_1_profiles));
+                if (__pyx_t_27 < 0) __pyx_t_27 += __pyx_bshape_0_pops;
+                if (__pyx_t_28 < 0) __pyx_t_28 += __pyx_bshape_1_pops;
+                if (__pyx_t_29 < 0) __pyx_t_29 += __pyx_bshape_2_pops;
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":563
+ *                 if profile_prob > 0.:
+ *                     for j from 0 <= j < profile_size:
+ *                         payoffs[g, j, profiles[i, j]] = payoffs[g, j, profiles[i, j]] + \             # <<<<<<<<<<<<<<
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, j, profiles[i, j]]
+ * 
+ */
+                __pyx_t_30 = __pyx_v_i;
+                __pyx_t_31 = __pyx_v_j;
+                if (__pyx_t_30 < 0) __pyx_t_30 += __pyx_bshape_0_profiles;
+                if (__pyx_t_31 < 0) __pyx_t_31 += __pyx_bshape_1_profiles;
+                __pyx_t_32 = __pyx_v_g;
+                __pyx_t_33 = __pyx_v_j;
+                __pyx_t_34 = (*__Pyx_BufPtrStrided2d(__pyx_t_5numpy_int_t *, __pyx_bstruct_profiles.buf, __pyx_t_30, __pyx_bstride_0_profiles, __pyx_t_31, __pyx_bstride_1_profiles));
+                if (__pyx_t_32 < 0) __pyx_t_32 += __pyx_bshape_0_payoffs;
+                if (__pyx_t_33 < 0) __pyx_t_33 += __pyx_bshape_1_payoffs;
+                if (__pyx_t_34 < 0) __pyx_t_34 += __pyx_bshape_2_payoffs;
+                *__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_32, __pyx_bstride_0_payoffs, __pyx_t_33, __pyx_bstride_1_payoffs, __pyx_t_34, __pyx_bstride_2_payoffs) = ((*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_19, __pyx_bstride_0_payoffs, __pyx_t_20, __pyx_bstride_1_payoffs, __pyx_t_21, __pyx_bstride_2_payoffs)) + (((*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_profile_payoffs.buf, __pyx_t_22, __pyx_bstride_0_profile_payoffs, __pyx_t_23, __pyx_bstride_1_profile_payoffs, __pyx_t_24, __pyx_bstride_2_profile_payoffs)) * __pyx_v_profile_prob) / (*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_27, __pyx_bstride_0_pops, __pyx_t_28, __pyx_bstride_1_pops, __pyx_t_29, __pyx_bstride_2_pops))));
+              }
+              goto __pyx_L12;
+            }
+            __pyx_L12:;
+          }
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":566
+ *                             profile_payoffs[g, i, j] * profile_prob / pops[g, j, profiles[i, j]]
+ * 
+ *             same = 1             # <<<<<<<<<<<<<<
+ *             for k from 0 <= k < num_pops:
+ *                 avg_payoff = <np.float64_t>0
+ */
+          __pyx_v_same = 1;
+
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":567
+ * 
+ *             same = 1
+ *             for k from 0 <= k < num_pops:             # <<<<<<<<<<<<<<
+ *                 avg_payoff = <np.float64_t>0
+ *                 for j from 0 <= j < types:
+ */
+          __pyx_t_9 = __pyx_v_num_pops;
+          for (__pyx_v_k = 0; __pyx_v_k < __pyx_t_9; __pyx_v_k++) {
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":568
+ *             same = 1
+ *             for k from 0 <= k < num_pops:
+ *                 avg_payoff = <np.float64_t>0             # <<<<<<<<<<<<<<
+ *                 for j from 0 <= j < types:
+ *                     avg_payoff = avg_payoff + pops[g, k, j] * payoffs[g, k, j]
+ */
+            __pyx_v_avg_payoff = ((__pyx_t_5numpy_float64_t)0);
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":569
+ *             for k from 0 <= k < num_pops:
+ *                 avg_payoff = <np.float64_t>0
+ *                 for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                     avg_payoff = avg_payoff + pops[g, k, j] * payoffs[g, k, j]
+ *                 if background_rate + avg_payoff == 0.:
+ */
+            __pyx_t_10 = __pyx_v_types;
+            for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_10; __pyx_v_j++) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":570
+ *                 avg_payoff = <np.float64_t>0
+ *                 for j from 0 <= j < types:
+ *                     avg_payoff = avg_payoff + pops[g, k, j] * payoffs[g, k, j]             # <<<<<<<<<<<<<<
+ *                 if background_rate + avg_payoff == 0.:
+ *                     degenerate = 1
+ */
+              __pyx_t_35 = __pyx_v_g;
+              __pyx_t_36 = __pyx_v_k;
+              __pyx_t_37 = __pyx_v_j;
+              if (__pyx_t_35 < 0) __pyx_t_35 += __pyx_bshape_0_pops;
+              if (__pyx_t_36 < 0) __pyx_t_36 += __pyx_bshape_1_pops;
+              if (__pyx_t_37 < 0) __pyx_t_37 += __pyx_bshape_2_pops;
+              __pyx_t_38 = __pyx_v_g;
+              __pyx_t_39 = __pyx_v_k;
+              __pyx_t_40 = __pyx_v_j;
+              if (__pyx_t_38 < 0) __pyx_t_38 += __pyx_bshape_0_payoffs;
+              if (__pyx_t_39 < 0) __pyx_t_39 += __pyx_bshape_1_payoffs;
+              if (__pyx_t_40 < 0) __pyx_t_40 += __pyx_bshape_2_payoffs;
+              __pyx_v_avg_payoff = (__pyx_v_avg_payoff + ((*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_35, __pyx_bstride_0_pops, __pyx_t_36, __pyx_bstride_1_pops, __pyx_t_37, __pyx_bstride_2_pops)) * (*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_38, __pyx_bstride_0_payoffs, __pyx_t_39, __pyx_bstride_1_payoffs, __pyx_t_40, __pyx_bstride_2_payoffs))));
+            }
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":247
- *             avg_payoffs[i] = avg_payoffs[i] + (contrib * contrib2)
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":571
+ *                 for j from 0 <= j < types:
+ *                     avg_payoff = avg_payoff + pops[g, k, j] * payoffs[g, k, j]
+ *                 if background_rate + avg_payoff == 0.:             # <<<<<<<<<<<<<<
+ *                     degenerate = 1
  * 
- *         for j from 0 <= j < types:             # <<<<<<<<<<<<<<
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
  */
-    __pyx_t_18 = __pyx_v_types;
-    for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_18; __pyx_v_j++) {
+            __pyx_t_16 = ((__pyx_v_background_rate + __pyx_v_avg_payoff) == 0.);
+            if (__pyx_t_16) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":248
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":572
+ *                     avg_payoff = avg_payoff + pops[g, k, j] * payoffs[g, k, j]
+ *                 if background_rate + avg_payoff == 0.:
+ *                     degenerate = 1             # <<<<<<<<<<<<<<
  * 
- *         for j from 0 <= j < types:
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]             # <<<<<<<<<<<<<<
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
- *             tmp = (contrib * (background_rate + contrib2) / (background_rate + avg_payoffs[i]))
+ *                 for j from 0 <= j < types:
  */
-      __pyx_v_contrib = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_pop), __pyx_v_i, __pyx_v_j))[0]);
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":249
- *         for j from 0 <= j < types:
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]             # <<<<<<<<<<<<<<
- *             tmp = (contrib * (background_rate + contrib2) / (background_rate + avg_payoffs[i]))
- *             np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR2(newpop2, i, j), tmp)
- */
-      __pyx_v_contrib2 = (((__pyx_t_5numpy_float64_t *)PyArray_GETPTR2(((PyArrayObject *)__pyx_v_payoffs), __pyx_v_i, __pyx_v_j))[0]);
-
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":250
- *             contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
- *             tmp = (contrib * (background_rate + contrib2) / (background_rate + avg_payoffs[i]))             # <<<<<<<<<<<<<<
- *             np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR2(newpop2, i, j), tmp)
- *             np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, <int>(i + 1), j), tmp)
- */
-      __pyx_t_14 = (__pyx_v_contrib * (__pyx_v_background_rate + __pyx_v_contrib2));
-      __pyx_t_21 = __pyx_v_i;
-      if (__pyx_t_21 < 0) __pyx_t_21 += __pyx_bshape_0_avg_payoffs;
-      __pyx_t_22 = (__pyx_v_background_rate + (*__Pyx_BufPtrStrided1d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_avg_payoffs.buf, __pyx_t_21, __pyx_bstride_0_avg_payoffs)));
-      if (unlikely(__pyx_t_22 == 0)) {
-        PyErr_Format(PyExc_ZeroDivisionError, "float division");
-        {__pyx_filename = __pyx_f[0]; __pyx_lineno = 250; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      }
-      __pyx_v_tmp = (__pyx_t_14 / __pyx_t_22);
+              __pyx_v_degenerate = 1;
+              goto __pyx_L19;
+            }
+            __pyx_L19:;
+
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":574
+ *                     degenerate = 1
+ * 
+ *                 for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                     tmp = pops[g, k, j] * (background_rate + payoffs[g, k, j]) / (background_rate + avg_payoff)
+ *                     newpop[g, k + 1, j] = tmp
+ */
+            __pyx_t_10 = __pyx_v_types;
+            for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_10; __pyx_v_j++) {
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":575
+ * 
+ *                 for j from 0 <= j < types:
+ *                     tmp = pops[g, k, j] * (background_rate + payoffs[g, k, j]) / (background_rate + avg_payoff)             # <<<<<<<<<<<<<<
+ *                     newpop[g, k + 1, j] = tmp
+ *                     diff = tmp - pops[g, k, j]
+ */
+              __pyx_t_41 = __pyx_v_g;
+              __pyx_t_42 = __pyx_v_k;
+              __pyx_t_43 = __pyx_v_j;
+              if (__pyx_t_41 < 0) __pyx_t_41 += __pyx_bshape_0_pops;
+              if (__pyx_t_42 < 0) __pyx_t_42 += __pyx_bshape_1_pops;
+              if (__pyx_t_43 < 0) __pyx_t_43 += __pyx_bshape_2_pops;
+              __pyx_t_44 = __pyx_v_g;
+              __pyx_t_45 = __pyx_v_k;
+              __pyx_t_46 = __pyx_v_j;
+              if (__pyx_t_44 < 0) __pyx_t_44 += __pyx_bshape_0_payoffs;
+              if (__pyx_t_45 < 0) __pyx_t_45 += __pyx_bshape_1_payoffs;
+              if (__pyx_t_46 < 0) __pyx_t_46 += __pyx_bshape_2_payoffs;
+              __pyx_v_tmp = (((*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_41, __pyx_bstride_0_pops, __pyx_t_42, __pyx_bstride_1_pops, __pyx_t_43, __pyx_bstride_2_pops)) * (__pyx_v_background_rate + (*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_payoffs.buf, __pyx_t_44, __pyx_bstride_0_payoffs, __pyx_t_45, __pyx_bstride_1_payoffs, __pyx_t_46, __pyx_bstride_2_payoffs)))) / (__pyx_v_background_rate + __pyx_v_avg_payoff));
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":576
+ *                 for j from 0 <= j < types:
+ *                     tmp = pops[g, k, j] * (background_rate + payoffs[g, k, j]) / (background_rate + avg_payoff)
+ *                     newpop[g, k + 1, j] = tmp             # <<<<<<<<<<<<<<
+ *                     diff = tmp - pops[g, k, j]
+ *                     if diff < neg_effective_zero or diff > effective_zero:
+ */
+              __pyx_t_47 = __pyx_v_g;
+              __pyx_t_48 = (__pyx_v_k + 1);
+              __pyx_t_49 = __pyx_v_j;
+              if (__pyx_t_47 < 0) __pyx_t_47 += __pyx_bshape_0_newpop;
+              if (__pyx_t_48 < 0) __pyx_t_48 += __pyx_bshape_1_newpop;
+              if (__pyx_t_49 < 0) __pyx_t_49 += __pyx_bshape_2_newpop;
+              *__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_47, __pyx_bstride_0_newpop, __pyx_t_48, __pyx_bstride_1_newpop, __pyx_t_49, __pyx_bstride_2_newpop) = __pyx_v_tmp;
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":577
+ *                     tmp = pops[g, k, j] * (background_rate + payoffs[g, k, j]) / (background_rate + avg_payoff)
+ *                     newpop[g, k + 1, j] = tmp
+ *                     diff = tmp - pops[g, k, j]             # <<<<<<<<<<<<<<
+ *                     if diff < neg_effective_zero or diff > effective_zero:
+ *                         same = 0
+ */
+              __pyx_t_50 = __pyx_v_g;
+              __pyx_t_51 = __pyx_v_k;
+              __pyx_t_52 = __pyx_v_j;
+              if (__pyx_t_50 < 0) __pyx_t_50 += __pyx_bshape_0_pops;
+              if (__pyx_t_51 < 0) __pyx_t_51 += __pyx_bshape_1_pops;
+              if (__pyx_t_52 < 0) __pyx_t_52 += __pyx_bshape_2_pops;
+              __pyx_v_diff = (__pyx_v_tmp - (*__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_pops.buf, __pyx_t_50, __pyx_bstride_0_pops, __pyx_t_51, __pyx_bstride_1_pops, __pyx_t_52, __pyx_bstride_2_pops)));
+
+              /* "simulations/dynamics/replicator_fastfuncs.pyx":578
+ *                     newpop[g, k + 1, j] = tmp
+ *                     diff = tmp - pops[g, k, j]
+ *                     if diff < neg_effective_zero or diff > effective_zero:             # <<<<<<<<<<<<<<
+ *                         same = 0
+ * 
+ */
+              __pyx_t_16 = (__pyx_v_diff < __pyx_v_neg_effective_zero);
+              if (!__pyx_t_16) {
+                __pyx_t_53 = (__pyx_v_diff > __pyx_v_effective_zero);
+                __pyx_t_54 = __pyx_t_53;
+              } else {
+                __pyx_t_54 = __pyx_t_16;
+              }
+              if (__pyx_t_54) {
+
+                /* "simulations/dynamics/replicator_fastfuncs.pyx":579
+ *                     diff = tmp - pops[g, k, j]
+ *                     if diff < neg_effective_zero or diff > effective_zero:
+ *                         same = 0             # <<<<<<<<<<<<<<
+ * 
+ *             for j from 0 <= j < types:
+ */
+                __pyx_v_same = 0;
+                goto __pyx_L22;
+              }
+              __pyx_L22:;
+            }
+          }
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":251
- *             contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
- *             tmp = (contrib * (background_rate + contrib2) / (background_rate + avg_payoffs[i]))
- *             np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR2(newpop2, i, j), tmp)             # <<<<<<<<<<<<<<
- *             np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, <int>(i + 1), j), tmp)
+          /* "simulations/dynamics/replicator_fastfuncs.pyx":581
+ *                         same = 0
+ * 
+ *             for j from 0 <= j < types:             # <<<<<<<<<<<<<<
+ *                 newpop[g, 0, j] = <np.float64_t>same
  * 
  */
-      __pyx_t_1 = PyFloat_FromDouble(__pyx_v_tmp); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 251; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_1);
-      PyArray_SETITEM(((PyArrayObject *)__pyx_v_newpop2), PyArray_GETPTR2(((PyArrayObject *)__pyx_v_newpop2), __pyx_v_i, __pyx_v_j), __pyx_t_1);
-      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+          __pyx_t_9 = __pyx_v_types;
+          for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_9; __pyx_v_j++) {
 
-      /* "simulations/dynamics/replicator_fastfuncs.pyx":252
- *             tmp = (contrib * (background_rate + contrib2) / (background_rate + avg_payoffs[i]))
- *             np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR2(newpop2, i, j), tmp)
- *             np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, <int>(i + 1), j), tmp)             # <<<<<<<<<<<<<<
+            /* "simulations/dynamics/replicator_fastfuncs.pyx":582
  * 
- *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ *             for j from 0 <= j < types:
+ *                 newpop[g, 0, j] = <np.float64_t>same             # <<<<<<<<<<<<<<
+ * 
+ *     if degenerate:
  */
-      __pyx_t_1 = PyFloat_FromDouble(__pyx_v_tmp); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 252; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_1);
-      PyArray_SETITEM(((PyArrayObject *)__pyx_v_newpop), PyArray_GETPTR2(((PyArrayObject *)__pyx_v_newpop), ((int)(__pyx_v_i + 1)), __pyx_v_j), __pyx_t_1);
-      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
-    }
-  }
+            __pyx_t_10 = __pyx_v_g;
+            __pyx_t_55 = 0;
+            __pyx_t_56 = __pyx_v_j;
+            if (__pyx_t_10 < 0) __pyx_t_10 += __pyx_bshape_0_newpop;
+            if (__pyx_t_55 < 0) __pyx_t_55 += __pyx_bshape_1_newpop;
+            if (__pyx_t_56 < 0) __pyx_t_56 += __pyx_bshape_2_newpop;
+            *__Pyx_BufPtrStrided3d(__pyx_t_5numpy_float64_t *, __pyx_bstruct_newpop.buf, __pyx_t_10, __pyx_bstride_0_newpop, __pyx_t_55, __pyx_bstride_1_newpop, __pyx_t_56, __pyx_bstride_2_newpop) = ((__pyx_t_5numpy_float64_t)__pyx_v_same);
+          }
+        }
+      }
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":254
- *             np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, <int>(i + 1), j), tmp)
+      /* "simulations/dynamics/replicator_fastfuncs.pyx":553
+ *     cdef np.ndarray[np.float64_t, ndim=3] newpop = np.zeros((num_games, num_pops + 1, types), dtype=np.float64)
  * 
- *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)             # <<<<<<<<<<<<<<
- *     for j from 0 <= j < types:
- *         np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, 0, j), tmp)
+ *     with nogil:             # <<<<<<<<<<<<<<
+ *         for g from 0 <= g < num_games:
+ *             #go over each possible profile of strategies for this game
  */
-  __pyx_v_tmp = ((__pyx_t_5numpy_float64_t)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_pop_equals(((PyArrayObject *)__pyx_v_newpop2), ((PyArrayObject *)__pyx_v_pop), __pyx_v_effective_zero));
+      /*finally:*/ {
+        Py_BLOCK_THREADS
+      }
+  }
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":255
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":584
+ *                 newpop[g, 0, j] = <np.float64_t>same
  * 
- *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
- *     for j from 0 <= j < types:             # <<<<<<<<<<<<<<
- *         np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, 0, j), tmp)
+ *     if degenerate:             # <<<<<<<<<<<<<<
+ *         raise ZeroDivisionError("float division")
  * 
  */
-  __pyx_t_17 = __pyx_v_types;
-  for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_17; __pyx_v_j++) {
+  if (__pyx_v_degenerate) {
 
-    /* "simulations/dynamics/replicator_fastfuncs.pyx":256
- *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
- *     for j from 0 <= j < types:
- *         np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, 0, j), tmp)             # <<<<<<<<<<<<<<
+    /* "simulations/dynamics/replicator_fastfuncs.pyx":585
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
  * 
  *     return newpop
  */
-    __pyx_t_1 = PyFloat_FromDouble(__pyx_v_tmp); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 256; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_1 = PyObject_Call(__pyx_builtin_ZeroDivisionError, ((PyObject *)__pyx_k_tuple_13), NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 585; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_1);
-    PyArray_SETITEM(((PyArrayObject *)__pyx_v_newpop), PyArray_GETPTR2(((PyArrayObject *)__pyx_v_newpop), 0, __pyx_v_j), __pyx_t_1);
+    __Pyx_Raise(__pyx_t_1, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+    {__pyx_filename = __pyx_f[0]; __pyx_lineno = 585; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    goto __pyx_L25;
   }
+  __pyx_L25:;
 
-  /* "simulations/dynamics/replicator_fastfuncs.pyx":258
- *         np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, 0, j), tmp)
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":587
+ *         raise ZeroDivisionError("float division")
  * 
  *     return newpop             # <<<<<<<<<<<<<<
- * 
  */
   __Pyx_XDECREF(((PyObject *)__pyx_r));
   __Pyx_INCREF(((PyObject *)__pyx_v_newpop));
@@ -3863,123 +10078,83 @@ static PyArrayObject *__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_d
   goto __pyx_L0;
   __pyx_L1_error:;
   __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
   { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
     __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_expected_contribution);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_avg_payoffs);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
   __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
-  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_batch_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
   __pyx_r = 0;
   goto __pyx_L2;
   __pyx_L0:;
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_probs);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop2);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_expected_contribution);
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_newpop);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_avg_payoffs);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_payoffs);
   __pyx_L2:;
-  __Pyx_XDECREF((PyObject *)__pyx_v_expected_contribution);
-  __Pyx_XDECREF((PyObject *)__pyx_v_profile_probs);
-  __Pyx_XDECREF((PyObject *)__pyx_v_newpop2);
   __Pyx_XDECREF((PyObject *)__pyx_v_payoffs);
   __Pyx_XDECREF((PyObject *)__pyx_v_newpop);
-  __Pyx_XDECREF((PyObject *)__pyx_v_avg_payoffs);
   __Pyx_XGIVEREF((PyObject *)__pyx_r);
   __Pyx_RefNannyFinishContext();
   return __pyx_r;
 }
 
-/* "simulations/dynamics/replicator_fastfuncs.pyx":164
+/* "simulations/dynamics/replicator_fastfuncs.pyx":535
  * 
- * 
- * cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_step(np.ndarray[np.float64_t, ndim=2] pop,             # <<<<<<<<<<<<<<
- *                                                           np.ndarray[np.int_t, ndim=2] profiles,
- *                                                           np.ndarray[np.int_t, ndim=1] sample_profile,
+ * @cython.cdivision(True)
+ * cpdef np.ndarray[np.float64_t, ndim=3] n_dimensional_batch_step(np.ndarray[np.float64_t, ndim=3] pops,             # <<<<<<<<<<<<<<
+ *                                                                 np.ndarray[np.int_t, ndim=2] profiles,
+ *                                                                 np.ndarray[np.float64_t, ndim=3] profile_payoffs,
  */
 
-static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dimensional_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
-static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dimensional_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
-  PyArrayObject *__pyx_v_pop = 0;
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_10n_dimensional_batch_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
+static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_10n_dimensional_batch_step(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
+  PyArrayObject *__pyx_v_pops = 0;
   PyArrayObject *__pyx_v_profiles = 0;
-  PyArrayObject *__pyx_v_sample_profile = 0;
   PyArrayObject *__pyx_v_profile_payoffs = 0;
-  PyArrayObject *__pyx_v_types_array = 0;
-  PyArrayObject *__pyx_v_types_array_2 = 0;
   __pyx_t_5numpy_float64_t __pyx_v_background_rate;
   __pyx_t_5numpy_float64_t __pyx_v_effective_zero;
-  PyArrayObject *__pyx_v_type_counts = 0;
-  __pyx_t_5numpy_int_t __pyx_v_num_profiles;
-  __pyx_t_5numpy_int_t __pyx_v_profile_size;
+  Py_buffer __pyx_bstruct_pops;
+  Py_ssize_t __pyx_bstride_0_pops = 0;
+  Py_ssize_t __pyx_bstride_1_pops = 0;
+  Py_ssize_t __pyx_bstride_2_pops = 0;
+  Py_ssize_t __pyx_bshape_0_pops = 0;
+  Py_ssize_t __pyx_bshape_1_pops = 0;
+  Py_ssize_t __pyx_bshape_2_pops = 0;
   Py_buffer __pyx_bstruct_profile_payoffs;
   Py_ssize_t __pyx_bstride_0_profile_payoffs = 0;
   Py_ssize_t __pyx_bstride_1_profile_payoffs = 0;
+  Py_ssize_t __pyx_bstride_2_profile_payoffs = 0;
   Py_ssize_t __pyx_bshape_0_profile_payoffs = 0;
   Py_ssize_t __pyx_bshape_1_profile_payoffs = 0;
-  Py_buffer __pyx_bstruct_types_array_2;
-  Py_ssize_t __pyx_bstride_0_types_array_2 = 0;
-  Py_ssize_t __pyx_bstride_1_types_array_2 = 0;
-  Py_ssize_t __pyx_bshape_0_types_array_2 = 0;
-  Py_ssize_t __pyx_bshape_1_types_array_2 = 0;
+  Py_ssize_t __pyx_bshape_2_profile_payoffs = 0;
   Py_buffer __pyx_bstruct_profiles;
   Py_ssize_t __pyx_bstride_0_profiles = 0;
   Py_ssize_t __pyx_bstride_1_profiles = 0;
   Py_ssize_t __pyx_bshape_0_profiles = 0;
   Py_ssize_t __pyx_bshape_1_profiles = 0;
-  Py_buffer __pyx_bstruct_types_array;
-  Py_ssize_t __pyx_bstride_0_types_array = 0;
-  Py_ssize_t __pyx_bstride_1_types_array = 0;
-  Py_ssize_t __pyx_bshape_0_types_array = 0;
-  Py_ssize_t __pyx_bshape_1_types_array = 0;
-  Py_buffer __pyx_bstruct_pop;
-  Py_ssize_t __pyx_bstride_0_pop = 0;
-  Py_ssize_t __pyx_bstride_1_pop = 0;
-  Py_ssize_t __pyx_bshape_0_pop = 0;
-  Py_ssize_t __pyx_bshape_1_pop = 0;
-  Py_buffer __pyx_bstruct_sample_profile;
-  Py_ssize_t __pyx_bstride_0_sample_profile = 0;
-  Py_ssize_t __pyx_bshape_0_sample_profile = 0;
-  Py_buffer __pyx_bstruct_type_counts;
-  Py_ssize_t __pyx_bstride_0_type_counts = 0;
-  Py_ssize_t __pyx_bshape_0_type_counts = 0;
   PyObject *__pyx_r = NULL;
   __Pyx_RefNannyDeclarations
   PyObject *__pyx_t_1 = NULL;
   int __pyx_lineno = 0;
   const char *__pyx_filename = NULL;
   int __pyx_clineno = 0;
-  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pop,&__pyx_n_s__profiles,&__pyx_n_s__sample_profile,&__pyx_n_s__profile_payoffs,&__pyx_n_s__types_array,&__pyx_n_s__types_array_2,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,&__pyx_n_s__type_counts,&__pyx_n_s__num_profiles,&__pyx_n_s__profile_size,0};
-  __Pyx_RefNannySetupContext("n_dimensional_step");
+  static PyObject **__pyx_pyargnames[] = {&__pyx_n_s__pops,&__pyx_n_s__profiles,&__pyx_n_s__profile_payoffs,&__pyx_n_s__background_rate,&__pyx_n_s__effective_zero,0};
+  __Pyx_RefNannySetupContext("n_dimensional_batch_step");
   __pyx_self = __pyx_self;
   {
-    PyObject* values[11] = {0,0,0,0,0,0,0,0,0,0,0};
+    PyObject* values[5] = {0,0,0,0,0};
     if (unlikely(__pyx_kwds)) {
       Py_ssize_t kw_args;
       switch (PyTuple_GET_SIZE(__pyx_args)) {
-        case 11: values[10] = PyTuple_GET_ITEM(__pyx_args, 10);
-        case 10: values[9] = PyTuple_GET_ITEM(__pyx_args, 9);
-        case  9: values[8] = PyTuple_GET_ITEM(__pyx_args, 8);
-        case  8: values[7] = PyTuple_GET_ITEM(__pyx_args, 7);
-        case  7: values[6] = PyTuple_GET_ITEM(__pyx_args, 6);
-        case  6: values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
         case  5: values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
         case  4: values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
         case  3: values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
@@ -3991,74 +10166,38 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dime
       kw_args = PyDict_Size(__pyx_kwds);
       switch (PyTuple_GET_SIZE(__pyx_args)) {
         case  0:
-        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pop);
+        values[0] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__pops);
         if (likely(values[0])) kw_args--;
         else goto __pyx_L5_argtuple_error;
         case  1:
         values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profiles);
         if (likely(values[1])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_batch_step", 1, 5, 5, 1); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  2:
-        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__sample_profile);
+        values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_payoffs);
         if (likely(values[2])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_batch_step", 1, 5, 5, 2); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  3:
-        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_payoffs);
+        values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
         if (likely(values[3])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_batch_step", 1, 5, 5, 3); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  4:
-        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__types_array);
+        values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
         if (likely(values[4])) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-        }
-        case  5:
-        values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__types_array_2);
-        if (likely(values[5])) kw_args--;
-        else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 5); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-        }
-        case  6:
-        values[6] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__background_rate);
-        if (likely(values[6])) kw_args--;
-        else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 6); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-        }
-        case  7:
-        values[7] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__effective_zero);
-        if (likely(values[7])) kw_args--;
-        else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 7); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-        }
-        case  8:
-        values[8] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__type_counts);
-        if (likely(values[8])) kw_args--;
-        else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 8); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-        }
-        case  9:
-        values[9] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__num_profiles);
-        if (likely(values[9])) kw_args--;
-        else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 9); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-        }
-        case 10:
-        values[10] = PyDict_GetItem(__pyx_kwds, __pyx_n_s__profile_size);
-        if (likely(values[10])) kw_args--;
-        else {
-          __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, 10); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("n_dimensional_batch_step", 1, 5, 5, 4); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
       }
       if (unlikely(kw_args > 0)) {
-        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "n_dimensional_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+        if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, PyTuple_GET_SIZE(__pyx_args), "n_dimensional_batch_step") < 0)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
       }
-    } else if (PyTuple_GET_SIZE(__pyx_args) != 11) {
+    } else if (PyTuple_GET_SIZE(__pyx_args) != 5) {
       goto __pyx_L5_argtuple_error;
     } else {
       values[0] = PyTuple_GET_ITEM(__pyx_args, 0);
@@ -4066,91 +10205,47 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dime
       values[2] = PyTuple_GET_ITEM(__pyx_args, 2);
       values[3] = PyTuple_GET_ITEM(__pyx_args, 3);
       values[4] = PyTuple_GET_ITEM(__pyx_args, 4);
-      values[5] = PyTuple_GET_ITEM(__pyx_args, 5);
-      values[6] = PyTuple_GET_ITEM(__pyx_args, 6);
-      values[7] = PyTuple_GET_ITEM(__pyx_args, 7);
-      values[8] = PyTuple_GET_ITEM(__pyx_args, 8);
-      values[9] = PyTuple_GET_ITEM(__pyx_args, 9);
-      values[10] = PyTuple_GET_ITEM(__pyx_args, 10);
     }
-    __pyx_v_pop = ((PyArrayObject *)values[0]);
+    __pyx_v_pops = ((PyArrayObject *)values[0]);
     __pyx_v_profiles = ((PyArrayObject *)values[1]);
-    __pyx_v_sample_profile = ((PyArrayObject *)values[2]);
-    __pyx_v_profile_payoffs = ((PyArrayObject *)values[3]);
-    __pyx_v_types_array = ((PyArrayObject *)values[4]);
-    __pyx_v_types_array_2 = ((PyArrayObject *)values[5]);
-    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[6]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 170; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[7]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 171; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_type_counts = ((PyArrayObject *)values[8]);
-    __pyx_v_num_profiles = __Pyx_PyInt_from_py_npy_long(values[9]); if (unlikely((__pyx_v_num_profiles == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 173; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
-    __pyx_v_profile_size = __Pyx_PyInt_from_py_npy_long(values[10]); if (unlikely((__pyx_v_profile_size == (npy_long)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 174; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_profile_payoffs = ((PyArrayObject *)values[2]);
+    __pyx_v_background_rate = __pyx_PyFloat_AsDouble(values[3]); if (unlikely((__pyx_v_background_rate == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 538; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    __pyx_v_effective_zero = __pyx_PyFloat_AsDouble(values[4]); if (unlikely((__pyx_v_effective_zero == (npy_float64)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 539; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
   }
   goto __pyx_L4_argument_unpacking_done;
   __pyx_L5_argtuple_error:;
-  __Pyx_RaiseArgtupleInvalid("n_dimensional_step", 1, 11, 11, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __Pyx_RaiseArgtupleInvalid("n_dimensional_batch_step", 1, 5, 5, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
   __pyx_L3_error:;
-  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_batch_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
   __Pyx_RefNannyFinishContext();
   return NULL;
   __pyx_L4_argument_unpacking_done:;
-  __pyx_bstruct_pop.buf = NULL;
+  __pyx_bstruct_pops.buf = NULL;
   __pyx_bstruct_profiles.buf = NULL;
-  __pyx_bstruct_sample_profile.buf = NULL;
   __pyx_bstruct_profile_payoffs.buf = NULL;
-  __pyx_bstruct_types_array.buf = NULL;
-  __pyx_bstruct_types_array_2.buf = NULL;
-  __pyx_bstruct_type_counts.buf = NULL;
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pop), __pyx_ptype_5numpy_ndarray, 1, "pop", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 165; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_sample_profile), __pyx_ptype_5numpy_ndarray, 1, "sample_profile", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 166; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profile_payoffs), __pyx_ptype_5numpy_ndarray, 1, "profile_payoffs", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 167; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array), __pyx_ptype_5numpy_ndarray, 1, "types_array", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 168; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_types_array_2), __pyx_ptype_5numpy_ndarray, 1, "types_array_2", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 169; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_type_counts), __pyx_ptype_5numpy_ndarray, 1, "type_counts", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 172; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_pops), __pyx_ptype_5numpy_ndarray, 1, "pops", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profiles), __pyx_ptype_5numpy_ndarray, 1, "profiles", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 536; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_profile_payoffs), __pyx_ptype_5numpy_ndarray, 1, "profile_payoffs", 0))) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 537; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pop, (PyObject*)__pyx_v_pop, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_pops, (PyObject*)__pyx_v_pops, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 3, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
-  __pyx_bstride_0_pop = __pyx_bstruct_pop.strides[0]; __pyx_bstride_1_pop = __pyx_bstruct_pop.strides[1];
-  __pyx_bshape_0_pop = __pyx_bstruct_pop.shape[0]; __pyx_bshape_1_pop = __pyx_bstruct_pop.shape[1];
+  __pyx_bstride_0_pops = __pyx_bstruct_pops.strides[0]; __pyx_bstride_1_pops = __pyx_bstruct_pops.strides[1]; __pyx_bstride_2_pops = __pyx_bstruct_pops.strides[2];
+  __pyx_bshape_0_pops = __pyx_bstruct_pops.shape[0]; __pyx_bshape_1_pops = __pyx_bstruct_pops.shape[1]; __pyx_bshape_2_pops = __pyx_bstruct_pops.shape[2];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profiles, (PyObject*)__pyx_v_profiles, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
   __pyx_bstride_0_profiles = __pyx_bstruct_profiles.strides[0]; __pyx_bstride_1_profiles = __pyx_bstruct_profiles.strides[1];
   __pyx_bshape_0_profiles = __pyx_bstruct_profiles.shape[0]; __pyx_bshape_1_profiles = __pyx_bstruct_profiles.shape[1];
   {
     __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_sample_profile, (PyObject*)__pyx_v_sample_profile, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  }
-  __pyx_bstride_0_sample_profile = __pyx_bstruct_sample_profile.strides[0];
-  __pyx_bshape_0_sample_profile = __pyx_bstruct_sample_profile.shape[0];
-  {
-    __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  }
-  __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1];
-  __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1];
-  {
-    __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array, (PyObject*)__pyx_v_types_array, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  }
-  __pyx_bstride_0_types_array = __pyx_bstruct_types_array.strides[0]; __pyx_bstride_1_types_array = __pyx_bstruct_types_array.strides[1];
-  __pyx_bshape_0_types_array = __pyx_bstruct_types_array.shape[0]; __pyx_bshape_1_types_array = __pyx_bstruct_types_array.shape[1];
-  {
-    __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_types_array_2, (PyObject*)__pyx_v_types_array_2, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 2, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  }
-  __pyx_bstride_0_types_array_2 = __pyx_bstruct_types_array_2.strides[0]; __pyx_bstride_1_types_array_2 = __pyx_bstruct_types_array_2.strides[1];
-  __pyx_bshape_0_types_array_2 = __pyx_bstruct_types_array_2.shape[0]; __pyx_bshape_1_types_array_2 = __pyx_bstruct_types_array_2.shape[1];
-  {
-    __Pyx_BufFmt_StackElem __pyx_stack[1];
-    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_type_counts, (PyObject*)__pyx_v_type_counts, &__Pyx_TypeInfo_nn___pyx_t_5numpy_int_t, PyBUF_FORMAT| PyBUF_STRIDES, 1, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    if (unlikely(__Pyx_GetBufferAndValidate(&__pyx_bstruct_profile_payoffs, (PyObject*)__pyx_v_profile_payoffs, &__Pyx_TypeInfo_nn___pyx_t_5numpy_float64_t, PyBUF_FORMAT| PyBUF_STRIDES, 3, 0, __pyx_stack) == -1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   }
-  __pyx_bstride_0_type_counts = __pyx_bstruct_type_counts.strides[0];
-  __pyx_bshape_0_type_counts = __pyx_bstruct_type_counts.shape[0];
+  __pyx_bstride_0_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[0]; __pyx_bstride_1_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[1]; __pyx_bstride_2_profile_payoffs = __pyx_bstruct_profile_payoffs.strides[2];
+  __pyx_bshape_0_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[0]; __pyx_bshape_1_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[1]; __pyx_bshape_2_profile_payoffs = __pyx_bstruct_profile_payoffs.shape[2];
   __Pyx_XDECREF(__pyx_r);
-  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_step(__pyx_v_pop, __pyx_v_profiles, __pyx_v_sample_profile, __pyx_v_profile_payoffs, __pyx_v_types_array, __pyx_v_types_array_2, __pyx_v_background_rate, __pyx_v_effective_zero, __pyx_v_type_counts, __pyx_v_num_profiles, __pyx_v_profile_size, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 164; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = ((PyObject *)__pyx_f_11simulations_8dynamics_20replicator_fastfuncs_n_dimensional_batch_step(__pyx_v_pops, __pyx_v_profiles, __pyx_v_profile_payoffs, __pyx_v_background_rate, __pyx_v_effective_zero, 0)); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 535; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __pyx_r = __pyx_t_1;
   __pyx_t_1 = 0;
@@ -4162,25 +10257,17 @@ static PyObject *__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dime
   __Pyx_XDECREF(__pyx_t_1);
   { PyObject *__pyx_type, *__pyx_value, *__pyx_tb;
     __Pyx_ErrFetch(&__pyx_type, &__pyx_value, &__pyx_tb);
+    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
     __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
-    __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
   __Pyx_ErrRestore(__pyx_type, __pyx_value, __pyx_tb);}
-  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_AddTraceback("simulations.dynamics.replicator_fastfuncs.n_dimensional_batch_step", __pyx_clineno, __pyx_lineno, __pyx_filename);
   __pyx_r = NULL;
   goto __pyx_L2;
   __pyx_L0:;
+  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pops);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profile_payoffs);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array_2);
   __Pyx_SafeReleaseBuffer(&__pyx_bstruct_profiles);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_types_array);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_pop);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_sample_profile);
-  __Pyx_SafeReleaseBuffer(&__pyx_bstruct_type_counts);
   __pyx_L2:;
   __Pyx_XGIVEREF(__pyx_r);
   __Pyx_RefNannyFinishContext();
@@ -4333,7 +10420,7 @@ static CYTHON_UNUSED int __pyx_pf_5numpy_7ndarray___getbuffer__(PyObject *__pyx_
  * 
  *             if ((flags & pybuf.PyBUF_F_CONTIGUOUS == pybuf.PyBUF_F_CONTIGUOUS)
  */
-    __pyx_t_4 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_9), NULL); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 211; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_4 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_15), NULL); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 211; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_4);
     __Pyx_Raise(__pyx_t_4, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
@@ -4373,7 +10460,7 @@ static CYTHON_UNUSED int __pyx_pf_5numpy_7ndarray___getbuffer__(PyObject *__pyx_
  * 
  *             info.buf = PyArray_DATA(self)
  */
-    __pyx_t_4 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_11), NULL); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_4 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_17), NULL); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_4);
     __Pyx_Raise(__pyx_t_4, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
@@ -4643,7 +10730,7 @@ static CYTHON_UNUSED int __pyx_pf_5numpy_7ndarray___getbuffer__(PyObject *__pyx_
  *                 if   t == NPY_BYTE:        f = "b"
  *                 elif t == NPY_UBYTE:       f = "B"
  */
-      __pyx_t_4 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_13), NULL); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 253; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_4 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_19), NULL); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 253; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(__pyx_t_4);
       __Pyx_Raise(__pyx_t_4, 0, 0, 0);
       __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
@@ -4883,7 +10970,7 @@ static CYTHON_UNUSED int __pyx_pf_5numpy_7ndarray___getbuffer__(PyObject *__pyx_
  */
       __pyx_t_4 = PyInt_FromLong(__pyx_v_t); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 272; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(__pyx_t_4);
-      __pyx_t_8 = PyNumber_Remainder(((PyObject *)__pyx_kp_u_14), __pyx_t_4); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 272; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_8 = PyNumber_Remainder(((PyObject *)__pyx_kp_u_20), __pyx_t_4); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 272; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(((PyObject *)__pyx_t_8));
       __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
       __pyx_t_4 = PyTuple_New(1); if (unlikely(!__pyx_t_4)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 272; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
@@ -5415,7 +11502,7 @@ static CYTHON_INLINE char *__pyx_f_5numpy__util_dtypestring(PyArray_Descr *__pyx
  * 
  *         if ((child.byteorder == '>' and little_endian) or
  */
-      __pyx_t_5 = PyObject_Call(__pyx_builtin_RuntimeError, ((PyObject *)__pyx_k_tuple_16), NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 795; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_5 = PyObject_Call(__pyx_builtin_RuntimeError, ((PyObject *)__pyx_k_tuple_22), NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 795; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(__pyx_t_5);
       __Pyx_Raise(__pyx_t_5, 0, 0, 0);
       __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
@@ -5466,7 +11553,7 @@ static CYTHON_INLINE char *__pyx_f_5numpy__util_dtypestring(PyArray_Descr *__pyx
  *             # One could encode it in the format string and have Cython
  *             # complain instead, BUT: < and > in format strings also imply
  */
-      __pyx_t_5 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_17), NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 799; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_5 = PyObject_Call(__pyx_builtin_ValueError, ((PyObject *)__pyx_k_tuple_23), NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 799; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(__pyx_t_5);
       __Pyx_Raise(__pyx_t_5, 0, 0, 0);
       __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
@@ -5571,7 +11658,7 @@ static CYTHON_INLINE char *__pyx_f_5numpy__util_dtypestring(PyArray_Descr *__pyx
  * 
  *             # Until ticket #99 is fixed, use integers to avoid warnings
  */
-        __pyx_t_3 = PyObject_Call(__pyx_builtin_RuntimeError, ((PyObject *)__pyx_k_tuple_19), NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 819; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        __pyx_t_3 = PyObject_Call(__pyx_builtin_RuntimeError, ((PyObject *)__pyx_k_tuple_25), NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 819; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
         __Pyx_GOTREF(__pyx_t_3);
         __Pyx_Raise(__pyx_t_3, 0, 0, 0);
         __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
@@ -5917,7 +12004,7 @@ static CYTHON_INLINE char *__pyx_f_5numpy__util_dtypestring(PyArray_Descr *__pyx
  *             f += 1
  *         else:
  */
-        __pyx_t_5 = PyNumber_Remainder(((PyObject *)__pyx_kp_u_14), __pyx_v_t); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 840; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        __pyx_t_5 = PyNumber_Remainder(((PyObject *)__pyx_kp_u_20), __pyx_v_t); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 840; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
         __Pyx_GOTREF(((PyObject *)__pyx_t_5));
         __pyx_t_3 = PyTuple_New(1); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 840; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
         __Pyx_GOTREF(((PyObject *)__pyx_t_3));
@@ -6126,6 +12213,13 @@ static CYTHON_INLINE PyObject *__pyx_f_5numpy_get_array_base(PyArrayObject *__py
 static PyMethodDef __pyx_methods[] = {
   {__Pyx_NAMESTR("one_dimensional_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_2one_dimensional_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
   {__Pyx_NAMESTR("n_dimensional_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_3n_dimensional_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("matrix_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_4matrix_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("one_dimensional_sparse_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_5one_dimensional_sparse_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("n_dimensional_sparse_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_6n_dimensional_sparse_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("structured_replicator_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_7structured_replicator_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("structured_imitation_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_8structured_imitation_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("one_dimensional_batch_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_9one_dimensional_batch_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
+  {__Pyx_NAMESTR("n_dimensional_batch_step"), (PyCFunction)__pyx_pf_11simulations_8dynamics_20replicator_fastfuncs_10n_dimensional_batch_step, METH_VARARGS|METH_KEYWORDS, __Pyx_DOCSTR(0)},
   {0, 0, 0, 0}
 };
 
@@ -6144,32 +12238,43 @@ static struct PyModuleDef __pyx_moduledef = {
 #endif
 
 static __Pyx_StringTabEntry __pyx_string_tab[] = {
-  {&__pyx_kp_u_10, __pyx_k_10, sizeof(__pyx_k_10), 0, 1, 0, 0},
-  {&__pyx_kp_u_12, __pyx_k_12, sizeof(__pyx_k_12), 0, 1, 0, 0},
   {&__pyx_kp_u_14, __pyx_k_14, sizeof(__pyx_k_14), 0, 1, 0, 0},
-  {&__pyx_kp_u_15, __pyx_k_15, sizeof(__pyx_k_15), 0, 1, 0, 0},
+  {&__pyx_kp_u_16, __pyx_k_16, sizeof(__pyx_k_16), 0, 1, 0, 0},
   {&__pyx_kp_u_18, __pyx_k_18, sizeof(__pyx_k_18), 0, 1, 0, 0},
-  {&__pyx_n_s_20, __pyx_k_20, sizeof(__pyx_k_20), 0, 0, 1, 1},
+  {&__pyx_kp_u_20, __pyx_k_20, sizeof(__pyx_k_20), 0, 1, 0, 0},
+  {&__pyx_kp_u_21, __pyx_k_21, sizeof(__pyx_k_21), 0, 1, 0, 0},
+  {&__pyx_kp_u_24, __pyx_k_24, sizeof(__pyx_k_24), 0, 1, 0, 0},
+  {&__pyx_n_s_26, __pyx_k_26, sizeof(__pyx_k_26), 0, 0, 1, 1},
   {&__pyx_kp_s_6, __pyx_k_6, sizeof(__pyx_k_6), 0, 0, 1, 0},
-  {&__pyx_kp_u_8, __pyx_k_8, sizeof(__pyx_k_8), 0, 1, 0, 0},
+  {&__pyx_kp_s_8, __pyx_k_8, sizeof(__pyx_k_8), 0, 0, 1, 0},
   {&__pyx_n_s__RuntimeError, __pyx_k__RuntimeError, sizeof(__pyx_k__RuntimeError), 0, 0, 1, 1},
+  {&__pyx_n_s__T, __pyx_k__T, sizeof(__pyx_k__T), 0, 0, 1, 1},
   {&__pyx_n_s__ValueError, __pyx_k__ValueError, sizeof(__pyx_k__ValueError), 0, 0, 1, 1},
+  {&__pyx_n_s__ZeroDivisionError, __pyx_k__ZeroDivisionError, sizeof(__pyx_k__ZeroDivisionError), 0, 0, 1, 1},
   {&__pyx_n_s____main__, __pyx_k____main__, sizeof(__pyx_k____main__), 0, 0, 1, 1},
   {&__pyx_n_s____test__, __pyx_k____test__, sizeof(__pyx_k____test__), 0, 0, 1, 1},
   {&__pyx_n_s__arange, __pyx_k__arange, sizeof(__pyx_k__arange), 0, 0, 1, 1},
   {&__pyx_n_s__arity, __pyx_k__arity, sizeof(__pyx_k__arity), 0, 0, 1, 1},
   {&__pyx_n_s__background_rate, __pyx_k__background_rate, sizeof(__pyx_k__background_rate), 0, 0, 1, 1},
+  {&__pyx_n_s__dot, __pyx_k__dot, sizeof(__pyx_k__dot), 0, 0, 1, 1},
   {&__pyx_n_s__dtype, __pyx_k__dtype, sizeof(__pyx_k__dtype), 0, 0, 1, 1},
   {&__pyx_n_s__effective_zero, __pyx_k__effective_zero, sizeof(__pyx_k__effective_zero), 0, 0, 1, 1},
+  {&__pyx_n_s__entries, __pyx_k__entries, sizeof(__pyx_k__entries), 0, 0, 1, 1},
+  {&__pyx_n_s__float64, __pyx_k__float64, sizeof(__pyx_k__float64), 0, 0, 1, 1},
   {&__pyx_n_s__generate_profiles, __pyx_k__generate_profiles, sizeof(__pyx_k__generate_profiles), 0, 0, 1, 1},
+  {&__pyx_n_s__indices, __pyx_k__indices, sizeof(__pyx_k__indices), 0, 0, 1, 1},
+  {&__pyx_n_s__indptr, __pyx_k__indptr, sizeof(__pyx_k__indptr), 0, 0, 1, 1},
   {&__pyx_n_s__int, __pyx_k__int, sizeof(__pyx_k__int), 0, 0, 1, 1},
+  {&__pyx_n_s__left, __pyx_k__left, sizeof(__pyx_k__left), 0, 0, 1, 1},
   {&__pyx_n_s__newpop, __pyx_k__newpop, sizeof(__pyx_k__newpop), 0, 0, 1, 1},
   {&__pyx_n_s__np, __pyx_k__np, sizeof(__pyx_k__np), 0, 0, 1, 1},
   {&__pyx_n_s__num_profiles, __pyx_k__num_profiles, sizeof(__pyx_k__num_profiles), 0, 0, 1, 1},
   {&__pyx_n_s__numpy, __pyx_k__numpy, sizeof(__pyx_k__numpy), 0, 0, 1, 1},
   {&__pyx_n_s__out, __pyx_k__out, sizeof(__pyx_k__out), 0, 0, 1, 1},
+  {&__pyx_n_s__payoff_matrix, __pyx_k__payoff_matrix, sizeof(__pyx_k__payoff_matrix), 0, 0, 1, 1},
   {&__pyx_n_s__pop, __pyx_k__pop, sizeof(__pyx_k__pop), 0, 0, 1, 1},
   {&__pyx_n_s__pop_equals, __pyx_k__pop_equals, sizeof(__pyx_k__pop_equals), 0, 0, 1, 1},
+  {&__pyx_n_s__pops, __pyx_k__pops, sizeof(__pyx_k__pops), 0, 0, 1, 1},
   {&__pyx_n_s__prevpop, __pyx_k__prevpop, sizeof(__pyx_k__prevpop), 0, 0, 1, 1},
   {&__pyx_n_s__prod, __pyx_k__prod, sizeof(__pyx_k__prod), 0, 0, 1, 1},
   {&__pyx_n_s__profile_payoffs, __pyx_k__profile_payoffs, sizeof(__pyx_k__profile_payoffs), 0, 0, 1, 1},
@@ -6177,12 +12282,14 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
   {&__pyx_n_s__profiles, __pyx_k__profiles, sizeof(__pyx_k__profiles), 0, 0, 1, 1},
   {&__pyx_n_s__range, __pyx_k__range, sizeof(__pyx_k__range), 0, 0, 1, 1},
   {&__pyx_n_s__repeat, __pyx_k__repeat, sizeof(__pyx_k__repeat), 0, 0, 1, 1},
+  {&__pyx_n_s__right, __pyx_k__right, sizeof(__pyx_k__right), 0, 0, 1, 1},
   {&__pyx_n_s__sample_profile, __pyx_k__sample_profile, sizeof(__pyx_k__sample_profile), 0, 0, 1, 1},
   {&__pyx_n_s__size, __pyx_k__size, sizeof(__pyx_k__size), 0, 0, 1, 1},
   {&__pyx_n_s__type_counts, __pyx_k__type_counts, sizeof(__pyx_k__type_counts), 0, 0, 1, 1},
   {&__pyx_n_s__types, __pyx_k__types, sizeof(__pyx_k__types), 0, 0, 1, 1},
   {&__pyx_n_s__types_array, __pyx_k__types_array, sizeof(__pyx_k__types_array), 0, 0, 1, 1},
   {&__pyx_n_s__types_array_2, __pyx_k__types_array_2, sizeof(__pyx_k__types_array_2), 0, 0, 1, 1},
+  {&__pyx_n_s__values, __pyx_k__values, sizeof(__pyx_k__values), 0, 0, 1, 1},
   {&__pyx_n_s__xrange, __pyx_k__xrange, sizeof(__pyx_k__xrange), 0, 0, 1, 1},
   {&__pyx_n_s__zeros, __pyx_k__zeros, sizeof(__pyx_k__zeros), 0, 0, 1, 1},
   {0, 0, 0, 0, 0, 0, 0}
@@ -6194,6 +12301,7 @@ static int __Pyx_InitCachedBuiltins(void) {
   __pyx_builtin_xrange = __Pyx_GetName(__pyx_b, __pyx_n_s__xrange); if (!__pyx_builtin_xrange) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 22; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   #endif
   __pyx_builtin_ValueError = __Pyx_GetName(__pyx_b, __pyx_n_s__ValueError); if (!__pyx_builtin_ValueError) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_builtin_ZeroDivisionError = __Pyx_GetName(__pyx_b, __pyx_n_s__ZeroDivisionError); if (!__pyx_builtin_ZeroDivisionError) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 143; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_builtin_range = __Pyx_GetName(__pyx_b, __pyx_n_s__range); if (!__pyx_builtin_range) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 224; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_builtin_RuntimeError = __Pyx_GetName(__pyx_b, __pyx_n_s__RuntimeError); if (!__pyx_builtin_RuntimeError) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 795; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   return 0;
@@ -6264,6 +12372,76 @@ static int __Pyx_InitCachedConstants(void) {
   __Pyx_GIVEREF(((PyObject *)__pyx_kp_s_6));
   __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_7));
 
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":143
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     #newpop = np.insert(newpop, 0, one_pop_equals(newpop, pop, effective_zero))
+ */
+  __pyx_k_tuple_9 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_9)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 143; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_9));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_s_8));
+  PyTuple_SET_ITEM(__pyx_k_tuple_9, 0, ((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_9));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":221
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+ */
+  __pyx_k_tuple_10 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_10)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 221; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_10));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_s_8));
+  PyTuple_SET_ITEM(__pyx_k_tuple_10, 0, ((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_10));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":267
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+ */
+  __pyx_k_tuple_11 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_11)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 267; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_11));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_s_8));
+  PyTuple_SET_ITEM(__pyx_k_tuple_11, 0, ((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_11));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":529
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+  __pyx_k_tuple_12 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_12)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 529; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_12));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_s_8));
+  PyTuple_SET_ITEM(__pyx_k_tuple_12, 0, ((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_12));
+
+  /* "simulations/dynamics/replicator_fastfuncs.pyx":585
+ * 
+ *     if degenerate:
+ *         raise ZeroDivisionError("float division")             # <<<<<<<<<<<<<<
+ * 
+ *     return newpop
+ */
+  __pyx_k_tuple_13 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_13)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 585; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_13));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_s_8));
+  PyTuple_SET_ITEM(__pyx_k_tuple_13, 0, ((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_s_8));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_13));
+
   /* "numpy.pxd":211
  *             if ((flags & pybuf.PyBUF_C_CONTIGUOUS == pybuf.PyBUF_C_CONTIGUOUS)
  *                 and not PyArray_CHKFLAGS(self, NPY_C_CONTIGUOUS)):
@@ -6271,12 +12449,12 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *             if ((flags & pybuf.PyBUF_F_CONTIGUOUS == pybuf.PyBUF_F_CONTIGUOUS)
  */
-  __pyx_k_tuple_9 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 211; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_9));
-  __Pyx_INCREF(((PyObject *)__pyx_kp_u_8));
-  PyTuple_SET_ITEM(__pyx_k_tuple_9, 0, ((PyObject *)__pyx_kp_u_8));
-  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_8));
-  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_9));
+  __pyx_k_tuple_15 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_15)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 211; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_15));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_u_14));
+  PyTuple_SET_ITEM(__pyx_k_tuple_15, 0, ((PyObject *)__pyx_kp_u_14));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_14));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_15));
 
   /* "numpy.pxd":215
  *             if ((flags & pybuf.PyBUF_F_CONTIGUOUS == pybuf.PyBUF_F_CONTIGUOUS)
@@ -6285,12 +12463,12 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *             info.buf = PyArray_DATA(self)
  */
-  __pyx_k_tuple_11 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_11)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_11));
-  __Pyx_INCREF(((PyObject *)__pyx_kp_u_10));
-  PyTuple_SET_ITEM(__pyx_k_tuple_11, 0, ((PyObject *)__pyx_kp_u_10));
-  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_10));
-  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_11));
+  __pyx_k_tuple_17 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_17)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_17));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_u_16));
+  PyTuple_SET_ITEM(__pyx_k_tuple_17, 0, ((PyObject *)__pyx_kp_u_16));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_16));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_17));
 
   /* "numpy.pxd":253
  *                 if ((descr.byteorder == '>' and little_endian) or
@@ -6299,12 +12477,12 @@ static int __Pyx_InitCachedConstants(void) {
  *                 if   t == NPY_BYTE:        f = "b"
  *                 elif t == NPY_UBYTE:       f = "B"
  */
-  __pyx_k_tuple_13 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_13)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 253; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_13));
-  __Pyx_INCREF(((PyObject *)__pyx_kp_u_12));
-  PyTuple_SET_ITEM(__pyx_k_tuple_13, 0, ((PyObject *)__pyx_kp_u_12));
-  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_12));
-  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_13));
+  __pyx_k_tuple_19 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 253; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_19));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_u_18));
+  PyTuple_SET_ITEM(__pyx_k_tuple_19, 0, ((PyObject *)__pyx_kp_u_18));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_18));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_19));
 
   /* "numpy.pxd":795
  * 
@@ -6313,12 +12491,12 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *         if ((child.byteorder == '>' and little_endian) or
  */
-  __pyx_k_tuple_16 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_16)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 795; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_16));
-  __Pyx_INCREF(((PyObject *)__pyx_kp_u_15));
-  PyTuple_SET_ITEM(__pyx_k_tuple_16, 0, ((PyObject *)__pyx_kp_u_15));
-  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_15));
-  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_16));
+  __pyx_k_tuple_22 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_22)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 795; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_22));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_u_21));
+  PyTuple_SET_ITEM(__pyx_k_tuple_22, 0, ((PyObject *)__pyx_kp_u_21));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_21));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_22));
 
   /* "numpy.pxd":799
  *         if ((child.byteorder == '>' and little_endian) or
@@ -6327,12 +12505,12 @@ static int __Pyx_InitCachedConstants(void) {
  *             # One could encode it in the format string and have Cython
  *             # complain instead, BUT: < and > in format strings also imply
  */
-  __pyx_k_tuple_17 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_17)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 799; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_17));
-  __Pyx_INCREF(((PyObject *)__pyx_kp_u_12));
-  PyTuple_SET_ITEM(__pyx_k_tuple_17, 0, ((PyObject *)__pyx_kp_u_12));
-  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_12));
-  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_17));
+  __pyx_k_tuple_23 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_23)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 799; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_23));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_u_18));
+  PyTuple_SET_ITEM(__pyx_k_tuple_23, 0, ((PyObject *)__pyx_kp_u_18));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_18));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_23));
 
   /* "numpy.pxd":819
  *             t = child.type_num
@@ -6341,12 +12519,12 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *             # Until ticket #99 is fixed, use integers to avoid warnings
  */
-  __pyx_k_tuple_19 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 819; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_19));
-  __Pyx_INCREF(((PyObject *)__pyx_kp_u_18));
-  PyTuple_SET_ITEM(__pyx_k_tuple_19, 0, ((PyObject *)__pyx_kp_u_18));
-  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_18));
-  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_19));
+  __pyx_k_tuple_25 = PyTuple_New(1); if (unlikely(!__pyx_k_tuple_25)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 819; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(((PyObject *)__pyx_k_tuple_25));
+  __Pyx_INCREF(((PyObject *)__pyx_kp_u_24));
+  PyTuple_SET_ITEM(__pyx_k_tuple_25, 0, ((PyObject *)__pyx_kp_u_24));
+  __Pyx_GIVEREF(((PyObject *)__pyx_kp_u_24));
+  __Pyx_GIVEREF(((PyObject *)__pyx_k_tuple_25));
   __Pyx_RefNannyFinishContext();
   return 0;
   __pyx_L1_error:;
@@ -6461,7 +12639,7 @@ PyMODINIT_FUNC PyInit_replicator_fastfuncs(void)
  *                       np.ndarray[np.int_t, ndim=2] out=None):
  *     cdef int n = types.prod()
  */
-  __pyx_t_1 = PyCFunction_NewEx(&__pyx_mdef_11simulations_8dynamics_20replicator_fastfuncs_generate_profiles, NULL, __pyx_n_s_20); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 9; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyCFunction_NewEx(&__pyx_mdef_11simulations_8dynamics_20replicator_fastfuncs_generate_profiles, NULL, __pyx_n_s_26); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 9; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   if (PyObject_SetAttr(__pyx_m, __pyx_n_s__generate_profiles, __pyx_t_1) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 9; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
@@ -6473,7 +12651,7 @@ PyMODINIT_FUNC PyInit_replicator_fastfuncs(void)
  *                np.ndarray prevpop not None,
  *                np.float64_t effective_zero):
  */
-  __pyx_t_1 = PyCFunction_NewEx(&__pyx_mdef_11simulations_8dynamics_20replicator_fastfuncs_1pop_equals, NULL, __pyx_n_s_20); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 27; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = PyCFunction_NewEx(&__pyx_mdef_11simulations_8dynamics_20replicator_fastfuncs_1pop_equals, NULL, __pyx_n_s_26); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 27; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   if (PyObject_SetAttr(__pyx_m, __pyx_n_s__pop_equals, __pyx_t_1) < 0) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 27; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
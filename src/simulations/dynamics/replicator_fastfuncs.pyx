@@ -66,6 +66,7 @@ cdef int one_pop_equals(np.ndarray[np.float64_t, ndim=1] newpop,
     return one
 
 
+@cython.cdivision(True)
 cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_step(np.ndarray[np.float64_t, ndim=1] pop,
                                                             np.ndarray[np.int_t, ndim=2] profiles,
                                                             np.ndarray[np.int_t, ndim=1] sample_profile,
@@ -79,88 +80,75 @@ cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_step(np.ndarray[np.float6
                                                             np.int_t profile_size):
 
     cdef int i, j, strategy
+    cdef int degenerate = 0
     cdef int types = types_array.shape[0]
     cdef int izero = <int>0
     cdef int ione = <int>1
-    cdef np.float64_t profile_prob, avg_payoff, prob, contrib, contrib2, tmp = 0.
+    cdef np.float64_t profile_prob, avg_payoff, prob, tmp = 0.
     cdef np.float64_t arityf = <np.float64_t>arity
     cdef np.float64_t zero = 0.
-    cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
     cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
     cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.PyArray_ZEROS(ione, dims, np.NPY_FLOAT64, izero)
     cdef np.ndarray[np.float64_t, ndim=1] newpop = np.PyArray_ZEROS(ione, new_dims, np.NPY_FLOAT64, izero)
-
-    #go over each possible profile of strategies
-    for i from 0 <= i < num_profiles:
-        profile_prob = 1.
-        #profile_probs = np.empty(profile_size, dtype=np.float64)
-        profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
-        expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)
-
-        #calculate the probability of that profile being drawn
-        #profile_prob = profile_probs.prod()
-        for j from 0 <= j < profile_size:
-            strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
-            prob = (<np.float64_t*>np.PyArray_GETPTR1(pop, strategy))[0]
-            #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
-            profile_probs[j] = prob
-            profile_prob = profile_prob * prob
-
-        #calculate the expected contribution for each of the profile slots
-        for j from 0 <= j < profile_size:
-            if profile_prob > zero:
+    cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+    cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+
+    #the loops only touch typed buffers, so other threads can run meanwhile
+    with nogil:
+        #go over each possible profile of strategies
+        for i from 0 <= i < num_profiles:
+            #calculate the probability of that profile being drawn
+            #profile_prob = profile_probs.prod()
+            profile_prob = 1.
+            for j from 0 <= j < profile_size:
+                prob = pop[profiles[i, j]]
+                profile_probs[j] = prob
+                profile_prob = profile_prob * prob
+
+            #calculate the expected contribution for each of the profile slots
             #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
-                contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
-                prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]
-                contrib = contrib * profile_prob / prob
-                #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
-                expected_contribution[j] = contrib
-            else:
-                #expected_contribution = profile_payoffs[i] * zero
-                #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), zero)
-                expected_contribution[j] = zero
-
-        #add the expected contributions to the right type's payoff.
-        for j from 0 <= j < profile_size:
+            for j from 0 <= j < profile_size:
+                if profile_prob > zero:
+                    expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
+                else:
+                    expected_contribution[j] = zero
+
+            #add the expected contributions to the right type's payoff.
             #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
-            strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
-            contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, strategy))[0]
-            contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
-            #np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, strategy), contrib + contrib2)
-            payoffs[strategy] = contrib + contrib2
-
-    #payoffs = payoffs / <float>arity
-    for i from 0 <= i < types:
-        contrib = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
-        contrib = contrib / arityf
-        np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR1(payoffs, i), contrib)
-
-    #avg_payoff = np.dot(pop, payoffs)
-    avg_payoff = <np.float64_t>0
-    for i from 0 <= i < types:
-        contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
-        contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
-        avg_payoff = <np.float64_t>(avg_payoff + (contrib * contrib2))
-
-    #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
-    for i from 0 <= i < types:
-        contrib = (<np.float64_t*>np.PyArray_GETPTR1(pop, i))[0]
-        contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(payoffs, i))[0]
-        tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
-        #np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR1(newpop2, i), tmp)
-        #np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, <int>(i + 1)), tmp)
-        newpop2[i] = tmp
-        newpop[i + 1] = tmp
+            for j from 0 <= j < profile_size:
+                strategy = profiles[i, j]
+                payoffs[strategy] = payoffs[strategy] + expected_contribution[j]
+
+        #payoffs = payoffs / <float>arity
+        for i from 0 <= i < types:
+            payoffs[i] = payoffs[i] / arityf
+
+        #avg_payoff = np.dot(pop, payoffs)
+        avg_payoff = <np.float64_t>0
+        for i from 0 <= i < types:
+            avg_payoff = <np.float64_t>(avg_payoff + (pop[i] * payoffs[i]))
+        if background_rate + avg_payoff == zero:
+            degenerate = 1
+
+        #newpop = pop * (background_rate + payoffs) / (background_rate + avg_payoff)
+        for i from 0 <= i < types:
+            tmp = pop[i] * (background_rate + payoffs[i]) / (background_rate + avg_payoff)
+            newpop2[i] = tmp
+            newpop[i + 1] = tmp
+
+    if degenerate:
+        raise ZeroDivisionError("float division")
 
     #newpop = np.insert(newpop, 0, one_pop_equals(newpop, pop, effective_zero))
-    np.PyArray_SETITEM(newpop, np.PyArray_GETPTR1(newpop, 0), <np.float64_t>one_pop_equals(newpop2, pop, effective_zero))
+    newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
 
     return newpop
 
 
+@cython.cdivision(True)
 cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_step(np.ndarray[np.float64_t, ndim=2] pop,
                                                           np.ndarray[np.int_t, ndim=2] profiles,
                                                           np.ndarray[np.int_t, ndim=1] sample_profile,
@@ -174,14 +162,14 @@ cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_step(np.ndarray[np.float64_
                                                           np.int_t profile_size):
 
     cdef int i, j, strategy
+    cdef int degenerate = 0
     cdef int izero = <int>0
     cdef int ione = <int>1
     cdef int itwo = <int>2
     cdef int num_pops = types_array.shape[0]
     cdef int types = types_array.shape[1]
     cdef np.float64_t zero = 0.
-    cdef np.float64_t profile_prob, prob, contrib, contrib2, tmp = 0.
-    cdef np.ndarray[np.float64_t, ndim=1] expected_contribution, profile_probs
+    cdef np.float64_t profile_prob, prob, tmp = 0.
     cdef np.npy_intp* dims = np.PyArray_DIMS(types_array)
     cdef np.npy_intp* new_dims = np.PyArray_DIMS(types_array_2)
     cdef np.npy_intp* profile_dims = np.PyArray_DIMS(sample_profile)
@@ -190,70 +178,410 @@ cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_step(np.ndarray[np.float64_
     cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.PyArray_ZEROS(itwo, dims, np.NPY_FLOAT64, izero)
     cdef np.ndarray[np.float64_t, ndim=2] newpop = np.PyArray_ZEROS(itwo, new_dims, np.NPY_FLOAT64, izero)
     cdef np.ndarray[np.float64_t, ndim=1] avg_payoffs = np.PyArray_ZEROS(ione, by_pop_dims, np.NPY_FLOAT64, izero)
+    cdef np.ndarray[np.float64_t, ndim=1] profile_probs = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+    cdef np.ndarray[np.float64_t, ndim=1] expected_contribution = np.PyArray_ZEROS(ione, profile_dims, np.NPY_FLOAT64, izero)
+
+    with nogil:
+        #go over each possible profile of strategies
+        for i from 0 <= i < num_profiles:
+            #calculate the probability of that profile being drawn
+            #profile_prob = profile_probs.prod()
+            profile_prob = 1.
+            for j from 0 <= j < profile_size:
+                prob = pop[j, profiles[i, j]]
+                profile_probs[j] = prob
+                profile_prob = profile_prob * prob
+
+            #calculate the expected contribution for each of the profile slots
+            #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
+            for j from 0 <= j < profile_size:
+                if profile_prob > zero:
+                    expected_contribution[j] = profile_payoffs[i, j] * profile_prob / profile_probs[j]
+                else:
+                    expected_contribution[j] = zero
+
+            #add the expected contributions to the right type's payoff.
+            #payoffs[j][profile[j]] = payoffs[j][profile[j]] + expected_contribution[j]
+            for j from 0 <= j < profile_size:
+                strategy = profiles[i, j]
+                payoffs[j, strategy] = payoffs[j, strategy] + expected_contribution[j]
+
+        for i from 0 <= i < num_pops:
+            for j from 0 <= j < types:
+                avg_payoffs[i] = avg_payoffs[i] + (pop[i, j] * payoffs[i, j])
+            if background_rate + avg_payoffs[i] == zero:
+                degenerate = 1
+
+            for j from 0 <= j < types:
+                tmp = (pop[i, j] * (background_rate + payoffs[i, j]) / (background_rate + avg_payoffs[i]))
+                newpop2[i, j] = tmp
+                newpop[i + 1, j] = tmp
+
+    if degenerate:
+        raise ZeroDivisionError("float division")
 
-    #go over each possible profile of strategies
-    for i from 0 <= i < num_profiles:
-        profile_prob = 1.
-        profile_probs = np.PyArray_EMPTY(1, profile_dims, np.NPY_FLOAT64, 0)
-        expected_contribution = np.PyArray_ZEROS(1, profile_dims, np.NPY_FLOAT64, 0)
+    tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
+    for j from 0 <= j < types:
+        newpop[0, j] = tmp
 
-        #calculate the probability of that profile being drawn
-        for j from 0 <= j < profile_size:
-            #profile_probs[j] = pop[j][profile[j]]
-            #profile_prob = profile_prob * pop[j][profile[j]]
-            strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
-            prob = (<np.float64_t*>np.PyArray_GETPTR2(pop, j, strategy))[0]
-            #np.PyArray_SETITEM(profile_probs, np.PyArray_GETPTR1(profile_probs, j), prob)
-            profile_probs[j] = prob
-            profile_prob = profile_prob * prob
-        #profile_prob = profile_probs.prod()
-
-        #calculate the expected contribution for each of the profile slots
-        #if profile_prob > zero:
-        #    expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
-        #else:
-        #    expected_contribution = profile_payoffs[i] * zero
-        #calculate the expected contribution for each of the profile slots
+    return newpop
+
+
+
+@cython.cdivision(True)
+cpdef np.ndarray[np.float64_t, ndim=1] matrix_step(np.ndarray[np.float64_t, ndim=1] pop,
+                                                   np.ndarray[np.float64_t, ndim=2] left,
+                                                   np.ndarray[np.float64_t, ndim=2] right,
+                                                   np.float64_t background_rate,
+                                                   np.float64_t effective_zero):
+
+    cdef int i
+    cdef int degenerate = 0
+    cdef int types = pop.shape[0]
+    cdef np.float64_t avg_payoff, contrib, contrib2, tmp = 0.
+    cdef np.ndarray[np.float64_t, ndim=1] payoffs
+    cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)
+
+    #payoffs = left . pop, or left . (right . pop) in O(types * rank)
+    if right is None:
+        payoffs = np.dot(left, pop)
+    else:
+        payoffs = np.dot(left, np.dot(right, pop))
+
+    with nogil:
+        avg_payoff = <np.float64_t>0
+        for i from 0 <= i < types:
+            avg_payoff = avg_payoff + pop[i] * payoffs[i]
+        if background_rate + avg_payoff == 0.:
+            degenerate = 1
+
+        for i from 0 <= i < types:
+            contrib = pop[i]
+            contrib2 = payoffs[i]
+            tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+            newpop2[i] = tmp
+            newpop[i + 1] = tmp
+
+    if degenerate:
+        raise ZeroDivisionError("float division")
+
+    newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+
+    return newpop
+
+
+cpdef np.ndarray[np.float64_t, ndim=1] one_dimensional_sparse_step(np.ndarray[np.float64_t, ndim=1] pop,
+                                                                   np.ndarray[np.int_t, ndim=2] profiles,
+                                                                   np.ndarray[np.int_t, ndim=2] entries,
+                                                                   np.ndarray[np.float64_t, ndim=1] values,
+                                                                   np.int_t arity,
+                                                                   np.float64_t background_rate,
+                                                                   np.float64_t effective_zero):
+
+    cdef int e, j, row, slot
+    cdef int types = pop.shape[0]
+    cdef int num_entries = values.shape[0]
+    cdef int profile_size = profiles.shape[1]
+    cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+    cdef np.float64_t arityf = <np.float64_t>arity
+    cdef np.ndarray[np.float64_t, ndim=1] payoffs = np.zeros(types, dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=1] newpop2 = np.zeros(types, dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=1] newpop = np.zeros(types + 1, dtype=np.float64)
+
+    #only visit the nonzero (profile, slot, value) entries
+    for e from 0 <= e < num_entries:
+        row = entries[e, 0]
+        slot = entries[e, 1]
+
+        #probability of the other slots of the profile being drawn
+        prob = 1.
         for j from 0 <= j < profile_size:
-            if profile_prob > zero:
-            #expected_contribution = (profile_payoffs[i] / profile_probs) * profile_prob
-                contrib = (<np.float64_t*>np.PyArray_GETPTR2(profile_payoffs, i, j))[0]
-                prob = (<np.float64_t*>np.PyArray_GETPTR1(profile_probs, j))[0]
-                contrib = contrib * profile_prob / prob
-                #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), contrib)
-                expected_contribution[j] = contrib
-            else:
-                #expected_contribution = profile_payoffs[i] * zero
-                #np.PyArray_SETITEM(expected_contribution, np.PyArray_GETPTR1(expected_contribution, j), zero)
-                expected_contribution[j] = zero
-
-        #add the expected contributions to the right type's payoff.
-        #for j from 0 <= j < profile_size:
-        #    payoffs[j][profile[j]] = payoffs[j][profile[j]] + expected_contribution[j]
+            if j != slot:
+                prob = prob * pop[profiles[row, j]]
+
+        payoffs[profiles[row, slot]] = payoffs[profiles[row, slot]] + values[e] * prob
+
+    avg_payoff = <np.float64_t>0
+    for j from 0 <= j < types:
+        payoffs[j] = payoffs[j] / arityf
+        avg_payoff = avg_payoff + pop[j] * payoffs[j]
+
+    for j from 0 <= j < types:
+        contrib = pop[j]
+        contrib2 = payoffs[j]
+        tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+        newpop2[j] = tmp
+        newpop[j + 1] = tmp
+
+    newpop[0] = <np.float64_t>one_pop_equals(newpop2, pop, effective_zero)
+
+    return newpop
+
+
+cpdef np.ndarray[np.float64_t, ndim=2] n_dimensional_sparse_step(np.ndarray[np.float64_t, ndim=2] pop,
+                                                                 np.ndarray[np.int_t, ndim=2] profiles,
+                                                                 np.ndarray[np.int_t, ndim=2] entries,
+                                                                 np.ndarray[np.float64_t, ndim=1] values,
+                                                                 np.float64_t background_rate,
+                                                                 np.float64_t effective_zero):
+
+    cdef int e, i, j, row, slot
+    cdef int num_pops = pop.shape[0]
+    cdef int types = pop.shape[1]
+    cdef int num_entries = values.shape[0]
+    cdef int profile_size = profiles.shape[1]
+    cdef np.float64_t prob, avg_payoff, contrib, contrib2, tmp = 0.
+    cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_pops, types), dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=2] newpop2 = np.zeros((num_pops, types), dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_pops + 1, types), dtype=np.float64)
+
+    #only visit the nonzero (profile, slot, value) entries
+    for e from 0 <= e < num_entries:
+        row = entries[e, 0]
+        slot = entries[e, 1]
+
+        #probability of the other populations' strategies in the profile
+        prob = 1.
         for j from 0 <= j < profile_size:
-            #payoffs[profile[j]] = payoffs[profile[j]] + expected_contribution[j]
-            strategy = (<int*>np.PyArray_GETPTR2(profiles, i, j))[0]
-            contrib = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, j, strategy))[0]
-            contrib2 = (<np.float64_t*>np.PyArray_GETPTR1(expected_contribution, j))[0]
-            np.PyArray_SETITEM(payoffs, np.PyArray_GETPTR2(payoffs, j, strategy), contrib + contrib2)
+            if j != slot:
+                prob = prob * pop[j, profiles[row, j]]
 
+        payoffs[slot, profiles[row, slot]] = payoffs[slot, profiles[row, slot]] + values[e] * prob
 
     for i from 0 <= i < num_pops:
+        avg_payoff = <np.float64_t>0
         for j from 0 <= j < types:
-            contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
-            contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
-            avg_payoffs[i] = avg_payoffs[i] + (contrib * contrib2)
+            avg_payoff = avg_payoff + pop[i, j] * payoffs[i, j]
 
         for j from 0 <= j < types:
-            contrib = (<np.float64_t*>np.PyArray_GETPTR2(pop, i, j))[0]
-            contrib2 = (<np.float64_t*>np.PyArray_GETPTR2(payoffs, i, j))[0]
-            tmp = (contrib * (background_rate + contrib2) / (background_rate + avg_payoffs[i]))
-            np.PyArray_SETITEM(newpop2, np.PyArray_GETPTR2(newpop2, i, j), tmp)
-            np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, <int>(i + 1), j), tmp)
+            contrib = pop[i, j]
+            contrib2 = payoffs[i, j]
+            tmp = contrib * (background_rate + contrib2) / (background_rate + avg_payoff)
+            newpop2[i, j] = tmp
+            newpop[i + 1, j] = tmp
 
     tmp = <np.float64_t>n_pop_equals(newpop2, pop, effective_zero)
     for j from 0 <= j < types:
-        np.PyArray_SETITEM(newpop, np.PyArray_GETPTR2(newpop, 0, j), tmp)
+        newpop[0, j] = tmp
+
+    return newpop
+
+
+cdef np.ndarray neighbour_payoffs(np.ndarray[np.float64_t, ndim=2] pop,
+                                  np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+                                  np.ndarray[np.int_t, ndim=1] indptr,
+                                  np.ndarray[np.int_t, ndim=1] indices):
+
+    cdef int v, k, j
+    cdef int nodes = pop.shape[0]
+    cdef int types = pop.shape[1]
+    cdef np.float64_t degree
+    cdef np.ndarray[np.float64_t, ndim=2] neighbourhood = np.zeros((nodes, types), dtype=np.float64)
+
+    #mean state of each node's neighbours
+    for v from 0 <= v < nodes:
+        for k from indptr[v] <= k < indptr[v + 1]:
+            for j from 0 <= j < types:
+                neighbourhood[v, j] = neighbourhood[v, j] + pop[indices[k], j]
+
+        degree = <np.float64_t>(indptr[v + 1] - indptr[v])
+        if degree > 0.:
+            for j from 0 <= j < types:
+                neighbourhood[v, j] = neighbourhood[v, j] / degree
+
+    #payoffs[v, i] = sum_j payoff_matrix[i, j] * neighbourhood[v, j]
+    return np.dot(neighbourhood, payoff_matrix.T)
+
+
+cpdef np.ndarray[np.float64_t, ndim=2] structured_replicator_step(np.ndarray[np.float64_t, ndim=2] pop,
+                                                                  np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+                                                                  np.ndarray[np.int_t, ndim=1] indptr,
+                                                                  np.ndarray[np.int_t, ndim=1] indices,
+                                                                  np.float64_t background_rate,
+                                                                  np.float64_t effective_zero):
+
+    cdef int v, j
+    cdef int same = 1
+    cdef int nodes = pop.shape[0]
+    cdef int types = pop.shape[1]
+    cdef np.float64_t avg_payoff, diff, tmp
+    cdef np.float64_t neg_effective_zero = -1 * effective_zero
+    cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+    cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+
+    for v from 0 <= v < nodes:
+        avg_payoff = <np.float64_t>0
+        for j from 0 <= j < types:
+            avg_payoff = avg_payoff + pop[v, j] * payoffs[v, j]
+
+        #isolated nodes (and nodes with no net fitness) keep their state
+        if indptr[v + 1] == indptr[v] or background_rate + avg_payoff == 0.:
+            for j from 0 <= j < types:
+                newpop[v + 1, j] = pop[v, j]
+            continue
+
+        for j from 0 <= j < types:
+            tmp = pop[v, j] * (background_rate + payoffs[v, j]) / (background_rate + avg_payoff)
+            newpop[v + 1, j] = tmp
+            diff = tmp - pop[v, j]
+            if diff < neg_effective_zero or diff > effective_zero:
+                same = 0
+
+    for j from 0 <= j < types:
+        newpop[0, j] = <np.float64_t>same
+
+    return newpop
+
+
+cpdef np.ndarray[np.float64_t, ndim=2] structured_imitation_step(np.ndarray[np.float64_t, ndim=2] pop,
+                                                                 np.ndarray[np.float64_t, ndim=2] payoff_matrix,
+                                                                 np.ndarray[np.int_t, ndim=1] indptr,
+                                                                 np.ndarray[np.int_t, ndim=1] indices,
+                                                                 np.float64_t effective_zero):
+
+    cdef int v, k, j, best
+    cdef int same = 1
+    cdef int nodes = pop.shape[0]
+    cdef int types = pop.shape[1]
+    cdef np.float64_t best_fitness, diff
+    cdef np.float64_t neg_effective_zero = -1 * effective_zero
+    cdef np.ndarray[np.float64_t, ndim=2] payoffs = neighbour_payoffs(pop, payoff_matrix, indptr, indices)
+    cdef np.ndarray[np.float64_t, ndim=1] fitness = np.zeros(nodes, dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((nodes + 1, types), dtype=np.float64)
+
+    for v from 0 <= v < nodes:
+        for j from 0 <= j < types:
+            fitness[v] = fitness[v] + pop[v, j] * payoffs[v, j]
+
+    #each node copies its fittest neighbour, if that one does strictly better
+    for v from 0 <= v < nodes:
+        best = v
+        best_fitness = fitness[v]
+        for k from indptr[v] <= k < indptr[v + 1]:
+            if fitness[indices[k]] - best_fitness > effective_zero:
+                best = indices[k]
+                best_fitness = fitness[best]
+
+        for j from 0 <= j < types:
+            newpop[v + 1, j] = pop[best, j]
+            diff = pop[best, j] - pop[v, j]
+            if diff < neg_effective_zero or diff > effective_zero:
+                same = 0
+
+    for j from 0 <= j < types:
+        newpop[0, j] = <np.float64_t>same
 
     return newpop
 
+
+@cython.cdivision(True)
+cpdef np.ndarray[np.float64_t, ndim=2] one_dimensional_batch_step(np.ndarray[np.float64_t, ndim=2] pops,
+                                                                  np.ndarray[np.int_t, ndim=2] profiles,
+                                                                  np.ndarray[np.float64_t, ndim=3] profile_payoffs,
+                                                                  np.int_t arity,
+                                                                  np.float64_t background_rate,
+                                                                  np.float64_t effective_zero):
+
+    cdef int g, i, j, same
+    cdef int degenerate = 0
+    cdef int num_games = pops.shape[0]
+    cdef int types = pops.shape[1]
+    cdef int num_profiles = profiles.shape[0]
+    cdef int profile_size = profiles.shape[1]
+    cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+    cdef np.float64_t arityf = <np.float64_t>arity
+    cdef np.float64_t neg_effective_zero = -1 * effective_zero
+    cdef np.ndarray[np.float64_t, ndim=2] payoffs = np.zeros((num_games, types), dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=2] newpop = np.zeros((num_games, types + 1), dtype=np.float64)
+
+    with nogil:
+        for g from 0 <= g < num_games:
+            #go over each possible profile of strategies for this game
+            for i from 0 <= i < num_profiles:
+                profile_prob = 1.
+                for j from 0 <= j < profile_size:
+                    profile_prob = profile_prob * pops[g, profiles[i, j]]
+
+                if profile_prob > 0.:
+                    for j from 0 <= j < profile_size:
+                        payoffs[g, profiles[i, j]] = payoffs[g, profiles[i, j]] + \
+                            profile_payoffs[g, i, j] * profile_prob / pops[g, profiles[i, j]]
+
+            avg_payoff = <np.float64_t>0
+            for j from 0 <= j < types:
+                payoffs[g, j] = payoffs[g, j] / arityf
+                avg_payoff = avg_payoff + pops[g, j] * payoffs[g, j]
+            if background_rate + avg_payoff == 0.:
+                degenerate = 1
+
+            same = 1
+            for j from 0 <= j < types:
+                tmp = pops[g, j] * (background_rate + payoffs[g, j]) / (background_rate + avg_payoff)
+                newpop[g, j + 1] = tmp
+                diff = tmp - pops[g, j]
+                if diff < neg_effective_zero or diff > effective_zero:
+                    same = 0
+
+            newpop[g, 0] = <np.float64_t>same
+
+    if degenerate:
+        raise ZeroDivisionError("float division")
+
+    return newpop
+
+
+@cython.cdivision(True)
+cpdef np.ndarray[np.float64_t, ndim=3] n_dimensional_batch_step(np.ndarray[np.float64_t, ndim=3] pops,
+                                                                np.ndarray[np.int_t, ndim=2] profiles,
+                                                                np.ndarray[np.float64_t, ndim=3] profile_payoffs,
+                                                                np.float64_t background_rate,
+                                                                np.float64_t effective_zero):
+
+    cdef int g, i, j, k, same
+    cdef int degenerate = 0
+    cdef int num_games = pops.shape[0]
+    cdef int num_pops = pops.shape[1]
+    cdef int types = pops.shape[2]
+    cdef int num_profiles = profiles.shape[0]
+    cdef int profile_size = profiles.shape[1]
+    cdef np.float64_t profile_prob, avg_payoff, diff, tmp
+    cdef np.float64_t neg_effective_zero = -1 * effective_zero
+    cdef np.ndarray[np.float64_t, ndim=3] payoffs = np.zeros((num_games, num_pops, types), dtype=np.float64)
+    cdef np.ndarray[np.float64_t, ndim=3] newpop = np.zeros((num_games, num_pops + 1, types), dtype=np.float64)
+
+    with nogil:
+        for g from 0 <= g < num_games:
+            #go over each possible profile of strategies for this game
+            for i from 0 <= i < num_profiles:
+                profile_prob = 1.
+                for j from 0 <= j < profile_size:
+                    profile_prob = profile_prob * pops[g, j, profiles[i, j]]
+
+                if profile_prob > 0.:
+                    for j from 0 <= j < profile_size:
+                        payoffs[g, j, profiles[i, j]] = payoffs[g, j, profiles[i, j]] + \
+                            profile_payoffs[g, i, j] * profile_prob / pops[g, j, profiles[i, j]]
+
+            same = 1
+            for k from 0 <= k < num_pops:
+                avg_payoff = <np.float64_t>0
+                for j from 0 <= j < types:
+                    avg_payoff = avg_payoff + pops[g, k, j] * payoffs[g, k, j]
+                if background_rate + avg_payoff == 0.:
+                    degenerate = 1
+
+                for j from 0 <= j < types:
+                    tmp = pops[g, k, j] * (background_rate + payoffs[g, k, j]) / (background_rate + avg_payoff)
+                    newpop[g, k + 1, j] = tmp
+                    diff = tmp - pops[g, k, j]
+                    if diff < neg_effective_zero or diff > effective_zero:
+                        same = 0
+
+            for j from 0 <= j < types:
+                newpop[g, 0, j] = <np.float64_t>same
+
+    if degenerate:
+        raise ZeroDivisionError("float division")
+
+    return newpop
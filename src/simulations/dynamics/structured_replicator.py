@@ -0,0 +1,387 @@
+""" Simulation class that implements discrete-time dynamics on a structured
+    (graph or lattice) population
+
+Classes:
+
+    :py:class:`StructuredReplicatorDynamics`
+      implements replicator or imitation dynamics on a graph or 2-D lattice
+
+Functions:
+
+    :py:func:`graph_adjacency`
+      Builds a sparse adjacency structure from an edge list
+
+    :py:func:`lattice_adjacency`
+      Builds a sparse adjacency structure for a 2-D lattice
+
+    :py:func:`stable_state_handler`
+      Default handler for 'stable state' and 'force stop' events
+
+"""
+
+import numpy as np
+import simulations.dynamics.replicator_fastfuncs as fastfuncs
+
+from simulations.dynamics.discrete_replicator import DiscreteReplicatorDynamics
+from simulations.dynamics.discrete_replicator import _create_caches
+from simulations.dynamics.onepop_discrete_replicator import payoff_matrix
+
+
+class StructuredReplicatorDynamics(DiscreteReplicatorDynamics):
+    """ Implements discrete-time dynamics for a population of nodes on a graph
+        or 2-D lattice. Each node holds a mixed state (or a pure strategy, as
+        a 0/1 state) over the types and plays the two-player game against the
+        mean state of its neighbours.
+
+    Keyword Parameters:
+
+        adjacency
+          A tuple (indptr, indices) giving the neighbours of node v as
+          indices[indptr[v]:indptr[v + 1]] (see :py:func:`graph_adjacency`).
+          Overrides the lattice parameters.
+
+        background_rate
+          The natural rate of reproduction (parameter in the dynamics,
+          default 0.)
+
+        effective_zero
+          The effective zero value for floating-point comparisons
+          (default 1e-10)
+
+        lattice_shape
+          The (rows, columns) of the lattice to use if no adjacency is given
+          (default (10, 10))
+
+        neighbourhood
+          The lattice neighbourhood, 'von neumann' or 'moore'
+          (default 'von neumann')
+
+        pairwise_payoffs
+          A types x types matrix whose (i, j) entry is the payoff to type i
+          against type j. If not given, it is computed from
+          :py:meth:`~StructuredReplicatorDynamics._profile_payoffs`.
+
+        periodic
+          Whether the lattice wraps around at its edges (default True)
+
+        types
+          A list of names for the possible types (used to calculate
+          dimensionality, defaults to the return value of :py:meth:`~StructuredReplicatorDynamics._default_types`)
+
+        update_rule
+          'replicator' (each node's mixed state follows the replicator
+          dynamics against its neighbours) or 'imitation' (each node copies
+          the state of its fittest neighbour if that one does strictly better)
+          (default 'replicator')
+
+    Methods to Implement:
+
+        :py:meth:`~StructuredReplicatorDynamics._profile_payoffs`
+          Returns the payoff for a type given a strategy profile
+
+    Events:
+
+        force stop(this, genct, finalgen, prevgen, firstgen)
+          emitted when the generation iteration is broken by a forced stop
+          condition (instead of stable state event)
+
+        generation(this, genct, thisgen, lastgen)
+          emitted when a generation is complete
+
+        initial set(this, initial_pop)
+          emitted when the initial population is set up
+
+        stable state(this, genct, finalgen, prevgen, firstgen)
+          emitted when a stable state is reached
+
+    """
+
+    UPDATE_RULES = ('replicator', 'imitation')
+
+    def __init__(self, *args, **kwdargs):
+        """ Checks for the structure keyword arguments and passes up the
+            inheritance chain.
+
+        Keyword Parameters:
+
+            adjacency
+              A tuple (indptr, indices) giving the neighbours of node v as
+              indices[indptr[v]:indptr[v + 1]]. Overrides the lattice
+              parameters.
+
+            lattice_shape
+              The (rows, columns) of the lattice to use if no adjacency is
+              given (default (10, 10))
+
+            neighbourhood
+              The lattice neighbourhood, 'von neumann' or 'moore'
+              (default 'von neumann')
+
+            pairwise_payoffs
+              A types x types matrix whose (i, j) entry is the payoff to type
+              i against type j
+
+            periodic
+              Whether the lattice wraps around at its edges (default True)
+
+            update_rule
+              'replicator' or 'imitation' (default 'replicator')
+
+        """
+
+        super(StructuredReplicatorDynamics, self).__init__(*args, **kwdargs)
+
+        if 'adjacency' in kwdargs and kwdargs['adjacency'] is not None:
+            (indptr, indices) = kwdargs['adjacency']
+            self.adjacency = (np.array(indptr, dtype=np.int),
+                              np.array(indices, dtype=np.int))
+        else:
+            self.adjacency = None
+
+        if 'lattice_shape' in kwdargs and kwdargs['lattice_shape']:
+            self.lattice_shape = tuple(kwdargs['lattice_shape'])
+        else:
+            self.lattice_shape = (10, 10)
+
+        if 'neighbourhood' in kwdargs and kwdargs['neighbourhood']:
+            self.neighbourhood = kwdargs['neighbourhood']
+        else:
+            self.neighbourhood = 'von neumann'
+
+        if 'periodic' in kwdargs and kwdargs['periodic'] is not None:
+            self.periodic = bool(kwdargs['periodic'])
+        else:
+            self.periodic = True
+
+        if 'pairwise_payoffs' in kwdargs and kwdargs['pairwise_payoffs'] is not None:
+            self.pairwise_payoffs = np.array(kwdargs['pairwise_payoffs'], dtype=np.float64)
+        else:
+            self.pairwise_payoffs = None
+
+        if 'update_rule' in kwdargs and kwdargs['update_rule']:
+            self.update_rule = kwdargs['update_rule']
+        else:
+            self.update_rule = 'replicator'
+
+        if self.update_rule not in self.UPDATE_RULES:
+            raise ValueError("Unknown update rule: {0}".format(self.update_rule))
+
+        self.interaction_arity = 2
+
+        self._one_or_many = self.TYPE_ONE
+        self._payoff_matrix = None
+        self._indptr = None
+        self._indices = None
+
+    def _add_default_listeners(self):
+        """ Sets up default event listeners
+
+        Handlers:
+
+            - stable state - :py:func:`stable_state_handler`
+            - force stop - :py:func:`stable_state_handler`
+
+        """
+
+        super(StructuredReplicatorDynamics, self)._add_default_listeners()
+
+        self.add_listener('stable state', stable_state_handler)
+        self.add_listener('force stop', stable_state_handler)
+
+    def _default_types(self):
+        """ Returns a default type object for the population
+
+        """
+
+        return ['A', 'B']
+
+    def num_nodes(self):
+        """ Returns the number of nodes in the population
+
+        """
+
+        if self.adjacency is not None:
+            return len(self.adjacency[0]) - 1
+
+        return self.lattice_shape[0] * self.lattice_shape[1]
+
+    def _random_population(self):
+        """ Generate a random state for every node: a point on the unit simplex
+            for the replicator rule, or a pure strategy for the imitation rule
+
+        """
+
+        if self.update_rule == 'imitation':
+            pop = np.zeros((self.num_nodes(), len(self.types)), dtype=np.float64)
+            pop[np.arange(len(pop)), self.random.randint(len(self.types), size=len(pop))] = 1.
+            return pop
+
+        return self.random.dirichlet([1] * len(self.types), size=self.num_nodes())
+
+    def _null_population(self):
+        """ Generates a population guaranteed to compare falsely with a random
+            population
+
+        """
+
+        return np.zeros((self.num_nodes(), len(self.types)), dtype=np.float64)
+
+    def _profile_payoffs(self, profile):
+        """ You should implement this method (or pass pairwise_payoffs)
+
+        Parameters:
+
+            profile
+              the strategy profile that is being played (tuple of integers)
+
+        """
+
+        return [1, 1]
+
+    def _create_caches(self):
+        if self.pairwise_payoffs is not None:
+            if self.pairwise_payoffs.shape != (len(self.types), len(self.types)):
+                raise ValueError("Pairwise payoffs must be a types x types matrix")
+
+            self._payoff_matrix = self.pairwise_payoffs
+        else:
+            self._profiles_cache = fastfuncs.generate_profiles(np.repeat(np.int(len(self.types)), 2))
+            self._payoffs_cache = np.array([np.array(self._profile_payoffs(c), dtype=np.float64)
+                                                        for c in self._profiles_cache])
+            self._payoff_matrix = payoff_matrix(self._payoffs_cache, len(self.types))
+
+        if self.adjacency is not None:
+            (self._indptr, self._indices) = self.adjacency
+        else:
+            (self._indptr, self._indices) = lattice_adjacency(self.lattice_shape,
+                                                              self.neighbourhood,
+                                                              self.periodic)
+
+    def _step_generation(self, pop):
+        """ Step every node to the next generation against its neighbours
+
+        Parameters:
+
+            pop
+              The nodes x types array of node states
+
+        """
+
+        if self._background_rate is None:
+            _create_caches(self)
+
+        if self.update_rule == 'imitation':
+            return fastfuncs.structured_imitation_step(pop,
+                                                       self._payoff_matrix,
+                                                       self._indptr,
+                                                       self._indices,
+                                                       self._effective_zero)
+
+        return fastfuncs.structured_replicator_step(pop,
+                                                    self._payoff_matrix,
+                                                    self._indptr,
+                                                    self._indices,
+                                                    self._background_rate,
+                                                    self._effective_zero)
+
+
+def lattice_adjacency(shape, neighbourhood='von neumann', periodic=True):
+    """ Builds the (indptr, indices) adjacency structure of a 2-D lattice whose
+        nodes are numbered in row-major order
+
+    Parameters:
+
+        shape
+          the (rows, columns) of the lattice
+
+        neighbourhood
+          'von neumann' (4 neighbours) or 'moore' (8 neighbours)
+
+        periodic
+          whether the lattice wraps around at its edges
+
+    """
+
+    if neighbourhood == 'von neumann':
+        offsets = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    elif neighbourhood == 'moore':
+        offsets = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i or j]
+    else:
+        raise ValueError("Unknown neighbourhood: {0}".format(neighbourhood))
+
+    (rows, cols) = shape
+    (row, col) = np.divmod(np.arange(rows * cols), cols)
+
+    neighbours = np.empty((rows * cols, len(offsets)), dtype=np.int)
+    valid = np.ones((rows * cols, len(offsets)), dtype=np.bool)
+    for k, (drow, dcol) in enumerate(offsets):
+        nrow = row + drow
+        ncol = col + dcol
+        if periodic:
+            nrow %= rows
+            ncol %= cols
+        else:
+            valid[:, k] = (nrow >= 0) & (nrow < rows) & (ncol >= 0) & (ncol < cols)
+        neighbours[:, k] = nrow * cols + ncol
+
+    indptr = np.zeros(rows * cols + 1, dtype=np.int)
+    indptr[1:] = np.cumsum(valid.sum(axis=1))
+
+    return (indptr, neighbours[valid])
+
+
+def graph_adjacency(num_nodes, edges):
+    """ Builds the (indptr, indices) adjacency structure of an undirected graph
+
+    Parameters:
+
+        num_nodes
+          the number of nodes in the graph
+
+        edges
+          a sequence of (node, node) pairs
+
+    """
+
+    edges = np.array(edges, dtype=np.int).reshape(-1, 2)
+    sources = np.concatenate((edges[:, 0], edges[:, 1]))
+    targets = np.concatenate((edges[:, 1], edges[:, 0]))
+
+    order = np.argsort(sources, kind='mergesort')
+
+    indptr = np.zeros(num_nodes + 1, dtype=np.int)
+    indptr[1:] = np.cumsum(np.bincount(sources, minlength=num_nodes))
+
+    return (indptr, targets[order])
+
+
+def stable_state_handler(this, genct, thisgen, lastgen, firstgen):
+    """ Print out a report when a stable state is reached.
+
+    Parameters:
+
+        this
+          a reference to the simulation
+
+        genct
+          the number of generations
+
+        thisgen
+          the stable state population
+
+        lastgen
+          the previous population
+
+        firstgen
+          the initial population
+
+    """
+
+    mean = thisgen.mean(axis=0)
+    print >> this.out, "\tMean state: {0}".format(mean)
+
+    fstr3 = "\t\t{0:>5}: {1:>20}: {2}"
+    for i, pop in enumerate(mean):
+        if abs(pop - 0.) > this.effective_zero:
+            print >> this.out, fstr3.format(i, this.types[i], pop)
+    print >> this.out
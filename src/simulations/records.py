@@ -0,0 +1,878 @@
+""" Reading and writing the records of aggregate stats files
+
+A binary stats file starts with the 8-byte magic string 'SIMSTATS' and a
+little-endian unsigned short format version. Each record that follows is a
+header of (kind, payload length, CRC-32 of the payload) and then the payload.
+The kind is 'P' for a highest-protocol pickle or 'N' for a numpy array in
+.npy format. The first record holds the options of the run and each later
+record holds one duplication result.
+
+Legacy stats files (protocol 0 pickles, each followed by a blank line) are
+detected automatically when reading.
+
+A parser following a stats file that is still being written keeps its
+position in a cursor file (see :py:func:`cursor_path`) holding the byte
+offset of the next record, the number of results read so far and the
+identity of the file (see :py:func:`file_identity`), so that a cursor left
+by an earlier run whose stats file has since been overwritten is detected.
+
+A binary stats file may also have a journal file (see :py:func:`journal_path`)
+starting with the magic string 'SIMJOURN', a version and the 32-byte run
+identifier, followed by one entry per completed result of (duplication,
+byte offset, record length), written after everything else for the result.
+Results that were not written to the stats file have an offset and length
+of 0.
+
+A binary stats file may have a sidecar index file (see :py:func:`index_path`)
+starting with the magic string 'SIMINDEX' and a version, followed by one
+fixed-size entry per result of (duplication, byte offset, record length,
+generation count, converged flag). Unknown generation counts and converged
+flags are stored as -1.
+
+Classes:
+
+    :py:class:`IndexWriter`
+      Writes entries to a stats index file
+
+    :py:class:`JournalWriter`
+      Writes entries to a journal file
+
+    :py:class:`LegacyStatsWriter`
+      Writes records in the legacy text format
+
+    :py:class:`StatsWriter`
+      Writes records in the binary format
+
+Exceptions:
+
+    :py:class:`StatsFileError`
+      Raised when a stats file is corrupt
+
+    :py:class:`TruncatedRecordError`
+      Raised when a stats file ends partway through a record
+
+Functions:
+
+    :py:func:`cursor_path`
+      Returns the path of the cursor file of a stats file
+
+    :py:func:`decode_record`
+      Decodes a record payload
+
+    :py:func:`encode_record`
+      Encodes an object as a record payload
+
+    :py:func:`file_identity`
+      Returns the identity of a binary stats file
+
+    :py:func:`frame_record`
+      Returns the bytes of a whole record
+
+    :py:func:`index_path`
+      Returns the path of the index file of a stats file
+
+    :py:func:`is_binary`
+      Checks whether a stats file is in the binary format
+
+    :py:func:`journal_path`
+      Returns the path of the journal file of a stats file
+
+    :py:func:`iter_legacy_records`
+      Yields the objects in a legacy stats file
+
+    :py:func:`iter_records`
+      Yields the objects in a stats file of either format
+
+    :py:func:`read_cursor`
+      Reads a cursor file
+
+    :py:func:`read_index`
+      Reads a stats index file into a numpy record array
+
+    :py:func:`read_journal`
+      Reads a journal file
+
+    :py:func:`read_record`
+      Reads the next record of a binary stats file
+
+    :py:func:`read_record_at`
+      Reads the record at a byte offset of a binary stats file
+
+    :py:func:`record_offsets`
+      Returns the byte offsets of the records of a binary stats file
+
+    :py:func:`result_summary`
+      Extracts the generation count and converged flag of a result
+
+    :py:func:`shard_path`
+      Returns the path of the stats file of a shard
+
+    :py:func:`write_cursor`
+      Writes a cursor file
+
+"""
+
+import cPickle
+import cStringIO
+import os
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = 'SIMSTATS'
+VERSION = 1
+
+FILE_HEADER = struct.Struct('<8sH')
+RECORD_HEADER = struct.Struct('<cQI')
+
+KIND_PICKLE = 'P'
+KIND_NUMPY = 'N'
+
+INDEX_MAGIC = 'SIMINDEX'
+INDEX_VERSION = 1
+
+INDEX_ENTRY = struct.Struct('<QQQqb')
+INDEX_DTYPE = np.dtype([('duplication', '<u8'),
+                        ('offset', '<u8'),
+                        ('length', '<u8'),
+                        ('generation_count', '<i8'),
+                        ('converged', 'i1')])
+
+JOURNAL_MAGIC = 'SIMJOURN'
+JOURNAL_VERSION = 1
+
+JOURNAL_IDENTIFIER = struct.Struct('<32s')
+JOURNAL_ENTRY = struct.Struct('<QQQ')
+JOURNAL_DTYPE = np.dtype([('duplication', '<u8'),
+                          ('offset', '<u8'),
+                          ('length', '<u8')])
+
+
+class StatsFileError(ValueError):
+    """ Raised when a stats file is truncated, corrupt or of an unknown version
+
+    """
+
+    pass
+
+
+class TruncatedRecordError(StatsFileError):
+    """ Raised when a stats file ends partway through a record (which may
+        still be being written)
+
+    """
+
+    pass
+
+
+class StatsWriter(object):
+    """ Writes objects to a file object in the binary record format
+
+    Parameters:
+
+        statsfile
+          a file object opened for binary writing
+
+    Public Methods:
+
+        :py:meth:`~StatsWriter.write_header`
+          Writes the file header
+
+        :py:meth:`~StatsWriter.write`
+          Writes an object as a record
+
+        :py:meth:`~StatsWriter.write_raw`
+          Writes an encoded record
+
+    """
+
+    def __init__(self, statsfile):
+        """ Sets up the writer
+
+        Parameters:
+
+            statsfile
+              a file object opened for binary writing
+
+        """
+
+        self.statsfile = statsfile
+
+    def write_header(self):
+        """ Writes the file header (once, at the start of the file)
+
+        """
+
+        self.statsfile.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, obj):
+        """ Writes an object as a record and returns the (offset, length) of
+            the whole record in the file
+
+        Parameters:
+
+            obj
+              the object to write
+
+        """
+
+        return self.write_raw(*encode_record(obj))
+
+    def write_raw(self, kind, payload):
+        """ Writes an already encoded record (as returned by
+            :py:func:`encode_record` or by :py:func:`read_record` with decode
+            false) and returns the (offset, length) of the whole record in the
+            file
+
+        Parameters:
+
+            kind
+              the record kind
+
+            payload
+              the record payload
+
+        """
+
+        offset = self.statsfile.tell()
+        self.statsfile.write(frame_record(kind, payload))
+        self.statsfile.flush()
+
+        return (offset, RECORD_HEADER.size + len(payload))
+
+
+class LegacyStatsWriter(object):
+    """ Writes objects to a file object in the legacy text format (a protocol
+        0 pickle followed by a blank line)
+
+    Parameters:
+
+        statsfile
+          a file object opened for writing
+
+    """
+
+    def __init__(self, statsfile):
+        """ Sets up the writer
+
+        Parameters:
+
+            statsfile
+              a file object opened for writing
+
+        """
+
+        self.statsfile = statsfile
+
+    def write_header(self):
+        """ Does nothing (legacy files have no header)
+
+        """
+
+        pass
+
+    def write(self, obj):
+        """ Writes an object as a record and returns the (offset, length) of
+            the whole record in the file
+
+        Parameters:
+
+            obj
+              the object to write
+
+        """
+
+        offset = self.statsfile.tell()
+        print >> self.statsfile, cPickle.dumps(obj)
+        print >> self.statsfile
+        self.statsfile.flush()
+
+        return (offset, self.statsfile.tell() - offset)
+
+
+class IndexWriter(object):
+    """ Writes entries to a stats index file
+
+    Parameters:
+
+        indexfile
+          a file object opened for binary writing
+
+    Public Methods:
+
+        :py:meth:`~IndexWriter.write_header`
+          Writes the index file header
+
+        :py:meth:`~IndexWriter.write`
+          Writes an index entry
+
+    """
+
+    def __init__(self, indexfile):
+        """ Sets up the writer
+
+        Parameters:
+
+            indexfile
+              a file object opened for binary writing
+
+        """
+
+        self.indexfile = indexfile
+
+    def write_header(self):
+        """ Writes the index file header (once, at the start of the file)
+
+        """
+
+        self.indexfile.write(FILE_HEADER.pack(INDEX_MAGIC, INDEX_VERSION))
+
+    def write(self, duplication, offset, length, generation_count=-1, converged=-1):
+        """ Writes an index entry
+
+        Parameters:
+
+            duplication
+              the duplication number of the result
+
+            offset
+              the byte offset of the result's record in the stats file
+
+            length
+              the length in bytes of the result's record
+
+            generation_count
+              the number of generations of the result (-1 if unknown)
+
+            converged
+              1 if the result reached a stable state, 0 if not, -1 if unknown
+
+        """
+
+        self.indexfile.write(INDEX_ENTRY.pack(duplication, offset, length,
+                                              generation_count, converged))
+        self.indexfile.flush()
+
+
+class JournalWriter(object):
+    """ Writes entries to a journal file
+
+    Parameters:
+
+        journalfile
+          a file object opened for binary writing
+
+    Public Methods:
+
+        :py:meth:`~JournalWriter.write_header`
+          Writes the journal file header
+
+        :py:meth:`~JournalWriter.write`
+          Writes a journal entry
+
+    """
+
+    def __init__(self, journalfile):
+        """ Sets up the writer
+
+        Parameters:
+
+            journalfile
+              a file object opened for binary writing
+
+        """
+
+        self.journalfile = journalfile
+
+    def write_header(self, identifier):
+        """ Writes the journal file header (once, at the start of the file)
+
+        Parameters:
+
+            identifier
+              the identifier of the run (at most 32 characters)
+
+        """
+
+        self.journalfile.write(FILE_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+        self.journalfile.write(JOURNAL_IDENTIFIER.pack(identifier))
+        self.journalfile.flush()
+
+    def write(self, duplication, offset=0, length=0):
+        """ Writes a journal entry
+
+        Parameters:
+
+            duplication
+              the duplication number of the completed result
+
+            offset
+              the byte offset of the result's record in the stats file (0 if
+              it was not written)
+
+            length
+              the length in bytes of the result's record (0 if it was not
+              written)
+
+        """
+
+        self.journalfile.write(JOURNAL_ENTRY.pack(duplication, offset, length))
+        self.journalfile.flush()
+
+
+def _checksum(payload):
+    """ The unsigned CRC-32 of a payload
+
+    """
+
+    return zlib.crc32(payload) & 0xffffffff
+
+
+def encode_record(obj):
+    """ Encodes an object as a (kind, payload) pair: non-object numpy arrays
+        are stored raw, everything else as a highest-protocol pickle
+
+    Parameters:
+
+        obj
+          the object to encode
+
+    """
+
+    if isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+        buf = cStringIO.StringIO()
+        np.save(buf, obj)
+        return (KIND_NUMPY, buf.getvalue())
+
+    return (KIND_PICKLE, cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL))
+
+
+def frame_record(kind, payload):
+    """ Returns the bytes of a whole record (header and payload), e.g. to
+        send it over a socket
+
+    Parameters:
+
+        kind
+          the record kind
+
+        payload
+          the record payload
+
+    """
+
+    return RECORD_HEADER.pack(kind, len(payload), _checksum(payload)) + payload
+
+
+def decode_record(kind, payload):
+    """ Decodes a record payload
+
+    Parameters:
+
+        kind
+          the record kind
+
+        payload
+          the record payload
+
+    """
+
+    if kind == KIND_PICKLE:
+        return cPickle.loads(payload)
+    elif kind == KIND_NUMPY:
+        return np.load(cStringIO.StringIO(payload))
+    else:
+        raise StatsFileError("Unknown record kind: {0!r}".format(kind))
+
+
+def is_binary(statsfile):
+    """ Checks whether a stats file is in the binary format. Leaves the file
+        positioned at its first record if so, and at its start otherwise.
+
+    Parameters:
+
+        statsfile
+          a file object opened for binary reading
+
+    """
+
+    start = statsfile.tell()
+    header = statsfile.read(FILE_HEADER.size)
+
+    if len(header) == FILE_HEADER.size and header[:len(MAGIC)] == MAGIC:
+        (_, version) = FILE_HEADER.unpack(header)
+        if version > VERSION:
+            raise StatsFileError("Unsupported stats file version {0}".format(version))
+        return True
+
+    statsfile.seek(start)
+    return False
+
+
+def read_record(statsfile, decode=True):
+    """ Reads the next record of a binary stats file, returning the decoded
+        object (or the raw (kind, payload) pair if decode is false). Raises
+        EOFError at the end of the file.
+
+    Parameters:
+
+        statsfile
+          a file object positioned at the start of a record
+
+        decode
+          whether to decode the payload (default True)
+
+    """
+
+    header = statsfile.read(RECORD_HEADER.size)
+    if not header:
+        raise EOFError()
+    elif len(header) < RECORD_HEADER.size:
+        raise TruncatedRecordError("Truncated record header")
+
+    (kind, length, checksum) = RECORD_HEADER.unpack(header)
+    payload = statsfile.read(length)
+    if len(payload) < length:
+        raise TruncatedRecordError("Truncated record payload")
+    elif _checksum(payload) != checksum:
+        raise StatsFileError("Record checksum mismatch")
+
+    if decode:
+        return decode_record(kind, payload)
+
+    return (kind, payload)
+
+
+def file_identity(statsfile):
+    """ Returns the identity of a binary stats file: the (length, CRC-32) of
+        the payload of its options record and the run identifier from its
+        journal ('' if it has none), since reruns with the same seed and
+        options write the same options record. Leaves the file positioned
+        after the record header.
+
+    Parameters:
+
+        statsfile
+          a file object for a binary stats file with a complete options record
+
+    """
+
+    identifier = ''
+    path = journal_path(statsfile.name)
+    if os.path.exists(path):
+        with open(path, "rb") as journalfile:
+            try:
+                identifier = _read_journal_header(journalfile)
+            except StatsFileError:
+                pass
+
+    statsfile.seek(FILE_HEADER.size)
+    (kind, length, checksum) = RECORD_HEADER.unpack(statsfile.read(RECORD_HEADER.size))
+
+    return (length, checksum, identifier)
+
+
+def read_record_at(statsfile, offset):
+    """ Reads the record at a byte offset of a binary stats file
+
+    Parameters:
+
+        statsfile
+          a file object opened for binary reading
+
+        offset
+          the byte offset of the record (as stored in the index)
+
+    """
+
+    statsfile.seek(offset)
+
+    return read_record(statsfile)
+
+
+def record_offsets(statsfile):
+    """ Returns a numpy array of the byte offsets of the records of a binary
+        stats file (including the options record), reading only the record
+        headers
+
+    Parameters:
+
+        statsfile
+          a file object opened for binary reading
+
+    """
+
+    statsfile.seek(0)
+    if not is_binary(statsfile):
+        raise StatsFileError("Record offsets need a binary stats file")
+
+    offsets = []
+    while True:
+        offset = statsfile.tell()
+        header = statsfile.read(RECORD_HEADER.size)
+        if not header:
+            break
+        elif len(header) < RECORD_HEADER.size:
+            raise TruncatedRecordError("Truncated record header")
+
+        offsets.append(offset)
+        statsfile.seek(RECORD_HEADER.unpack(header)[1], os.SEEK_CUR)
+
+    return np.array(offsets, dtype=np.uint64)
+
+
+def cursor_path(stats_path):
+    """ Returns the path of the cursor file of a stats file
+
+    Parameters:
+
+        stats_path
+          the path of the stats file
+
+    """
+
+    return stats_path + ".cursor"
+
+
+def read_cursor(path):
+    """ Reads the (offset, count, identity) triple of a cursor file, or returns
+        None if there is no cursor file. The identity is None for a cursor
+        written without one, and has an empty run identifier for a cursor
+        written without that.
+
+    Parameters:
+
+        path
+          the path of the cursor file
+
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r") as cursorfile:
+        fields = cursorfile.read().split()
+
+    (offset, count) = (int(fields[0]), int(fields[1]))
+    if len(fields) >= 4:
+        identifier = fields[4] if len(fields) > 4 else ''
+        return (offset, count, (int(fields[2]), int(fields[3]), identifier))
+
+    return (offset, count, None)
+
+
+def write_cursor(path, offset, count, identity):
+    """ Writes a cursor file, replacing any old one atomically
+
+    Parameters:
+
+        path
+          the path of the cursor file
+
+        offset
+          the byte offset of the next record to read
+
+        count
+          the number of results read so far
+
+        identity
+          the identity of the stats file (see :py:func:`file_identity`)
+
+    """
+
+    with open(path + ".tmp", "w") as cursorfile:
+        cursorfile.write("{0} {1} {2} {3} {4}\n".format(offset, count, *identity))
+
+    os.rename(path + ".tmp", path)
+
+
+def journal_path(stats_path):
+    """ Returns the path of the journal file of a stats file
+
+    Parameters:
+
+        stats_path
+          the path of the stats file
+
+    """
+
+    return stats_path + ".journal"
+
+
+def read_journal(path):
+    """ Reads a journal file, returning the run identifier and a numpy record
+        array of the entries with the fields of :py:data:`JOURNAL_DTYPE`
+        (ignoring a partially written trailing entry)
+
+    Parameters:
+
+        path
+          the path of the journal file
+
+    """
+
+    with open(path, "rb") as journalfile:
+        identifier = _read_journal_header(journalfile)
+        data = journalfile.read()
+
+    count = len(data) // JOURNAL_DTYPE.itemsize
+    entries = np.frombuffer(data[:count * JOURNAL_DTYPE.itemsize], dtype=JOURNAL_DTYPE)
+
+    return (identifier, entries)
+
+
+def _read_journal_header(journalfile):
+    """ Reads the header of a journal file, returning the run identifier
+
+    Parameters:
+
+        journalfile
+          a file object for the journal file, positioned at its start
+
+    """
+
+    header = journalfile.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size or header[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+        raise StatsFileError("Not a journal file")
+
+    (_, version) = FILE_HEADER.unpack(header)
+    if version > JOURNAL_VERSION:
+        raise StatsFileError("Unsupported journal file version {0}".format(version))
+
+    identifier = journalfile.read(JOURNAL_IDENTIFIER.size)
+    if len(identifier) < JOURNAL_IDENTIFIER.size:
+        raise TruncatedRecordError("Truncated journal header")
+
+    return JOURNAL_IDENTIFIER.unpack(identifier)[0].rstrip('\0')
+
+
+def index_path(stats_path):
+    """ Returns the path of the index file of a stats file
+
+    Parameters:
+
+        stats_path
+          the path of the stats file
+
+    """
+
+    return stats_path + ".index"
+
+
+def shard_path(stats_path, shard, num_shards):
+    """ Returns the path of the stats file of a shard of a run (which has its
+        own index and journal files)
+
+    Parameters:
+
+        stats_path
+          the path of the stats file of the whole run
+
+        shard
+          the shard (from 0)
+
+        num_shards
+          the number of shards
+
+    """
+
+    return "{0}.shard{1}of{2}".format(stats_path, shard, num_shards)
+
+
+def read_index(path):
+    """ Reads a stats index file into a (memory-mapped) numpy record array
+        with the fields of :py:data:`INDEX_DTYPE`
+
+    Parameters:
+
+        path
+          the path of the index file
+
+    """
+
+    with open(path, "rb") as indexfile:
+        header = indexfile.read(FILE_HEADER.size)
+
+    if len(header) < FILE_HEADER.size or header[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+        raise StatsFileError("Not a stats index file")
+
+    (_, version) = FILE_HEADER.unpack(header)
+    if version > INDEX_VERSION:
+        raise StatsFileError("Unsupported index file version {0}".format(version))
+
+    # ignore a partially written trailing entry
+    count = (os.path.getsize(path) - FILE_HEADER.size) // INDEX_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=INDEX_DTYPE)
+
+    return np.memmap(path, dtype=INDEX_DTYPE, mode="r",
+                     offset=FILE_HEADER.size, shape=(count,))
+
+
+def result_summary(result):
+    """ Extracts the (generation_count, converged) pair of a result for the
+        index, using -1 for anything that cannot be determined
+
+    Parameters:
+
+        result
+          the result object returned by a simulation
+
+    """
+
+    generation_count = -1
+    converged = -1
+
+    if isinstance(result, tuple) and len(result) and \
+            isinstance(result[0], (int, long, np.integer)):
+        generation_count = int(result[0])
+
+    flag = getattr(result, 'converged', None)
+    if flag is not None:
+        converged = int(bool(flag))
+
+    return (generation_count, converged)
+
+
+def iter_legacy_records(statsfile):
+    """ Yields the objects in a legacy stats file
+
+    Parameters:
+
+        statsfile
+          a file object for the file to parse
+
+    """
+
+    lines = []
+    for line in statsfile:
+        if line == "\n":
+            yield cPickle.loads("".join(lines))
+            lines = []
+        else:
+            lines.append(line)
+
+
+def iter_records(statsfile):
+    """ Yields the objects in a stats file, detecting its format
+
+    Parameters:
+
+        statsfile
+          a file object opened for binary reading
+
+    """
+
+    if not is_binary(statsfile):
+        for obj in iter_legacy_records(statsfile):
+            yield obj
+        return
+
+    while True:
+        try:
+            obj = read_record(statsfile)
+        except EOFError:
+            return
+
+        yield obj
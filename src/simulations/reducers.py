@@ -0,0 +1,396 @@
+""" Online reducers that summarize simulation results as they arrive
+
+Reducers are registered on a
+:py:class:`~simulations.simulation_runner.SimulationRunner` with
+:py:meth:`~simulations.simulation_runner.SimulationRunner.add_reducer`. Each
+result is passed to every reducer as it comes back, and the states of the
+reducers are saved at the end of the run in a sidecar file next to the stats
+file (see :py:func:`reduced_path`).
+
+Classes:
+
+    :py:class:`AttractorClusters`
+      Clusters the final states into attractors
+
+    :py:class:`AttractorCounter`
+      Counts the results reaching each final state
+
+    :py:class:`FinalStateMoments`
+      Keeps the running mean and variance of the final states
+
+    :py:class:`GenerationHistogram`
+      Counts the results by generation count
+
+    :py:class:`Reducer`
+      Base class for reducers
+
+Functions:
+
+    :py:func:`read_reduced`
+      Reads the saved reducer states of a stats file
+
+    :py:func:`reduced_path`
+      Returns the path of the reducer state file of a stats file
+
+    :py:func:`write_reduced`
+      Saves the states of a list of reducers
+
+"""
+
+import numpy as np
+
+from simulations.clustering import AttractorClustering
+from simulations.columns import _is_replicator_result
+from simulations.records import StatsFileError
+from simulations.records import StatsWriter
+from simulations.records import is_binary
+from simulations.records import read_record
+
+
+class Reducer(object):
+    """ Base class for reducers
+
+    Keyword Parameters:
+
+        name
+          the name under which the state is saved (default the class's
+          :py:attr:`name`)
+
+    Public Methods:
+
+        :py:meth:`~Reducer.state`
+          Returns the picklable state of the reducer
+
+        :py:meth:`~Reducer.update`
+          Updates the reducer with a result
+
+    Methods to Implement:
+
+        :py:meth:`~Reducer.state`
+          Returns the picklable state of the reducer
+
+        :py:meth:`~Reducer._update`
+          Updates the reducer with a (generation_count, initial_pop,
+          final_pop, result_data) result
+
+    """
+
+    name = 'reducer'
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the reducer
+
+        Keyword Parameters:
+
+            name
+              the name under which the state is saved
+
+        """
+
+        if 'name' in kwdargs and kwdargs['name']:
+            self.name = kwdargs['name']
+
+        self.count = 0
+
+    def update(self, duplication, result):
+        """ Updates the reducer with a result
+
+        Parameters:
+
+            duplication
+              the (1-based) duplication number of the result
+
+            result
+              a (generation_count, initial_pop, final_pop, result_data) result
+
+        """
+
+        if not _is_replicator_result(result):
+            raise ValueError("Reducers need (generation_count, initial_pop, final_pop, result_data) results")
+
+        self.count += 1
+        self._update(duplication, result)
+
+    def _update(self, duplication, result):
+        """ Updates the reducer with a result (should implement)
+
+        Parameters:
+
+            duplication
+              the (1-based) duplication number of the result
+
+            result
+              a (generation_count, initial_pop, final_pop, result_data) result
+
+        """
+
+        pass
+
+    def state(self):
+        """ Returns the picklable state of the reducer (should implement)
+
+        """
+
+        return {'count': self.count}
+
+
+class AttractorCounter(Reducer):
+    """ Counts the results reaching each final state, with the final states
+        rounded to a number of decimals
+
+    Keyword Parameters:
+
+        decimals
+          the number of decimals to which to round the final states
+          (default 6)
+
+        name
+          the name under which the state is saved (default 'attractors')
+
+    """
+
+    name = 'attractors'
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the counter
+
+        Keyword Parameters:
+
+            decimals
+              the number of decimals to which to round the final states
+              (default 6)
+
+        """
+
+        super(AttractorCounter, self).__init__(*args, **kwdargs)
+
+        if 'decimals' in kwdargs and kwdargs['decimals'] is not None:
+            self.decimals = kwdargs['decimals']
+        else:
+            self.decimals = 6
+
+        self.counts = {}
+
+    def _update(self, duplication, result):
+        final_pop = np.round(np.asarray(result[2], dtype=np.float64), self.decimals) + 0.
+        key = tuple(final_pop.ravel().tolist())
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def state(self):
+        """ Returns a dict with the number of results and a list of
+            (final_state, count) pairs, most common first
+
+        """
+
+        return {'count': self.count,
+                'attractors': sorted(self.counts.items(), key=lambda item: -item[1])}
+
+
+class AttractorClusters(Reducer):
+    """ Clusters the final states into attractors within a multiple of the
+        effective zero (see :py:class:`~simulations.clustering.AttractorClustering`)
+
+    Keyword Parameters:
+
+        effective_zero
+          The effective zero value for floating-point comparisons
+          (default 1e-10)
+
+        name
+          the name under which the state is saved (default 'clusters')
+
+        tolerance_scale
+          The multiple of the effective zero within which states are
+          clustered (default 1e4)
+
+    """
+
+    name = 'clusters'
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the clustering
+
+        Keyword Parameters:
+
+            effective_zero
+              The effective zero value for floating-point comparisons
+              (default 1e-10)
+
+            tolerance_scale
+              The multiple of the effective zero within which states are
+              clustered (default 1e4)
+
+        """
+
+        super(AttractorClusters, self).__init__(*args, **kwdargs)
+
+        self.clustering = AttractorClustering(**kwdargs)
+
+    def _update(self, duplication, result):
+        self.clustering.add(result[2])
+
+    def state(self):
+        """ Returns a dict with the number of results, the tolerance and the
+            list of (state, count, frequency, standard_error) attractors, most
+            common first
+
+        """
+
+        return {'count': self.count,
+                'tolerance': self.clustering.tolerance,
+                'attractors': self.clustering.attractors()}
+
+
+class GenerationHistogram(Reducer):
+    """ Counts the results by generation count, in bins of a fixed width
+
+    Keyword Parameters:
+
+        bin_width
+          the width of the bins (default 1)
+
+        name
+          the name under which the state is saved (default 'generations')
+
+    """
+
+    name = 'generations'
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the histogram
+
+        Keyword Parameters:
+
+            bin_width
+              the width of the bins (default 1)
+
+        """
+
+        super(GenerationHistogram, self).__init__(*args, **kwdargs)
+
+        if 'bin_width' in kwdargs and kwdargs['bin_width']:
+            self.bin_width = int(kwdargs['bin_width'])
+        else:
+            self.bin_width = 1
+
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _update(self, duplication, result):
+        slot = int(result[0]) // self.bin_width
+        if slot >= len(self.counts):
+            self.counts = np.concatenate((self.counts,
+                                          np.zeros(max(slot + 1 - len(self.counts), len(self.counts)),
+                                                   dtype=np.int64)))
+        self.counts[slot] += 1
+
+    def state(self):
+        """ Returns a dict with the number of results, the bin width and the
+            array of counts per bin (bin k holding generation counts from
+            k * bin_width to (k + 1) * bin_width - 1)
+
+        """
+
+        used = np.flatnonzero(self.counts)
+        end = used[-1] + 1 if len(used) else 0
+
+        return {'count': self.count,
+                'bin_width': self.bin_width,
+                'counts': self.counts[:end].copy()}
+
+
+class FinalStateMoments(Reducer):
+    """ Keeps the running mean and variance of the final states (using
+        Welford's algorithm)
+
+    Keyword Parameters:
+
+        name
+          the name under which the state is saved (default 'final_state')
+
+    """
+
+    name = 'final_state'
+
+    def __init__(self, *args, **kwdargs):
+        """ Sets up the moments
+
+        """
+
+        super(FinalStateMoments, self).__init__(*args, **kwdargs)
+
+        self.mean = None
+        self._sum_squares = None
+
+    def _update(self, duplication, result):
+        final_pop = np.asarray(result[2], dtype=np.float64)
+
+        if self.mean is None:
+            self.mean = np.zeros(final_pop.shape, dtype=np.float64)
+            self._sum_squares = np.zeros(final_pop.shape, dtype=np.float64)
+
+        delta = final_pop - self.mean
+        self.mean += delta / self.count
+        self._sum_squares += delta * (final_pop - self.mean)
+
+    def state(self):
+        """ Returns a dict with the number of results and the mean and
+            (population) variance of the final states
+
+        """
+
+        if self.mean is None:
+            return {'count': 0, 'mean': None, 'variance': None}
+
+        return {'count': self.count,
+                'mean': self.mean.copy(),
+                'variance': self._sum_squares / self.count}
+
+
+def reduced_path(stats_path):
+    """ Returns the path of the reducer state file of a stats file
+
+    Parameters:
+
+        stats_path
+          the path of the stats file
+
+    """
+
+    return stats_path + ".reduced"
+
+
+def write_reduced(path, reducers):
+    """ Saves the states of a list of reducers, as a dict by reducer name in a
+        single-record binary stats file
+
+    Parameters:
+
+        path
+          the path of the file to write
+
+        reducers
+          the list of :py:class:`Reducer` instances
+
+    """
+
+    with open(path, "wb") as reducedfile:
+        writer = StatsWriter(reducedfile)
+        writer.write_header()
+        writer.write(dict((reducer.name, reducer.state()) for reducer in reducers))
+
+
+def read_reduced(path):
+    """ Reads the dict of reducer states saved by :py:func:`write_reduced`
+
+    Parameters:
+
+        path
+          the path of the reducer state file
+
+    """
+
+    with open(path, "rb") as reducedfile:
+        if not is_binary(reducedfile):
+            raise StatsFileError("Not a reducer state file")
+
+        return read_record(reducedfile)
@@ -0,0 +1,139 @@
+""" Reproducible random streams for the duplications of a run
+
+Every run has a master seed (stored with its options in the stats file), and
+the random stream of each duplication is derived from the master seed and
+the (1-based) duplication number alone: the SHA-256 digest of the pair seeds
+a :py:class:`numpy.random.RandomState`. The streams of different
+duplications are therefore independent, and any duplication can be replayed
+exactly from the master seed and its number, however the run was split into
+tasks, shards or workers.
+
+Classes:
+
+    :py:class:`RandomStreams`
+      The random streams of the duplications of a task
+
+Functions:
+
+    :py:func:`duplication_seed`
+      Returns the seed of the random stream of a duplication
+
+    :py:func:`new_master_seed`
+      Draws a new master seed from OS entropy
+
+"""
+
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+SEED_PAIR = struct.Struct('<QQ')
+
+# master seeds are non-negative 64-bit signed integers, so that they fit in
+# SQLite (and the catalogue)
+MAX_SEED = 2 ** 63 - 1
+
+
+class RandomStreams(object):
+    """ The random streams of a consecutive range of duplications, which are
+        passed to the simulation of a task
+
+    Parameters:
+
+        master_seed
+          the master seed of the run
+
+        first
+          the (1-based) number of the first duplication (default 1)
+
+    Public Methods:
+
+        :py:meth:`~RandomStreams.random_state`
+          Returns a new random state for a duplication
+
+        :py:meth:`~RandomStreams.seed`
+          Returns the seed of a duplication
+
+    """
+
+    def __init__(self, master_seed, first=1):
+        """ Sets up the streams
+
+        Parameters:
+
+            master_seed
+              the master seed of the run
+
+            first
+              the (1-based) number of the first duplication (default 1)
+
+        """
+
+        self.master_seed = master_seed
+        self.first = first
+
+    def seed(self, k=0):
+        """ Returns the seed (see :py:func:`duplication_seed`) of the k-th
+            duplication of the range
+
+        Parameters:
+
+            k
+              the offset of the duplication from the first one (default 0)
+
+        """
+
+        return duplication_seed(self.master_seed, self.first + k)
+
+    def random_state(self, k=0):
+        """ Returns a new :py:class:`numpy.random.RandomState` at the start of
+            the stream of the k-th duplication of the range
+
+        Parameters:
+
+            k
+              the offset of the duplication from the first one (default 0)
+
+        """
+
+        return np.random.RandomState(self.seed(k))
+
+    def __eq__(self, other):
+        return isinstance(other, RandomStreams) and \
+                (self.master_seed, self.first) == (other.master_seed, other.first)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "RandomStreams({0!r}, {1!r})".format(self.master_seed, self.first)
+
+
+def duplication_seed(master_seed, duplication):
+    """ Returns the seed of the random stream of a duplication: an array of
+        eight 32-bit words from the SHA-256 digest of the master seed and the
+        duplication number (usable as a key to memoize results by)
+
+    Parameters:
+
+        master_seed
+          the master seed of the run
+
+        duplication
+          the (1-based) duplication number
+
+    """
+
+    digest = hashlib.sha256(SEED_PAIR.pack(master_seed, duplication)).digest()
+
+    return np.frombuffer(digest, dtype='<u4').astype(np.uint32)
+
+
+def new_master_seed():
+    """ Draws a new master seed from OS entropy
+
+    """
+
+    return struct.unpack('<Q', os.urandom(8))[0] & MAX_SEED
@@ -10,6 +10,8 @@ Classes:
 import os
 import sys
 
+import numpy as np
+
 from simulations.base import Base
 from simulations.base import listener
 
@@ -75,14 +77,37 @@ class Simulation(Base):
           The name of a file to which to dump output (or None, indicating
           stdout)
 
+        streams
+          The :py:class:`~simulations.seeds.RandomStreams` of the task's
+          duplications (default None, to seed from OS entropy)
+
     Public Methods:
 
+        :py:meth:`random_state`
+          Returns a new random state for a duplication of the task
+
+        :py:meth:`reset`
+          Prepares the simulation to run another duplication
+
         :py:meth:`run`
           Runs the simulation
 
         :py:meth:`set_output_file`
           Sets the output file name
 
+    Attributes:
+
+        random
+          The :py:class:`numpy.random.RandomState` that the simulation should
+          draw its random numbers from (by default the stream of its first
+          duplication, started afresh by each :py:meth:`run`)
+
+        reusable
+          Whether a worker may keep an instance and :py:meth:`reset` it for
+          later duplications with the same class and data instead of
+          creating a new one (default False; subclasses that set it must
+          reset all of their per-run state in :py:meth:`reset`)
+
     Methods to Implement:
 
         :py:meth:`~simulations.base.Base._add_listeners`
@@ -102,12 +127,18 @@ class Simulation(Base):
         outfile error(this)
           emitted when there was an error opening the output file
 
+        reset(this)
+          emitted when :py:meth:`~Simulation.reset` has prepared the
+          simulation for another duplication
+
         run(this)
           emitted just before :py:meth:`~Simulation._run` is called
 
     """
 
-    def __init__(self, data, iteration, outfile, *args, **kwdargs):
+    reusable = False
+
+    def __init__(self, data, iteration, outfile, streams=None, *args, **kwdargs):
         """ Sets up the simulation parameters
 
         Parameters:
@@ -124,17 +155,24 @@ class Simulation(Base):
               The name of a file to which to dump output (or None, indicating
               stdout)
 
+            streams
+              The :py:class:`~simulations.seeds.RandomStreams` of the task's
+              duplications (default None, to seed from OS entropy)
+
         """
 
         super(Simulation, self).__init__(*args, **kwdargs)
 
         self.data = data
         self.num = iteration
+        self.streams = streams
+        self._random = None
         self.outfile = None
         self.out = None
         self.out_opened = False
         self.result = None
         self.is_running = False
+        self._initial_listeners = None
 
         self.set_output_file(outfile)
 
@@ -157,12 +195,93 @@ class Simulation(Base):
 
         """
 
+        if self._initial_listeners is None:
+            self._initial_listeners = (dict((event, listeners[:]) for (event, listeners) in self._map.items()),
+                                       dict((event, listeners[:]) for (event, listeners) in self._oncemap.items()))
+
+        self._random = None
         self.is_running = True
         self.emit('run', self)
         self.result = self._run()
         self.emit('done', self)
         return self.result
 
+    @property
+    def random(self):
+        """ The :py:class:`numpy.random.RandomState` that the simulation
+            should draw its random numbers from, created on first use
+
+        """
+
+        if self._random is None:
+            self._random = self.random_state()
+
+        return self._random
+
+    @random.setter
+    def random(self, value):
+        self._random = value
+
+    def random_state(self, k=0):
+        """ Returns a new :py:class:`numpy.random.RandomState` at the start of
+            the stream of the k-th duplication of the task (for tasks that
+            run several, like sweeps), or seeded from OS entropy if the
+            simulation has no streams
+
+        Parameters:
+
+            k
+              the offset of the duplication from the task's first one
+              (default 0)
+
+        """
+
+        if self.streams is None:
+            return np.random.RandomState()
+
+        return self.streams.random_state(k)
+
+    def reset(self, iteration, outfile, streams=None):
+        """ Prepares the simulation to run another duplication with the same
+            data: sets the iteration number and outfile, clears the result and
+            restores the listeners it had when it first ran (so once-listeners
+            fire again, and listeners added since are dropped). Subclasses
+            should extend this to clear any other per-run state, keeping what
+            can be reused (like caches).
+
+        Parameters:
+
+            iteration
+              The iteration number of the next duplication
+
+            outfile
+              The name of a file to which to dump output (or None, indicating
+              stdout)
+
+            streams
+              The :py:class:`~simulations.seeds.RandomStreams` of the next
+              task's duplications (default None)
+
+        """
+
+        _close_out_fd(self)
+
+        self.num = iteration
+        self.streams = streams
+        self._random = None
+        self.result = None
+        self.is_running = False
+
+        if self._initial_listeners is not None:
+            (listeners, once_listeners) = self._initial_listeners
+            self._map.clear()
+            self._map.update((event, handlers[:]) for (event, handlers) in listeners.items())
+            self._oncemap.clear()
+            self._oncemap.update((event, handlers[:]) for (event, handlers) in once_listeners.items())
+
+        self.set_output_file(outfile)
+        self.emit('reset', self)
+
     def _run(self, *args, **kwdargs):
         """ Actual functionality for running the simulation (should implement)
 
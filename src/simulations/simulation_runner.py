@@ -1,37 +1,108 @@
 """ Handler for running simulations in a multiprocessing environment
 
+Each worker keeps up to MAX_KEPT_SIMULATIONS simulation instances for reuse.
+A simulation class opts in by setting
+:py:attr:`~simulations.simulation.Simulation.reusable` once its
+:py:meth:`~simulations.simulation.Simulation.reset` clears all of its per-run
+state (the library dynamics leave this to their concrete subclasses, as the
+examples do). The next task with the same class and data then resets a kept
+instance instead of creating a new one, keeping its caches. Classes with a
+share_caches method share their read-only caches between the instances with
+the same data in a process whether or not they opt in.
+
 Classes:
 
     :py:class:`SimulationRunner`
-      Handles option parsing and a pp server pool for simulations
+      Handles option parsing and a worker pool for simulations
 
 Functions:
 
+    :py:func:`default_listening_handler`
+      Default handler for 'listening' events
+
     :py:func:`default_pool_handler`
       Default handler for 'pool started' events
 
+    :py:func:`default_replayed_handler`
+      Default handler for 'replayed' events
+
     :py:func:`default_start_handler`
       Default handler for 'start' events
 
     :py:func:`default_result_handler`
       Default handler for 'result' events
 
+    :py:func:`parse_duplications`
+      Parses a list of duplication numbers and ranges
+
     :py:func:`run_simulation`
       runs a simulation task
 
+    :py:func:`shard_range`
+      Returns the duplications owned by a shard
+
 """
 
+import collections
 import cPickle
 import os
 import multiprocessing as mp
 import sys
+import threading
+import time
 
 from simulations.base import Base
 from simulations.base import withoptions
-## pp stuff
-#from simulations.utils.fake_server import Server as FakeServer
+from simulations.catalogue import Catalogue
+from simulations.columns import ColumnWriter
+from simulations.columns import _unwrap_swept
+from simulations.dispatch import BACKENDS
+from simulations.dispatch import ChunkSizer
+from simulations.dispatch import WorkerPool
+from simulations.dispatch import imap_chunked
+from simulations.distributed import Coordinator
+from simulations.distributed import parse_address
+from simulations.distributed import work_for
+from simulations.records import FILE_HEADER
+from simulations.records import INDEX_ENTRY
+from simulations.records import IndexWriter
+from simulations.records import JOURNAL_ENTRY
+from simulations.records import JOURNAL_IDENTIFIER
+from simulations.records import JournalWriter
+from simulations.records import LegacyStatsWriter
+from simulations.records import StatsFileError
+from simulations.records import StatsWriter
+from simulations.records import index_path
+from simulations.records import is_binary
+from simulations.records import journal_path
+from simulations.records import encode_record
+from simulations.records import read_index
+from simulations.records import read_journal
+from simulations.records import read_record
+from simulations.records import read_record_at
+from simulations.records import result_summary
+from simulations.records import shard_path
+from simulations.reducers import reduced_path
+from simulations.reducers import write_reduced
+from simulations.seeds import MAX_SEED
+from simulations.seeds import RandomStreams
+from simulations.seeds import new_master_seed
 from simulations.utils.functions import random_string
 
+# the most simulation instances each worker keeps for reuse
+MAX_KEPT_SIMULATIONS = 16
+
+# the most seconds a run's catalogue goes without committing its new results
+CATALOGUE_COMMIT_INTERVAL = 5.
+
+# the simulation instances kept by this worker (per thread)
+_worker_state = threading.local()
+
+# an instance for each (class, data) key whose caches new instances in this
+# process share, so worker threads keep one copy of them
+_shared_simulations = collections.OrderedDict()
+_shared_lock = threading.Lock()
+
 
 @withoptions
 class SimulationRunner(Base):
@@ -53,11 +124,44 @@ class SimulationRunner(Base):
         option_exit_handler
           An exit handler for the :py:class:`~simulations.optionparser.OptionParser`
 
+        pool
+          A :py:class:`~simulations.dispatch.WorkerPool` to run the
+          simulations on, which the caller starts and closes (default: the
+          runner starts its own on the first :py:meth:`~SimulationRunner.go`
+          call, with --poolsize workers of the --backend kind, and keeps it until
+          :py:meth:`~SimulationRunner.close` is called)
+
     Public Methods:
 
+        :py:meth:`~SimulationRunner.add_reducer`
+          Register an online reducer of the results
+
+        :py:meth:`~SimulationRunner.close`
+          Shut down the worker pool the runner started
+
         :py:meth:`~SimulationRunner.go`
           Kick off the batch of simulations
 
+    Attributes:
+
+        pool
+          The :py:class:`~simulations.dispatch.WorkerPool` the simulations
+          run on (None until the first :py:meth:`~SimulationRunner.go` call
+          if the runner starts its own)
+
+        reducers
+          The list of registered :py:class:`~simulations.reducers.Reducer`
+          instances, which are updated with every result and whose states
+          are saved to <statsfile>.reduced when the batch is done
+
+        sweep
+          If set to a list of game parameters (e.g. in an 'options parsed'
+          handler), each duplication runs every parameter, in tasks of
+          --sweepchunk games that the simulation steps together (see
+          :py:class:`~simulations.dynamics.discrete_replicator.DiscreteReplicatorDynamics`).
+          Each (game_parameter, result) pair is then stored and emitted as a
+          separate result.
+
     Methods to Implement:
 
         :py:meth:`~simulations.base.Base._add_listeners`
@@ -71,6 +175,10 @@ class SimulationRunner(Base):
         go(this)
           emitted when the :py:meth:`~SimulationRunner.go` method is called
 
+        listening(this, address)
+          emitted with the (host, port) the runner listens on for workers,
+          when coordinating a distributed run (with --listen)
+
         made output_dir(this)
           emitted if/when the output directory needs to be created
 
@@ -83,13 +191,34 @@ class SimulationRunner(Base):
           has parsed arguments
 
         pool started(this, pool)
-          emitted after the :py:class:`multiprocessing.Pool` is set up
+          emitted after the :py:class:`~simulations.dispatch.WorkerPool` is
+          set up, on every :py:meth:`~SimulationRunner.go` call that runs
+          simulations (not when coordinating with --listen)
+
+        replayed(this, duplication, result, stored)
+          emitted for each duplication run again with --replay, with the
+          result stored by the original run (None if it was not stored)
 
         result(this, result)
-          emitted when a result is complete
+          emitted when a result is complete (a (game_parameter, result) pair
+          when running a sweep), on the coordinator of a distributed run as
+          well as on the worker that ran it
+
+        resumed(this, count)
+          emitted when resuming an interrupted run (with --resume), with the
+          number of results that were already complete
 
         start(this)
-          emitted just before the pool :py:meth:`~multiprocessing.Pool.imap_unordered` is called
+          emitted just before the tasks are sent to the pool (in chunks, see
+          :py:func:`~simulations.dispatch.imap_chunked`) or handed out to the
+          workers
+
+        worker joined(this, name)
+          emitted when a worker connects to the coordinator (with --listen)
+
+        worker left(this, name, requeued)
+          emitted when the connection to a worker ends, with the number of
+          its tasks handed out again because it was lost
 
     """
 
@@ -112,16 +241,56 @@ class SimulationRunner(Base):
             option_exit_handler
               An exit handler for the :py:class:`~simulations.optionparser.OptionParser`
 
+            pool
+              A :py:class:`~simulations.dispatch.WorkerPool` to run the
+              simulations on, which the caller starts and closes
+
         """
 
         super(SimulationRunner, self).__init__(*args, **kwdargs)
 
+        if 'pool' in kwdargs and kwdargs['pool']:
+            self.pool = kwdargs['pool']
+            self._owns_pool = False
+        else:
+            self.pool = None
+            self._owns_pool = True
+
         self.data = {}
+        self.sweep = None
+        self.reducers = []
         self._task_dup_num = False
         self._simulation_class = simulation_class
         self.finished_count = 0
         self.identifier = random_string()
 
+    def add_reducer(self, reducer):
+        """ Registers an online reducer that is updated with every result
+            (with the replicator result of swept (game_parameter, result)
+            pairs) and whose state is saved when the batch is done
+
+        Parameters:
+
+            reducer
+              a :py:class:`~simulations.reducers.Reducer` instance
+
+        """
+
+        if any(other.name == reducer.name for other in self.reducers):
+            raise ValueError("A reducer named {0} is already registered".format(reducer.name))
+
+        self.reducers.append(reducer)
+
+    def close(self):
+        """ Shuts down the worker pool, if the runner started it (a pool
+            passed to the runner is left to its owner)
+
+        """
+
+        if self._owns_pool and self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
     def go(self, **kwdargs):
         """ Verify options and run the batch of simulations
 
@@ -148,17 +317,6 @@ class SimulationRunner(Base):
         else:
             option_values = None
 
-        ## pp stuff
-        #if 'pp_modules' in kwdargs:
-        #    pp_modules = kwdargs['pp_modules']
-        #else:
-        #    pp_modules = ()
-        #
-        #if 'pp_deps' in kwdargs:
-        #    pp_deps = kwdargs['pp_deps']
-        #else:
-        #    pp_deps = ()
-
         (self.options, self.args) = self.oparser.parse_args(args=option_args, values=option_values)
 
         self._check_base_options()
@@ -170,41 +328,153 @@ class SimulationRunner(Base):
 
         output_base = ("{0}" + os.sep + "{1}").format(self.options.output_dir, "{0}")
 
-        stats = open(output_base.format(self.options.stats_file), "wb")
-
-        ##pp stuff
-        #serverlist = ()
-        #
-        #if self.options.cluster_string:
-        #    serverlist = tuple(self.options.cluster_string.split(","))
-        #
-        #if len(serverlist) > 1 or self.options.pool_size > 1:
-        #    pool = pp.Server(self.options.pool_size,
-        #                        ppservers=serverlist,
-        #                        secret=self.options.cluster_secret)
-        #else:
-        #    pool = FakeServer(self.options.pool_size,
-        #                              ppservers=serverlist,
-        #                              secret=self.options.cluster_secret)
-
-        pool = mp.Pool(self.options.pool_size)
+        if self.options.connect_address:
+            self._work(output_base)
+            self.emit('done', self)
+            return
 
-        self.emit('pool started', self, pool)
+        stats_path = output_base.format(self.options.stats_file)
+        if self.options.shard is not None:
+            stats_path = shard_path(stats_path, self.options.shard, self.options.num_shards)
 
-        tasks_base = ([self.data, i, None]
-                        for i in range(self.options.dup))
-        if self.options.file_dump:
-            tasks = (task[:2] + [output_base.format(self.options.output_file.format(task[1] + 1))]
-                        for task in tasks_base)
-        elif self.options.quiet:
-            tasks = (task[:2] + [False] for task in tasks_base)
+        if self.options.replay:
+            self._replay(stats_path, output_base)
+            self.emit('done', self)
+            return
+
+        resuming = self.options.resume and os.path.exists(journal_path(stats_path))
+
+        if self.options.resume and not resuming and os.path.exists(stats_path):
+            self.oparser.error("Cannot resume {0}: its journal is missing".format(stats_path))
+
+        if resuming:
+            self.options.seed = self._stored_seed(stats_path)
+        elif self.options.merge_shards:
+            self.options.seed = self._stored_seed(shard_path(stats_path, 0, self.options.num_shards))
+
+        if self.options.seed is None:
+            self.options.seed = new_master_seed()
+
+        if resuming:
+            (self.identifier, entries) = self._recover(stats_path)
+            done = set(entries['duplication'].tolist())
+
+            stats = open(stats_path, "r+b")
+            stats.seek(0, os.SEEK_END)
+            writer = StatsWriter(stats)
+            index_file = open(index_path(stats_path), "r+b")
+            index_file.seek(0, os.SEEK_END)
+            index = IndexWriter(index_file)
+            journal_file = open(journal_path(stats_path), "r+b")
+            journal_file.seek(0, os.SEEK_END)
+            journal = JournalWriter(journal_file)
+
+            self.emit('resumed', self, len(done))
         else:
-            tasks = (task for task in tasks_base)
+            done = set()
+
+            stats = open(stats_path, "wb")
+            if self.options.legacy_stats:
+                writer = LegacyStatsWriter(stats)
+                index_file = None
+                index = None
+                journal_file = None
+                journal = None
+            else:
+                writer = StatsWriter(stats)
+                index_file = open(index_path(stats_path), "wb")
+                index = IndexWriter(index_file)
+                index.write_header()
+                journal_file = open(journal_path(stats_path), "wb")
+                journal = JournalWriter(journal_file)
+                journal.write_header(self.identifier)
+
+            writer.write_header()
+            writer.write(self.options)
+
+        if self.options.catalogue_file:
+            catalogue = Catalogue(self.options.catalogue_file)
+            catalogue.add_run(self.identifier, stats_path, dict(vars(self.options), **self.data))
+        else:
+            catalogue = None
+
+        if resuming and (self.reducers or catalogue is not None):
+            if any(entries['length'] == 0):
+                self.oparser.error("Cannot resume reducers or a catalogue of a run without the full results")
+
+            # replay the journaled results, which may not have reached the
+            # catalogue before the interruption
+            for entry in entries:
+                result = read_record_at(stats, int(entry['offset']))
+                for reducer in self.reducers:
+                    reducer.update(int(entry['duplication']), _unwrap_swept(result))
+                if catalogue is not None:
+                    catalogue.add_result(self.identifier, int(entry['duplication']), result)
+            stats.seek(0, os.SEEK_END)
+
+        if self.options.columnar:
+            num_results = self.options.dup * (1 if self.sweep is None else len(self.sweep))
+            columns = ColumnWriter(stats_path, num_results, append=resuming)
+        else:
+            columns = None
+
+        if self.options.merge_shards:
+            pool = None
+            coordinator = None
+        elif self.options.listen_address:
+            pool = None
+            coordinator = Coordinator(parse_address(self.options.listen_address),
+                                      secret=self.options.cluster_secret,
+                                      range_size=self.options.range_size,
+                                      worker_timeout=self.options.worker_timeout)
+            coordinator.on('worker joined',
+                           lambda that, name: self.emit('worker joined', self, name))
+            coordinator.on('worker left',
+                           lambda that, name, requeued: self.emit('worker left', self, name, requeued))
+            self.emit('listening', self, coordinator.listen())
+        else:
+            coordinator = None
+            pool = self._start_pool()
+            self.emit('pool started', self, pool)
+
+        if self.options.shard is not None:
+            dups = xrange(*shard_range(self.options.dup, self.options.shard, self.options.num_shards))
+        else:
+            dups = xrange(self.options.dup)
+
+        if self.sweep is None:
+            chunks = None
+            nums = (i for i in dups if i + 1 not in done)
+            num_tasks = len(dups)
+            if done:
+                num_tasks -= sum(1 for i in dups if i + 1 in done)
+        else:
+            chunk = self.options.sweep_chunk
+            chunks = [self.sweep[k:k + chunk] for k in range(0, len(self.sweep), chunk)]
+            num_chunks = len(chunks)
+            def chunk_done(i, j):
+                return all(i * len(self.sweep) + j * chunk + k + 1 in done
+                           for k in range(len(chunks[j])))
+
+            nums = (i * num_chunks + j
+                        for i in dups
+                        for j in range(num_chunks)
+                        if not chunk_done(i, j))
+            num_tasks = len(dups) * num_chunks
+            if done:
+                num_tasks -= sum(1 for i in dups
+                                   for j in range(num_chunks)
+                                   if chunk_done(i, j))
+
+        setup = (self._simulation_class, self.data, chunks, self.options.seed)
 
         self.emit('start', self)
 
-        def finish_run(this, out, result):
-            """ The pp task callback to handle finished simulations
+        # the time of the last catalogue commit (a list, to update it below)
+        committed = [time.time()]
+
+        def finish_run(this, out, duplication, result, summary=None):
+            """ Handles a finished simulation
 
             Parameters:
 
@@ -212,71 +482,443 @@ class SimulationRunner(Base):
                   a reference to self
 
                 out
-                  the file-like object to which to print data
+                  the stats writer to which to write the result
+
+                duplication
+                  the (1-based) duplication number of the result
 
                 result
                   the result object returned by the simulation
 
+                summary
+                  the object to summarize in the index, columns and reducers
+                  (default: result)
+
             """
 
-            print >> out, cPickle.dumps(result)
-            print >> out
-            out.flush()
+            if duplication in done:
+                return
+
+            if summary is None:
+                summary = result
+
+            (offset, length) = (0, 0)
+            if this.options.write_results:
+                (offset, length) = out.write(result)
+                if index is not None:
+                    (generation_count, converged) = result_summary(summary)
+                    index.write(duplication, offset, length, generation_count, converged)
+
+            if columns is not None:
+                columns.write(duplication, summary)
+
+            for reducer in this.reducers:
+                reducer.update(duplication, summary)
+
+            if catalogue is not None:
+                catalogue.add_result(this.identifier, duplication, result)
+                if time.time() - committed[0] >= CATALOGUE_COMMIT_INTERVAL:
+                    catalogue.commit()
+                    committed[0] = time.time()
+
+            if journal is not None:
+                journal.write(duplication, offset, length)
+
             this.finished_count += 1
 
             this.emit('result', this, result)
 
         try:
-            print >> stats, cPickle.dumps(self.options)
-            print >> stats
-
-            ## pp stuff
-            #job_template = pp.Template(pool, run_simulation,
-            #                                 callback=finish_run,
-            #                                 callbackargs=(self, stats),
-            #                                 depfuncs=pp_deps,
-            #                                 modules=pp_modules,
-            #                                 group=self.identifier)
-            #
-            #for task in tasks:
-            #    job_template.submit(self._simulation_class(*task))
-            #
-            #pool.wait(self.identifier)
-
-            taskiter = ([self._simulation_class] + task for task in tasks)
-            for result in pool.imap_unordered(run_simulation, taskiter):
-                finish_run(self, stats, result)
+            if self.options.merge_shards:
+                results = ()
+                for (duplication, result) in self._shard_results(stats_path):
+                    finish_run(self, writer, duplication, result,
+                               None if self.sweep is None else result[1])
+            elif coordinator is None:
+                tasks = (self._task(num, setup, output_base) for num in nums)
+                sizer = ChunkSizer(size=self.options.chunk_size,
+                                   target=self.options.chunk_time,
+                                   workers=_pool_size(pool, self.options.pool_size))
+                results = imap_chunked(pool, _run_numbered_simulation, tasks,
+                                       sizer=sizer, total=num_tasks,
+                                       max_in_flight=self.options.max_in_flight,
+                                       max_pending=self.options.max_pending)
+            else:
+                results = coordinator.results(setup, nums, num_tasks)
+
+            for (num, result) in results:
+                if self.sweep is None:
+                    finish_run(self, writer, num + 1, result)
+                else:
+                    # number swept results by duplication, then by game
+                    first = (num // num_chunks) * len(self.sweep) + (num % num_chunks) * chunk
+                    for (k, game_result) in enumerate(result):
+                        finish_run(self, writer, first + k + 1, game_result, game_result[1])
 
         except KeyboardInterrupt:
-            ## pp stuff
-            #pool.destroy()
-            pool.terminate()
+            if pool is not None:
+                pool.terminate()
+                if self._owns_pool:
+                    self.pool = None
             print "caught KeyboardInterrupt"
             sys.exit(1)
 
+        finally:
+            if coordinator is not None:
+                coordinator.close()
+            # keep the results so far, also when interrupted
+            if catalogue is not None:
+                catalogue.commit()
+
         stats.close()
+        if index_file is not None:
+            index_file.close()
+        if journal_file is not None:
+            journal_file.close()
+        if columns is not None:
+            columns.close()
+        if self.reducers:
+            write_reduced(reduced_path(stats_path), self.reducers)
+        if catalogue is not None:
+            catalogue.close()
+
         self.emit('done', self)
 
+    def _start_pool(self):
+        """ Starts and returns the worker pool, first replacing the pool the
+            runner started if its size or backend no longer match the options
+
+        """
+
+        if self._owns_pool and self.pool is not None and \
+                (self.pool.processes != (self.options.pool_size or mp.cpu_count()) or
+                 self.pool.backend != self.options.backend):
+            self.close()
+
+        if self.pool is None:
+            self.pool = WorkerPool(self.options.pool_size, backend=self.options.backend)
+
+        return self.pool.start()
+
+    def _task(self, num, setup, output_base):
+        """ Returns the [simulation class, data, num, outfile, streams] task of
+            a task number, where streams are the
+            :py:class:`~simulations.seeds.RandomStreams` of its duplications
+
+        Parameters:
+
+            num
+              the task number (the duplication index, or for sweeps the
+              duplication index times the number of sweep chunks plus the
+              chunk index)
+
+            setup
+              the (simulation class, data, sweep chunks, master seed) of the
+              batch, with None for the sweep chunks if it is not a sweep
+
+            output_base
+              the format string of the paths in the output directory
+
+        """
+
+        (klass, data, chunks, seed) = setup
+        if chunks is None:
+            first = num + 1
+        else:
+            data = dict(data, game_parameters=chunks[num % len(chunks)])
+            first = (num // len(chunks)) * sum(len(c) for c in chunks) + \
+                        sum(len(c) for c in chunks[:num % len(chunks)]) + 1
+
+        if self.options.file_dump:
+            outfile = output_base.format(self.options.output_file.format(num + 1))
+        elif self.options.quiet:
+            outfile = False
+        else:
+            outfile = None
+
+        return [klass, data, num, outfile, RandomStreams(seed, first)]
+
+    def _work(self, output_base):
+        """ Runs the tasks handed out by the coordinator at --connect on the
+            worker pool until it has no more, emitting the results without
+            writing any stats files (the coordinator writes those)
+
+        Parameters:
+
+            output_base
+              the format string of the paths in the output directory
+
+        """
+
+        pool = self._start_pool()
+        self.emit('pool started', self, pool)
+
+        sizer = ChunkSizer(size=self.options.chunk_size,
+                           target=self.options.chunk_time,
+                           workers=_pool_size(pool, self.options.pool_size))
+
+        def run(setup, nums):
+            tasks = (self._task(num, setup, output_base) for num in nums)
+            for (num, result) in imap_chunked(pool, _run_numbered_simulation, tasks,
+                                              sizer=sizer, total=len(nums),
+                                              max_in_flight=self.options.max_in_flight,
+                                              max_pending=self.options.max_pending):
+                for game_result in (result if setup[2] is not None else [result]):
+                    self.finished_count += 1
+                    self.emit('result', self, game_result)
+
+                yield (num, result)
+
+        self.emit('start', self)
+
+        try:
+            work_for(parse_address(self.options.connect_address), run,
+                     secret=self.options.cluster_secret)
+        except KeyboardInterrupt:
+            pool.terminate()
+            if self._owns_pool:
+                self.pool = None
+            print "caught KeyboardInterrupt"
+            sys.exit(1)
+
+    def _replay(self, stats_path, output_base):
+        """ Runs the --replay duplications of an earlier run again from their
+            recorded random streams, tracing each into its -F file in the
+            output directory, and emits them with the stored results without
+            writing any stats files
+
+        Parameters:
+
+            stats_path
+              the path of the stats file of the earlier run
+
+            output_base
+              the format string of the paths in the output directory
+
+        """
+
+        try:
+            duplications = parse_duplications(self.options.replay)
+        except ValueError, err:
+            self.oparser.error(str(err))
+
+        per_dup = 1 if self.sweep is None else len(self.sweep)
+        if duplications[-1] > self.options.dup * per_dup:
+            self.oparser.error("Duplication {0} is not in a run of {1} results".format(
+                                    duplications[-1], self.options.dup * per_dup))
+
+        self.options.seed = self._stored_seed(stats_path)
+        if self.options.seed is None:
+            self.oparser.error("{0} has no recorded seed to replay from".format(stats_path))
+
+        stored = {}
+        if os.path.exists(index_path(stats_path)):
+            wanted = set(duplications)
+            with open(stats_path, "rb") as statsfile:
+                for entry in read_index(index_path(stats_path)):
+                    if int(entry['duplication']) in wanted:
+                        stored[int(entry['duplication'])] = read_record_at(statsfile, int(entry['offset']))
+
+        jobs = []
+        for duplication in duplications:
+            if self.sweep is None:
+                data = self.data
+                num = duplication - 1
+            else:
+                # the game runs alone, in the task numbering of the original run
+                (i, k) = divmod(duplication - 1, per_dup)
+                data = dict(self.data, game_parameters=[self.sweep[k]])
+                num = i * -(-per_dup // self.options.sweep_chunk) + k // self.options.sweep_chunk
+
+            outfile = output_base.format(self.options.output_file.format(duplication))
+            jobs.append((duplication, [self._simulation_class, data, num, outfile,
+                                       RandomStreams(self.options.seed, duplication)]))
+
+        pool = self._start_pool()
+        self.emit('pool started', self, pool)
+        self.emit('start', self)
+
+        sizer = ChunkSizer(size=self.options.chunk_size,
+                           target=self.options.chunk_time,
+                           workers=_pool_size(pool, self.options.pool_size))
+        try:
+            for (duplication, result) in imap_chunked(pool, _run_replay, jobs,
+                                                      sizer=sizer, total=len(jobs)):
+                if self.sweep is not None:
+                    result = result[0]
+
+                self.finished_count += 1
+                self.emit('result', self, result)
+                self.emit('replayed', self, duplication, result, stored.get(duplication))
+        except KeyboardInterrupt:
+            pool.terminate()
+            if self._owns_pool:
+                self.pool = None
+            print "caught KeyboardInterrupt"
+            sys.exit(1)
+
+    def _stored_seed(self, path):
+        """ Returns the master seed stored with the options in a binary stats
+            file (or --seed if it has none), checking that it matches --seed
+            if that was given and that the file is not merged from several runs
+
+        Parameters:
+
+            path
+              the path of the stats file
+
+        """
+
+        if not os.path.exists(path):
+            self.oparser.error("{0} is missing".format(path))
+
+        with open(path, "rb") as statsfile:
+            if not is_binary(statsfile):
+                raise StatsFileError("Only binary stats files store a seed")
+            options = read_record(statsfile)
+
+        if hasattr(options, 'merged_from'):
+            self.oparser.error("{0} is merged from several runs, which have no common seed".format(path))
+
+        seed = getattr(options, 'seed', None)
+
+        if seed is None:
+            return self.options.seed
+
+        if self.options.seed is not None and self.options.seed != seed:
+            self.oparser.error("The seed {0} does not match the seed {1} of {2}".format(
+                                    self.options.seed, seed, path))
+
+        return seed
+
+    def _shard_results(self, stats_path):
+        """ Yields the (result number, result) pairs of the shard stats files
+            of a sharded run (see --numshards) in order, checking that each
+            file is the complete shard of the same run
+
+        Parameters:
+
+            stats_path
+              the path of the merged stats file (the shard files are next to
+              it, see :py:func:`~simulations.records.shard_path`)
+
+        """
+
+        num_shards = self.options.num_shards
+        per_dup = 1 if self.sweep is None else len(self.sweep)
+
+        for shard in range(num_shards):
+            path = shard_path(stats_path, shard, num_shards)
+            if not os.path.exists(journal_path(path)):
+                self.oparser.error("Shard {0} of {1} is missing at {2}".format(shard, num_shards, path))
+
+            (_, entries) = read_journal(journal_path(path))
+            (start, stop) = shard_range(self.options.dup, shard, num_shards)
+            if sorted(entries['duplication'].tolist()) != range(start * per_dup + 1, stop * per_dup + 1):
+                self.oparser.error("Shard {0} of {1} is incomplete".format(shard, num_shards))
+            if any(entries['length'] == 0):
+                self.oparser.error("Cannot merge shards written without the full results")
+
+            with open(path, "rb") as shard_file:
+                if not is_binary(shard_file):
+                    raise StatsFileError("Only binary stats files can be merged")
+
+                options = read_record(shard_file)
+                if (getattr(options, 'shard', None), getattr(options, 'num_shards', None),
+                        getattr(options, 'dup', None), getattr(options, 'seed', None)) != \
+                        (shard, num_shards, self.options.dup, self.options.seed):
+                    self.oparser.error("{0} is not shard {1} of {2} of {3} duplications with seed {4}".format(
+                                            path, shard, num_shards, self.options.dup, self.options.seed))
+
+                for entry in entries[entries['duplication'].argsort()]:
+                    yield (int(entry['duplication']), read_record_at(shard_file, int(entry['offset'])))
+
+    def _recover(self, stats_path):
+        """ Prepares the files of an interrupted run for resuming: keeps the
+            journal entries up to the last one whose record is intact, and
+            truncates the stats, index and journal files after it. Returns
+            the run identifier and the kept journal entries.
+
+        Parameters:
+
+            stats_path
+              the path of the stats file
+
+        """
+
+        (identifier, entries) = read_journal(journal_path(stats_path))
+
+        with open(stats_path, "r+b") as stats:
+            if not is_binary(stats):
+                raise StatsFileError("Only binary stats files can be resumed")
+
+            read_record(stats)
+            end = stats.tell()
+
+            # validate the tail record, dropping entries whose record is damaged
+            keep = len(entries)
+            while keep > 0 and entries[keep - 1]['length']:
+                (offset, length) = (int(entries[keep - 1]['offset']), int(entries[keep - 1]['length']))
+                try:
+                    read_record_at(stats, offset)
+                    if stats.tell() == offset + length:
+                        break
+                except (EOFError, StatsFileError):
+                    pass
+                keep -= 1
+
+            entries = entries[:keep]
+            written = entries[entries['length'] > 0]
+            if len(written):
+                end = max(end, int((written['offset'] + written['length']).max()))
+            stats.truncate(end)
+
+        with open(index_path(stats_path), "r+b") as index_file:
+            index_file.truncate(FILE_HEADER.size + len(written) * INDEX_ENTRY.size)
+
+        with open(journal_path(stats_path), "r+b") as journal_file:
+            journal_file.truncate(FILE_HEADER.size + JOURNAL_IDENTIFIER.size +
+                                  len(entries) * JOURNAL_ENTRY.size)
+
+        return (identifier, entries)
+
     def _set_base_options(self):
         """ Set up the basic :py:class:`~simulations.optionparser.OptionParser` options.
         Calling this is handled by the decorator :py:func:`simulations.base.withoptions`
 
         Options:
 
+        --backend=NAME                  Run the simulations in worker processes ('process') or threads ('thread', which only run in parallel inside the dense, batched and matrix step kernels)
+        --catalogue=FILE                Also add result summaries to this SQLite catalogue
+        --chunksize=NUM                 Number of tasks to send to a worker at once (default: tuned automatically)
+        --chunktime=SECONDS             Time each chunk of tasks should take when tuning the chunk size
+        --clustersecret=STRING          Secret shared by the coordinator and workers of a distributed run (required with --listen or --connect)
+        --columnar                      Also write the results to memory-mapped column files
+        --connect=HOST:PORT             Run as a worker for the coordinator listening at this address
         -D, --nofiledump                Do not dump individual simulation output
         -F STRING, --filename=STRING    Format string for file name of individual duplication output
+        --legacystats                   Write the aggregate output in the legacy text pickle format
+        --listen=[HOST:]PORT            Coordinate a distributed run, handing the tasks to the workers that connect
+        --maxinflight=NUM               Most tasks to have sent to the pool and not completed at once
+        --maxpending=NUM                Most completed results to hold before they are written
+        --mergeshards                   Merge the stats files of the --numshards shards into the stats file
         -N NUM, --duplications=NUM      Number of trials to run
+        --noresults                     Do not write the full results to the aggregate output
+        --numshards=NUM                 Number of shards the duplications are split into
         -O DIR, --output=DIR            Directory to which to output the results
         -P NUM, --poolsize=NUM          Number of simultaneous trials
         -Q, --quiet                     Suppress all output except aggregate pickle dump
+        --rangesize=NUM                 Number of tasks to hand a worker of a distributed run at once
+        --replay=LIST                   Run these duplications (e.g. 3,7,10-12) of the stats file again, with tracing
+        --seed=NUM                      Master seed of the duplications' random streams (default: drawn, and stored in the stats file)
+        --resume                        Resume an interrupted run, running only the missing duplications (refused if the stats file has no journal)
         -S FILE, --statsfile=FILE       File name for aggregate, pickled output
+        --shard=NUM                     Run only this shard (from 0) of the duplications, into <statsfile>.shard<NUM>of<N>
+        --sweepchunk=NUM                Number of swept games to run per task
+        --workertimeout=SECONDS         Time to wait for a result from a worker of a distributed run before handing its tasks to others
 
         """
 
-        ## pp stuff (from docstring)
-        #            --cluster                   List of cluster servers to use via parallelpython
-        #            --clustersecret             Password to access the cluster servers
-
         self.oparser.add_option("-N", "--duplications", type="int",
                                     action="store", dest="dup", default=1,
                                     help="number of duplications")
@@ -293,20 +935,76 @@ class SimulationRunner(Base):
         self.oparser.add_option("-S", "--statsfile", action="store",
                                     dest="stats_file", default="aggregate",
                                     help="file for aggregate stats")
+        self.oparser.add_option("--backend", action="store", type="choice",
+                                    choices=list(BACKENDS),
+                                    dest="backend", default="process",
+                                    help="run simulations in worker processes or threads (threads only run in parallel inside the step kernels)")
+        self.oparser.add_option("--catalogue", action="store",
+                                    dest="catalogue_file", default=None,
+                                    help="SQLite catalogue of result summaries")
+        self.oparser.add_option("--chunksize", action="store", type="int",
+                                    dest="chunk_size", default=None,
+                                    help="number of tasks per chunk sent to a worker")
+        self.oparser.add_option("--chunktime", action="store", type="float",
+                                    dest="chunk_time", default=0.1,
+                                    help="seconds each chunk should take when tuning the chunk size")
+        self.oparser.add_option("--clustersecret", action="store",
+                                    dest="cluster_secret", default="",
+                                    help="secret shared by the coordinator and workers (required to listen or connect)")
+        self.oparser.add_option("--columnar", action="store_true",
+                                    dest="columnar", default=False,
+                                    help="also write results to columnar .npy files")
+        self.oparser.add_option("--connect", action="store",
+                                    dest="connect_address", default=None,
+                                    help="run as a worker for the coordinator at HOST:PORT")
+        self.oparser.add_option("--legacystats", action="store_true",
+                                    dest="legacy_stats", default=False,
+                                    help="write aggregate stats in the legacy text format")
+        self.oparser.add_option("--listen", action="store",
+                                    dest="listen_address", default=None,
+                                    help="coordinate workers connecting to [HOST:]PORT")
+        self.oparser.add_option("--maxinflight", action="store", type="int",
+                                    dest="max_in_flight", default=None,
+                                    help="most tasks in flight at once")
+        self.oparser.add_option("--maxpending", action="store", type="int",
+                                    dest="max_pending", default=None,
+                                    help="most completed results waiting to be written")
+        self.oparser.add_option("--mergeshards", action="store_true",
+                                    dest="merge_shards", default=False,
+                                    help="merge the shard stats files into the stats file")
+        self.oparser.add_option("--noresults", action="store_false",
+                                    dest="write_results", default=True,
+                                    help="do not write full results to the aggregate stats")
+        self.oparser.add_option("--numshards", action="store", type="int",
+                                    dest="num_shards", default=None,
+                                    help="number of shards the duplications are split into")
         self.oparser.add_option("-P", "--poolsize", action="store", type="int",
                                     dest="pool_size", default=None,
                                     help="number of parallel computations")
         self.oparser.add_option("-Q", "--quiet", action="store_true",
                                     dest="quiet", default=False,
                                     help="suppress standard output")
-        ## pp stuff
-        #self.oparser.add_option("--cluster", action="store", type="string",
-        #                            dest="cluster_string", default=None,
-        #                            help="list of cluster servers")
-        #self.oparser.add_option("--clustersecret", action="store",
-        #                            type="string", dest="cluster_secret",
-        #                            default=None,
-        #                            help="password for the cluster")
+        self.oparser.add_option("--rangesize", action="store", type="int",
+                                    dest="range_size", default=50,
+                                    help="number of tasks handed to a worker at once")
+        self.oparser.add_option("--replay", action="store",
+                                    dest="replay", default=None,
+                                    help="replay these duplications of the stats file with tracing")
+        self.oparser.add_option("--resume", action="store_true",
+                                    dest="resume", default=False,
+                                    help="resume an interrupted run")
+        self.oparser.add_option("--seed", action="store", type="long",
+                                    dest="seed", default=None,
+                                    help="master seed of the random streams")
+        self.oparser.add_option("--shard", action="store", type="int",
+                                    dest="shard", default=None,
+                                    help="run only this shard of the duplications")
+        self.oparser.add_option("--sweepchunk", action="store", type="int",
+                                    dest="sweep_chunk", default=100,
+                                    help="number of swept games per task")
+        self.oparser.add_option("--workertimeout", action="store", type="float",
+                                    dest="worker_timeout", default=600.,
+                                    help="seconds to wait for a worker's next result before dropping it")
 
     def _check_base_options(self):
         """ Verify the values passed to the base options
@@ -315,31 +1013,112 @@ class SimulationRunner(Base):
 
             - Number of duplications is positive
             - Pool size is positive, if specified
+            - Sweep chunk size is positive
+            - Task chunk size is positive, if specified, and the chunk time is positive
+            - The in-flight and pending limits are positive, if specified
+            - Resuming is not combined with the legacy stats format
+            - The listen and connect addresses are valid and not both given,
+              and come with a cluster secret
+            - Range size and worker timeout are positive
+            - A shard is given with a positive number of shards, and is below it
+            - Merging is given the number of shards and no shard, and is not
+              combined with resuming or a distributed run
+            - Sharding and merging are not combined with the legacy stats format
+            - The seed is between 0 and 2 ** 63 - 1, and is given when sharding
+            - Replaying is not combined with resuming, merging or a distributed
+              run
 
         """
 
         if not self.options.dup or self.options.dup <= 0:
             self.oparser.error("Number of duplications must be positive")
 
-        ## pp stuff
-        #if self.options.pool_size is None:
-        #    self.options.pool_size = 'autodetect'
-        #elif self.options.pool_size < 0:
         if self.options.pool_size is not None and self.options.pool_size < 0:
             self.oparser.error("Pool size must be non-negative")
 
+        if not self.options.sweep_chunk or self.options.sweep_chunk <= 0:
+            self.oparser.error("Sweep chunk size must be positive")
+
+        if self.options.chunk_size is not None and self.options.chunk_size <= 0:
+            self.oparser.error("Chunk size must be positive")
+
+        if not self.options.chunk_time or self.options.chunk_time <= 0:
+            self.oparser.error("Chunk time must be positive")
+
+        if self.options.max_in_flight is not None and self.options.max_in_flight <= 0:
+            self.oparser.error("Maximum number of tasks in flight must be positive")
+
+        if self.options.max_pending is not None and self.options.max_pending <= 0:
+            self.oparser.error("Maximum number of pending results must be positive")
+
+        if self.options.resume and self.options.legacy_stats:
+            self.oparser.error("Cannot resume with the legacy stats format")
+
+        if self.options.listen_address and self.options.connect_address:
+            self.oparser.error("Cannot both listen for and connect to a coordinator")
+
+        for address in (self.options.listen_address, self.options.connect_address):
+            if address:
+                try:
+                    parse_address(address)
+                except ValueError, err:
+                    self.oparser.error(str(err))
+
+        if (self.options.listen_address or self.options.connect_address) and not self.options.cluster_secret:
+            self.oparser.error("A distributed run needs a cluster secret")
+
+        if not self.options.range_size or self.options.range_size <= 0:
+            self.oparser.error("Range size must be positive")
+
+        if not self.options.worker_timeout or self.options.worker_timeout <= 0:
+            self.oparser.error("Worker timeout must be positive")
+
+        if self.options.num_shards is not None and self.options.num_shards <= 0:
+            self.oparser.error("Number of shards must be positive")
+
+        if self.options.shard is not None:
+            if self.options.num_shards is None:
+                self.oparser.error("A shard needs the number of shards")
+            if not 0 <= self.options.shard < self.options.num_shards:
+                self.oparser.error("Shard must be between 0 and the number of shards - 1")
+
+        if self.options.merge_shards:
+            if self.options.num_shards is None or self.options.shard is not None:
+                self.oparser.error("Merging needs the number of shards and no shard")
+            if self.options.resume or self.options.listen_address or self.options.connect_address:
+                self.oparser.error("Cannot merge shards while resuming or in a distributed run")
+        elif self.options.num_shards is not None and self.options.shard is None:
+            self.oparser.error("The number of shards needs a shard (or --mergeshards)")
+
+        if self.options.num_shards is not None and self.options.legacy_stats:
+            self.oparser.error("Cannot shard with the legacy stats format")
+
+        if self.options.seed is not None and not 0 <= self.options.seed <= MAX_SEED:
+            self.oparser.error("Seed must be between 0 and 2 ** 63 - 1")
+
+        if self.options.shard is not None and self.options.seed is None:
+            self.oparser.error("Sharding needs a seed shared by the shards")
+
+        if self.options.replay and (self.options.resume or self.options.merge_shards or
+                                    self.options.listen_address or self.options.connect_address):
+            self.oparser.error("Cannot replay while resuming, merging or in a distributed run")
+
     def _add_default_listeners(self):
         """ Sets up default listeners for various events
 
         Events Handled:
 
+            - listening - :py:func:`default_listening_handler`
             - pool started - :py:func:`default_pool_handler`
+            - replayed - :py:func:`default_replayed_handler`
             - start - :py:func:`default_start_handler`
             - result - :py:func:`default_result_handler`
 
         """
 
+        self.on('listening', default_listening_handler)
         self.on('pool started', default_pool_handler)
+        self.on('replayed', default_replayed_handler)
         self.on('start', default_start_handler)
         self.on('result', default_result_handler)
 
@@ -347,18 +1126,217 @@ class SimulationRunner(Base):
 def run_simulation(task):
     """ A simple function to run a :py:class:`~simulations.simulation.Simulation`. Used with the multiprocessing pool.
 
+    Simulations whose class is :py:attr:`~simulations.simulation.Simulation.reusable`
+    are kept by the worker after they run, and the next task with the same
+    class and data :py:meth:`~simulations.simulation.Simulation.reset`\s the
+    kept instance instead of creating a new one. New instances that can
+    share_caches (like :py:meth:`~simulations.dynamics.discrete_replicator.DiscreteReplicatorDynamics.share_caches`)
+    use the caches of an earlier instance with the same class and data in the
+    same process, whether or not the class is reusable, so the worker threads
+    of the thread backend share one copy.
+
     Parameters:
 
         task
-          An instance of a :py:class:`~simulations.simulation.Simulation` to run
+          A list of the :py:class:`~simulations.simulation.Simulation` class
+          and its (data, iteration, outfile[, streams]) constructor arguments
 
     """
 
     klass = task.pop(0)
-    sim = klass(*task)
+    sharing = hasattr(klass, 'share_caches')
+    reusable = getattr(klass, 'reusable', False)
+    key = _task_key(klass, task) if sharing or reusable else None
+    if key is None:
+        return klass(*task).run()
+
+    if reusable:
+        kept = getattr(_worker_state, 'simulations', None)
+        if kept is None:
+            kept = _worker_state.simulations = collections.OrderedDict()
+
+        # an instance is only kept again if its run completes
+        sim = kept.pop(key, None)
+    else:
+        sim = None
+
+    if sim is None:
+        sim = klass(*task)
+        if sharing:
+            with _shared_lock:
+                donor = _shared_simulations.get(key)
+            if donor is not None:
+                sim.share_caches(donor)
+    else:
+        sim.reset(*task[1:])
+
+    result = sim.run()
+
+    if reusable:
+        kept[key] = sim
+        while len(kept) > MAX_KEPT_SIMULATIONS:
+            kept.popitem(False)
+
+    if sharing:
+        with _shared_lock:
+            if key not in _shared_simulations:
+                _shared_simulations[key] = sim
+                while len(_shared_simulations) > MAX_KEPT_SIMULATIONS:
+                    _shared_simulations.popitem(False)
+
+    return result
+
+
+def _task_key(klass, task):
+    """ Returns the (class, pickled data) key of the simulation of a task, or
+        None if its arguments are not the usual ones or its data cannot be
+        pickled
+
+    Parameters:
+
+        klass
+          the :py:class:`~simulations.simulation.Simulation` class
+
+        task
+          the constructor arguments
+
+    """
+
+    if len(task) not in (3, 4):
+        return None
+
+    try:
+        return (klass, cPickle.dumps(task[0], 2))
+    except (cPickle.PicklingError, TypeError):
+        return None
+
+
+def _run_replay(job):
+    """ Runs the task of a replayed duplication like :py:func:`run_simulation`,
+        returning the pair (duplication, result)
+
+    Parameters:
+
+        job
+          A (duplication, task) pair
+
+    """
+
+    (duplication, task) = job
+
+    return (duplication, run_simulation(task))
+
+
+def _same_result(result, other):
+    """ Checks whether two results are identical, by comparing their encoded
+        records
+
+    Parameters:
+
+        result
+          a result object
+
+        other
+          another result object
+
+    """
+
+    return encode_record(result) == encode_record(other)
+
+
+def parse_duplications(spec):
+    """ Parses a comma-separated list of (1-based) duplication numbers and
+        inclusive ranges like '3,7,10-12' into a sorted list without
+        repeats, raising ValueError if it is malformed or empty
+
+    Parameters:
+
+        spec
+          the list
+
+    """
+
+    duplications = set()
+    for part in spec.split(','):
+        (start, _, stop) = part.strip().partition('-')
+        try:
+            (start, stop) = (int(start), int(stop or start))
+        except ValueError:
+            raise ValueError("Bad duplication list {0}".format(spec))
+
+        if start < 1 or stop < start:
+            raise ValueError("Bad duplication range {0}".format(part.strip()))
 
-    return sim.run()
-    #return task.run()
+        duplications.update(xrange(start, stop + 1))
+
+    return sorted(duplications)
+
+
+def _run_numbered_simulation(task):
+    """ Runs a simulation task like :py:func:`run_simulation`, returning the
+        pair (iteration number, result) so results can be matched to their
+        duplications when they come back out of order
+
+    Parameters:
+
+        task
+          A list of the :py:class:`~simulations.simulation.Simulation` class
+          and its constructor arguments
+
+    """
+
+    num = task[2]
+
+    return (num, run_simulation(task))
+
+
+def shard_range(dup, shard, num_shards):
+    """ Returns the (start, stop) range of the (0-based) duplication indexes
+        owned by a shard: the duplications are split into num_shards
+        contiguous slices whose sizes differ by at most one
+
+    Parameters:
+
+        dup
+          the number of duplications of the whole run
+
+        shard
+          the shard (from 0)
+
+        num_shards
+          the number of shards
+
+    """
+
+    return (shard * dup // num_shards, (shard + 1) * dup // num_shards)
+
+
+def _pool_size(pool, pool_size=None):
+    """ Returns the number of workers of a pool
+
+    Parameters:
+
+        pool
+          the :py:class:`~simulations.dispatch.WorkerPool` (or
+          :py:class:`multiprocessing.Pool`)
+
+        pool_size
+          the requested pool size (None for the number of CPUs), used if the
+          pool does not say
+
+    """
+
+    try:
+        return pool.processes
+    except AttributeError:
+        pass
+
+    try:
+        return pool._processes
+    except AttributeError:
+        if pool_size is None:
+            return mp.cpu_count()
+        return pool_size
 
 
 def default_result_handler(this, result, out=None):
@@ -385,6 +1363,29 @@ def default_result_handler(this, result, out=None):
         print >> out, "done #{0}".format(this.finished_count)
 
 
+def default_listening_handler(this, address, out=None):
+    """ Default handler for the 'listening' event
+
+    Parameters:
+
+        this
+          a reference to a :py:class:`SimulationRunner` instance
+
+        address
+          the (host, port) address the coordinator listens on
+
+        out
+          the file descriptor to print to
+
+    """
+
+    if out is None:
+        out = sys.stdout
+
+    if not this.options.quiet:
+        print >> out, "Listening for workers on {0}:{1}".format(*address)
+
+
 def default_pool_handler(this, pool, out=None):
     """ Default handler for the 'pool started' event
 
@@ -394,7 +1395,7 @@ def default_pool_handler(this, pool, out=None):
           a reference to a :py:class:`SimulationRunner` instance
 
         pool
-          the :py:class:`multiprocessing.Pool` that was started
+          the :py:class:`~simulations.dispatch.WorkerPool` that was started
 
         out
           the file descriptor to print to
@@ -405,18 +1406,43 @@ def default_pool_handler(this, pool, out=None):
         out = sys.stdout
 
     if not this.options.quiet:
-        ## pp stuff
-        #print >> out, "Pool Started: {0} workers".format(pool.get_ncpus())
+        print >> out, "Pool Started: {0} workers".format(_pool_size(pool, this.options.pool_size))
 
-        try:
-            pool_size = pool._processes
-        except AttributeError:
-            if this.options.pool_size is None:
-                pool_size = mp.cpu_count()
-            else:
-                pool_size = this.options.pool_size
 
-        print >> out, "Pool Started: {0} workers".format(pool_size)
+def default_replayed_handler(this, duplication, result, stored, out=None):
+    """ Default handler for the 'replayed' event
+
+    Parameters:
+
+        this
+          a reference to a :py:class:`SimulationRunner` instance
+
+        duplication
+          the duplication number that was replayed
+
+        result
+          the replayed result
+
+        stored
+          the result stored by the original run (None if it was not stored)
+
+        out
+          the file descriptor to print to
+
+    """
+
+    if out is None:
+        out = sys.stdout
+
+    if not this.options.quiet:
+        if stored is None:
+            status = "no stored result to compare"
+        elif _same_result(result, stored):
+            status = "same as the stored result"
+        else:
+            status = "DIFFERS from the stored result"
+
+        print >> out, "Replayed #{0}: {1}".format(duplication, status)
 
 
 def default_start_handler(this, out=None):
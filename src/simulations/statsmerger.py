@@ -0,0 +1,325 @@
+""" Merge and compact aggregate stats files
+
+Classes:
+
+    :py:class:`StatsMerger`
+      merges many stats files into one
+
+"""
+
+import copy
+import hashlib
+import os
+
+from simulations.base import Base
+from simulations.base import withoptions
+from simulations.columns import ColumnWriter
+from simulations.columns import _unwrap_swept
+from simulations.records import IndexWriter
+from simulations.records import StatsWriter
+from simulations.records import decode_record
+from simulations.records import encode_record
+from simulations.records import index_path
+from simulations.records import is_binary
+from simulations.records import iter_legacy_records
+from simulations.records import iter_records
+from simulations.records import read_index
+from simulations.records import read_record
+from simulations.records import result_summary
+
+
+@withoptions
+class StatsMerger(Base):
+    """ Merges the stats files given as arguments (binary or legacy) into one
+        compacted binary stats file with a rebuilt index. The results are
+        streamed through one at a time and renumbered 1, 2, ... in the order
+        of the files, so memory use does not depend on the size of the files
+        (apart from the record digests kept with --dedup).
+
+    Keyword Parameters:
+
+        option_error_handler
+          An error handler for the :py:class:`~simulations.utils.optionparser.OptionParser`
+
+        option_exit_handler
+          An exit handler for the :py:class:`~simulations.utils.optionparser.OptionParser`
+
+    Public Methods:
+
+        :py:meth:`~StatsMerger.go`
+          Kick off merging the files
+
+    Methods to Implement:
+
+        :py:meth:`~simulations.base.Base._add_listeners`
+          Add listeners for various merging events
+
+        :py:meth:`~StatsMerger._merge_options`
+          Builds the option header of the merged file (optional)
+
+    Events:
+
+        done(this, count)
+          emitted when the merged file (and columns) are complete, with the
+          number of results in it
+
+        go(this)
+          emitted when the :py:meth:`~StatsMerger.go` method is called
+
+        merged file(this, path, kept, skipped)
+          emitted when the results of a file have been merged, with the
+          numbers of results kept and skipped as duplicates
+
+        oparser set up(this)
+          emitted after the :py:class:`~simulations.utils.optionparser.OptionParser`
+          is set up and able to add options
+
+        options parsed(this)
+          emitted after the :py:class:`~simulations.utils.optionparser.OptionParser`
+          has parsed arguments
+
+    """
+
+    def go(self, **kwdargs):
+        """ Verify options and merge the files
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`.
+              Defaults to sys.argv[1:].
+
+            option_values
+              target of option parsing (probably should not use)
+
+        """
+
+        self.emit('go', self)
+
+        if 'option_args' in kwdargs:
+            option_args = kwdargs['option_args']
+        else:
+            option_args = None
+
+        if 'option_values' in kwdargs:
+            option_values = kwdargs['option_values']
+        else:
+            option_values = None
+
+        (self.options, self.args) = self.oparser.parse_args(args=option_args, values=option_values)
+
+        self._check_base_options()
+        self.emit('options parsed', self)
+
+        count = self._merge()
+
+        if self.options.columnar:
+            if self.options.verbose:
+                print "Writing columns..."
+            self._write_columns(count)
+
+        if self.options.verbose:
+            print "Merged {0} results into {1}.".format(count, self.options.output_file)
+
+        self.emit('done', self, count)
+
+    def _merge(self):
+        """ Streams the results of the input files into the merged file and
+            its index, returning the number of results written
+
+        """
+
+        digests = set() if self.options.dedup else None
+        count = 0
+
+        with open(self.options.output_file, "wb") as stats:
+            with open(index_path(self.options.output_file), "wb") as index_file:
+                writer = StatsWriter(stats)
+                writer.write_header()
+                index = IndexWriter(index_file)
+                index.write_header()
+
+                writer.write(self._merge_options(self.args,
+                                                 [_read_options(path) for path in self.args]))
+
+                for path in self.args:
+                    if self.options.verbose:
+                        print "Merging {0}...".format(path)
+
+                    kept = 0
+                    skipped = 0
+                    for (kind, payload, summary) in _iter_encoded_results(path):
+                        if digests is not None:
+                            digest = hashlib.sha1(kind + payload).digest()
+                            if digest in digests:
+                                skipped += 1
+                                continue
+                            digests.add(digest)
+
+                        count += 1
+                        kept += 1
+                        (offset, length) = writer.write_raw(kind, payload)
+                        index.write(count, offset, length, *summary)
+
+                    self.emit('merged file', self, path, kept, skipped)
+
+        return count
+
+    def _merge_options(self, paths, options):
+        """ Returns the option header of the merged file: a copy of the options
+            of the first file, with the total number of duplications, no master
+            seed (the files' duplications do not share one) and a merged_from
+            attribute listing the (path, options) pairs of all of the files
+
+        Parameters:
+
+            paths
+              the list of the paths of the files
+
+            options
+              the list of the options records of the files
+
+        """
+
+        merged = copy.copy(options[0])
+
+        if all(hasattr(option, 'dup') for option in options):
+            merged.dup = sum(option.dup for option in options)
+
+        if hasattr(merged, 'seed'):
+            del merged.seed
+
+        merged.merged_from = zip(paths, options)
+
+        return merged
+
+    def _write_columns(self, count):
+        """ Writes the columns (see :py:mod:`simulations.columns`) of the
+            merged file by streaming through it
+
+        Parameters:
+
+            count
+              the number of results in the merged file
+
+        """
+
+        columns = ColumnWriter(self.options.output_file, count)
+        try:
+            with open(self.options.output_file, "rb") as stats:
+                records = iter_records(stats)
+                next(records)
+                for (k, result) in enumerate(records):
+                    columns.write(k + 1, _unwrap_swept(result))
+        finally:
+            columns.close()
+
+    def _set_base_options(self):
+        """ Set up the basic :py:class:`~simulations.utils.optionparser.OptionParser` options
+
+        Options:
+
+        --columnar                      Also write the merged results to memory-mapped column files
+        --dedup                         Skip results whose records are identical to earlier ones
+        -O FILE, --output=FILE          File name of the merged stats file
+        -V, --verbose                   Print detailed output to stdout as things are processed
+
+        """
+
+        self.oparser.add_option("-O", "--output", action="store",
+                                        dest="output_file",
+                                        default="./output/merged",
+                                        help="file for the merged stats")
+        self.oparser.add_option("--columnar", action="store_true",
+                                        dest="columnar", default=False,
+                                        help="also write merged results to columnar .npy files")
+        self.oparser.add_option("--dedup", action="store_true",
+                                        dest="dedup", default=False,
+                                        help="skip duplicate results")
+        self.oparser.add_option("-V", "--verbose", action="store_true",
+                                        dest="verbose", default=False,
+                                        help="detailed output?")
+
+    def _check_base_options(self):
+        """ Verify the values passed to the base options
+
+        Checks:
+
+            - At least one stats file is given and all of them exist
+            - The output file is not one of the stats files
+
+        """
+
+        if not self.args:
+            self.oparser.error("No stats files to merge")
+
+        for path in self.args:
+            if not os.path.isfile(path):
+                self.oparser.error("The stats file {0} does not exist".format(path))
+
+        output = os.path.abspath(self.options.output_file)
+        if any(os.path.abspath(path) == output for path in self.args):
+            self.oparser.error("The output file cannot be one of the stats files")
+
+
+def _read_options(path):
+    """ Reads the options record of a stats file
+
+    Parameters:
+
+        path
+          the path of the stats file
+
+    """
+
+    with open(path, "rb") as statsfile:
+        for record in iter_records(statsfile):
+            return record
+
+    raise ValueError("Stats file {0} is empty".format(path))
+
+
+def _iter_encoded_results(path):
+    """ Yields the (kind, payload, (generation_count, converged)) triples of
+        the results of a stats file, taking the summaries from its index if
+        it has one
+
+    Parameters:
+
+        path
+          the path of the stats file
+
+    """
+
+    with open(path, "rb") as statsfile:
+        if not is_binary(statsfile):
+            records = iter_legacy_records(statsfile)
+            next(records, None)
+            for result in records:
+                (kind, payload) = encode_record(result)
+                yield (kind, payload, result_summary(_unwrap_swept(result)))
+            return
+
+        if os.path.exists(index_path(path)):
+            entries = read_index(index_path(path))
+        else:
+            entries = []
+
+        read_record(statsfile, False)
+        entry = 0
+        while True:
+            offset = statsfile.tell()
+            try:
+                (kind, payload) = read_record(statsfile, False)
+            except EOFError:
+                return
+
+            while entry < len(entries) and entries[entry]['offset'] < offset:
+                entry += 1
+
+            if entry < len(entries) and entries[entry]['offset'] == offset:
+                summary = (int(entries[entry]['generation_count']), int(entries[entry]['converged']))
+            else:
+                summary = result_summary(_unwrap_swept(decode_record(kind, payload)))
+
+            yield (kind, payload, summary)
@@ -7,12 +7,37 @@ Classes:
 
 """
 
-import cPickle
+import multiprocessing as mp
 import os
 import sys
+import time
+
+import numpy as np
 
 from simulations.base import Base
 from simulations.base import withoptions
+from simulations.catalogue import Catalogue
+from simulations.clustering import AttractorClustering
+from simulations.clustering import cluster_states
+from simulations.columns import column_path
+from simulations.columns import read_columns
+from simulations.columns import stack_results
+from simulations.records import FILE_HEADER
+from simulations.records import StatsFileError
+from simulations.records import TruncatedRecordError
+from simulations.records import cursor_path
+from simulations.records import file_identity
+from simulations.records import index_path
+from simulations.records import is_binary
+from simulations.records import iter_records
+from simulations.records import read_cursor
+from simulations.records import read_index
+from simulations.records import read_record
+from simulations.records import read_record_at
+from simulations.records import record_offsets
+from simulations.records import write_cursor
+from simulations.reducers import read_reduced
+from simulations.reducers import reduced_path
 
 
 @withoptions
@@ -32,11 +57,44 @@ class StatsParser(Base):
         :py:meth:`~StatsParser.go`
           Kick off parsing the results
 
+        :py:meth:`~StatsParser.cluster_attractors`
+          Clusters the final states of the results into attractors
+
+        :py:meth:`~StatsParser.get_duplication`
+          Reads a single duplication result using the index
+
+        :py:meth:`~StatsParser.import_catalogue`
+          Adds the result summaries to a SQLite catalogue
+
+        :py:meth:`~StatsParser.iter_duplications`
+          Reads a filtered subset of the duplication results using the index
+
+        :py:meth:`~StatsParser.read_columns`
+          Reads the columnar results as whole arrays
+
+        :py:meth:`~StatsParser.read_index`
+          Reads the index of the stats file
+
+        :py:meth:`~StatsParser.read_reduced`
+          Reads the reducer states saved by the runner
+
+    Attributes:
+
+        stop_following
+          Set to True (e.g. in a 'result' handler) to stop parsing with
+          --follow after the current result
+
     Methods to Implement:
 
         :py:meth:`~simulations.base.Base._add_listeners`
           Add listeners for various parsing events
 
+        :py:meth:`~StatsParser._reduce_chunk`
+          Pre-reduce a chunk of results in a worker process (with --processes)
+
+        :py:meth:`~StatsParser._combine_chunks`
+          Merge the pre-reduced chunks in the parent process (with --processes)
+
     Events:
 
         done(this, out)
@@ -54,11 +112,25 @@ class StatsParser(Base):
           has parsed arguments
 
         result(this, out, duplication, result)
-          emitted when a result is ready to be interpreted
+          emitted when a result is ready to be interpreted (not emitted when
+          parsing with --batchsize or --processes); the duplication number
+          comes from the index, or is the position of the result in the file
+          if there is no index
+
+        result batch(this, out, duplications, results, columns)
+          emitted for every --batchsize results when parsing with
+          --batchsize, with an array of the duplication numbers (as for the
+          result event), the list of results and the results stacked into
+          arrays by :py:func:`~simulations.columns.stack_results` (empty if
+          they cannot be stacked)
 
         result options(this, out, options)
           emitted when the simulation runner options are ready to be interpreted
 
+        result reduced(this, out, combined)
+          emitted when parsing with --processes, with the combination of all
+          of the pre-reduced chunks
+
     """
 
     def __init__(self, *args, **kwdargs):
@@ -76,6 +148,9 @@ class StatsParser(Base):
 
         super(StatsParser, self).__init__(*args, **kwdargs)
 
+        self._index = None
+        self.stop_following = False
+
     def go(self, **kwdargs):
         """ Pass off the parsing of the results file after some data manipulation
 
@@ -92,6 +167,37 @@ class StatsParser(Base):
 
         self.emit('go', self)
 
+        self._parse_options(**kwdargs)
+
+        with open(self.options.stats_file, "rb") as statsfile:
+            if self.options.out_file:
+                if self.options.verbose:
+                    print "Sending output to {0}...".format(self.options.out_file)
+
+                with open(self.options.out_file, "w") as out:
+                    self._go(statsfile, out)
+                    self.emit('done', self, out)
+            else:
+                if self.options.verbose:
+                    print "Sending output to stdout..."
+
+                self._go(statsfile, sys.stdout)
+                self.emit('done', self, sys.stdout)
+
+    def _parse_options(self, **kwdargs):
+        """ Parses and checks the options
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`.
+              Defaults to sys.argv[1:].
+
+            option_values
+              target of option parsing (probably should not use)
+
+        """
+
         if 'option_args' in kwdargs:
             option_args = kwdargs['option_args']
         else:
@@ -104,26 +210,246 @@ class StatsParser(Base):
 
         (self.options, self.args) = self.oparser.parse_args(args=option_args, values=option_values)
 
+        self._index = None
         self._check_base_options()
         self.emit('options parsed', self)
 
+    def read_index(self, **kwdargs):
+        """ Reads the index written by the runner alongside the stats file,
+            returning a numpy record array with the fields of
+            :py:data:`~simulations.records.INDEX_DTYPE`. Parses the options
+            first if that has not been done.
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        if self.options is None:
+            self._parse_options(**kwdargs)
+
+        if self._index is None:
+            self._index = read_index(index_path(self.options.stats_file))
+
+        return self._index
+
+    def read_columns(self, mmap_mode='r', **kwdargs):
+        """ Reads the column files written by the runner with --columnar,
+            returning a dict of whole arrays (see :py:mod:`simulations.columns`)
+            whose row k belongs to duplication k + 1. Parses the options first
+            if that has not been done.
+
+        Parameters:
+
+            mmap_mode
+              the memory-mapping mode passed to :py:func:`numpy.load`
+              (default 'r', None to read the arrays into memory)
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        if self.options is None:
+            self._parse_options(**kwdargs)
+
+        return read_columns(self.options.stats_file, mmap_mode)
+
+    def cluster_attractors(self, effective_zero=None, tolerance_scale=None, **kwdargs):
+        """ Clusters the final states of the results into attractors (see
+            :py:mod:`simulations.clustering`), using the columns written with
+            --columnar if there are any and the stats file records otherwise.
+            Returns a list of (state, count, frequency, standard_error)
+            tuples, most common first. Parses the options first if that has
+            not been done.
+
+        Parameters:
+
+            effective_zero
+              The effective zero value for floating-point comparisons
+              (default 1e-10)
+
+            tolerance_scale
+              The multiple of the effective zero within which states are
+              clustered (default 1e4)
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        if self.options is None:
+            self._parse_options(**kwdargs)
+
+        if os.path.exists(column_path(self.options.stats_file, 'final_pop')):
+            return cluster_states(self.read_columns()['final_pop'],
+                                  effective_zero=effective_zero,
+                                  tolerance_scale=tolerance_scale)
+
+        clustering = AttractorClustering(effective_zero=effective_zero,
+                                         tolerance_scale=tolerance_scale)
         with open(self.options.stats_file, "rb") as statsfile:
-            if self.options.out_file:
-                if self.options.verbose:
-                    print "Sending output to {0}...".format(self.options.out_file)
+            records = iter_records(statsfile)
+            next(records, None)
+            for result in records:
+                columns = stack_results([result])
+                if not columns:
+                    raise ValueError("Clustering needs (generation_count, initial_pop, final_pop, result_data) results")
+                clustering.add(columns['final_pop'][0])
+
+        return clustering.attractors()
+
+    def import_catalogue(self, catalogue_file, run_id=None, **kwdargs):
+        """ Adds the options and result summaries of the stats file to a
+            SQLite catalogue (see :py:mod:`simulations.catalogue`), numbering
+            the results by duplication if the stats file has an index and by
+            position otherwise. Returns the run id. Parses the options first
+            if that has not been done.
 
-                with open(self.options.out_file, "w") as out:
-                    self._go(statsfile, out)
-                    self.emit('done', self, out)
-            else:
-                if self.options.verbose:
-                    print "Sending output to stdout..."
+        Parameters:
 
-                self._go(statsfile, sys.stdout)
-                self.emit('done', self, sys.stdout)
+            catalogue_file
+              the path of the catalogue database
+
+            run_id
+              the identifier of the run in the catalogue (default the
+              absolute path of the stats file)
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        if self.options is None:
+            self._parse_options(**kwdargs)
+
+        if run_id is None:
+            run_id = os.path.abspath(self.options.stats_file)
+
+        catalogue = Catalogue(catalogue_file)
+        try:
+            with open(self.options.stats_file, "rb") as statsfile:
+                records = iter_records(statsfile)
+                options = next(records)
+                catalogue.add_run(run_id, self.options.stats_file, getattr(options, '__dict__', None))
+
+                if os.path.exists(index_path(self.options.stats_file)):
+                    results = self.iter_duplications()
+                else:
+                    results = ((count + 1, result) for (count, result) in enumerate(records))
+
+                for (duplication, result) in results:
+                    catalogue.add_result(run_id, duplication, result)
+        finally:
+            catalogue.close()
+
+        return run_id
+
+    def read_reduced(self, **kwdargs):
+        """ Reads the dict of reducer states (by reducer name) that the runner
+            saved at the end of the run (see :py:mod:`simulations.reducers`).
+            Parses the options first if that has not been done.
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        if self.options is None:
+            self._parse_options(**kwdargs)
+
+        return read_reduced(reduced_path(self.options.stats_file))
+
+    def get_duplication(self, duplication, **kwdargs):
+        """ Reads the result of a single duplication, seeking straight to it
+
+        Parameters:
+
+            duplication
+              the (1-based) duplication number
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        for (_, result) in self.iter_duplications(duplications=[duplication], **kwdargs):
+            return result
+
+        raise KeyError("No result for duplication {0}".format(duplication))
+
+    def iter_duplications(self, duplications=None, converged=None,
+                                min_generations=None, max_generations=None,
+                                **kwdargs):
+        """ Yields (duplication, result) pairs for the results matching all of
+            the given filters, in file order, reading only those records
+
+        Parameters:
+
+            duplications
+              an iterable of (1-based) duplication numbers
+
+            converged
+              True for only results that reached a stable state, False for
+              only results that did not
+
+            min_generations
+              the minimum generation count
+
+            max_generations
+              the maximum generation count
+
+        Keyword Parameters:
+
+            option_args
+              arguments to pass to the :py:class:`~simulations.utils.optionparser.OptionParser`
+              if the options have not been parsed yet
+
+        """
+
+        index = self.read_index(**kwdargs)
+        mask = np.ones(len(index), dtype=np.bool)
+
+        if duplications is not None:
+            mask &= np.in1d(index['duplication'], np.array(list(duplications), dtype=np.uint64))
+
+        if converged is not None:
+            mask &= index['converged'] == int(bool(converged))
+
+        if min_generations is not None:
+            mask &= index['generation_count'] >= min_generations
+
+        if max_generations is not None:
+            mask &= index['generation_count'] <= max_generations
+
+        selected = index[mask]
+        selected = selected[np.argsort(selected['offset'], kind='mergesort')]
+
+        with open(self.options.stats_file, "rb") as statsfile:
+            for entry in selected:
+                yield (int(entry['duplication']), read_record_at(statsfile, int(entry['offset'])))
 
     def _go(self, statsfile, out):
-        """ Actually parses the data
+        """ Actually parses the data (in either the binary or the legacy
+            stats file format)
 
         Parameters:
 
@@ -135,43 +461,50 @@ class StatsParser(Base):
 
         """
 
+        if self.options.processes:
+            return self._go_parallel(statsfile, out)
+        elif self.options.follow:
+            return self._go_follow(statsfile, out)
+
         count = -1
-        pickle = ""
+        batch = []
 
         if self.options.verbose:
             print "Beginning processing of stats file..."
 
-        for line in statsfile:
-            if line == "\n":
-                if self.options.verbose:
-                    print "Entry boundary encountered."
-
-                count += 1
-
-                if count == 0:
-                    if self.options.verbose:
-                        print "Emitting 'result options'."
-                    self.emit('result options',
-                                self,
-                                out,
-                                cPickle.loads(pickle)
-                             )
-                else:
-                    if self.options.verbose:
-                        print "Emitting 'result'."
-                    self.emit('result',
-                                self,
-                                out,
-                                count,
-                                cPickle.loads(pickle))
+        for record in iter_records(statsfile):
+            if self.options.verbose:
+                print "Entry boundary encountered."
 
-                pickle = ""
+            count += 1
 
+            if count == 0:
                 if self.options.verbose:
-                    print "Prepared for next entry."
-
+                    print "Emitting 'result options'."
+                self.emit('result options',
+                            self,
+                            out,
+                            record
+                         )
+            elif self.options.batch_size:
+                batch.append(record)
+                if len(batch) == self.options.batch_size:
+                    self._emit_batch(out, count - len(batch) + 1, batch)
+                    batch = []
             else:
-                pickle += line
+                if self.options.verbose:
+                    print "Emitting 'result'."
+                self.emit('result',
+                            self,
+                            out,
+                            int(self._record_duplications(count, 1)[0]),
+                            record)
+
+            if self.options.verbose:
+                print "Prepared for next entry."
+
+        if batch:
+            self._emit_batch(out, count - len(batch) + 1, batch)
 
         if count < 1:
             raise ValueError("Stats file contained no duplication results")
@@ -179,13 +512,287 @@ class StatsParser(Base):
             resstr = "Processing done. Entries for {0} duplications found."
             print resstr.format(count)
 
+    def _go_follow(self, statsfile, out):
+        """ Parses a binary stats file while the runner is still appending to
+            it, emitting the 'result' events as the results are written. The
+            position is kept in the --cursor file, so a later follow picks up
+            where this one left off (or starts over if the stats file has since
+            been overwritten by another run). Following stops when
+            :py:attr:`stop_following` is set or when no new result has arrived
+            for --followidle seconds.
+
+        Parameters:
+
+            statsfile
+              a file object for the file to parse
+
+            out
+              the output target (either a file object or sys.stdout)
+
+        """
+
+        path = self.options.cursor_file or cursor_path(self.options.stats_file)
+        cursor = read_cursor(path)
+        self.stop_following = False
+        last_result = time.time()
+
+        if self.options.verbose:
+            print "Following stats file..."
+
+        while True:
+            statsfile.seek(0)
+            if os.fstat(statsfile.fileno()).st_size >= FILE_HEADER.size:
+                if not is_binary(statsfile):
+                    raise ValueError("Following needs a binary stats file")
+
+                try:
+                    options = read_record(statsfile)
+                    start = statsfile.tell()
+                    identity = file_identity(statsfile)
+                    break
+                except (EOFError, TruncatedRecordError):
+                    pass
+
+            if not self._follow_wait(last_result):
+                return
+
+        if self.options.verbose:
+            print "Emitting 'result options'."
+        self.emit('result options', self, out, options)
+
+        size = os.fstat(statsfile.fileno()).st_size
+        if cursor is None:
+            (offset, count) = (start, 0)
+        elif cursor[2] != identity or not start <= cursor[0] <= size:
+            # the cursor was left on another (overwritten) stats file
+            (offset, count) = (start, 0)
+            if self.options.verbose:
+                print "Cursor does not match the stats file; starting over."
+        else:
+            (offset, count) = cursor[:2]
+            if self.options.verbose:
+                print "Resuming after {0} results.".format(count)
+
+        while not self.stop_following:
+            statsfile.seek(offset)
+            try:
+                record = read_record(statsfile)
+            except (EOFError, TruncatedRecordError):
+                write_cursor(path, offset, count, identity)
+                if not self._follow_wait(last_result):
+                    break
+                continue
+
+            offset = statsfile.tell()
+            count += 1
+            last_result = time.time()
+
+            if self.options.verbose:
+                print "Emitting 'result'."
+            self.emit('result', self, out, count, record)
+
+        write_cursor(path, offset, count, identity)
+
+        if self.options.verbose:
+            print "Stopped following after {0} results.".format(count)
+
+    def _follow_wait(self, last_result):
+        """ Waits --pollinterval seconds for more results, returning False
+            instead if following should stop
+
+        Parameters:
+
+            last_result
+              the time at which the last result (or the start) was read
+
+        """
+
+        if self.stop_following:
+            return False
+
+        idle = self.options.follow_idle
+        if idle is not None and time.time() - last_result >= idle:
+            return False
+
+        time.sleep(self.options.poll_interval)
+
+        return True
+
+    def _go_parallel(self, statsfile, out):
+        """ Parses a binary stats file in a pool of --processes worker
+            processes, splitting it into chunks of whole records (at the
+            offsets in the index if there is one, or else at the record
+            boundaries found by scanning the file) that are decoded and
+            pre-reduced by :py:meth:`~StatsParser._reduce_chunk`, then merged
+            in file order by :py:meth:`~StatsParser._combine_chunks`
+
+        Parameters:
+
+            statsfile
+              a file object for the file to parse
+
+            out
+              the output target (either a file object or sys.stdout)
+
+        """
+
+        if os.path.exists(index_path(self.options.stats_file)):
+            if not is_binary(statsfile):
+                raise StatsFileError("Parsing in parallel needs a binary stats file")
+
+            index = self.read_index()
+            offsets = np.concatenate(([FILE_HEADER.size], index['offset']))
+            duplications = index['duplication'].astype(np.int)
+        else:
+            if self.options.verbose:
+                print "Scanning stats file for record boundaries..."
+
+            offsets = record_offsets(statsfile)
+            duplications = np.arange(1, len(offsets))
+
+        if len(offsets) < 2:
+            raise ValueError("Stats file contained no duplication results")
+
+        if self.options.verbose:
+            print "Emitting 'result options'."
+        self.emit('result options',
+                    self,
+                    out,
+                    read_record_at(statsfile, int(offsets[0])))
+
+        offsets = offsets[1:]
+        num_chunks = min(len(offsets), self.options.processes * 4)
+        bounds = np.linspace(0, len(offsets), num_chunks + 1).astype(np.int)
+        tasks = ([type(self), self.options, int(offsets[bounds[k]]),
+                  duplications[bounds[k]:bounds[k + 1]]]
+                    for k in xrange(num_chunks))
+
+        if self.options.verbose:
+            print "Parsing {0} chunks in {1} processes...".format(num_chunks, self.options.processes)
+
+        pool = mp.Pool(self.options.processes)
+        combined = None
+        try:
+            for partial in pool.imap(_parse_chunk, tasks):
+                combined = self._combine_chunks(combined, partial)
+        finally:
+            pool.close()
+            pool.join()
+
+        if self.options.verbose:
+            print "Emitting 'result reduced'."
+        self.emit('result reduced', self, out, combined)
+
+        if self.options.verbose:
+            resstr = "Processing done. Entries for {0} duplications found."
+            print resstr.format(len(offsets))
+
+    @staticmethod
+    def _reduce_chunk(options, duplications, results):
+        """ Pre-reduces a chunk of results in a worker process when parsing
+            with --processes (override as a staticmethod). Returns a list of
+            (duplication, result) pairs by default.
+
+        Parameters:
+
+            options
+              the parsed options of the parser
+
+            duplications
+              an array of the duplication numbers of the results (their
+              positions in the file if there is no index)
+
+            results
+              the list of results
+
+        """
+
+        return zip(duplications.tolist(), results)
+
+    def _combine_chunks(self, combined, partial):
+        """ Merges a pre-reduced chunk into the combination of the chunks
+            before it, in file order, when parsing with --processes. Returns
+            the new combination (by default, the concatenation of the chunks).
+
+        Parameters:
+
+            combined
+              the combination so far (None for the first chunk)
+
+            partial
+              the return value of :py:meth:`~StatsParser._reduce_chunk` for
+              the chunk
+
+        """
+
+        if combined is None:
+            return partial
+
+        return combined + partial
+
+    def _emit_batch(self, out, first, batch):
+        """ Stacks a batch of results and emits it
+
+        Parameters:
+
+            out
+              the output target (either a file object or sys.stdout)
+
+            first
+              the (1-based) position in the file of the first result in the
+              batch
+
+            batch
+              the list of results
+
+        """
+
+        if self.options.verbose:
+            print "Emitting 'result batch'."
+
+        self.emit('result batch',
+                    self,
+                    out,
+                    self._record_duplications(first, len(batch)),
+                    batch,
+                    stack_results(batch))
+
+    def _record_duplications(self, first, count):
+        """ Returns an array of the duplication numbers of consecutive results
+            in the file, from the index if there is one (the runner writes the
+            results in the order they finish, which is not duplication order
+            when it runs them in parallel), or else their positions
+
+        Parameters:
+
+            first
+              the (1-based) position in the file of the first result
+
+            count
+              the number of results
+
+        """
+
+        if self._index is not None or os.path.exists(index_path(self.options.stats_file)):
+            index = self.read_index()
+            if len(index) >= first - 1 + count:
+                return index['duplication'][first - 1:first - 1 + count].astype(np.int)
+
+        return np.arange(first, first + count)
+
     def _set_base_options(self):
         """ Set up the basic :py:class:`~simulations.utils.optionparser.OptionParser` options
 
         Options:
 
+        --batchsize=NUM                 Emit 'result batch' events of this many results instead of 'result' events
+        --cursor=FILE                   Cursor file for --follow (default: the stats file name plus .cursor)
         -F FILE, --statsfile=FILE       File name of the results file
+        --follow                        Keep parsing results as they are appended to a binary stats file
+        --followidle=SECONDS            Stop following after this long without new results
         -O FILE, --outfile=FILE         File to which to print data
+        --pollinterval=SECONDS          Time between checks for new results when following
+        --processes=NUM                 Parse a binary stats file in this many processes
         -V, --verbose                   Print detailed output to stdout as things are processed
 
         """
@@ -200,6 +807,24 @@ class StatsParser(Base):
         self.oparser.add_option("-V", "--verbose", action="store_true",
                                         dest="verbose", default=False,
                                         help="detailed output?")
+        self.oparser.add_option("--batchsize", action="store", type="int",
+                                        dest="batch_size", default=None,
+                                        help="number of results per 'result batch' event")
+        self.oparser.add_option("--processes", action="store", type="int",
+                                        dest="processes", default=None,
+                                        help="number of parallel parsing processes")
+        self.oparser.add_option("--follow", action="store_true",
+                                        dest="follow", default=False,
+                                        help="follow a stats file as it is written")
+        self.oparser.add_option("--cursor", action="store",
+                                        dest="cursor_file", default=None,
+                                        help="cursor file for following")
+        self.oparser.add_option("--pollinterval", action="store", type="float",
+                                        dest="poll_interval", default=1.,
+                                        help="seconds between checks for new results")
+        self.oparser.add_option("--followidle", action="store", type="float",
+                                        dest="follow_idle", default=None,
+                                        help="seconds without new results before following stops")
 
     def _check_base_options(self):
         """ Verify the values passed to the base options
@@ -207,9 +832,56 @@ class StatsParser(Base):
         Checks:
 
             - Stats file exists
+            - Batch size is positive, if specified
+            - Number of processes is positive, if specified, and not combined
+              with a batch size
+            - Following is not combined with a batch size or processes
+            - Poll interval is non-negative and idle time, if specified, is
+              non-negative
 
         """
 
         file_exists = os.path.isfile(self.options.stats_file)
         if not self.options.stats_file or not file_exists:
             self.oparser.error("The stats file specified does not exist")
+
+        if self.options.batch_size is not None and self.options.batch_size <= 0:
+            self.oparser.error("Batch size must be positive")
+
+        if self.options.processes is not None:
+            if self.options.processes <= 0:
+                self.oparser.error("Number of processes must be positive")
+            elif self.options.batch_size is not None:
+                self.oparser.error("Cannot combine --processes with --batchsize")
+
+        if self.options.follow:
+            if self.options.processes is not None or self.options.batch_size is not None:
+                self.oparser.error("Cannot combine --follow with --processes or --batchsize")
+
+        if self.options.poll_interval < 0:
+            self.oparser.error("Poll interval must be non-negative")
+
+        if self.options.follow_idle is not None and self.options.follow_idle < 0:
+            self.oparser.error("Follow idle time must be non-negative")
+
+
+def _parse_chunk(task):
+    """ Decodes a chunk of consecutive records of a stats file and pre-reduces
+        them with the parser class's :py:meth:`~StatsParser._reduce_chunk`.
+        Used with the multiprocessing pool.
+
+    Parameters:
+
+        task
+          A list of the parser class, its options, the byte offset of the
+          first record and an array of the duplication numbers of the records
+
+    """
+
+    (parser_class, options, offset, duplications) = task
+
+    with open(options.stats_file, "rb") as statsfile:
+        statsfile.seek(offset)
+        results = [read_record(statsfile) for _ in xrange(len(duplications))]
+
+    return parser_class._reduce_chunk(options, duplications, results)
@@ -5,10 +5,6 @@ Modules:
     :py:mod:`~simulations.utils.eventemitter`
       Implements an EventEmitter model
 
-    :py:mod:`~simulations.utils.fake_server`
-      Implements a fake pp-like server interface for running things
-      one-at-a-time (not used)
-
     :py:mod:`~simulations.utils.functions`
       Contains utility functions
 
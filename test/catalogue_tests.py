@@ -0,0 +1,63 @@
+import simulations.catalogue as catalogue
+
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from simulations.dynamics.discrete_replicator import ReplicatorResult
+from nose.tools import assert_equal
+
+
+def result(generation_count, final_pop, converged=True):
+    return ReplicatorResult((generation_count, np.array([.5, .5]), np.array(final_pop), None), converged)
+
+
+class TestCatalogue:
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = self.dir + os.sep + "catalogue.testout"
+        self.catalogue = catalogue.Catalogue(self.path)
+
+        self.catalogue.add_run("a", "a.stats", {'background_rate': .1, 'dup': 3, 'types': ['C', 'D']})
+        self.catalogue.add_result("a", 1, result(4, [0., 1.]))
+        self.catalogue.add_result("a", 2, result(7, [1e-9, 1.]))
+        self.catalogue.add_result("a", 3, result(100, [.5, .5], False))
+
+        self.catalogue.add_run("b", "b.stats", {'background_rate': .2})
+        self.catalogue.add_result("b", 1, (2., result(5, [0., 1.])))
+        self.catalogue.add_result("b", 2, "runs")
+
+    def tearDown(self):
+        self.catalogue.close()
+        shutil.rmtree(self.dir)
+
+    def test_find(self):
+        assert_equal(len(self.catalogue.find()), 5)
+        assert_equal([r[:2] for r in self.catalogue.find(parameters={'background_rate': .1})],
+                     [("a", 1), ("a", 2), ("a", 3)])
+        assert_equal([r[:2] for r in self.catalogue.find(parameters={'background_rate': .1},
+                                                         final_state=[0., 1.])],
+                     [("a", 1), ("a", 2)])
+        assert_equal([r[:2] for r in self.catalogue.find(final_state=[0., 1.])],
+                     [("a", 1), ("a", 2), ("b", 1)])
+        assert_equal(self.catalogue.find(reason='force stop'), [("a", 3, None, 100, 'force stop', 2)])
+        assert_equal(self.catalogue.find(game_parameter=2.), [("b", 1, 2., 5, 'stable state', 1)])
+        assert_equal([r[1] for r in self.catalogue.find(run_id="a", min_generations=5, max_generations=50)], [2])
+        assert_equal(self.catalogue.find(final_state=[1., 0.]), [])
+
+    def test_unknown(self):
+        assert_equal(self.catalogue.find(run_id="b")[1], ("b", 2, None, None, None, None))
+
+    def test_reopen(self):
+        self.catalogue.close()
+        self.catalogue = catalogue.Catalogue(self.path)
+        self.catalogue.add_result("b", 3, result(9, [5e-7, 1. - 5e-7]))
+        assert_equal(self.catalogue.find(run_id="b")[2][5], 1)
+        assert_equal(len(self.catalogue.find(final_state=[0., 1.])), 4)
+
+    def test_replace_run(self):
+        self.catalogue.add_run("a", "a.stats", {'background_rate': .3})
+        assert_equal(self.catalogue.find(parameters={'background_rate': .1}), [])
+        assert_equal(len(self.catalogue.find(parameters={'background_rate': .3})), 3)
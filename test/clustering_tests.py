@@ -0,0 +1,66 @@
+import simulations.clustering as clustering
+
+import numpy as np
+
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+class TestAttractorClustering:
+
+    def setUp(self):
+        self.clustering = clustering.AttractorClustering(effective_zero=1e-10, tolerance_scale=1e3)
+
+    def tearDown(self):
+        pass
+
+    def test_tolerance(self):
+        assert np.allclose(self.clustering.tolerance, 1e-7)
+        assert np.allclose(clustering.AttractorClustering().tolerance, 1e-6)
+
+    def test_add(self):
+        first = self.clustering.add([0., 1.])
+        assert_equal(self.clustering.add([5e-8, 1. - 5e-8]), first)
+        assert_equal(self.clustering.add([1e-9, 1.]), first)
+        assert self.clustering.add([2e-7, 1. - 2e-7]) != first
+        assert_equal(self.clustering.add([1., 0.], 4), 2)
+
+        attractors = self.clustering.attractors()
+        assert_equal([a[1] for a in attractors], [4, 3, 1])
+        assert_equal(self.clustering.total, 8)
+        assert np.allclose(attractors[0][0], [1., 0.])
+        assert np.allclose(attractors[1][0], [0., 1.], atol=1e-7)
+        assert np.allclose([a[2] for a in attractors], [.5, 3. / 8, 1. / 8])
+        assert np.allclose(attractors[2][3], np.sqrt((1. / 8) * (7. / 8) / 8))
+
+    def test_cell_boundaries(self):
+        # leaders sitting just either side of a cell boundary still join
+        width = self.clustering.cell_width
+        first = self.clustering.add([width / 2 - 1e-8, .5])
+        assert_equal(self.clustering.add([width / 2 + 1e-8, .5]), first)
+        assert_equal(len(self.clustering.attractors()), 1)
+
+    def test_many_types(self):
+        random = np.random.RandomState(0)
+        leaders = random.dirichlet(np.ones(40), 50)
+        for leader in leaders:
+            self.clustering.add(leader)
+            assert len(self.clustering._cells(leader)) <= 2 ** clustering.GRID_DIMENSIONS
+        for (k, leader) in enumerate(leaders):
+            nudged = leader + random.uniform(-5e-8, 5e-8, 40)
+            assert_equal(self.clustering.add(nudged), k)
+        for pure in np.eye(40):
+            self.clustering.add(pure)
+
+        assert_equal(len(self.clustering.attractors()), 90)
+        assert_equal(self.clustering.matching(np.eye(40)[7]), [57])
+
+    def test_shape(self):
+        self.clustering.add(np.zeros((2, 2)))
+        assert_raises(ValueError, self.clustering.add, np.zeros(4))
+
+    def test_cluster_states(self):
+        states = np.array([[0., 1.], [1e-9, 1.], [1., 0.], [np.nan, np.nan], [0., 1.]])
+        attractors = clustering.cluster_states(states)
+        assert_equal([a[1] for a in attractors], [3, 1])
+        assert np.allclose(attractors[0][2], .75)
@@ -0,0 +1,72 @@
+import simulations.columns as columns
+
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from simulations.dynamics.discrete_replicator import ReplicatorResult
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+class TestColumns:
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = self.dir + os.sep + "results.testout"
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        writer = columns.ColumnWriter(self.path, 3)
+        writer.write(3, ReplicatorResult((7, np.array([.5, .5]), np.array([0., 1.]), None), True))
+        writer.write(1, ReplicatorResult((2, np.array([.25, .75]), np.array([1., 0.]), "data"), False))
+        writer.close()
+
+        got = columns.read_columns(self.path)
+        assert_equal(sorted(got.keys()), sorted(columns.COLUMNS))
+        assert_equal(list(got['generation_count']), [2, -1, 7])
+        assert_equal(list(got['converged']), [0, -1, 1])
+        assert_equal(got['final_pop'].shape, (3, 2))
+        assert (got['initial_pop'][0] == [.25, .75]).all()
+        assert (got['final_pop'][2] == [0., 1.]).all()
+        assert np.isnan(got['final_pop'][1]).all()
+
+    def test_plain_tuple(self):
+        writer = columns.ColumnWriter(self.path, 1)
+        writer.write(1, (4, np.ones((2, 3)) / 3., np.ones((2, 3)) / 3., None))
+        writer.close()
+
+        got = columns.read_columns(self.path, None)
+        assert_equal(got['initial_pop'].shape, (1, 2, 3))
+        assert_equal(list(got['converged']), [-1])
+
+    def test_not_replicator_result(self):
+        writer = columns.ColumnWriter(self.path, 1)
+        assert_raises(ValueError, writer.write, 1, "runs")
+        writer.close()
+
+    def test_missing(self):
+        assert_raises(IOError, columns.read_columns, self.path)
+
+    def test_stack_results(self):
+        results = [ReplicatorResult((3, np.array([.5, .5]), np.array([0., 1.]), "a"), True),
+                   (5, np.array([.2, .8]), np.array([1., 0.]), None)]
+        got = columns.stack_results(results)
+        assert_equal(list(got['generation_count']), [3, 5])
+        assert_equal(list(got['converged']), [1, -1])
+        assert_equal(got['initial_pop'].shape, (2, 2))
+        assert_equal(got['result_data'], ["a", None])
+        assert 'game_parameter' not in got
+
+        got = columns.stack_results([(.5, result) for result in results])
+        assert_equal(list(got['game_parameter']), [.5, .5])
+        assert_equal(list(got['generation_count']), [3, 5])
+
+    def test_stack_unstackable(self):
+        assert_equal(columns.stack_results(["runs", "runs"]), {})
+        assert_equal(columns.stack_results([]), {})
+        assert_equal(columns.stack_results([(1, np.zeros(2), np.zeros(2), None),
+                                            (1, np.zeros(3), np.zeros(3), None)]), {})
@@ -0,0 +1,185 @@
+import simulations.dispatch as dispatch
+
+import itertools
+import multiprocessing as mp
+import multiprocessing.pool
+import os
+import threading
+
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+def square(x):
+    if x < 0:
+        raise ValueError("negative")
+    return x * x
+
+
+def pid(x):
+    return os.getpid()
+
+
+def unpicklable(x):
+    return threading.Lock()
+
+
+class RecordingPool:
+
+    def __init__(self):
+        self.chunks = []
+
+    def apply_async(self, function, args, callback):
+        self.chunks.append(len(args[0][1]))
+        callback(function(*args))
+
+
+class TestChunkSizer:
+
+    def test_fixed(self):
+        sizer = dispatch.ChunkSizer(size=7)
+        assert_equal(sizer.size(), 7)
+        sizer.update(7, 100.)
+        assert_equal(sizer.size(3), 7)
+
+    def test_automatic(self):
+        sizer = dispatch.ChunkSizer(target=0.1, smoothing=0.5, max_size=500)
+        assert_equal(sizer.size(), 1)
+
+        sizer.update(1, 0.01)
+        assert_equal(sizer.size(), 10)
+
+        sizer.update(10, 0.3)
+        assert_equal(sizer.size(), 5)
+
+        sizer.update(10, 0.)
+        sizer.update(10, 0.)
+        sizer.update(10, 0.)
+        assert_equal(sizer.size(), 40)
+
+        sizer.task_time = 0.
+        assert_equal(sizer.size(), 500)
+
+    def test_remaining(self):
+        sizer = dispatch.ChunkSizer(workers=4)
+        sizer.update(1, 0.0001)
+        assert_equal(sizer.size(), 1000)
+        assert_equal(sizer.size(10), 3)
+        assert_equal(sizer.size(1), 1)
+
+
+class TestImapChunked:
+
+    def test_chunks(self):
+        pool = RecordingPool()
+        sizer = dispatch.ChunkSizer(size=4)
+        assert_equal(list(dispatch.imap_chunked(pool, square, range(10), sizer)),
+                     [x * x for x in range(10)])
+        assert_equal(pool.chunks, [4, 4, 2])
+
+    def test_tuned(self):
+        pool = RecordingPool()
+        sizer = dispatch.ChunkSizer(workers=2)
+        assert_equal(sorted(dispatch.imap_chunked(pool, square, range(100), sizer, total=100)),
+                     [x * x for x in range(100)])
+        assert_equal(pool.chunks[0], 1)
+        assert len(pool.chunks) < 100
+        assert_equal(sum(pool.chunks), 100)
+
+    def test_max_in_flight(self):
+        pool = RecordingPool()
+        sizer = dispatch.ChunkSizer(size=10)
+        assert_equal(list(dispatch.imap_chunked(pool, square, range(10), sizer, max_in_flight=4)),
+                     [x * x for x in range(10)])
+        assert_equal(pool.chunks, [4, 4, 2])
+
+    def test_backpressure(self):
+        pulled = []
+
+        def tasks():
+            for x in xrange(1000000):
+                pulled.append(x)
+                yield x
+
+        results = dispatch.imap_chunked(RecordingPool(), square, tasks(),
+                                        dispatch.ChunkSizer(size=2), window=100, max_pending=5)
+        for (k, result) in enumerate(itertools.islice(results, 200)):
+            assert_equal(result, k * k)
+            assert len(pulled) - k <= 6, len(pulled) - k
+        results.close()
+
+    def test_pool_limits(self):
+        pool = mp.Pool(2)
+        try:
+            pulled = []
+
+            def tasks():
+                for x in xrange(200):
+                    pulled.append(x)
+                    yield x
+
+            results = dispatch.imap_chunked(pool, square, tasks(), dispatch.ChunkSizer(workers=2),
+                                            max_in_flight=8, max_pending=4)
+            for (k, result) in enumerate(results):
+                assert len(pulled) - k <= 12
+            assert_equal(len(pulled), 200)
+        finally:
+            pool.terminate()
+
+    def test_pool(self):
+        pool = mp.Pool(2)
+        try:
+            results = dispatch.imap_chunked(pool, square, xrange(50),
+                                            dispatch.ChunkSizer(workers=2), total=50)
+            assert_equal(sorted(results), [x * x for x in range(50)])
+
+            results = dispatch.imap_chunked(pool, square, [1, 2, -1, 3], dispatch.ChunkSizer(size=2))
+            assert_raises(ValueError, list, results)
+        finally:
+            pool.terminate()
+
+    def test_unpicklable_results(self):
+        pool = mp.Pool(2)
+        try:
+            results = dispatch.imap_chunked(pool, unpicklable, xrange(4), dispatch.ChunkSizer(size=2))
+            assert_raises(multiprocessing.pool.MaybeEncodingError, list, results)
+        finally:
+            pool.terminate()
+
+
+class TestWorkerPool:
+
+    def test_lifecycle(self):
+        pool = dispatch.WorkerPool(2)
+        assert_equal(pool.processes, 2)
+        assert not pool.running
+
+        assert_equal(pool.apply_async(square, (3,)).get(), 9)
+        assert pool.running
+
+        pids = set(dispatch.imap_chunked(pool, pid, range(20), dispatch.ChunkSizer(size=1)))
+        assert_equal(set(dispatch.imap_chunked(pool, pid, range(20), dispatch.ChunkSizer(size=1))) | pids,
+                     pids)
+
+        pool.close()
+        assert not pool.running
+        assert pids.isdisjoint(dispatch.imap_chunked(pool, pid, range(4)))
+        pool.terminate()
+        assert not pool.running
+
+    def test_context(self):
+        with dispatch.WorkerPool(1) as pool:
+            assert pool.running
+            assert_equal(list(dispatch.imap_chunked(pool, square, [2])), [4])
+        assert not pool.running
+
+    def test_default_size(self):
+        assert_equal(dispatch.WorkerPool().processes, mp.cpu_count())
+
+    def test_thread_backend(self):
+        with dispatch.WorkerPool(3, backend='thread') as pool:
+            assert_equal(set(dispatch.imap_chunked(pool, pid, range(10))), set([os.getpid()]))
+            results = dispatch.imap_chunked(pool, square, [1, -1], dispatch.ChunkSizer(size=1))
+            assert_raises(ValueError, list, results)
+
+        assert_raises(ValueError, dispatch.WorkerPool, 2, backend='cluster')
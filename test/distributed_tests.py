@@ -0,0 +1,152 @@
+import simulations.distributed as distributed
+
+import socket
+import threading
+
+from simulations.records import read_record
+
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+def squares(setup, nums):
+    for num in nums:
+        yield (num, (setup, num * num))
+
+
+class WorkerThread(threading.Thread):
+
+    def __init__(self, address, run, **kwdargs):
+        super(WorkerThread, self).__init__()
+        self.daemon = True
+        self.address = address
+        self.run_function = run
+        self.kwdargs = kwdargs
+        self.count = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.count = distributed.work_for(self.address, self.run_function, **self.kwdargs)
+        except Exception, err:
+            self.error = err
+
+
+class TestHelpers:
+
+    def test_parse_address(self):
+        assert_equal(distributed.parse_address("example.org:5000"), ("example.org", 5000))
+        assert_equal(distributed.parse_address("5000"), ("127.0.0.1", 5000))
+        assert_equal(distributed.parse_address(":0", default_host=""), ("", 0))
+        assert_raises(ValueError, distributed.parse_address, "host:port")
+        assert_raises(ValueError, distributed.parse_address, "65536")
+
+    def test_runs(self):
+        nums = [0, 1, 2, 5, 7, 8]
+        assert_equal(distributed._runs(nums), [(0, 3), (5, 6), (7, 9)])
+        assert_equal(distributed._expand(distributed._runs(nums)), nums)
+        assert_equal(distributed._runs([]), [])
+
+
+class TestCoordinator:
+
+    def setUp(self):
+        self.coordinator = distributed.Coordinator(("127.0.0.1", 0), secret="sekrit", range_size=3)
+        self.address = self.coordinator.listen()
+        self.events = []
+        self.coordinator.on('worker joined', lambda this, name: self.events.append('joined'))
+        self.coordinator.on('worker left', lambda this, name, requeued: self.events.append(requeued))
+
+    def tearDown(self):
+        self.coordinator.close()
+
+    def test_results(self):
+        assert self.address[1] > 0
+
+        workers = [WorkerThread(self.address, squares, secret="sekrit") for _ in range(3)]
+        for worker in workers:
+            worker.start()
+
+        results = list(self.coordinator.results("setup", iter(range(20)), 20))
+        assert_equal(sorted(results), [(num, ("setup", num * num)) for num in range(20)])
+
+        for worker in workers:
+            worker.join(10)
+            assert worker.error is None
+        assert_equal(sum(worker.count for worker in workers), 20)
+
+    def test_lost_worker(self):
+        def dies(setup, nums):
+            yield (nums[0], (setup, nums[0] ** 2))
+            raise RuntimeError("worker died")
+
+        results = []
+        consumer = threading.Thread(target=lambda: results.extend(self.coordinator.results("setup", xrange(10), 10)))
+        consumer.start()
+
+        lost = WorkerThread(self.address, dies, secret="sekrit")
+        lost.start()
+        lost.join(10)
+
+        worker = WorkerThread(self.address, squares, secret="sekrit")
+        worker.start()
+        consumer.join(10)
+
+        assert_equal(sorted(results), [(num, ("setup", num * num)) for num in range(10)])
+        assert isinstance(lost.error, RuntimeError)
+        assert 2 in self.events
+
+        worker.join(10)
+        assert_equal(worker.count, 9)
+
+    def test_stalled_worker(self):
+        coordinator = distributed.Coordinator(("127.0.0.1", 0), secret="sekrit", range_size=3, worker_timeout=1)
+        address = coordinator.listen()
+        left = []
+        coordinator.on('worker left', lambda this, name, requeued: left.append(requeued))
+
+        results = []
+        consumer = threading.Thread(target=lambda: results.extend(coordinator.results("setup", xrange(10), 10)))
+        consumer.daemon = True
+        consumer.start()
+
+        stalled = socket.create_connection(address)
+        rfile = stalled.makefile('rb')
+        wfile = stalled.makefile('wb')
+        try:
+            distributed._challenge(rfile, wfile, "sekrit", 'W', 'C')
+            assert_equal(read_record(rfile), ('setup', "setup"))
+            distributed._send(wfile, ('request',))
+            assert_equal(read_record(rfile), ('range', [(0, 3)]))
+
+            # never sends the results for its range
+            worker = WorkerThread(address, squares, secret="sekrit")
+            worker.start()
+            consumer.join(10)
+        finally:
+            for fileobj in (rfile, wfile, stalled):
+                fileobj.close()
+            coordinator.close()
+
+        assert_equal(sorted(results), [(num, ("setup", num * num)) for num in range(10)])
+        assert_equal(left, [3])
+
+        worker.join(10)
+        assert_equal(worker.count, 10)
+
+    def test_worker_timeout(self):
+        assert_equal(self.coordinator.worker_timeout, 600.)
+        assert_raises(ValueError, distributed.Coordinator, ("127.0.0.1", 0), secret="sekrit", worker_timeout=0)
+
+    def test_wrong_secret(self):
+        worker = WorkerThread(self.address, squares, secret="wrong")
+        worker.start()
+        worker.join(10)
+        assert isinstance(worker.error, (distributed.ProtocolError, EOFError))
+        assert_equal(worker.count, None)
+
+    def test_empty_secret(self):
+        assert_raises(ValueError, distributed.Coordinator, ("127.0.0.1", 0))
+        assert_raises(ValueError, distributed.Coordinator, ("127.0.0.1", 0), secret="")
+        assert_raises(ValueError, distributed.work_for, self.address, squares)
+        assert_raises(ValueError, distributed.work_for, self.address, squares, secret="")
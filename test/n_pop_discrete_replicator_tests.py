@@ -249,3 +249,62 @@ class TestOddGameSim:
         assert gen_ct > 1
         assert_equal(len(initial_pop), len(self.sim.types))
         assert_equal(self.sim.force_stop, False)
+
+
+class TestSparsePayoffs:
+
+    def setUp(self):
+        self.pop = np.array(((.3, .7, 0.), (.6, .4, 0.), (.2, .3, .5)), dtype=np.float64)
+
+    def tearDown(self):
+        pass
+
+    def test_step_generation(self):
+        dense = OddGameSim({}, 1, False)
+        sparse = OddGameSim({}, 1, False, sparse_payoffs=True)
+        expected = dense._step_generation(self.pop)
+        got = sparse._step_generation(self.pop)
+        assert sparse._payoffs_cache is None, "Dense payoffs were kept"
+        assert_equal(len(sparse._sparse_values), 36)
+        assert np.allclose(got, expected, rtol=1e-12, atol=1e-12), "{0} != {1}".format(got, expected)
+
+    def test_zero_skipping(self):
+        sim = PDSim({}, 1, False, sparse_payoffs=True)
+        pop = np.array(((.5, .5), (.25, .75)), dtype=np.float64)
+        got = sim._step_generation(pop)
+        assert_equal(len(sim._sparse_values), 6)
+        assert_equal(len(sim._profiles_cache), 4)
+        assert np.allclose(got, PDSim({}, 1, False)._step_generation(pop), rtol=1e-12, atol=1e-12)
+
+
+class SweepSim(dr.NPopDiscreteReplicatorDynamics):
+
+    def _profile_payoffs(self, profile):
+        payoffs = [[3., 0.], [self.game_parameter, 1.]]
+        return [payoffs[profile[0]][profile[1]], payoffs[profile[1]][profile[0]]]
+
+
+class TestBatchStep:
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_batch_step(self):
+        parameters = [2., 4., 5.]
+        pops = np.array([((.5, .5), (.2, .8)), ((.9, .1), (.4, .6)), ((.3, .7), (.7, .3))], dtype=np.float64)
+        sim = SweepSim({}, 1, False, game_parameters=parameters)
+        sim.emit('initial set', sim, pops)
+        got = sim._step_generation_batch(pops, sim._batch_payoffs)
+        assert_equal(got.shape, (3, 3, 2))
+        for (k, parameter) in enumerate(parameters):
+            single = SweepSim({}, 1, False)
+            single.game_parameter = parameter
+            assert np.allclose(got[k], single._step_generation(pops[k]), rtol=1e-12, atol=1e-12)
+
+    def test_run(self):
+        results = SweepSim({}, 1, False, game_parameters=[2., 4.]).run()
+        assert_equal(len(results), 2)
+        assert all(gen_ct >= 1 for (parameter, (gen_ct, initial_pop, final_pop, custom_data)) in results)
@@ -1,10 +1,13 @@
+import simulations.dynamics.discrete_replicator as discrete_replicator
 import simulations.dynamics.onepop_discrete_replicator as dr
 import simulations.dynamics.replicator_fastfuncs as fastfuncs
+import simulations.seeds as seeds
 import simulations.simulation as simulation
 import math
 import numpy as np
 
 from nose.tools import assert_equal
+from nose.tools import assert_raises
 
 
 class PDSim(dr.OnePopDiscreteReplicatorDynamics):
@@ -248,6 +251,21 @@ class TestDiscreteReplicatorInstance:
         assert_equal(len(initial_pop), len(self.sim.types))
 
 
+    def test_reset(self):
+        created = []
+        self.sim.on('initial set', lambda this, pop: created.append(this._profiles_cache))
+        first = self.sim.run()
+        self.sim.force_stop = True
+        self.sim.reset(2, False)
+        assert_equal((self.sim.num, self.sim.force_stop, self.sim.result_data), (2, False, None))
+
+        second = self.sim.run()
+        assert created[1] is created[0], "Caches were created again"
+        assert fastfuncs.pop_equals(second[2], np.array((0., 1.)), self.sim.effective_zero) or \
+                fastfuncs.pop_equals(second[1], np.array((1., 0.)), self.sim.effective_zero)
+        assert second[0] >= 1 and first[0] >= 1
+
+
 class TestDiscreteReplicatorInstance2:
 
     def setUp(self):
@@ -352,3 +370,229 @@ class TestDiscreteReplicatorThreeway:
         assert fastfuncs.pop_equals(final_pop, np.array((0., 1.)), self.sim.effective_zero), "Final population was unexpected: {0}".format(final_pop)
         assert gen_ct >= 1
         assert_equal(len(initial_pop), len(self.sim.types))
+
+
+class MatrixSim(dr.OnePopDiscreteReplicatorDynamics):
+    _payoffs = np.outer(np.arange(1., 7.), np.arange(6., 0., -1.)) + np.eye(6)
+
+    def __init__(self, *args, **kwdargs):
+        super(MatrixSim, self).__init__(*args, types=range(6), **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        return [self._payoffs[profile[0]][profile[1]], self._payoffs[profile[1]][profile[0]]]
+
+
+class TestDiscreteReplicatorLowRank:
+
+    def setUp(self):
+        self.pop = np.array((.1, .2, .3, .15, .05, .2), dtype=np.float64)
+
+    def tearDown(self):
+        pass
+
+    def test_payoff_matrix(self):
+        sim = PDSim({}, 1, False)
+        sim._create_caches()
+        assert (dr.payoff_matrix(sim._payoffs_cache, 2) == np.array(PDSim._payoffs, dtype=np.float64)).all()
+
+    def test_full_rank(self):
+        dense = MatrixSim({}, 1, False)
+        factored = MatrixSim({}, 1, False, payoff_rank=6)
+        expected = dense._step_generation(self.pop)
+        got = factored._step_generation(self.pop)
+        assert factored._payoff_left is not None, "Low-rank factors were not created"
+        assert_equal(factored._payoff_right.shape, (6, 6))
+        assert np.allclose(got, expected, rtol=1e-12, atol=1e-12), "{0} != {1}".format(got, expected)
+        assert factored.payoff_approximation_error < 1e-12
+
+    def test_tolerance(self):
+        sim = MatrixSim({}, 1, False, payoff_tolerance=.2)
+        sim._step_generation(self.pop)
+        assert_equal(sim.result_data['payoff_rank'], 1)
+        assert sim.payoff_approximation_error <= .2
+        assert_equal(sim.result_data['payoff_approximation_error'], sim.payoff_approximation_error)
+
+    def test_exact_tolerance(self):
+        sim = MatrixSim({}, 1, False, payoff_tolerance=0)
+        sim._step_generation(self.pop)
+        assert sim._payoff_left is not None, "Low-rank factors were not created"
+        assert sim.payoff_approximation_error < 1e-12
+
+    def test_payoff_rank_failure(self):
+        assert_raises(ValueError, MatrixSim, {}, 1, False, payoff_rank=0)
+        assert_raises(ValueError, MatrixSim, {}, 1, False, payoff_tolerance=-.1)
+
+    def test_rank_error(self):
+        sim = MatrixSim({}, 1, False, payoff_rank=1)
+        sim._step_generation(self.pop)
+        values = np.linalg.svd(dr.payoff_matrix(sim._payoffs_cache, 6), compute_uv=False)
+        assert abs(sim.payoff_approximation_error - math.sqrt((values[1:] ** 2).sum() / (values ** 2).sum())) < 1e-12
+
+    def test_run(self):
+        sim = MatrixSim({}, 1, False, payoff_rank=6)
+        (gen_ct, initial_pop, final_pop, custom_data) = sim.run()
+        assert gen_ct >= 1
+        assert_equal(custom_data['payoff_rank'], 6)
+
+    def test_share_caches(self):
+        sim = MatrixSim({}, 1, False, payoff_rank=6)
+        other = MatrixSim({}, 2, False, payoff_rank=6)
+        assert not other.share_caches(sim)
+
+        first = sim.run()
+        assert other.share_caches(sim)
+        assert other._payoff_left is sim._payoff_left
+        assert_equal(other.result_data, first[3])
+
+        (gen_ct, initial_pop, final_pop, custom_data) = other.run()
+        assert other._payoff_left is sim._payoff_left, "Low-rank factors were created again"
+        assert_equal(custom_data['payoff_rank'], 6)
+        assert 'result_data' not in sim._cache_attributes
+
+    def test_reset(self):
+        sim = MatrixSim({}, 1, False, payoff_rank=6)
+        first = sim.run()[3]
+        left = sim._payoff_left
+
+        sim.reset(2, False)
+        (gen_ct, initial_pop, final_pop, custom_data) = sim.run()
+        assert sim._payoff_left is left, "Low-rank factors were created again"
+        assert custom_data is not first, "Result data is shared between runs"
+        assert_equal(custom_data, first)
+
+
+class SumSim(dr.OnePopDiscreteReplicatorDynamics):
+    _pairwise = np.array([[3., 0., 5.], [4., 1., 2.], [1., 6., 2.]])
+
+    def __init__(self, *args, **kwdargs):
+        super(SumSim, self).__init__(*args, types=['A', 'B', 'C'], **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        return [sum(self._pairwise[me][other] for (j, other) in enumerate(profile) if j != i)
+                    for (i, me) in enumerate(profile)]
+
+
+class TestDiscreteReplicatorPairwise:
+
+    def setUp(self):
+        self.pop = np.array((.2, .5, .3), dtype=np.float64)
+
+    def tearDown(self):
+        pass
+
+    def test_equivalence(self):
+        for arity in (2, 3, 4):
+            full = SumSim({}, 1, False, interaction_arity=arity)
+            pairwise = SumSim({}, 1, False, interaction_arity=arity, pairwise_payoffs=SumSim._pairwise)
+            expected = full._step_generation(self.pop)
+            got = pairwise._step_generation(self.pop)
+            assert pairwise._profiles_cache is None, "Profiles were enumerated"
+            assert np.allclose(got, expected, rtol=1e-12, atol=1e-12), "{0} != {1} at arity {2}".format(got, expected, arity)
+
+    def test_high_arity(self):
+        sim = SumSim({}, 1, False, interaction_arity=10, pairwise_payoffs=SumSim._pairwise)
+        payoffs = 9. * SumSim._pairwise.dot(self.pop)
+        expected = self.pop * payoffs / self.pop.dot(payoffs)
+        assert np.allclose(sim._step_generation(self.pop)[1:], expected, rtol=1e-12, atol=0.)
+
+    def test_low_rank(self):
+        sim = SumSim({}, 1, False, interaction_arity=5, pairwise_payoffs=SumSim._pairwise, payoff_rank=3)
+        full = SumSim({}, 1, False, interaction_arity=5, pairwise_payoffs=SumSim._pairwise)
+        assert np.allclose(sim._step_generation(self.pop), full._step_generation(self.pop), rtol=1e-12, atol=1e-12)
+
+    def test_run(self):
+        sim = SumSim({}, 1, False, interaction_arity=6, pairwise_payoffs=SumSim._pairwise)
+        (gen_ct, initial_pop, final_pop, custom_data) = sim.run()
+        assert gen_ct >= 1
+        assert custom_data is None, "custom data got set somehow"
+
+
+class TestDiscreteReplicatorSparse:
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_sparse_payoffs(self):
+        (profiles, entries, values) = discrete_replicator.sparse_payoffs(np.array([[0, 0], [0, 1], [1, 0], [1, 1]]),
+                                                                             np.array([[3., 3.], [0., 4.], [4., 0.], [0., 0.]]))
+        assert (profiles == np.array([[0, 0], [0, 1], [1, 0]])).all()
+        assert (entries == np.array([[0, 0], [0, 1], [1, 1], [2, 0]])).all()
+        assert (values == np.array([3., 3., 4., 4.])).all()
+
+    def test_step_generation(self):
+        pop = np.array((.25, .75), dtype=np.float64)
+        for (dense, sparse) in ((PDSim({}, 1, False), PDSim({}, 1, False, sparse_payoffs=True)),
+                                (PD3Sim({}, 1, False), PD3Sim({}, 1, False, sparse_payoffs=True))):
+            expected = dense._step_generation(pop)
+            got = sparse._step_generation(pop)
+            assert sparse._sparse_values is not None
+            assert np.allclose(got, expected, rtol=1e-12, atol=1e-12), "{0} != {1}".format(got, expected)
+
+    def test_run(self):
+        sim = PD3Sim({}, 1, False, sparse_payoffs=True)
+        (gen_ct, initial_pop, final_pop, custom_data) = sim.run()
+        assert fastfuncs.pop_equals(final_pop, np.array((0., 1.)), sim.effective_zero), "Final population was unexpected: {0}".format(final_pop)
+
+
+class SweepSim(dr.OnePopDiscreteReplicatorDynamics):
+
+    def __init__(self, *args, **kwdargs):
+        super(SweepSim, self).__init__(*args, types=['C', 'D'], **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        temptation = self.game_parameter if self.game_parameter is not None else 4.
+        payoffs = [[3., 0.], [temptation, 1.]]
+        return [payoffs[profile[0]][profile[1]], payoffs[profile[1]][profile[0]]]
+
+
+class TestDiscreteReplicatorBatch:
+
+    def setUp(self):
+        self.parameters = [2., 2.5, 4., 6.]
+        self.pops = np.array([[.5, .5], [.9, .1], [.3, .7], [.6, .4]], dtype=np.float64)
+
+    def tearDown(self):
+        pass
+
+    def test_batch_step(self):
+        sim = SweepSim({}, 1, False, game_parameters=self.parameters)
+        sim.emit('initial set', sim, self.pops)
+        assert_equal(sim._batch_payoffs.shape, (4, 4, 2))
+        got = sim._step_generation_batch(self.pops, sim._batch_payoffs)
+        for (k, parameter) in enumerate(self.parameters):
+            single = SweepSim({}, 1, False)
+            single.game_parameter = parameter
+            assert np.allclose(got[k], single._step_generation(self.pops[k]), rtol=1e-12, atol=1e-12)
+
+    def test_data_parameters(self):
+        sim = SweepSim({'game_parameters': self.parameters}, 1, False)
+        assert_equal(sim.game_parameters, self.parameters)
+
+    def test_run(self):
+        sim = SweepSim({}, 1, False, game_parameters=self.parameters)
+        results = sim.run()
+        assert_equal([parameter for (parameter, result) in results], self.parameters)
+        for (parameter, (gen_ct, initial_pop, final_pop, custom_data)) in results:
+            single = SweepSim({}, 1, False)
+            single.game_parameter = parameter
+            single.is_running = True
+            single.emit('run', single)
+            (single_ct, _, single_final, _) = single._run(initial_pop.copy())
+            assert_equal(gen_ct, single_ct)
+            assert np.allclose(final_pop, single_final, rtol=0., atol=1e-12)
+
+    def test_payoff_options_failure(self):
+        for extra in ({'sparse_payoffs': True}, {'payoff_rank': 1}, {'payoff_tolerance': .1}):
+            assert_raises(ValueError, SweepSim, {}, 1, False, game_parameters=self.parameters, **extra)
+            assert_raises(ValueError, SweepSim, {'game_parameters': self.parameters}, 1, False, **extra)
+
+    def test_streams(self):
+        sim = SweepSim({}, 1, False, seeds.RandomStreams(1234, 5), game_parameters=self.parameters)
+        results = sim.run()
+        for (k, (parameter, (gen_ct, initial_pop, final_pop, custom_data))) in enumerate(results):
+            single = SweepSim({}, 1, False, seeds.RandomStreams(1234, 5 + k))
+            assert np.array_equal(initial_pop, single._random_population())
+        assert_equal(len(set(tuple(result[1]) for (_, result) in results)), 4)
@@ -0,0 +1,164 @@
+import simulations.records as records
+
+import cPickle
+import cStringIO
+import numpy as np
+import os
+import tempfile
+
+from simulations.dynamics.discrete_replicator import ReplicatorResult
+
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+class TestRecords:
+
+    def setUp(self):
+        self.buf = cStringIO.StringIO()
+        self.writer = records.StatsWriter(self.buf)
+        self.writer.write_header()
+
+    def tearDown(self):
+        pass
+
+    def test_round_trip(self):
+        values = [{'a': 1}, "line\n\nbreaks", (3, np.array([.25, .75]), None)]
+        for value in values:
+            self.writer.write(value)
+        self.writer.write(np.arange(6.).reshape(2, 3))
+
+        self.buf.seek(0)
+        got = list(records.iter_records(self.buf))
+        assert_equal(got[:2], values[:2])
+        assert_equal(got[2][0], 3)
+        assert (got[2][1] == values[2][1]).all()
+        assert (got[3] == np.arange(6.).reshape(2, 3)).all()
+
+    def test_offsets(self):
+        (offset, length) = self.writer.write("first")
+        assert_equal(offset, records.FILE_HEADER.size)
+        (offset2, length2) = self.writer.write("second")
+        assert_equal(offset2, offset + length)
+
+        self.buf.seek(offset2)
+        assert_equal(records.read_record(self.buf), "second")
+
+    def test_encode_kind(self):
+        assert_equal(records.encode_record(np.zeros(3))[0], records.KIND_NUMPY)
+        assert_equal(records.encode_record(np.array([None]))[0], records.KIND_PICKLE)
+        assert_equal(records.encode_record("x")[0], records.KIND_PICKLE)
+
+    def test_checksum(self):
+        self.writer.write("payload")
+        data = self.buf.getvalue()
+        corrupt = cStringIO.StringIO(data[:-2] + "XX")
+        assert records.is_binary(corrupt)
+        assert_raises(records.StatsFileError, records.read_record, corrupt)
+
+    def test_truncated(self):
+        self.writer.write("payload")
+        truncated = cStringIO.StringIO(self.buf.getvalue()[:-1])
+        assert_raises(records.StatsFileError, list, records.iter_records(truncated))
+
+    def test_version(self):
+        newer = cStringIO.StringIO(records.FILE_HEADER.pack(records.MAGIC, records.VERSION + 1))
+        assert_raises(records.StatsFileError, records.is_binary, newer)
+
+    def test_legacy(self):
+        legacy = cStringIO.StringIO()
+        writer = records.LegacyStatsWriter(legacy)
+        writer.write_header()
+        writer.write({'a': 1})
+        writer.write("runs")
+        legacy.seek(0)
+
+        assert not records.is_binary(legacy)
+        assert_equal(legacy.tell(), 0)
+        assert_equal(list(records.iter_records(legacy)), [{'a': 1}, "runs"])
+
+
+class TestIndex:
+
+    def setUp(self):
+        (fd, self.path) = tempfile.mkstemp(suffix=".testout.index")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        with open(self.path, "wb") as indexfile:
+            writer = records.IndexWriter(indexfile)
+            writer.write_header()
+            writer.write(2, 10, 30, 7, 1)
+            writer.write(1, 40, 25)
+
+        index = records.read_index(self.path)
+        assert_equal(len(index), 2)
+        assert_equal(list(index['duplication']), [2, 1])
+        assert_equal(list(index['offset']), [10, 40])
+        assert_equal(list(index['length']), [30, 25])
+        assert_equal(list(index['generation_count']), [7, -1])
+        assert_equal(list(index['converged']), [1, -1])
+
+    def test_partial_entry(self):
+        with open(self.path, "wb") as indexfile:
+            writer = records.IndexWriter(indexfile)
+            writer.write_header()
+            writer.write(1, 10, 30)
+            indexfile.write("\0" * 5)
+
+        assert_equal(len(records.read_index(self.path)), 1)
+
+    def test_empty(self):
+        with open(self.path, "wb") as indexfile:
+            records.IndexWriter(indexfile).write_header()
+
+        assert_equal(len(records.read_index(self.path)), 0)
+
+    def test_not_index(self):
+        with open(self.path, "wb") as indexfile:
+            indexfile.write(records.FILE_HEADER.pack(records.MAGIC, records.VERSION))
+
+        assert_raises(records.StatsFileError, records.read_index, self.path)
+
+    def test_result_summary(self):
+        assert_equal(records.result_summary("runs"), (-1, -1))
+        assert_equal(records.result_summary((5, None, None, None)), (5, -1))
+        result = ReplicatorResult((5, None, None, None), False)
+        assert_equal(records.result_summary(result), (5, 0))
+        assert_equal(records.result_summary(cPickle.loads(cPickle.dumps(result, 2))), (5, 0))
+        assert_equal(records.result_summary(cPickle.loads(cPickle.dumps(result))), (5, 0))
+
+    def test_record_offsets(self):
+        buf = cStringIO.StringIO()
+        writer = records.StatsWriter(buf)
+        writer.write_header()
+        expected = [writer.write(value)[0] for value in ["options", np.zeros(4), (1, 2)]]
+
+        assert_equal(list(records.record_offsets(buf)), expected)
+        assert_raises(records.StatsFileError, records.record_offsets, cStringIO.StringIO("(dp0\n.\n\n"))
+
+    def test_journal(self):
+        with open(self.path, "wb") as journalfile:
+            writer = records.JournalWriter(journalfile)
+            writer.write_header("run-id")
+            writer.write(3, 10, 30)
+            writer.write(1)
+            journalfile.write("\0" * 5)
+
+        (identifier, entries) = records.read_journal(self.path)
+        assert_equal(identifier, "run-id")
+        assert_equal(list(entries['duplication']), [3, 1])
+        assert_equal(list(entries['offset']), [10, 0])
+        assert_equal(list(entries['length']), [30, 0])
+        assert_raises(records.StatsFileError, records.read_index, self.path)
+
+    def test_cursor(self):
+        records.write_cursor(self.path, 10, 2, (5, 7, "ABC123"))
+        assert_equal(records.read_cursor(self.path), (10, 2, (5, 7, "ABC123")))
+
+        with open(self.path, "w") as cursorfile:
+            cursorfile.write("10 2 5 7\n")
+        assert_equal(records.read_cursor(self.path), (10, 2, (5, 7, "")))
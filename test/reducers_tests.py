@@ -0,0 +1,82 @@
+import simulations.reducers as reducers
+
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from simulations.dynamics.discrete_replicator import ReplicatorResult
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+def result(generation_count, final_pop):
+    return ReplicatorResult((generation_count, np.array([.5, .5]), np.array(final_pop), None))
+
+
+class TestReducers:
+
+    def setUp(self):
+        self.results = [result(3, [0., 1.]), result(5, [1e-9, 1. - 1e-9]),
+                        result(12, [1., 0.]), result(3, [.5, .5])]
+
+    def tearDown(self):
+        pass
+
+    def test_attractor_counter(self):
+        counter = reducers.AttractorCounter()
+        for (k, r) in enumerate(self.results):
+            counter.update(k + 1, r)
+
+        state = counter.state()
+        assert_equal(state['count'], 4)
+        assert_equal(state['attractors'][0], ((0., 1.), 2))
+        assert_equal(sorted(state['attractors'][1:]), [((.5, .5), 1), ((1., 0.), 1)])
+
+    def test_generation_histogram(self):
+        histogram = reducers.GenerationHistogram(bin_width=5)
+        for (k, r) in enumerate(self.results):
+            histogram.update(k + 1, r)
+
+        state = histogram.state()
+        assert_equal(state['bin_width'], 5)
+        assert_equal(list(state['counts']), [2, 1, 1])
+
+    def test_final_state_moments(self):
+        moments = reducers.FinalStateMoments(name="moments")
+        for (k, r) in enumerate(self.results):
+            moments.update(k + 1, r)
+
+        finals = np.array([r[2] for r in self.results])
+        state = moments.state()
+        assert_equal(moments.name, "moments")
+        assert np.allclose(state['mean'], finals.mean(axis=0))
+        assert np.allclose(state['variance'], finals.var(axis=0))
+
+    def test_not_replicator_result(self):
+        assert_raises(ValueError, reducers.FinalStateMoments().update, 1, "runs")
+
+    def test_write_read(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = reducers.reduced_path(directory + os.sep + "results")
+            histogram = reducers.GenerationHistogram()
+            histogram.update(1, self.results[0])
+            reducers.write_reduced(path, [histogram, reducers.FinalStateMoments()])
+
+            got = reducers.read_reduced(path)
+            assert_equal(sorted(got.keys()), ['final_state', 'generations'])
+            assert_equal(list(got['generations']['counts']), [0, 0, 0, 1])
+            assert_equal(got['final_state']['count'], 0)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_attractor_clusters(self):
+        clusters = reducers.AttractorClusters(effective_zero=1e-10)
+        for (k, r) in enumerate(self.results):
+            clusters.update(k + 1, r)
+
+        state = clusters.state()
+        assert np.allclose(state['tolerance'], 1e-6)
+        assert_equal([a[1] for a in state['attractors']], [2, 1, 1])
+        assert np.allclose(state['attractors'][0][0], [5e-10, 1. - 5e-10])
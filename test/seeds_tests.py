@@ -0,0 +1,30 @@
+import simulations.seeds as seeds
+
+import numpy as np
+
+from nose.tools import assert_equal
+
+
+class TestSeeds:
+
+    def test_duplication_seed(self):
+        seed = seeds.duplication_seed(1234, 5)
+        assert_equal(seed.dtype, np.uint32)
+        assert_equal(len(seed), 8)
+        assert np.array_equal(seed, seeds.duplication_seed(1234, 5))
+        assert not np.array_equal(seed, seeds.duplication_seed(1234, 6))
+        assert not np.array_equal(seed, seeds.duplication_seed(1235, 5))
+
+    def test_new_master_seed(self):
+        masters = [seeds.new_master_seed() for _ in range(10)]
+        assert all(0 <= master <= seeds.MAX_SEED for master in masters)
+        assert_equal(len(set(masters)), 10)
+
+    def test_streams(self):
+        streams = seeds.RandomStreams(1234, 5)
+        assert np.array_equal(streams.seed(2), seeds.duplication_seed(1234, 7))
+        assert_equal(streams.random_state(2).random_sample(4).tolist(),
+                     seeds.RandomStreams(1234, 7).random_state().random_sample(4).tolist())
+        assert streams.random_state(0).random_sample() != streams.random_state(1).random_sample()
+        assert_equal(streams, seeds.RandomStreams(1234, 5))
+        assert streams != seeds.RandomStreams(1234, 6)
@@ -1,13 +1,22 @@
+import simulations.catalogue as catalogue
+import simulations.dispatch as dispatch
+import simulations.dynamics.onepop_discrete_replicator as onepop
 import simulations.simulation as simulation
 import simulations.simulation_runner as simrunner
+import simulations.records as records
+import simulations.seeds as seeds
 
 import cPickle
+import cStringIO
+import multiprocessing
+import numpy as np
 import os
 import random
 import re
 import string
 import subprocess
 import sys
+import threading
 
 from simulations.utils.optionparser import OptionParser
 from nose.tools import assert_equal
@@ -51,6 +60,24 @@ class Batch(simrunner.SimulationRunner):
     def _when_done(self):
         return "test"
 
+class CountingSim(simulation.Simulation):
+    reusable = True
+    created = 0
+
+    def __init__(self, *args, **kwdargs):
+        super(CountingSim, self).__init__(*args, **kwdargs)
+        CountingSim.created += 1
+        self.instance = CountingSim.created
+
+    def _run(self):
+        return (self.num, self.instance)
+
+class RandomSim(simulation.Simulation):
+    reusable = True
+
+    def _run(self):
+        return (self.num, self.random.random_sample())
+
 class TestSimulation:
 
     def setUp(self):
@@ -106,6 +133,57 @@ class TestSimulation:
         self.sim.set_output_file(None)
         assert_equal(simrunner.run_simulation([Sim, 1, 2, None]), "runs")
 
+    def test_reset(self):
+        fired = []
+        resets = []
+        self.sim.once('run', lambda this: fired.append(this.num))
+        self.sim.on('reset', lambda this: resets.append(this.num))
+        self.sim.set_output_file(False)
+        self.sim.run()
+        self.sim.on('run', lambda this: fired.append('added'))
+
+        self.sim.reset(5, False)
+        assert_equal(resets, [5])
+        assert_equal((self.sim.num, self.sim.outfile, self.sim.result), (5, False, None))
+        assert_equal(self.sim.is_running, False)
+
+        assert_equal(self.sim.run(), "runs")
+        assert_equal(fired, [2, 5])
+        assert_equal(self.sim.out_opened, False)
+
+    def test_reuse(self):
+        simrunner._worker_state.simulations = None
+        results = [simrunner.run_simulation([CountingSim, {'a': a}, k, False])
+                    for (k, a) in enumerate([1, 1, 2, 1])]
+        assert_equal([num for (num, _) in results], range(4))
+        instances = [instance for (_, instance) in results]
+        assert_equal(instances[1], instances[0])
+        assert instances[2] != instances[0]
+        assert_equal(instances[3], instances[0])
+        assert_equal(simrunner.run_simulation([Sim, 1, 2, False]), "runs")
+        assert_equal(len(simrunner._worker_state.simulations), 2)
+
+        for k in range(simrunner.MAX_KEPT_SIMULATIONS + 3):
+            simrunner.run_simulation([CountingSim, {'a': k + 10}, k, False])
+        assert_equal(len(simrunner._worker_state.simulations), simrunner.MAX_KEPT_SIMULATIONS)
+        simrunner._worker_state.simulations = None
+
+    def test_random_streams(self):
+        sim = RandomSim(1, 2, False, seeds.RandomStreams(1234, 3))
+        first = sim.run()[1]
+        assert_equal(sim.run()[1], first)
+        assert_equal(sim.random_state(1).random_sample(),
+                     seeds.RandomStreams(1234, 4).random_state().random_sample())
+
+        sim.reset(3, False, seeds.RandomStreams(1234, 4))
+        assert sim.run()[1] != first
+        sim.reset(2, False, seeds.RandomStreams(1234, 3))
+        assert_equal(sim.run()[1], first)
+
+        sim.reset(2, False)
+        assert sim.streams is None
+        assert sim.run()[1] != sim.run()[1]
+
 class TestSimulationBatch:
 
     def setUp(self):
@@ -118,7 +196,7 @@ class TestSimulationBatch:
             files = os.listdir(self.dir)
             for f in files:
                 if f == "." or f == "..": continue
-                if f[-8:] == ".testout":
+                if ".testout" in f:
                     os.remove(self.dir + os.sep + f)
             os.rmdir(self.dir)
 
@@ -157,7 +235,7 @@ class TestSimulationBatch:
         assert self.batch.oparser.has_option("--test"), "No --test option"
 
     def test_batch_go(self):
-        args = ["-F",  "iter_{0}.testout", "-N", "4", "-O", self.dir, "-S", "results.testout", "--test"]
+        args = ["-F",  "iter_{0}.testout", "-N", "4", "-O", self.dir, "-S", "results.testout", "--test", "--legacystats"]
         assert self.batch.go(option_args=args) is None
         assert_equal(self.batch.options.test, True)
         assert_equal(self.batch.options.dup, 4)
@@ -165,8 +243,6 @@ class TestSimulationBatch:
         assert_equal(self.batch.options.output_file, "iter_{0}.testout")
         assert_equal(self.batch.options.file_dump, True)
         assert_equal(self.batch.options.stats_file, "results.testout")
-        ## pp stuff
-        #assert_equal(self.batch.options.pool_size, 'autodetect')
         assert self.batch.options.pool_size is None, "Pool size is not None"
         assert_equal(self.batch.options.quiet, False)
 
@@ -190,7 +266,7 @@ class TestSimulationBatch:
             assert_equal(results_file.read(), should_be)
 
     def test_batch_go2(self):
-        args = ["-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "--test", "-D"]
+        args = ["-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "--test", "-D", "--legacystats"]
         assert self.batch.go(option_args=args) is None
         assert_equal(self.batch.options.test, True)
         assert_equal(self.batch.options.dup, 6)
@@ -217,7 +293,7 @@ class TestSimulationBatch:
             assert_equal(results_file.read(), should_be)
 
     def test_batch_go3(self):
-        args = ["-N", "6", "-P", "1", "-O", self.dir, "-S", "results.testout", "--test", "-D"]
+        args = ["-N", "6", "-P", "1", "-O", self.dir, "-S", "results.testout", "--test", "-D", "--legacystats"]
         assert self.batch.go(option_args=args) is None
         assert_equal(self.batch.options.test, True)
         assert_equal(self.batch.options.dup, 6)
@@ -243,6 +319,49 @@ class TestSimulationBatch:
                 should_be += "\n"
             assert_equal(results_file.read(), should_be)
 
+    def test_batch_go_binary(self):
+        args = ["-N", "5", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "--test", "-D"]
+        assert self.batch.go(option_args=args) is None
+        assert_equal(self.batch.options.legacy_stats, False)
+
+        with open(self.dir + os.sep + 'results.testout', "rb") as results_file:
+            assert records.is_binary(results_file)
+            assert_equal(records.read_record(results_file), self.batch.options)
+            for _ in range(5):
+                assert_equal(records.read_record(results_file), "runs")
+            assert_raises(EOFError, records.read_record, results_file)
+
+    def test_batch_go_chunked(self):
+        results = []
+        self.batch.on('result', lambda this, result: results.append(this.finished_count))
+        args = ["-N", "7", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "--test", "-D", "--chunksize", "3"]
+        assert self.batch.go(option_args=args) is None
+        assert_equal(self.batch.options.chunk_size, 3)
+        assert_equal(results, range(1, 8))
+
+        index = records.read_index(records.index_path(self.dir + os.sep + 'results.testout'))
+        assert_equal(sorted(index['duplication']), range(1, 8))
+
+    def test_batch_go_bounded(self):
+        args = ["-N", "20", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "--test", "-D",
+                "--maxinflight", "3", "--maxpending", "2"]
+        assert self.batch.go(option_args=args) is None
+        assert_equal((self.batch.options.max_in_flight, self.batch.options.max_pending), (3, 2))
+        assert_equal(self.batch.finished_count, 20)
+
+        args = ["-N", "6", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test", "--maxinflight", "0"]
+        assert_raises(SystemExit, self.batch.go, option_args=args)
+
+        args = ["-N", "6", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test", "--maxpending", "0"]
+        assert_raises(SystemExit, self.batch.go, option_args=args)
+
+    def test_chunk_failure(self):
+        args = ["-N", "6", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test", "--chunksize", "0"]
+        assert_raises(SystemExit, self.batch.go, option_args=args)
+
+        args = ["-N", "6", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test", "--chunktime", "-1"]
+        assert_raises(SystemExit, self.batch.go, option_args=args)
+
     def test_option_failure(self):
         args = ["-N", "-6", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test"]
 
@@ -259,56 +378,626 @@ class TestSimulationBatch:
 
         assert_raises(SystemExit, self.batch.go, option_args=args)
 
-## pp stuff
-#class TestClustering:
-#
-#    def setUp(self):
-#        self.secret = filename_generator(6)
-#        self.server = subprocess.Popen(["ppserver.py", "-s", self.secret])
-#        self.batch = Batch(Sim2)
-#        self.dir = "/tmp/" + filename_generator(8)
-#
-#    def tearDown(self):
-#        self.batch = None
-#        self.server.terminate()
-#        if os.path.isdir(self.dir):
-#            files = os.listdir(self.dir)
-#            for f in files:
-#                if f == "." or f == "..": continue
-#                if f[-8:] == ".testout":
-#                    os.remove(self.dir + os.sep + f)
-#            os.rmdir(self.dir)
-#
-#    def test_batch_cluster_go(self):
-#        args = ["-F",  "iter_{0}.testout", "-N", "4", "-P", "2", "-O", self.dir, "-S", "results.testout", "--test", "--cluster=127.0.0.1", "--clustersecret="+self.secret]
-#        assert self.batch.go(option_args=args) is None
-#        assert_equal(self.batch.options.test, True)
-#        assert_equal(self.batch.options.dup, 4)
-#        assert_equal(self.batch.options.output_dir, self.dir)
-#        assert_equal(self.batch.options.output_file, "iter_{0}.testout")
-#        assert_equal(self.batch.options.file_dump, True)
-#        assert_equal(self.batch.options.stats_file, "results.testout")
-#        assert_equal(self.batch.options.pool_size, 2)
-#        assert_equal(self.batch.options.quiet, False)
-#        assert_equal(self.batch.options.cluster_string, '127.0.0.1')
-#        assert_equal(self.batch.options.cluster_secret, self.secret)
-#
-#        assert_equal(self.batch.data['test'], True)
-#
-#        for i in range(4):
-#            assert os.path.isfile(self.dir + os.sep + 'iter_{0}.testout'.format(i + 1)), "Dup file {0} is missing".format(i + 1)
-#        assert os.path.isfile(self.dir + os.sep + 'results.testout'), "Results file is missing"
-#
-#        for i in range(4):
-#            with open(self.dir + os.sep + 'iter_{0}.testout'.format(i + 1), "r") as dup_file:
-#                assert_equal(dup_file.read(), "runs\n")
-#
-#        with open(self.dir + os.sep + 'results.testout', "r") as results_file:
-#            should_be = ''
-#            should_be += cPickle.dumps(self.batch.options) + "\n"
-#            should_be += "\n"
-#            for _ in range(4):
-#                should_be += cPickle.dumps("runs") + "\n"
-#                should_be += "\n"
-#            assert_equal(results_file.read(), should_be)
-#
+class SweepSim(simulation.Simulation):
+    def _run(self):
+        return [(parameter, parameter * 2) for parameter in self.data['game_parameters']]
+
+class TestSimulationSweep:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.batch = Batch(SweepSim)
+        self.results = []
+
+        def handler(this, result):
+            self.results.append(result)
+
+        self.batch.on('result', handler)
+
+    def tearDown(self):
+        self.batch = None
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def test_sweep(self):
+        self.batch.sweep = range(7)
+        args = ["-N", "2", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test", "--sweepchunk", "3"]
+        assert self.batch.go(option_args=args) is None
+        assert_equal(self.batch.finished_count, 14)
+        assert_equal(sorted(self.results), sorted([(p, p * 2) for p in range(7)] * 2))
+
+    def test_sweep_chunk_failure(self):
+        args = ["-N", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--test", "--sweepchunk", "0"]
+        assert_raises(SystemExit, self.batch.go, option_args=args)
+
+class NumberedSim(simulation.Simulation):
+    def _run(self):
+        return (self.num * 10, self.num)
+
+class NumberedSweepSim(simulation.Simulation):
+    def _run(self):
+        return [(parameter, (self.num, parameter)) for parameter in self.data['game_parameters']]
+
+class PidSim(simulation.Simulation):
+    def _run(self):
+        return os.getpid()
+
+class TestSimulationPool:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.args = ["-N", "12", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--chunksize", "1"]
+        self.pids = []
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def run_batch(self, batch, args=None):
+        results = []
+        batch.on('result', lambda this, result: results.append(result))
+        batch.go(option_args=args or self.args)
+        return set(results)
+
+    def test_owned_pool(self):
+        batch = simrunner.SimulationRunner(PidSim)
+        assert batch.pool is None
+
+        first = self.run_batch(batch)
+        pool = batch.pool
+        assert pool.running
+        assert_equal(pool.processes, 2)
+
+        second = self.run_batch(batch)
+        assert batch.pool is pool
+        assert_equal(first | second, first)
+
+        third = self.run_batch(batch, self.args[:3] + ["1"] + self.args[4:])
+        assert batch.pool is not pool
+        assert not pool.running
+        assert_equal(batch.pool.processes, 1)
+        assert first.isdisjoint(third)
+
+        batch.close()
+        assert batch.pool is None
+
+    def test_thread_backend(self):
+        batch = simrunner.SimulationRunner(PidSim)
+        assert_equal(self.run_batch(batch, self.args + ["--backend", "thread"]), set([os.getpid()]))
+        assert_equal(batch.pool.backend, 'thread')
+        pool = batch.pool
+
+        assert os.getpid() not in self.run_batch(batch)
+        assert_equal(batch.pool.backend, 'process')
+        assert not pool.running
+        batch.close()
+
+        args = ["-N", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--backend", "cluster"]
+        assert_raises(SystemExit, simrunner.SimulationRunner(PidSim).go, option_args=args)
+
+    def shared_caches(self, klass):
+        simrunner._shared_simulations.clear()
+        simrunner._worker_state.simulations = None
+        results = []
+
+        def work(num):
+            results.append(simrunner.run_simulation([klass, {'game': 'pd'}, num, False]))
+
+        for num in range(3):
+            thread = threading.Thread(target=work, args=(num,))
+            thread.start()
+            thread.join()
+
+        assert_equal(len(set(cache for (cache, _) in results)), 1)
+        for (_, final_pop) in results:
+            assert np.allclose(final_pop, [0., 1.])
+        simrunner._shared_simulations.clear()
+        simrunner._worker_state.simulations = None
+
+    def test_shared_caches(self):
+        self.shared_caches(CacheSim)
+
+    def test_shared_caches_unkept(self):
+        self.shared_caches(UnkeptCacheSim)
+
+    def test_shared_pool(self):
+        with dispatch.WorkerPool(2) as pool:
+            first = self.run_batch(simrunner.SimulationRunner(PidSim, pool=pool))
+            batch = simrunner.SimulationRunner(PidSim, pool=pool)
+            second = self.run_batch(batch, self.args[:3] + ["4"] + self.args[4:])
+            assert_equal(first | second, first)
+
+            batch.close()
+            assert batch.pool is pool
+            assert pool.running
+
+class CacheSim(onepop.OnePopDiscreteReplicatorDynamics):
+    reusable = True
+
+    def __init__(self, *args, **kwdargs):
+        super(CacheSim, self).__init__(*args, types=['C', 'D'], default_handlers=False, **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        payoffs = [[3, 0], [4, 1]]
+        return [payoffs[profile[0]][profile[1]], payoffs[profile[1]][profile[0]]]
+
+    def _run(self):
+        result = super(CacheSim, self)._run()
+        return (id(self._payoffs_cache), result[2].tolist())
+
+class UnkeptCacheSim(CacheSim):
+    reusable = False
+
+class TestSimulationResume:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.stats = self.dir + os.sep + "results.testout"
+        self.args = ["-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--resume"]
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def interrupt(self, completed, tail):
+        """ Cuts the journal down to the first completed entries and leaves
+            tail bytes after the last of their records
+
+        """
+
+        (identifier, entries) = records.read_journal(records.journal_path(self.stats))
+        last = entries[completed - 1]
+        with open(records.journal_path(self.stats), "r+b") as journal:
+            journal.truncate(records.FILE_HEADER.size + records.JOURNAL_IDENTIFIER.size +
+                             completed * records.JOURNAL_ENTRY.size)
+        with open(self.stats, "r+b") as stats:
+            stats.truncate(int(last['offset'] + last['length']))
+            stats.seek(0, os.SEEK_END)
+            stats.write(tail)
+
+        return (identifier, set(entries[:completed]['duplication'].tolist()))
+
+    def results(self):
+        with open(self.stats, "rb") as stats:
+            return list(records.iter_records(stats))[1:]
+
+    def resume(self, klass=NumberedSim, sweep=None):
+        batch = simrunner.SimulationRunner(klass)
+        batch.sweep = sweep
+        resumed = []
+        new = []
+        batch.on('resumed', lambda this, count: resumed.append(count))
+        batch.on('result', lambda this, result: new.append(result))
+        batch.go(option_args=self.args)
+
+        return (batch, resumed, new)
+
+    def test_resume(self):
+        simrunner.SimulationRunner(NumberedSim).go(option_args=self.args)
+        (identifier, done) = self.interrupt(3, records.RECORD_HEADER.pack(records.KIND_PICKLE, 50, 0) + "partial")
+
+        (batch, resumed, new) = self.resume()
+        assert_equal(resumed, [3])
+        assert_equal(batch.identifier, identifier)
+        assert_equal(sorted(new), sorted((k * 10, k) for k in range(6) if k + 1 not in done))
+        assert_equal(sorted(self.results()), [(k * 10, k) for k in range(6)])
+
+        index = records.read_index(records.index_path(self.stats))
+        assert_equal(sorted(index['duplication']), range(1, 7))
+        assert_equal(sorted(records.read_journal(records.journal_path(self.stats))[1]['duplication']), range(1, 7))
+
+        (batch, resumed, new) = self.resume()
+        assert_equal((resumed, new), ([6], []))
+
+    def test_damaged_tail(self):
+        simrunner.SimulationRunner(NumberedSim).go(option_args=self.args)
+        (identifier, entries) = records.read_journal(records.journal_path(self.stats))
+        with open(self.stats, "r+b") as stats:
+            stats.seek(int(entries[-1]['offset'] + entries[-1]['length']) - 2)
+            stats.write("XX")
+
+        (batch, resumed, new) = self.resume()
+        assert_equal(resumed, [5])
+        assert_equal(len(new), 1)
+        assert_equal(sorted(self.results()), [(k * 10, k) for k in range(6)])
+
+    def test_resume_sweep(self):
+        self.args[1] = "2"
+        self.args += ["--sweepchunk", "2"]
+        self.resume(NumberedSweepSim, range(5))
+        self.interrupt(4, "")
+
+        (batch, resumed, new) = self.resume(NumberedSweepSim, range(5))
+        assert_equal(resumed, [4])
+        assert_equal(len(new), 6)
+        index = records.read_index(records.index_path(self.stats))
+        assert_equal(sorted(index['duplication']), range(1, 11))
+        assert_equal(sorted(r[0] for r in self.results()), sorted(range(5) * 2))
+
+    def test_fresh_resume(self):
+        (batch, resumed, new) = self.resume()
+        assert_equal(resumed, [])
+        assert_equal(len(new), 6)
+
+    def test_resume_catalogue(self):
+        path = self.dir + os.sep + "catalogue.testout"
+        self.args += ["--catalogue", path]
+        simrunner.SimulationRunner(NumberedSim).go(option_args=self.args)
+        (identifier, done) = self.interrupt(3, "")
+        os.remove(path)
+
+        self.resume()
+        found = catalogue.Catalogue(path).find(run_id=identifier)
+        assert_equal([row[1] for row in found], range(1, 7))
+
+    def test_interrupted_catalogue(self):
+        path = self.dir + os.sep + "catalogue.testout"
+        batch = simrunner.SimulationRunner(NumberedSim)
+        results = []
+        def interrupt(this, result):
+            results.append(result)
+            if len(results) == 3:
+                raise KeyboardInterrupt()
+        batch.on('result', interrupt)
+        assert_raises(SystemExit, batch.go, option_args=self.args + ["--catalogue", path])
+
+        assert_equal(len(catalogue.Catalogue(path).find(run_id=batch.identifier)), 3)
+
+    def test_missing_journal(self):
+        simrunner.SimulationRunner(NumberedSim).go(option_args=self.args)
+        os.remove(records.journal_path(self.stats))
+        size = os.path.getsize(self.stats)
+
+        assert_raises(SystemExit, simrunner.SimulationRunner(NumberedSim).go, option_args=self.args)
+        assert_equal(os.path.getsize(self.stats), size)
+
+    def test_resume_legacy_failure(self):
+        assert_raises(SystemExit, simrunner.SimulationRunner(NumberedSim).go, option_args=self.args + ["--legacystats"])
+
+class DyingSim(simulation.Simulation):
+    def _run(self):
+        # the first worker to run duplication 4 dies, once
+        if self.num == 3:
+            try:
+                os.close(os.open(self.data['marker'], os.O_CREAT | os.O_EXCL))
+                os._exit(1)
+            except OSError:
+                pass
+        return (self.num * 10, self.num)
+
+def run_worker(klass, args):
+    simrunner.SimulationRunner(klass).go(option_args=args)
+
+class TestSimulationDistributed:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.stats = self.dir + os.sep + "results.testout"
+        self.args = ["-N", "12", "-O", self.dir, "-S", "results.testout", "-Q", "-D",
+                     "--listen", "127.0.0.1:0", "--clustersecret", "sekrit", "--rangesize", "2"]
+        self.workers = []
+        self.left = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.join(10)
+            if worker.is_alive():
+                worker.terminate()
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def run_batch(self, klass, num_workers, sweep=None, data=None, args=()):
+        batch = simrunner.SimulationRunner(klass)
+        batch.sweep = sweep
+        batch.data.update(data or {})
+        results = []
+
+        def start_workers(this, address):
+            args = ["--connect", "{0}:{1}".format(*address), "--clustersecret", "sekrit",
+                    "-P", "1", "--backend", "thread", "-O", self.dir, "-Q", "-D"]
+            for _ in range(num_workers):
+                worker = multiprocessing.Process(target=run_worker, args=(klass, args))
+                worker.start()
+                self.workers.append(worker)
+
+        batch.on('listening', start_workers)
+        batch.on('result', lambda this, result: results.append(result))
+        batch.on('worker left', lambda this, name, requeued: self.left.append(requeued))
+        batch.go(option_args=self.args + list(args))
+
+        return (batch, results)
+
+    def stored(self):
+        with open(self.stats, "rb") as stats:
+            return sorted(list(records.iter_records(stats))[1:])
+
+    def test_distributed(self):
+        (batch, results) = self.run_batch(NumberedSim, 3)
+        assert batch.pool is None
+        assert_equal(sorted(results), [(k * 10, k) for k in range(12)])
+        assert_equal(self.stored(), [(k * 10, k) for k in range(12)])
+        assert_equal(sorted(records.read_index(records.index_path(self.stats))['duplication']), range(1, 13))
+
+        for worker in self.workers:
+            worker.join(10)
+            assert_equal(worker.exitcode, 0)
+
+    def test_distributed_sweep(self):
+        (batch, results) = self.run_batch(NumberedSweepSim, 2, sweep=range(5), args=["--sweepchunk", "3"])
+        assert_equal(batch.finished_count, 60)
+        assert_equal(sorted(results), sorted((p, (i * 2 + j, p)) for i in range(12)
+                                             for (j, chunk) in enumerate([range(3), range(3, 5)])
+                                             for p in chunk))
+        index = records.read_index(records.index_path(self.stats))
+        assert_equal(sorted(index['duplication']), range(1, 61))
+
+    def test_dead_worker(self):
+        marker = self.dir + os.sep + "died.testout"
+        os.makedirs(self.dir)
+        (batch, results) = self.run_batch(DyingSim, 2, data={'marker': marker})
+        assert os.path.exists(marker)
+        assert_equal(self.stored(), [(k * 10, k) for k in range(12)])
+        assert_equal(sorted(records.read_index(records.index_path(self.stats))['duplication']), range(1, 13))
+
+        for worker in self.workers:
+            worker.join(10)
+        assert_equal(sorted(worker.exitcode for worker in self.workers), [0, 1])
+        assert max(self.left) > 0
+
+    def test_distributed_option_failures(self):
+        base = ["-N", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D"]
+        for extra in (["--listen", "0", "--connect", "127.0.0.1:1"],
+                      ["--listen", "localhost:port"],
+                      ["--connect", "127.0.0.1:70000"],
+                      ["--listen", "0", "--rangesize", "0"],
+                      ["--listen", "0", "--workertimeout", "0"]):
+            assert_raises(SystemExit, simrunner.SimulationRunner(NumberedSim).go,
+                          option_args=base + extra + ["--clustersecret", "sekrit"])
+
+        for extra in (["--listen", "0"], ["--connect", "127.0.0.1:1"],
+                      ["--listen", "0", "--clustersecret", ""]):
+            assert_raises(SystemExit, simrunner.SimulationRunner(NumberedSim).go, option_args=base + extra)
+
+class TestSimulationShards:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.stats = self.dir + os.sep + "results.testout"
+        self.args = ["-N", "10", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--seed", "1234"]
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def run_batch(self, args, klass=NumberedSim, sweep=None):
+        batch = simrunner.SimulationRunner(klass)
+        batch.sweep = sweep
+        batch.go(option_args=self.args + args)
+        return batch
+
+    def by_duplication(self, stats_path):
+        index = records.read_index(records.index_path(stats_path))
+        with open(stats_path, "rb") as stats:
+            return [(int(entry['duplication']), records.read_record_at(stats, int(entry['offset'])))
+                    for entry in np.sort(index, order='duplication')]
+
+    def test_shard_range(self):
+        for (dup, num_shards) in [(10, 3), (3, 5), (7, 7), (100, 1)]:
+            ranges = [simrunner.shard_range(dup, shard, num_shards) for shard in range(num_shards)]
+            assert_equal(sum((range(*r) for r in ranges), []), range(dup))
+            assert max(stop - start for (start, stop) in ranges) - min(stop - start for (start, stop) in ranges) <= 1
+
+    def test_merge(self):
+        self.run_batch([])
+        single = self.by_duplication(self.stats)
+        os.rename(self.stats, self.stats + ".single.testout")
+
+        for shard in range(3):
+            self.run_batch(["--shard", str(shard), "--numshards", "3"])
+            path = records.shard_path(self.stats, shard, 3)
+            (start, stop) = simrunner.shard_range(10, shard, 3)
+            assert_equal([dup for (dup, _) in self.by_duplication(path)], range(start + 1, stop + 1))
+            with open(path, "rb") as stats:
+                options = list(records.iter_records(stats))[0]
+            assert_equal((options.shard, options.num_shards, options.dup), (shard, 3, 10))
+
+        batch = self.run_batch(["--numshards", "3", "--mergeshards"])
+        assert_equal(batch.finished_count, 10)
+        assert_equal(self.by_duplication(self.stats), single)
+        assert_equal(sorted(records.read_journal(records.journal_path(self.stats))[1]['duplication']), range(1, 11))
+
+    def test_merge_sweep(self):
+        args = ["--sweepchunk", "2"]
+        self.run_batch(args, NumberedSweepSim, range(3))
+        single = self.by_duplication(self.stats)
+
+        for shard in range(4):
+            self.run_batch(args + ["--shard", str(shard), "--numshards", "4"], NumberedSweepSim, range(3))
+        self.run_batch(args + ["--numshards", "4", "--mergeshards"], NumberedSweepSim, range(3))
+        assert_equal(self.by_duplication(self.stats), single)
+
+    def test_merge_incomplete(self):
+        self.run_batch(["--shard", "0", "--numshards", "2"])
+        assert_raises(SystemExit, self.run_batch, ["--numshards", "2", "--mergeshards"])
+
+        self.run_batch(["--shard", "1", "--numshards", "2", "--noresults"])
+        assert_raises(SystemExit, self.run_batch, ["--numshards", "2", "--mergeshards"])
+
+        self.run_batch(["--shard", "1", "--numshards", "2"])
+        assert_raises(SystemExit, self.run_batch, ["--numshards", "2", "--mergeshards", "-N", "12"])
+
+    def test_shard_option_failures(self):
+        for extra in (["--shard", "0"],
+                      ["--numshards", "2"],
+                      ["--shard", "2", "--numshards", "2"],
+                      ["--shard", "0", "--numshards", "0"],
+                      ["--shard", "0", "--numshards", "2", "--legacystats"],
+                      ["--shard", "0", "--numshards", "2", "--mergeshards"],
+                      ["--numshards", "2", "--mergeshards", "--resume"]):
+            assert_raises(SystemExit, self.run_batch, extra)
+
+        args = ["-N", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--shard", "0", "--numshards", "2"]
+        assert_raises(SystemExit, simrunner.SimulationRunner(NumberedSim).go, option_args=args)
+
+class TestSimulationSeeds:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.stats = self.dir + os.sep + "results.testout"
+        self.args = ["-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D"]
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def run_batch(self, args, klass=RandomSim, sweep=None):
+        batch = simrunner.SimulationRunner(klass)
+        batch.sweep = sweep
+        batch.go(option_args=self.args + args)
+        with open(self.stats, "rb") as stats:
+            stored = list(records.iter_records(stats))
+        return (stored[0], sorted(stored[1:]))
+
+    def test_seed(self):
+        (options, first) = self.run_batch(["--seed", "1234"])
+        assert_equal(options.seed, 1234)
+        assert_equal(len(set(value for (_, value) in first)), 6)
+        assert_equal(self.run_batch(["--seed", "1234"])[1], first)
+        assert_equal(first[2][1], seeds.RandomStreams(1234, 3).random_state().random_sample())
+        assert self.run_batch(["--seed", "1235"])[1] != first
+
+        (options, drawn) = self.run_batch([])
+        assert 0 <= options.seed <= seeds.MAX_SEED
+        assert_equal(self.run_batch(["--seed", str(options.seed)])[1], drawn)
+
+        assert_raises(SystemExit, self.run_batch, ["--seed", "-1"])
+
+    def test_resume_seed(self):
+        (_, first) = self.run_batch(["--seed", "99", "--resume"])
+        with open(records.journal_path(self.stats), "r+b") as journal:
+            journal.truncate(records.FILE_HEADER.size + records.JOURNAL_IDENTIFIER.size +
+                             2 * records.JOURNAL_ENTRY.size)
+
+        (options, resumed) = self.run_batch(["--resume"])
+        assert_equal(options.seed, 99)
+        assert_equal(sorted(set(resumed)), first)
+
+        assert_raises(SystemExit, self.run_batch, ["--resume", "--seed", "98"])
+
+    def test_sweep_seed(self):
+        sweep = range(5)
+        (_, chunked) = self.run_batch(["--seed", "7", "--sweepchunk", "2"], SeedSweepSim, sweep)
+        (_, whole) = self.run_batch(["--seed", "7"], SeedSweepSim, sweep)
+        assert_equal(chunked, whole)
+        assert_equal(len(set(value for (_, value) in whole)), 30)
+
+    def test_replicator_seed(self):
+        (_, first) = self.run_batch(["--seed", "5"], SeededDynamics)
+        assert_equal(self.run_batch(["--seed", "5"], SeededDynamics)[1], first)
+        assert_equal(len(set(tuple(initial) for (initial, _) in first)), 6)
+
+class SeedSweepSim(simulation.Simulation):
+    def _run(self):
+        return [(parameter, self.random_state(k).random_sample())
+                for (k, parameter) in enumerate(self.data['game_parameters'])]
+
+class SeededDynamics(CacheSim):
+    def _run(self):
+        result = onepop.OnePopDiscreteReplicatorDynamics._run(self)
+        return (result[1].tolist(), result[2].tolist())
+
+class TracingDynamics(onepop.OnePopDiscreteReplicatorDynamics):
+    def __init__(self, *args, **kwdargs):
+        super(TracingDynamics, self).__init__(*args, types=['C', 'D'], **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        temptation = self.game_parameter if self.game_parameter is not None else 4.
+        payoffs = [[3., 0.], [temptation, 1.]]
+        return [payoffs[profile[0]][profile[1]], payoffs[profile[1]][profile[0]]]
+
+class TestSimulationReplay:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.args = ["-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D",
+                     "-F", "trace_{0}.testout"]
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def run_batch(self, args, sweep=None):
+        batch = simrunner.SimulationRunner(TracingDynamics)
+        batch.sweep = sweep
+        replayed = []
+        batch.on('replayed', lambda this, duplication, result, stored: replayed.append((duplication, result, stored)))
+        batch.go(option_args=self.args + args)
+        return (batch, replayed)
+
+    def test_parse_duplications(self):
+        assert_equal(simrunner.parse_duplications("3"), [3])
+        assert_equal(simrunner.parse_duplications("7, 3,10-12,11"), [3, 7, 10, 11, 12])
+        for spec in ("", "0", "a", "5-3", "1,,2"):
+            assert_raises(ValueError, simrunner.parse_duplications, spec)
+
+    def test_replay(self):
+        self.run_batch(["--seed", "11"])
+        assert_equal([f for f in os.listdir(self.dir) if f.startswith("trace_")], [])
+
+        (batch, replayed) = self.run_batch(["--replay", "5,2"])
+        assert_equal(batch.options.seed, 11)
+        assert_equal(batch.finished_count, 2)
+        assert_equal(sorted(duplication for (duplication, _, _) in replayed), [2, 5])
+        for (duplication, result, stored) in replayed:
+            assert stored is not None
+            assert simrunner._same_result(result, stored)
+
+        assert_equal(sorted(f for f in os.listdir(self.dir) if f.startswith("trace_")),
+                     ["trace_2.testout", "trace_5.testout"])
+        with open(self.dir + os.sep + "trace_2.testout") as trace:
+            text = trace.read()
+        assert "Initial State" in text
+        assert "Generation 1:" in text
+
+        out = cStringIO.StringIO()
+        batch.options.quiet = False
+        simrunner.default_replayed_handler(batch, *replayed[0], out=out)
+        assert "same as the stored result" in out.getvalue()
+
+    def test_replay_sweep(self):
+        sweep = [2., 2.5, 4., 6., 3.]
+        self.run_batch(["--seed", "3", "-N", "2", "--sweepchunk", "2"], sweep)
+        (batch, replayed) = self.run_batch(["--replay", "3,9", "-N", "2", "--sweepchunk", "2"], sweep)
+        assert_equal(sorted(duplication for (duplication, _, _) in replayed), [3, 9])
+        for (duplication, result, stored) in replayed:
+            assert_equal(result[0], sweep[(duplication - 1) % len(sweep)])
+            assert simrunner._same_result(result, stored)
+
+    def test_replay_failures(self):
+        assert_raises(SystemExit, self.run_batch, ["--replay", "1"])
+
+        self.run_batch(["--seed", "11"])
+        for extra in (["--replay", "7"], ["--replay", "x"], ["--replay", "1", "--resume"],
+                      ["--replay", "1", "--seed", "12"]):
+            assert_raises(SystemExit, self.run_batch, extra)
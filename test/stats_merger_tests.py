@@ -0,0 +1,92 @@
+import simulations.records as records
+import simulations.simulation as simulation
+import simulations.simulation_runner as simrunner
+import simulations.statsmerger as merger
+import simulations.statsparser as stats
+
+import numpy as np
+import os
+import random
+import string
+
+from simulations.dynamics.discrete_replicator import ReplicatorResult
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+def filename_generator(size=6, chars=string.ascii_uppercase + string.digits):
+    return ''.join(random.choice(chars) for x in range(size))
+
+class NumberedSim(simulation.Simulation):
+    def _run(self):
+        pop = np.array([self.num, 1.]) / (self.num + 1.)
+        return ReplicatorResult((self.num, pop, pop, None), self.num % 2 == 0)
+
+class TestStatsMerger:
+
+    def setUp(self):
+        self.dir = "/tmp/" + filename_generator(8)
+        self.merger = merger.StatsMerger()
+        self.merged = self.dir + os.sep + "merged.testout"
+        self.inputs = []
+
+        for (k, extra) in enumerate([[], ["--legacystats"], []]):
+            path = "results{0}.testout".format(k)
+            batch = simrunner.SimulationRunner(NumberedSim)
+            batch.go(option_args=["-N", str(3 + k), "-P", "2", "-O", self.dir, "-S", path, "-Q", "-D"] + extra)
+            self.inputs.append(self.dir + os.sep + path)
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def results(self, path):
+        with open(path, "rb") as statsfile:
+            return list(records.iter_records(statsfile))
+
+    def test_merge(self):
+        counts = []
+        self.merger.on('done', lambda this, count: counts.append(count))
+        self.merger.go(option_args=["-O", self.merged] + self.inputs)
+        assert_equal(counts, [12])
+
+        merged = self.results(self.merged)
+        assert_equal(merged[0].dup, 12)
+        assert_equal([path for (path, options) in merged[0].merged_from], self.inputs)
+        assert not hasattr(merged[0], 'seed')
+        assert_equal([r[0] for r in merged[1:]], [r[0] for path in self.inputs for r in self.results(path)[1:]])
+
+        index = records.read_index(records.index_path(self.merged))
+        assert_equal(list(index['duplication']), range(1, 13))
+        assert_equal(list(index['generation_count']), [r[0] for r in merged[1:]])
+        assert_equal(list(index['converged']), [int(r[0] % 2 == 0) for r in merged[1:]])
+
+        parser = stats.StatsParser()
+        assert_equal(parser.get_duplication(5, option_args=["-F", self.merged])[0], merged[5][0])
+
+    def test_merged_replay_failure(self):
+        self.merger.go(option_args=["-O", self.merged] + self.inputs)
+        batch = simrunner.SimulationRunner(NumberedSim)
+        assert_raises(SystemExit, batch.go,
+                      option_args=["-N", "12", "-O", self.dir, "-S", "merged.testout", "-Q", "-D", "--replay", "1"])
+
+    def test_dedup_columnar(self):
+        skipped = []
+        self.merger.on('merged file', lambda this, path, kept, sk: skipped.append(sk))
+        self.merger.go(option_args=["-O", self.merged, "--dedup", "--columnar"] + self.inputs + [self.inputs[0]])
+        # each run numbers its duplications from 0, so the runs overlap
+        assert_equal(skipped, [0, 3, 4, 3])
+
+        parser = stats.StatsParser()
+        columns = parser.read_columns(option_args=["-F", self.merged])
+        assert_equal(sorted(columns['generation_count']), range(5))
+        assert_equal(columns['final_pop'].shape, (5, 2))
+        assert_equal(len(self.results(self.merged)), 6)
+
+    def test_option_failure(self):
+        assert_raises(SystemExit, self.merger.go, option_args=["-O", self.merged])
+        assert_raises(SystemExit, self.merger.go, option_args=["-O", self.merged, self.dir + os.sep + "missing"])
+        assert_raises(SystemExit, self.merger.go, option_args=["-O", self.inputs[0]] + self.inputs)
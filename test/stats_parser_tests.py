@@ -1,11 +1,16 @@
 import simulations.simulation as simulation
 import simulations.simulation_runner as simrunner
 import simulations.statsparser as stats
+import simulations.catalogue as catalogue
+import simulations.records as records
+import simulations.reducers as reducers
 
+import numpy as np
 import os
 import random
 import string
 
+from simulations.dynamics.onepop_discrete_replicator import OnePopDiscreteReplicatorDynamics
 from simulations.utils.optionparser import OptionParser
 from nose.tools import assert_equal
 from nose.tools import assert_raises
@@ -72,7 +77,7 @@ class TestStatsParser:
             files = os.listdir(self.dir)
             for f in files:
                 if f == "." or f == "..": continue
-                if f[-8:] == ".testout":
+                if ".testout" in f:
                     os.remove(self.dir + os.sep + f)
             os.rmdir(self.dir)
 
@@ -123,7 +128,7 @@ class TestStatsParser:
         assert_equal(self.stats.options.verbose, True)
         assert_equal(self.stats.options.test, True)
         assert_equal(self.stats._result_options, self.batch.options)
-        assert_equal(self.stats._results, [(1, "runs"), (2, "runs"), (3, "runs"), (4, "runs")])
+        assert_equal(sorted(self.stats._results), [(1, "runs"), (2, "runs"), (3, "runs"), (4, "runs")])
 
     def test_go2(self):
         bargs = ["-F",  "iter_{0}.testout", "-N", "5", "-P", "2", "-O", self.dir, "-S", "results.testout"]
@@ -136,7 +141,7 @@ class TestStatsParser:
         assert_equal(self.stats.options.verbose, False)
         assert_equal(self.stats.options.test, True)
         assert_equal(self.stats._result_options, self.batch.options)
-        assert_equal(self.stats._results, [(1, "runs"), (2, "runs"), (3, "runs"), (4, "runs"), (5, "runs")])
+        assert_equal(sorted(self.stats._results), [(1, "runs"), (2, "runs"), (3, "runs"), (4, "runs"), (5, "runs")])
 
         with open(self.dir + os.sep + "stats.testout", "rb") as outfile:
             assert_equal(outfile.read(), "".join(["{0}\n".format(self.stats._result_options)] + (["runs\n"] * 5)))
@@ -152,11 +157,20 @@ class TestStatsParser:
         assert_equal(self.stats.options.verbose, True)
         assert_equal(self.stats.options.test, True)
         assert_equal(self.stats._result_options, self.batch.options)
-        assert_equal(self.stats._results, [(1, "runs"), (2, "runs"), (3, "runs"), (4, "runs"), (5, "runs")])
+        assert_equal(sorted(self.stats._results), [(1, "runs"), (2, "runs"), (3, "runs"), (4, "runs"), (5, "runs")])
 
         with open(self.dir + os.sep + "stats.testout", "rb") as outfile:
             assert_equal(outfile.read(), "".join(["{0}\n".format(self.stats._result_options)] + (["runs\n"] * 5)))
 
+    def test_go_legacy(self):
+        bargs = ["-F",  "iter_{0}.testout", "-N", "3", "-P", "2", "-O", self.dir, "-S", "results.testout", "--legacystats"]
+        self.batch.go(option_args=bargs)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "-O", self.dir + os.sep + "stats.testout", "--test"]
+        assert self.stats.go(option_args=sargs) is None
+        assert_equal(self.stats._result_options, self.batch.options)
+        assert_equal(self.stats._results, [(1, "runs"), (2, "runs"), (3, "runs")])
+
     def test_go4(self):
         with open(self.dir + os.sep + "results.testout", "w") as testfile:
             print >>testfile, "test"
@@ -167,3 +181,327 @@ class TestStatsParser:
         assert_equal(self.stats.options.out_file, self.dir + os.sep + "stats.testout")
         assert_equal(self.stats.options.verbose, False)
         assert_equal(self.stats.options.test, True)
+
+class NumberedSim(simulation.Simulation):
+    def _run(self):
+        return (self.num * 10, self.num)
+
+class CountingParser(StatsParser):
+
+    @staticmethod
+    def _reduce_chunk(options, duplications, results):
+        return (len(results), sum(result[0] for result in results))
+
+    def _combine_chunks(self, combined, partial):
+        if combined is None:
+            return partial
+
+        return (combined[0] + partial[0], combined[1] + partial[1])
+
+class TestStatsParserRandomAccess:
+
+    def setUp(self):
+        self.stats = StatsParser()
+        self.batch = simrunner.SimulationRunner(NumberedSim)
+        self.dir = "/tmp/" + filename_generator(8)
+
+        try:
+            os.makedirs(self.dir, 0755)
+        except:
+            pass
+
+        bargs = ["-F",  "iter_{0}.testout", "-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout"]
+        self.batch.go(option_args=bargs)
+        self.sargs = ["-F", self.dir + os.sep + "results.testout", "--test"]
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def reverse_results(self):
+        path = self.dir + os.sep + "results.testout"
+        with open(path, "rb") as statsfile:
+            found = list(records.iter_records(statsfile))
+
+        with open(path, "wb") as statsfile, open(records.index_path(path), "wb") as indexfile:
+            writer = records.StatsWriter(statsfile)
+            index = records.IndexWriter(indexfile)
+            writer.write_header()
+            index.write_header()
+            writer.write(found[0])
+            for result in sorted(found[1:], reverse=True):
+                (offset, length) = writer.write(result)
+                index.write(result[1] + 1, offset, length, result[0])
+
+    def test_read_index(self):
+        index = self.stats.read_index(option_args=self.sargs)
+        assert_equal(sorted(index['duplication']), range(1, 7))
+        for entry in index:
+            assert_equal(entry['generation_count'], (entry['duplication'] - 1) * 10)
+            assert_equal(entry['converged'], -1)
+
+    def test_get_duplication(self):
+        assert_equal(self.stats.get_duplication(4, option_args=self.sargs), (30, 3))
+        assert_equal(self.stats.get_duplication(1), (0, 0))
+        assert_raises(KeyError, self.stats.get_duplication, 7)
+
+    def test_result_duplications(self):
+        self.reverse_results()
+        self.stats.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout"])
+        assert_equal(self.stats._results, [(k + 1, (k * 10, k)) for k in reversed(range(6))])
+
+        batches = []
+        parser = StatsParser()
+        parser.on('result batch', lambda this, out, duplications, results, columns: batches.append(zip(duplications, results)))
+        parser.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--batchsize", "4"])
+        assert_equal(batches, [[(k + 1, (k * 10, k)) for k in (5, 4, 3, 2)], [(2, (10, 1)), (1, (0, 0))]])
+
+    def test_parallel(self):
+        reduced = []
+        self.stats.on('result reduced', lambda this, out, combined: reduced.append(combined))
+        assert self.stats.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--processes", "2"]) is None
+        assert_equal(self.stats._result_options, self.batch.options)
+        assert not hasattr(self.stats, '_results'), "Per-result events were emitted"
+
+        serial = StatsParser()
+        serial.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout"])
+        assert_equal(reduced, [serial._results])
+
+    def test_parallel_duplications(self):
+        self.reverse_results()
+        reduced = []
+        self.stats.on('result reduced', lambda this, out, combined: reduced.append(combined))
+
+        scan = stats.record_offsets
+        def no_scan(statsfile):
+            raise AssertionError("Scanned the stats file despite the index")
+        stats.record_offsets = no_scan
+        try:
+            self.stats.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--processes", "2"])
+        finally:
+            stats.record_offsets = scan
+
+        assert_equal(reduced, [[(k + 1, (k * 10, k)) for k in reversed(range(6))]])
+
+    def test_parallel_unindexed(self):
+        os.remove(records.index_path(self.dir + os.sep + "results.testout"))
+        parser = CountingParser()
+        reduced = []
+        parser.on('result reduced', lambda this, out, combined: reduced.append(combined))
+        parser.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--processes", "2"])
+        assert_equal(reduced, [(6, sum(range(6)) * 10)])
+
+    def test_parallel_hooks(self):
+        parser = CountingParser()
+        reduced = []
+        parser.on('result reduced', lambda this, out, combined: reduced.append(combined))
+        parser.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--processes", "3"])
+        assert_equal(reduced, [(6, sum(range(6)) * 10)])
+
+    def test_parallel_failure(self):
+        assert_raises(SystemExit, self.stats.go, option_args=self.sargs + ["--processes", "0"])
+        assert_raises(SystemExit, self.stats.go, option_args=self.sargs + ["--processes", "2", "--batchsize", "2"])
+
+    def test_follow(self):
+        cursor = self.dir + os.sep + "cursor.testout"
+        fargs = self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--follow",
+                              "--cursor", cursor, "--followidle", "0", "--pollinterval", "0"]
+        self.stats.go(option_args=fargs)
+        assert_equal([count for (count, result) in self.stats._results], range(1, 7))
+        assert_equal(sorted(result for (count, result) in self.stats._results), [(k * 10, k) for k in range(6)])
+        assert_equal(self.stats._result_options, self.batch.options)
+
+        again = StatsParser()
+        again.go(option_args=fargs)
+        assert not hasattr(again, '_results'), "Results were read twice"
+        assert_equal(again._result_options, self.batch.options)
+
+        with open(self.dir + os.sep + "results.testout", "ab") as statsfile:
+            writer = records.StatsWriter(statsfile)
+            writer.write((70, 7))
+            statsfile.write(records.RECORD_HEADER.pack(records.KIND_PICKLE, 100, 0) + "partial")
+
+        again.go(option_args=fargs)
+        assert_equal(again._results, [(7, (70, 7))])
+        assert_equal(records.read_cursor(cursor)[1], 7)
+
+    def test_stale_cursor(self):
+        cursor = self.dir + os.sep + "cursor.testout"
+        fargs = self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--follow",
+                              "--cursor", cursor, "--followidle", "0", "--pollinterval", "0"]
+        self.stats.go(option_args=fargs)
+        assert_equal(records.read_cursor(cursor)[1], 6)
+
+        # a new run overwrites the stats file, with fewer results
+        bargs = ["-F",  "iter_{0}.testout", "-N", "3", "-P", "2", "-O", self.dir, "-S", "results.testout"]
+        simrunner.SimulationRunner(NumberedSim).go(option_args=bargs)
+
+        again = StatsParser()
+        again.go(option_args=fargs)
+        assert_equal([count for (count, result) in again._results], [1, 2, 3])
+        assert_equal(sorted(result for (count, result) in again._results), [(k * 10, k) for k in range(3)])
+        assert_equal(records.read_cursor(cursor)[1], 3)
+
+    def test_rerun_cursor(self):
+        cursor = self.dir + os.sep + "cursor.testout"
+        fargs = self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--follow",
+                              "--cursor", cursor, "--followidle", "0", "--pollinterval", "0"]
+        bargs = ["-F",  "iter_{0}.testout", "-N", "6", "-P", "2", "-O", self.dir, "-S", "results.testout", "--seed", "1234"]
+        simrunner.SimulationRunner(NumberedSim).go(option_args=bargs)
+        self.stats.go(option_args=fargs)
+        assert_equal(len(self.stats._results), 6)
+
+        # the same seed and options write the same options record
+        simrunner.SimulationRunner(NumberedSim).go(option_args=bargs)
+
+        again = StatsParser()
+        again.go(option_args=fargs)
+        assert_equal(sorted(result for (count, result) in again._results), [(k * 10, k) for k in range(6)])
+        assert_equal(records.read_cursor(cursor)[1], 6)
+
+    def test_stop_following(self):
+        def stop(this, out, count, result):
+            this.stop_following = True
+        self.stats.on('result', stop)
+
+        self.stats.go(option_args=self.sargs + ["-O", self.dir + os.sep + "stats.testout", "--follow"])
+        assert_equal(len(self.stats._results), 1)
+        assert_equal(records.read_cursor(records.cursor_path(self.dir + os.sep + "results.testout"))[1], 1)
+
+    def test_follow_failure(self):
+        assert_raises(SystemExit, self.stats.go, option_args=self.sargs + ["--follow", "--processes", "2"])
+        assert_raises(SystemExit, self.stats.go, option_args=self.sargs + ["--follow", "--followidle", "-1"])
+
+    def test_iter_duplications(self):
+        got = sorted(self.stats.iter_duplications(duplications=[2, 5, 6], option_args=self.sargs))
+        assert_equal(got, [(2, (10, 1)), (5, (40, 4)), (6, (50, 5))])
+
+        got = sorted(self.stats.iter_duplications(min_generations=20, max_generations=40))
+        assert_equal(got, [(3, (20, 2)), (4, (30, 3)), (5, (40, 4))])
+
+        assert_equal(list(self.stats.iter_duplications(converged=True)), [])
+
+class PDSim(OnePopDiscreteReplicatorDynamics):
+    _payoffs = [[3., 0.], [4., 1.]]
+
+    def __init__(self, *args, **kwdargs):
+        super(PDSim, self).__init__(*args, types=['C', 'D'], **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        return [self._payoffs[profile[0]][profile[1]], self._payoffs[profile[1]][profile[0]]]
+
+class TestStatsParserColumns:
+
+    def setUp(self):
+        self.stats = StatsParser()
+        self.batch = simrunner.SimulationRunner(PDSim)
+        self.dir = "/tmp/" + filename_generator(8)
+
+        try:
+            os.makedirs(self.dir, 0755)
+        except:
+            pass
+
+    def tearDown(self):
+        if os.path.isdir(self.dir):
+            for f in os.listdir(self.dir):
+                if ".testout" in f:
+                    os.remove(self.dir + os.sep + f)
+            os.rmdir(self.dir)
+
+    def test_read_columns(self):
+        bargs = ["-F",  "iter_{0}.testout", "-N", "5", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--columnar"]
+        self.batch.go(option_args=bargs)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "--test"]
+        got = self.stats.read_columns(option_args=sargs)
+        assert_equal(got['final_pop'].shape, (5, 2))
+        assert np.allclose(got['final_pop'], [[0., 1.]] * 5, atol=1e-8)
+        assert (got['converged'] == 1).all()
+
+        for (duplication, result) in self.stats.iter_duplications():
+            assert_equal(got['generation_count'][duplication - 1], result[0])
+            assert (got['initial_pop'][duplication - 1] == result[1]).all()
+
+    def test_result_batch(self):
+        bargs = ["-F",  "iter_{0}.testout", "-N", "5", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D"]
+        self.batch.go(option_args=bargs)
+
+        batches = []
+        def handler(this, out, duplications, results, columns):
+            batches.append((list(duplications), len(results), columns))
+        self.stats.on('result batch', handler)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "-O", self.dir + os.sep + "stats.testout", "--test", "--batchsize", "2"]
+        self.stats.go(option_args=sargs)
+        index = self.stats.read_index()
+        assert_equal([b[0] for b in batches], [list(index['duplication'][:2]), list(index['duplication'][2:4]), [index['duplication'][4]]])
+        assert_equal([b[1] for b in batches], [2, 2, 1])
+        assert_equal(batches[0][2]['final_pop'].shape, (2, 2))
+        assert_equal(list(batches[2][2]['converged']), [1])
+        assert not hasattr(self.stats, '_results'), "Per-result events were emitted"
+
+    def test_batch_size_failure(self):
+        with open(self.dir + os.sep + "results.testout", "w") as testfile:
+            print >>testfile, "test"
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "--test", "--batchsize", "0"]
+        assert_raises(SystemExit, self.stats.go, option_args=sargs)
+
+    def test_read_reduced(self):
+        self.batch.add_reducer(reducers.AttractorCounter())
+        self.batch.add_reducer(reducers.GenerationHistogram())
+        assert_raises(ValueError, self.batch.add_reducer, reducers.GenerationHistogram())
+
+        bargs = ["-F",  "iter_{0}.testout", "-N", "4", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--noresults"]
+        self.batch.go(option_args=bargs)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "--test"]
+        got = self.stats.read_reduced(option_args=sargs)
+        assert_equal(got['attractors']['attractors'], [((0., 1.), 4)])
+        assert_equal(got['generations']['counts'].sum(), 4)
+        assert_equal(len(self.stats.read_index()), 0)
+        assert_raises(ValueError, self.stats.go, option_args=sargs)
+
+    def test_cluster_attractors(self):
+        self.batch.add_reducer(reducers.AttractorClusters())
+        bargs = ["-F",  "iter_{0}.testout", "-N", "4", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D"]
+        self.batch.go(option_args=bargs)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "--test"]
+        offline = self.stats.cluster_attractors(option_args=sargs)
+        online = self.stats.read_reduced()['clusters']['attractors']
+        assert_equal([a[1] for a in offline], [4])
+        assert_equal([a[1] for a in online], [4])
+        assert np.allclose(offline[0][0], [0., 1.], atol=1e-6)
+        assert_equal(offline[0][2], 1.)
+
+    def test_cluster_attractors_columnar(self):
+        bargs = ["-F",  "iter_{0}.testout", "-N", "4", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--columnar"]
+        self.batch.go(option_args=bargs)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "--test"]
+        attractors = self.stats.cluster_attractors(tolerance_scale=1e5, option_args=sargs)
+        assert_equal([a[1] for a in attractors], [4])
+
+    def test_catalogue(self):
+        online = self.dir + os.sep + "online.testout"
+        offline = self.dir + os.sep + "offline.testout"
+        self.batch.data['background_rate'] = .1
+
+        bargs = ["-F",  "iter_{0}.testout", "-N", "4", "-P", "2", "-O", self.dir, "-S", "results.testout", "-Q", "-D", "--catalogue", online]
+        self.batch.go(option_args=bargs)
+
+        sargs = ["-F", self.dir + os.sep + "results.testout", "--test"]
+        run_id = self.stats.import_catalogue(offline, option_args=sargs)
+        assert_equal(run_id, os.path.abspath(self.dir + os.sep + "results.testout"))
+
+        found = catalogue.Catalogue(online).find(parameters={'background_rate': .1, 'dup': 4},
+                                                 final_state=[0., 1.])
+        assert_equal([(r[0], r[1], r[4]) for r in found], [(self.batch.identifier, k, 'stable state') for k in range(1, 5)])
+
+        imported = catalogue.Catalogue(offline).find(parameters={'dup': 4}, final_state=[0., 1.])
+        assert_equal([r[1:] for r in imported], [r[1:] for r in found])
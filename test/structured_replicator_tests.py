@@ -0,0 +1,105 @@
+import simulations.dynamics.structured_replicator as sr
+import simulations.simulation as simulation
+import numpy as np
+
+from nose.tools import assert_equal
+from nose.tools import assert_raises
+
+
+class PDSim(sr.StructuredReplicatorDynamics):
+    _payoffs = [[3, 0], [4, 1]]
+
+    def __init__(self, *args, **kwdargs):
+        super(PDSim, self).__init__(*args, types=['C', 'D'], **kwdargs)
+
+    def _profile_payoffs(self, profile):
+        return [self._payoffs[profile[0]][profile[1]], self._payoffs[profile[1]][profile[0]]]
+
+
+class TestAdjacency:
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_lattice(self):
+        (indptr, indices) = sr.lattice_adjacency((3, 4))
+        assert_equal(len(indptr), 13)
+        assert (np.diff(indptr) == 4).all()
+        assert_equal(sorted(indices[indptr[0]:indptr[1]]), [1, 3, 4, 8])
+        assert_equal(sorted(indices[indptr[5]:indptr[6]]), [1, 4, 6, 9])
+
+    def test_lattice_open(self):
+        (indptr, indices) = sr.lattice_adjacency((3, 3), 'moore', periodic=False)
+        assert_equal(list(np.diff(indptr)), [3, 5, 3, 5, 8, 5, 3, 5, 3])
+        assert_equal(sorted(indices[indptr[0]:indptr[1]]), [1, 3, 4])
+
+    def test_graph(self):
+        (indptr, indices) = sr.graph_adjacency(4, [(0, 1), (1, 2), (0, 2)])
+        assert_equal(list(indptr), [0, 2, 4, 6, 6])
+        assert_equal(sorted(indices[0:2]), [1, 2])
+        assert_equal(sorted(indices[2:4]), [0, 2])
+
+    def test_bad_neighbourhood(self):
+        assert_raises(ValueError, sr.lattice_adjacency, (3, 3), 'hex')
+
+
+class TestStructuredReplicator:
+
+    def setUp(self):
+        self.sim = PDSim({}, 1, False, lattice_shape=(4, 5))
+
+    def tearDown(self):
+        pass
+
+    def test_init(self):
+        assert isinstance(self.sim, simulation.Simulation), "Sim is not a simulation instance"
+        assert_equal(self.sim.num_nodes(), 20)
+        assert_raises(ValueError, PDSim, {}, 1, False, update_rule='bogus')
+
+    def test_random_population(self):
+        pop = self.sim._random_population()
+        assert_equal(pop.shape, (20, 2))
+        assert np.allclose(pop.sum(axis=1), 1.)
+
+    def test_well_mixed_equivalence(self):
+        # on a complete graph with self-loops, every node sees the mean state
+        indptr = np.array([0, 3, 6, 9])
+        indices = np.array([0, 1, 2] * 3)
+        sim = PDSim({}, 1, False, adjacency=(indptr, indices))
+        pop = np.array([[.5, .5]] * 3)
+        assert np.allclose(sim._step_generation(pop)[1:], np.array([[.375, .625]] * 3))
+
+    def test_step_generation(self):
+        pop = np.array([[.5, .5]] * 20)
+        pop[0] = (1., 0.)
+        got = self.sim._step_generation(pop)
+        assert_equal(got.shape, (21, 2))
+        assert_equal(got[0, 0], 0.)
+        neighbours = (pop[1] + pop[4] + pop[5] + pop[15]) / 4.
+        payoffs = np.array([[3., 0.], [4., 1.]]).dot(neighbours)
+        assert np.allclose(got[1], pop[0] * payoffs / pop[0].dot(payoffs))
+
+    def test_imitation(self):
+        sim = PDSim({}, 1, False, lattice_shape=(1, 3), periodic=False, update_rule='imitation')
+        pop = np.array([[1., 0.], [0., 1.], [1., 0.]])
+        got = sim._step_generation(pop)
+        assert (got[1:] == np.array([[0., 1.], [0., 1.], [0., 1.]])).all(), "{0}".format(got)
+        assert_equal(sim._step_generation(got[1:])[0, 0], 1.)
+
+    def test_run(self):
+        (gen_ct, initial_pop, final_pop, custom_data) = self.sim.run()
+        assert gen_ct >= 1
+        assert_equal(final_pop.shape, (20, 2))
+        assert final_pop[:, 1].min() > .99
+
+    def test_large_lattice(self):
+        sim = PDSim({}, 1, False, lattice_shape=(500, 500), update_rule='imitation')
+        pop = sim._random_population()
+        got = sim._step_generation(pop)
+        assert_equal(got.shape, (250001, 2))
+        assert got[0, 0] in (0., 1.)
+        assert (got[1:] >= 0.).all()
+        assert np.allclose(got[1:].sum(axis=1), 1.)